@@ -0,0 +1,328 @@
+"""
+CPU Affinity and Isolation for WheelFlow
+Per-job core sets, MPI binding, cgroup v2 limits and low-priority workers
+
+Each running job is given its own set of physical cores, taken from a
+single NUMA node when one has enough free cores. mpirun is restricted to
+that set and binds one rank per core, so two jobs on the same host never
+share or migrate across each other's cores. When cgroup v2 is delegated
+to the server (WHEELFLOW_CGROUP_ROOT is writable) each job's process tree
+also gets a cpuset, a CPU quota and an optional memory limit.
+
+Post-processing and rendering run at lower CPU and I/O priority so they
+only use cycles the solvers leave idle.
+
+Configuration (environment variables):
+    WHEELFLOW_CPU_BINDING: "0" disables core sets and binding
+    WHEELFLOW_CGROUP_ROOT: Parent cgroup for jobs (default /sys/fs/cgroup/wheelflow)
+    WHEELFLOW_JOB_MEMORY_MAX: memory.max for each job (bytes, or e.g. "32G")
+    WHEELFLOW_RESERVED_CPUS: CPUs never given to jobs (e.g. "0,1"), left for the web server
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+SYSFS_CPU = Path("/sys/devices/system/cpu")
+SYSFS_NODE = Path("/sys/devices/system/node")
+
+BINDING_ENABLED = os.environ.get("WHEELFLOW_CPU_BINDING", "1") != "0"
+CGROUP_ROOT = Path(os.environ.get("WHEELFLOW_CGROUP_ROOT", "/sys/fs/cgroup/wheelflow"))
+JOB_MEMORY_MAX = os.environ.get("WHEELFLOW_JOB_MEMORY_MAX", "max")
+
+# Nice value for post-processing/render work (solvers run at 0)
+BACKGROUND_NICE = 10
+
+# cpu.max period in microseconds
+CPU_MAX_PERIOD = 100000
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """Parse a kernel CPU list such as "0-3,8,10-11"."""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-")
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def format_cpu_list(cpus: List[int]) -> str:
+    """Format CPUs as a comma-separated list (accepted by mpirun and cgroups)."""
+    return ",".join(str(c) for c in sorted(cpus))
+
+
+def _usable_cpus() -> List[int]:
+    """CPUs this process may run on, minus reserved ones."""
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = list(range(os.cpu_count() or 1))
+    reserved = set(parse_cpu_list(os.environ.get("WHEELFLOW_RESERVED_CPUS", "")))
+    return [c for c in cpus if c not in reserved]
+
+
+def _physical_cores(cpus: List[int]) -> List[int]:
+    """Keep one logical CPU (the first hyperthread) per physical core."""
+    cores = []
+    seen = set()
+    for cpu in cpus:
+        siblings_file = SYSFS_CPU / f"cpu{cpu}" / "topology" / "thread_siblings_list"
+        try:
+            siblings = tuple(parse_cpu_list(siblings_file.read_text()))
+        except (OSError, ValueError):
+            siblings = (cpu,)
+        if siblings in seen:
+            continue
+        seen.add(siblings)
+        cores.append(cpu)
+    return cores
+
+
+def get_numa_nodes() -> Dict[int, List[int]]:
+    """
+    Usable physical cores grouped by NUMA node.
+
+    Machines without NUMA information are reported as a single node 0.
+    """
+    usable = set(_usable_cpus())
+    nodes = {}
+    for node_dir in sorted(SYSFS_NODE.glob("node[0-9]*")):
+        try:
+            cpus = parse_cpu_list((node_dir / "cpulist").read_text())
+        except (OSError, ValueError):
+            continue
+        cores = _physical_cores([c for c in cpus if c in usable])
+        if cores:
+            nodes[int(node_dir.name[4:])] = cores
+    if not nodes:
+        nodes[0] = _physical_cores(sorted(usable))
+    return nodes
+
+
+class CoreAllocator:
+    """Hands out disjoint core sets to running jobs."""
+
+    def __init__(self, nodes: Optional[Dict[int, List[int]]] = None):
+        self.nodes = nodes if nodes is not None else get_numa_nodes()
+        self.allocations: Dict[str, List[int]] = {}
+
+    def _free(self) -> Dict[int, List[int]]:
+        used = {c for cpus in self.allocations.values() for c in cpus}
+        return {node: [c for c in cores if c not in used] for node, cores in self.nodes.items()}
+
+    def allocate(self, job_id: str, num_cores: int) -> Optional[List[int]]:
+        """
+        Reserve cores for a job.
+
+        Prefers the NUMA node with the fewest free cores that still fits the
+        job (keeping large nodes free for large jobs), then spreads over as
+        few nodes as possible.
+
+        Returns:
+            Sorted CPU list, or None when not enough cores are free
+        """
+        if job_id in self.allocations:
+            return self.allocations[job_id]
+
+        free = self._free()
+        if sum(len(c) for c in free.values()) < num_cores:
+            return None
+
+        fitting = [node for node, cores in free.items() if len(cores) >= num_cores]
+        if fitting:
+            node = min(fitting, key=lambda n: len(free[n]))
+            cpus = free[node][:num_cores]
+        else:
+            cpus = []
+            for node in sorted(free, key=lambda n: len(free[n]), reverse=True):
+                cpus.extend(free[node][:num_cores - len(cpus)])
+                if len(cpus) == num_cores:
+                    break
+
+        self.allocations[job_id] = sorted(cpus)
+        return self.allocations[job_id]
+
+    def release(self, job_id: str):
+        """Return a job's cores to the pool."""
+        self.allocations.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[List[int]]:
+        """Cores held by a job, if any."""
+        return self.allocations.get(job_id)
+
+
+_allocator: Optional[CoreAllocator] = None
+
+
+def get_allocator() -> CoreAllocator:
+    """Process-wide allocator (topology is read on first use)."""
+    global _allocator
+    if _allocator is None:
+        _allocator = CoreAllocator()
+    return _allocator
+
+
+def allocate_job_cores(job_id: str, num_cores: int) -> Optional[List[int]]:
+    """Reserve cores for a job; None means it runs unbound."""
+    if not BINDING_ENABLED:
+        return None
+    cpus = get_allocator().allocate(job_id, num_cores)
+    if cpus is None:
+        print(f"Job {job_id}: {num_cores} free cores not available, running without binding")
+    else:
+        print(f"Job {job_id}: bound to cores {format_cpu_list(cpus)}")
+    return cpus
+
+
+def release_job_cores(job_id: str):
+    """Release a job's cores and remove its cgroup."""
+    if _allocator is not None:
+        _allocator.release(job_id)
+    remove_job_cgroup(job_id)
+
+
+def get_job_cores(job_id: Optional[str]) -> Optional[List[int]]:
+    """Cores held by a job (None if unbound)."""
+    if job_id is None or _allocator is None:
+        return None
+    return _allocator.get(job_id)
+
+
+def mpirun_binding_args(cpus: Optional[List[int]], num_procs: int) -> List[str]:
+    """
+    mpirun (Open MPI) options restricting ranks to a core set.
+
+    Ranks are bound one per core; if the job was given fewer cores than
+    ranks they are left unbound rather than stacked on one core.
+    """
+    if not cpus:
+        return []
+    if len(cpus) < num_procs:
+        return ["--cpu-set", format_cpu_list(cpus), "--bind-to", "none"]
+    return ["--cpu-set", format_cpu_list(cpus[:num_procs]), "--map-by", "core", "--bind-to", "core"]
+
+
+# =============================================================================
+# cgroup v2
+# =============================================================================
+
+def cgroups_available() -> bool:
+    """True if job cgroups can be created under CGROUP_ROOT."""
+    # Only cgroup v2 (unified hierarchy) has cgroup.controllers
+    if not (CGROUP_ROOT.parent / "cgroup.controllers").exists():
+        return False
+    try:
+        if not CGROUP_ROOT.exists():
+            CGROUP_ROOT.mkdir()
+            # Let child cgroups use the cpuset, cpu and memory controllers
+            (CGROUP_ROOT / "cgroup.subtree_control").write_text("+cpuset +cpu +memory")
+        return os.access(CGROUP_ROOT / "cgroup.procs", os.W_OK)
+    except OSError:
+        return False
+
+
+def job_cgroup_path(job_id: str) -> Path:
+    return CGROUP_ROOT / f"job-{job_id}"
+
+
+def create_job_cgroup(job_id: str, cpus: List[int]) -> Optional[Path]:
+    """
+    Create (or update) a job cgroup limited to its cores.
+
+    Returns:
+        cgroup directory, or None when cgroups are not delegated to us
+    """
+    if not cgroups_available():
+        return None
+    path = job_cgroup_path(job_id)
+    try:
+        path.mkdir(exist_ok=True)
+        _write_cgroup_file(path / "cpuset.cpus", format_cpu_list(cpus))
+        _write_cgroup_file(path / "cpu.max", f"{len(cpus) * CPU_MAX_PERIOD} {CPU_MAX_PERIOD}")
+        _write_cgroup_file(path / "memory.max", JOB_MEMORY_MAX)
+        return path
+    except OSError as e:
+        print(f"Could not set up cgroup for job {job_id}: {e}")
+        return None
+
+
+def get_job_cgroup(job_id: Optional[str]) -> Optional[Path]:
+    """A job's cgroup directory, if one was created."""
+    if job_id is None:
+        return None
+    path = job_cgroup_path(job_id)
+    return path if path.is_dir() else None
+
+
+def _write_cgroup_file(path: Path, value: str):
+    """Write a cgroup control file if the controller is enabled."""
+    if path.exists():
+        path.write_text(value)
+
+
+def remove_job_cgroup(job_id: str):
+    """Remove a job's (empty) cgroup."""
+    path = job_cgroup_path(job_id)
+    try:
+        if path.exists():
+            path.rmdir()
+    except OSError:
+        pass
+
+
+def job_launch_prefix(cpus: Optional[List[int]], cgroup: Optional[Path],
+                      background: bool = False) -> List[str]:
+    """
+    Commands to run a job's launcher through, applying its isolation.
+
+    The launcher (mpirun, or a serial utility) is started as
+    prefix + command. Each part execs the next, so the launcher keeps the
+    pid and session it was started with: a shell joins the job cgroup,
+    nice/ionice drop background work's priority and taskset pins the
+    launcher to the job's cores, and mpirun and every rank it starts
+    inherit all of it. (A preexec_fn could do this in the child, but is not
+    safe to use in the threaded server.)
+    """
+    prefix = []
+    if cgroup is not None:
+        prefix += ["sh", "-c", 'echo $$ > "$1" 2>/dev/null; shift; exec "$@"', "sh",
+                   str(cgroup / "cgroup.procs")]
+    if background:
+        prefix += ["nice", "-n", str(BACKGROUND_NICE)]
+        if shutil.which("ionice"):
+            prefix += ["ionice", "-c", "3"]
+    if cpus:
+        if shutil.which("taskset"):
+            prefix += ["taskset", "-c", format_cpu_list(cpus)]
+        else:
+            print("WARNING: taskset not found; job launchers are not pinned to their cores")
+    return prefix
+
+
+# =============================================================================
+# Low-priority background work
+# =============================================================================
+
+def lower_priority():
+    """Drop the calling process to background CPU and I/O priority."""
+    try:
+        os.nice(BACKGROUND_NICE)
+    except OSError:
+        pass
+    if psutil is not None and hasattr(psutil, "IOPRIO_CLASS_IDLE"):
+        try:
+            psutil.Process().ionice(psutil.IOPRIO_CLASS_IDLE)
+        except (OSError, psutil.Error):
+            pass
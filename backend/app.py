@@ -4,18 +4,22 @@ FastAPI Backend for OpenFOAM Integration
 """
 
 import os
+import hmac
 import json
+import re
 import uuid
 import shutil
 import asyncio
 import subprocess
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, Response
 from fastapi.requests import Request
 from pydantic import BaseModel
 import math
@@ -47,6 +51,25 @@ try:
         generate_all_field_files_rotating
     )
     from backend import database as db
+    from backend import job_control
+    from backend import scaling_model
+    from backend import affinity
+    from backend import render_pool
+    from backend import openfoam_env
+    from backend import workers
+    from backend import executors
+    from backend import case_bundle
+    from backend import stage_metrics
+    from backend import metrics
+    from backend import profiler
+    from backend import loop_monitor
+    from backend import solver_profile
+    from backend import dat_reader
+    from backend import timeseries
+    from backend import log_index
+    from backend import foam_dict
+    from backend import foam_mesh
+    from backend import mesh_stats
 except ImportError:
     from stl_validator import (
         validate_stl_file,
@@ -73,24 +96,86 @@ except ImportError:
         generate_all_field_files_rotating
     )
     import database as db
+    import job_control
+    import scaling_model
+    import affinity
+    import render_pool
+    import openfoam_env
+    import workers
+    import executors
+    import case_bundle
+    import stage_metrics
+    import metrics
+    import profiler
+    import loop_monitor
+    import solver_profile
+    import dat_reader
+    import timeseries
+    import log_index
+    import foam_dict
+    import foam_mesh
+    import mesh_stats
 
 # Configuration
 BASE_DIR = Path(__file__).parent.parent
 UPLOAD_DIR = BASE_DIR / "uploads"
 CASES_DIR = BASE_DIR / "cases"
 RESULTS_DIR = BASE_DIR / "results"
+BUNDLES_DIR = BASE_DIR / "data" / "bundles"
 TEMPLATES_DIR = BASE_DIR / "templates"
 STATIC_DIR = BASE_DIR / "static"
 
-# OpenFOAM Configuration
-OPENFOAM_DIR = Path("/opt/openfoam13")
-OPENFOAM_BIN = OPENFOAM_DIR / "platforms/linux64GccDPInt32Opt/bin"
+# Admin endpoints (/api/admin/*) require this token in X-Admin-Token; they
+# are disabled when it is unset
+ADMIN_TOKEN = os.environ.get("WHEELFLOW_ADMIN_TOKEN")
+
+# Write format of the slice surfaces (VTK): binary files are smaller and
+# read without parsing text; ascii for inspecting them by hand
+SLICE_WRITE_FORMAT = "ascii" if os.environ.get("WHEELFLOW_SLICE_WRITE_FORMAT") == "ascii" else "binary"
+
+# OpenFOAM Configuration (WHEELFLOW_OPENFOAM_DIR etc., see openfoam_env)
+OPENFOAM_DIR = openfoam_env.OPENFOAM_DIR
+OPENFOAM_BIN = openfoam_env.OPENFOAM_BIN
 
 # Ensure directories exist
 for d in [UPLOAD_DIR, CASES_DIR, RESULTS_DIR]:
     d.mkdir(parents=True, exist_ok=True)
 
-app = FastAPI(title="WheelFlow", description="Bicycle Wheel CFD Analysis")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Server startup/shutdown hooks."""
+    # Load the OpenFOAM environment snapshot and probe installed tools once,
+    # instead of on the first simulation or visualization request
+    await asyncio.to_thread(openfoam_env.probe_capabilities)
+    # Requeue remote jobs whose workers stopped reporting
+    expiry_task = asyncio.create_task(expire_worker_leases())
+    # Watch for handlers and tasks that block the event loop
+    loop_monitor.monitor.start(app.routes)
+    yield
+    loop_monitor.monitor.stop()
+    expiry_task.cancel()
+    # Stop the low-priority render workers
+    render_pool.shutdown_pool()
+
+
+app = FastAPI(title="WheelFlow", description="Bicycle Wheel CFD Analysis", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Time every request for the per-route latency histogram."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Route templates keep the label set small (/api/jobs/{job_id}, not ids)
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.REQUEST_LATENCY.observe(time.perf_counter() - start, method=request.method,
+                                        route=route, status=str(status))
+
 
 # Mount static files
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
@@ -104,6 +189,9 @@ def _load_jobs_from_db():
 
 jobs = _load_jobs_from_db()
 
+# Blobs of each remote job's generated case, kept until the job finishes
+remote_inputs: Dict[str, list] = {}
+
 
 def sync_job_to_db(job_id: str, job: dict = None):
     """Sync job changes to database. Call after significant job updates."""
@@ -113,8 +201,11 @@ def sync_job_to_db(job_id: str, job: dict = None):
         db.update_job(
             job_id,
             status=job.get('status'),
+            config=job.get('config'),
             results=job.get('results'),
-            error=job.get('error')
+            error=job.get('error'),
+            suspended_stage=job.get('suspended_stage'),
+            mesh=job.get('mesh')
         )
 
 
@@ -134,7 +225,7 @@ class SimulationConfig(BaseModel):
 class JobStatus(BaseModel):
     id: str
     name: str
-    status: str  # queued, meshing, solving, post-processing, complete, failed
+    status: str  # queued, meshing, solving, post-processing, complete, failed, suspended, cancelled
     progress: int
     created_at: str
     updated_at: str
@@ -352,6 +443,20 @@ async def get_upload(file_id: str):
     raise HTTPException(404, "File not found")
 
 
+# Where a job runs: on this host, leased to a registered worker node,
+# submitted to a SLURM cluster (see executors.py), or exported as a case
+# bundle to solve elsewhere (see case_bundle.py)
+EXECUTOR_CHOICES = ("local", "remote", "slurm", "bundle")
+
+
+def check_executor(executor: str):
+    """Reject executors that are unknown or not set up on this server."""
+    if executor not in EXECUTOR_CHOICES:
+        raise HTTPException(400, f"Unknown executor: {executor}")
+    if executor == "remote" and not workers.WORKER_TOKEN:
+        raise HTTPException(400, "Remote workers are disabled; set WHEELFLOW_WORKER_TOKEN")
+
+
 @app.post("/api/simulate")
 async def start_simulation(
     background_tasks: BackgroundTasks,
@@ -373,9 +478,13 @@ async def start_simulation(
     domain_mode: str = Form("scaled"),  # "scaled" (5D/10D) or "fixed" (old hardcoded)
     n_layers_override: Optional[int] = Form(None),
     included_angle: int = Form(120),
+    reconstruct: str = Form("none"),  # "none" (results read from processor dirs) or "latest" (p, U at last time)
+    executor: str = Form("local"),  # "local", "remote" (leased to a worker), "slurm" or "bundle"
 ):
     """Start a new CFD simulation"""
 
+    check_executor(executor)
+
     # Parse yaw angles
     yaw_list = [float(y.strip()) for y in yaw_angles.split(",")]
 
@@ -402,6 +511,8 @@ async def start_simulation(
         "domain_mode": domain_mode,
         "n_layers_override": n_layers_override,
         "included_angle": included_angle,
+        "reconstruct": reconstruct,
+        "executor": executor,
     }
 
     # Create job in database and cache
@@ -411,7 +522,7 @@ async def start_simulation(
     jobs[job_id] = job_data
 
     # Start simulation in background
-    background_tasks.add_task(run_simulation, job_id)
+    background_tasks.add_task(execute_job, job_id)
 
     return {"job_id": job_id, "status": "queued"}
 
@@ -436,6 +547,8 @@ async def start_batch_simulation(
     domain_mode: str = Form("scaled"),
     n_layers_override: Optional[int] = Form(None),
     included_angle: int = Form(120),
+    reconstruct: str = Form("none"),
+    executor: str = Form("local"),
 ):
     """
     Start a batch CFD simulation for multiple yaw angles.
@@ -446,6 +559,8 @@ async def start_batch_simulation(
     Args:
         yaw_angles: Comma-separated list of yaw angles (e.g., "0,5,10,15,20")
     """
+    check_executor(executor)
+
     # Parse yaw angles
     yaw_list = [float(y.strip()) for y in yaw_angles.split(",")]
 
@@ -481,6 +596,8 @@ async def start_batch_simulation(
             "domain_mode": domain_mode,
             "n_layers_override": n_layers_override,
             "included_angle": included_angle,
+            "reconstruct": reconstruct,
+            "executor": executor,
         }
 
         # Create job in database and cache
@@ -524,21 +641,52 @@ async def run_batch_simulation(batch_id: str, job_ids: list):
 
     Optimization: Generate mesh once and reuse for all yaw angles
     (only boundary conditions change between runs).
+
+    Calling this again for a suspended batch resumes it: finished sub-jobs
+    are skipped and the suspended one continues from its checkpoint.
     """
     batch = batch_jobs[batch_id]
 
     try:
-        # Run jobs sequentially (could be parallelized with more resources)
-        for i, job_id in enumerate(job_ids):
+        executor = jobs[job_ids[0]]["config"].get("executor", "local")
+        if executor != "local":
+            # Workers and batch schedulers have room for the whole sweep:
+            # run every yaw angle at once
+            batch["status"] = f"running_{executor}"
+            await asyncio.gather(*(execute_job(job_id, resume=jobs[job_id]["status"] == "suspended")
+                                   for job_id in job_ids
+                                   if jobs[job_id]["status"] not in ("complete", "failed", "cancelled")))
+            if any(jobs[job_id]["status"] == "suspended" for job_id in job_ids):
+                batch["status"] = "suspended"
+                return
+            if any(jobs[job_id]["status"] == "awaiting_results" for job_id in job_ids):
+                # Aggregated when the last bundle's results are imported
+                batch["status"] = "awaiting_results"
+                return
+            job_ids_run = []
+        else:
+            job_ids_run = job_ids
+
+        # Run local jobs sequentially (could be parallelized with more resources)
+        for i, job_id in enumerate(job_ids_run):
+            # Skip jobs finished (or cancelled) before a suspend/resume cycle
+            if jobs[job_id]["status"] in ("complete", "failed", "cancelled"):
+                continue
+
             batch["status"] = f"running_{i+1}_of_{len(job_ids)}"
 
             # Run individual simulation
-            await run_simulation(job_id)
+            await run_simulation(job_id, resume=jobs[job_id]["status"] == "suspended")
 
             # Check if it failed
             if jobs[job_id]["status"] == "failed":
                 print(f"Job {job_id} failed: {jobs[job_id].get('error')}")
 
+            # A suspended sub-job pauses the whole sweep until resumed
+            if jobs[job_id]["status"] == "suspended":
+                batch["status"] = "suspended"
+                return
+
         # Aggregate results
         batch["status"] = "aggregating"
         batch_results = aggregate_batch_results(batch_id, job_ids)
@@ -643,109 +791,393 @@ async def get_batch_results(batch_id: str):
     return batch["results"]
 
 
-async def run_simulation(job_id: str):
-    """Run OpenFOAM simulation (background task)"""
+@app.post("/api/batch/{batch_id}/cancel")
+async def cancel_batch(batch_id: str):
+    """Cancel a batch: the running sub-job is killed, queued ones never start."""
+    if batch_id not in batch_jobs:
+        raise HTTPException(404, "Batch not found")
+
+    batch = batch_jobs[batch_id]
+    for job_id in batch["sub_jobs"]:
+        job = jobs.get(job_id)
+        if not job or job["status"] in ("complete", "failed", "cancelled"):
+            continue
+        if workers.coordinator.is_managed(job_id):
+            job["status"] = "cancelled"
+            workers.coordinator.cancel(job_id)
+        elif job["status"] in ("pending", "queued", "suspended", "awaiting_results"):
+            job["status"] = "cancelled"
+            sync_job_to_db(job_id, job)
+        else:
+            await job_control.cancel_job(job_id)
+
+    batch["status"] = "cancelled"
+    return {"batch_id": batch_id, "status": "cancelled"}
+
+
+@app.post("/api/batch/{batch_id}/suspend")
+async def suspend_batch(batch_id: str, background_tasks: BackgroundTasks):
+    """Suspend the running sub-job of a batch; the sweep pauses after it."""
+    if batch_id not in batch_jobs:
+        raise HTTPException(404, "Batch not found")
+
+    batch = batch_jobs[batch_id]
+    running = [job_id for job_id in batch["sub_jobs"]
+               if jobs.get(job_id) and jobs[job_id]["status"] not in FINISHED_STATUSES + QUEUED_STATUSES]
+    if not running:
+        raise HTTPException(400, f"Batch has no running job. Status: {batch['status']}")
+
+    for job_id in running:
+        background_tasks.add_task(job_control.suspend_job, job_id)
+
+    return {"batch_id": batch_id, "status": "suspending", "job_ids": running}
+
+
+@app.post("/api/batch/{batch_id}/resume")
+async def resume_batch(batch_id: str, background_tasks: BackgroundTasks):
+    """Resume a suspended batch, continuing the suspended sub-job first."""
+    if batch_id not in batch_jobs:
+        raise HTTPException(404, "Batch not found")
+
+    batch = batch_jobs[batch_id]
+    if batch["status"] != "suspended":
+        raise HTTPException(400, f"Batch is not suspended. Status: {batch['status']}")
+
+    batch["status"] = "resuming"
+    background_tasks.add_task(run_batch_simulation, batch_id, batch["sub_jobs"])
+    return {"batch_id": batch_id, "status": "resuming"}
+
+
+async def execute_job(job_id: str, resume: bool = False):
+    """Run a job with its configured executor (background task)."""
+    executor = jobs[job_id]["config"].get("executor")
+    if executor == "remote":
+        await run_remote_simulation(job_id)
+    elif executor == "bundle":
+        await prepare_bundle_job(job_id)
+    else:
+        await run_simulation(job_id, resume)
+
+
+async def prepare_bundle_job(job_id: str):
+    """
+    Generate a job's case for export as a bundle.
+
+    The job then waits in "awaiting_results" until results are imported
+    through POST /api/jobs/{job_id}/bundle/results.
+    """
     job = jobs[job_id]
     config = job["config"]
+    case_dir = CASES_DIR / job_id
+    if job["status"] == "cancelled":
+        return
 
     try:
-        # Update status
-        job["status"] = "preparing"
-        job["progress"] = 5
+        proc_plan = scaling_model.plan_procs(config.get("quality", "standard"),
+                                             rotation_method=config.get("rotation_method"))
+        await prepare_case(job_id, case_dir, config,
+                           num_procs_mesh=proc_plan["mesh_procs"], use_parallel=True)
+        if config.get("rotation_method") == "transient":
+            write_transient_case_files(case_dir, config, config.get("gpu_acceleration", False))
+        generate_decompose_dict(case_dir, proc_plan["solver_procs"])
+        job["status"] = "awaiting_results"
+    except Exception as e:
+        metrics.JOBS_FAILED.inc(stage=job["status"])
+        job["status"] = "failed"
+        job["error"] = str(e)
+
+    job["updated_at"] = datetime.now().isoformat()
+    sync_job_to_db(job_id, job)
+
+
+async def run_remote_simulation(job_id: str):
+    """
+    Generate a job's case, queue it for a remote worker and wait until it finishes.
+
+    The case is published as blobs before the job is queued, so a lease
+    only hands them out; the worker endpoints below record the outcome.
+    """
+    job = jobs[job_id]
+    if job["status"] == "cancelled":
+        return
+
+    job_control.clear_request(job_id)
+    try:
+        remote_inputs[job_id] = await prepare_remote_inputs(job_id)
+        job["status"] = "queued"
         job["updated_at"] = datetime.now().isoformat()
+        workers.coordinator.enqueue(job_id)
+        await workers.coordinator.wait(job_id)
+    except job_control.JobSuspended:
+        job["suspended_stage"] = job["status"]
+        job["status"] = "suspended"
+    except job_control.JobCancelled:
+        job["status"] = "cancelled"
+    except Exception as e:
+        # Bad input (e.g. missing geometry) would fail on every worker
+        metrics.JOBS_FAILED.inc(stage=job["status"])
+        job["status"] = "failed"
+        job["error"] = str(e)
 
-        # Create case directory
-        case_dir = CASES_DIR / job_id
-        case_dir.mkdir(parents=True, exist_ok=True)
-
-        # Copy and prepare STL file with transformation
-        for ext in ['.stl', '.obj']:
-            src = UPLOAD_DIR / f"{config['file_id']}{ext}"
-            if src.exists():
-                dst = case_dir / "constant" / "triSurface" / f"wheel{ext}"
-                dst.parent.mkdir(parents=True, exist_ok=True)
-
-                if ext == '.stl':
-                    # Detect STL units and get appropriate scale
-                    validation = validate_stl_file(src)
-                    if validation.geometry:
-                        transform_hint = get_stl_transform_for_openfoam(validation.geometry)
-                        scale = transform_hint.get("scale", 1.0)
-                        print(f"Detected STL units: {transform_hint.get('detected_unit', 'unknown')}, scale={scale}")
-                    else:
-                        scale = 0.001  # Default mm to meters
-                        print("Could not detect STL units, defaulting to mm->m scale")
-
-                    # Transform STL: apply detected scale, center, rotate upright, place on ground
-                    transform_info = transform_stl_for_openfoam(
-                        src, dst,
-                        scale=scale,
-                        center=True,
-                        stand_upright=True
-                    )
-                    print(f"Transformed STL: diameter={transform_info['wheel_diameter']:.3f}m, "
-                          f"radius={transform_info['wheel_radius']:.3f}m")
-                    # Store wheel radius in config for later use
-                    config['wheel_radius'] = transform_info['wheel_radius']
-
-                    # Calculate frontal area for accurate Cd calculation
-                    # Use AeroCloud standard (0.0225 m²) for comparison, or calculate actual
-                    aref, area_analysis = get_frontal_area_for_simulation(dst, use_aerocloud_standard=True)
-                    config['aref'] = aref
-                    config['frontal_area_analysis'] = area_analysis
-                    print(f"Frontal area: Aref={aref:.4f} m² (AeroCloud standard for comparison)")
-                else:
-                    shutil.copy(src, dst)
-                break
-        else:
-            raise Exception(f"Source file not found for file_id: {config['file_id']}")
-
-        # Determine parallelization settings
-        import multiprocessing
-        num_cpus = multiprocessing.cpu_count()
-        # Separate core counts: 8 cores is sweet spot for meshing (benchmarked),
-        # solver scales better so allow up to 16
-        num_procs_solver = max(4, min(num_cpus // 2, 16))
-        num_procs_mesh = max(4, min(num_cpus // 2, 8))
-        use_parallel = config.get("quality") in ["standard", "pro"]
+    job_control.clear_request(job_id)
+    remote_inputs.pop(job_id, None)
+    if job_id not in jobs:
+        # Deleted while queued or leased
+        return
+    job["updated_at"] = datetime.now().isoformat()
+    sync_job_to_db(job_id, job)
+
+
+async def run_simulation(job_id: str, resume: bool = False, prepared: bool = False,
+                         proc_plan: dict = None):
+    """Run OpenFOAM simulation (background task)
+
+    Args:
+        job_id: Job to run
+        resume: Continue a suspended job. If it was suspended while solving
+            and a time step was written, the solver restarts from latestTime;
+            otherwise the pipeline runs again from the start.
+        prepared: The case files were already generated (by the coordinator,
+            for a remote worker); start at meshing
+        proc_plan: mesh_procs/solver_procs to use instead of the scaling model
+    """
+    job = jobs[job_id]
+    config = job["config"]
+    case_dir = CASES_DIR / job_id
+
+    # Cancelled while still waiting in a batch queue
+    if job["status"] == "cancelled":
+        return
+
+    resume_solver = (resume and job.get("suspended_stage") == "solving"
+                     and job_control.latest_written_time(case_dir) is not None)
+    job_control.clear_request(job_id)
+    job["suspended_stage"] = None
+    # The solver appends to (or rewrites) the histories again
+    timeseries.forget(case_dir)
+
+    try:
+        executor = job_executor(job_id)
+
+        # Determine parallelization settings from the measured scaling model
+        # (falls back to 8 mesh / 16 solver procs until this host has samples)
+        if proc_plan is None:
+            proc_plan = scaling_model.plan_procs(config.get("quality", "standard"),
+                                                 max_procs=executor.max_procs(),
+                                                 rotation_method=config.get("rotation_method"))
+        num_procs_mesh = proc_plan["mesh_procs"]
+        num_procs_solver = proc_plan["solver_procs"]
+        # A single process runs serially (decomposePar cannot split into one part)
+        use_parallel = config.get("quality") in ["standard", "pro"] and num_procs_solver > 1
+        if prepared:
+            # The coordinator generated the case before this host's plan was known
+            config["use_parallel_mesh"] = (config.get("use_parallel_mesh", False)
+                                           and use_parallel and num_procs_mesh > 1)
         gpu_enabled = config.get("gpu_acceleration", False)
 
         print(f"Parallel execution: {use_parallel}, mesh={num_procs_mesh} procs, solver={num_procs_solver} procs")
+
+        # Reserve a core set for this job so concurrent jobs don't share cores
+        # (batch schedulers allocate their own)
+        if executor.local:
+            num_cores = max(num_procs_mesh, num_procs_solver) if use_parallel else 1
+            job_cores = affinity.allocate_job_cores(job_id, num_cores)
+            if job_cores:
+                affinity.create_job_cgroup(job_id, job_cores)
         if gpu_enabled:
             print("GPU acceleration enabled (AmgX for pressure solver)")
 
-        # Pass parallel mesh config for snappyHexMeshDict generation
-        config["num_procs"] = num_procs_mesh
-        config["use_parallel_mesh"] = config.get("quality") == "pro" and use_parallel
+        if resume_solver:
+            print(f"Resuming job {job_id} from latest written time")
+            job_control.set_start_from_latest(case_dir)
+        elif prepared:
+            await mesh_case(job_id, case_dir, config,
+                            num_procs_mesh=num_procs_mesh,
+                            num_procs_solver=num_procs_solver,
+                            use_parallel=use_parallel,
+                            gpu_enabled=gpu_enabled)
+        else:
+            await prepare_and_mesh_case(job_id, case_dir, config,
+                                        num_procs_mesh=num_procs_mesh,
+                                        num_procs_solver=num_procs_solver,
+                                        use_parallel=use_parallel,
+                                        gpu_enabled=gpu_enabled)
+
+        await solve_case(job_id, case_dir, config,
+                         num_procs_solver=num_procs_solver,
+                         use_parallel=use_parallel,
+                         gpu_enabled=gpu_enabled,
+                         resume=resume_solver)
+
+        job["progress"] = 85
+
+        # Post-process
+        job["status"] = "post-processing"
+        job["progress"] = 90
+
+        # Extract forces
+        job_control.check_interrupted(job_id)
+        async with stage_metrics.track_stage(job_id, "extract_results"):
+            results = await extract_results(case_dir, config)
+        job_control.check_interrupted(job_id)
+        job["results"] = results
+        job["progress"] = 100
+        job["status"] = "complete"
+
+    except job_control.JobSuspended:
+        job["suspended_stage"] = job["status"]
+        job["status"] = "suspended"
+        print(f"Job {job_id} suspended during {job['suspended_stage']}")
+    except job_control.JobCancelled:
+        job["status"] = "cancelled"
+        print(f"Job {job_id} cancelled")
+    except Exception as e:
+        metrics.JOBS_FAILED.inc(stage=job["status"])
+        job["status"] = "failed"
+        job["error"] = str(e)
+
+    job_control.clear_request(job_id)
+    affinity.release_job_cores(job_id)
+    job["updated_at"] = datetime.now().isoformat()
+    # Persist final job state to database
+    sync_job_to_db(job_id, job)
+
+
+async def prepare_and_mesh_case(job_id: str, case_dir: Path, config: dict,
+                                num_procs_mesh: int, num_procs_solver: int,
+                                use_parallel: bool, gpu_enabled: bool):
+    """Copy the geometry, generate case files and build the mesh."""
+    await prepare_case(job_id, case_dir, config,
+                       num_procs_mesh=num_procs_mesh, use_parallel=use_parallel)
+    await mesh_case(job_id, case_dir, config,
+                    num_procs_mesh=num_procs_mesh, num_procs_solver=num_procs_solver,
+                    use_parallel=use_parallel, gpu_enabled=gpu_enabled)
+
+
+async def prepare_case(job_id: str, case_dir: Path, config: dict,
+                       num_procs_mesh: int, use_parallel: bool):
+    """Copy and transform the geometry and generate the case files.
+
+    Needs no OpenFOAM installation, so a coordinator can prepare a case
+    for a remote worker.
+    """
+    job = jobs[job_id]
+
+    # Update status
+    job["status"] = "preparing"
+    job["progress"] = 5
+    job["updated_at"] = datetime.now().isoformat()
+
+    case_dir.mkdir(parents=True, exist_ok=True)
+
+    # A re-run (e.g. resuming a job suspended while meshing) must not pick
+    # up a stale decomposition from the previous attempt
+    for proc_dir in case_dir.glob("processor*"):
+        shutil.rmtree(proc_dir)
+
+    # Copy and prepare STL file with transformation
+    async with stage_metrics.track_stage(job_id, "transform_geometry"):
+        copy_geometry(case_dir, config)
+    job_control.check_interrupted(job_id)
 
-        # Generate OpenFOAM case files
+    # Pass parallel mesh config for snappyHexMeshDict generation
+    config["num_procs"] = num_procs_mesh
+    config["use_parallel_mesh"] = (config.get("quality") == "pro" and use_parallel
+                                   and num_procs_mesh > 1)
+
+    # Generate OpenFOAM case files
+    async with stage_metrics.track_stage(job_id, "generate_case"):
         await generate_case_files(case_dir, config)
-        job["progress"] = 10
+    job_control.check_interrupted(job_id)
+    job["progress"] = 10
 
-        # Run blockMesh (always serial)
-        job["status"] = "meshing"
-        job["progress"] = 15
-        await run_openfoam_command(case_dir, "blockMesh")
-        job["progress"] = 18
 
-        # Extract feature edges for better surface snapping
-        await run_openfoam_command(case_dir, "surfaceFeatures", parallel=False)
-        job["progress"] = 20
+def copy_geometry(case_dir: Path, config: dict):
+    """Copy the uploaded geometry into the case, scaled and placed for OpenFOAM.
 
-        # Run snappyHexMesh - parallel for pro quality, serial for basic/standard
-        use_parallel_mesh = config.get("use_parallel_mesh", False)
-        job["updated_at"] = datetime.now().isoformat()
-        await run_openfoam_command(case_dir, "snappyHexMesh", ["-overwrite"],
-                                   parallel=use_parallel_mesh, num_procs=num_procs_mesh,
-                                   gpu_enabled=gpu_enabled)
-        job["progress"] = 45
-
-        # Create MRF cellZone using topoSet (if MRF rotation enabled)
-        rotation_method = config.get("rotation_method", "none")
-        if rotation_method == "mrf" and config.get("rolling_enabled", True):
-            wheel_radius = config['wheel_radius']
-            # Create topoSetDict for cylindrical MRF zone
-            topo_set_dict = f"""FoamFile
+    Stores the wheel radius and reference area in the config.
+    """
+    for ext in ['.stl', '.obj']:
+        src = UPLOAD_DIR / f"{config['file_id']}{ext}"
+        if src.exists():
+            dst = case_dir / "constant" / "triSurface" / f"wheel{ext}"
+            dst.parent.mkdir(parents=True, exist_ok=True)
+
+            if ext == '.stl':
+                # Detect STL units and get appropriate scale
+                validation = validate_stl_file(src)
+                if validation.geometry:
+                    transform_hint = get_stl_transform_for_openfoam(validation.geometry)
+                    scale = transform_hint.get("scale", 1.0)
+                    print(f"Detected STL units: {transform_hint.get('detected_unit', 'unknown')}, scale={scale}")
+                else:
+                    scale = 0.001  # Default mm to meters
+                    print("Could not detect STL units, defaulting to mm->m scale")
+
+                # Transform STL: apply detected scale, center, rotate upright, place on ground
+                transform_info = transform_stl_for_openfoam(
+                    src, dst,
+                    scale=scale,
+                    center=True,
+                    stand_upright=True
+                )
+                print(f"Transformed STL: diameter={transform_info['wheel_diameter']:.3f}m, "
+                      f"radius={transform_info['wheel_radius']:.3f}m")
+                # Store wheel radius in config for later use
+                config['wheel_radius'] = transform_info['wheel_radius']
+
+                # Calculate frontal area for accurate Cd calculation
+                # Use AeroCloud standard (0.0225 m²) for comparison, or calculate actual
+                aref, area_analysis = get_frontal_area_for_simulation(dst, use_aerocloud_standard=True)
+                config['aref'] = aref
+                config['frontal_area_analysis'] = area_analysis
+                print(f"Frontal area: Aref={aref:.4f} m² (AeroCloud standard for comparison)")
+            else:
+                shutil.copy(src, dst)
+            break
+    else:
+        raise Exception(f"Source file not found for file_id: {config['file_id']}")
+
+
+async def mesh_case(job_id: str, case_dir: Path, config: dict,
+                    num_procs_mesh: int, num_procs_solver: int,
+                    use_parallel: bool, gpu_enabled: bool):
+    """Build the mesh of a prepared case and initialise the flow."""
+    job = jobs[job_id]
+
+    # Run blockMesh (always serial)
+    job["status"] = "meshing"
+    job["progress"] = 15
+    await run_openfoam_command(case_dir, "blockMesh", job_id=job_id)
+    job["progress"] = 18
+
+    # Extract feature edges for better surface snapping
+    await run_openfoam_command(case_dir, "surfaceFeatures", parallel=False, job_id=job_id)
+    job["progress"] = 20
+
+    # Run snappyHexMesh - parallel for pro quality, serial for basic/standard
+    use_parallel_mesh = config.get("use_parallel_mesh", False)
+    job["updated_at"] = datetime.now().isoformat()
+    stage_start = time.monotonic()
+    await run_openfoam_command(case_dir, "snappyHexMesh", ["-overwrite"],
+                               parallel=use_parallel_mesh, num_procs=num_procs_mesh,
+                               gpu_enabled=gpu_enabled, job_id=job_id)
+    record_scaling_sample(job_id, case_dir, scaling_model.MESH,
+                          num_procs_mesh if use_parallel_mesh else 1,
+                          time.monotonic() - stage_start)
+    if use_parallel_mesh:
+        # Keep the parallel mesh decomposed for the solver; only the
+        # processor fields need the new wheel patch
+        refresh_decomposed_fields(case_dir)
+    await capture_mesh_stats(job_id, case_dir)
+    job["progress"] = 45
+
+    # Create MRF cellZone using topoSet (if MRF rotation enabled)
+    rotation_method = config.get("rotation_method", "none")
+    if rotation_method == "mrf" and config.get("rolling_enabled", True):
+        wheel_radius = config['wheel_radius']
+        # Create topoSetDict for cylindrical MRF zone
+        topo_set_dict = f"""FoamFile
 {{
     version     2.0;
     format      ascii;
@@ -773,97 +1205,154 @@ actions
     }}
 );
 """
-            (case_dir / "system" / "topoSetDict").write_text(topo_set_dict)
-            print("Creating MRF cellZone with topoSet...")
-            await run_openfoam_command(case_dir, "topoSet", parallel=False)
-            print("MRF cellZone created successfully")
-
-        job["progress"] = 50
-
-        # Run potentialFoam for better initial conditions (helps convergence)
-        if use_parallel:
-            try:
-                await run_openfoam_command(case_dir, "potentialFoam", ["-writephi"],
-                                          parallel=use_parallel, num_procs=num_procs_solver)
-            except Exception as e:
-                print(f"potentialFoam skipped: {e}")
-
-        # Run simulation
-        job["status"] = "solving"
-        job["progress"] = 55
-        job["updated_at"] = datetime.now().isoformat()
+        (case_dir / "system" / "topoSetDict").write_text(topo_set_dict)
+        print("Creating MRF cellZone with topoSet...")
+        await run_openfoam_command(case_dir, "topoSet", parallel=use_parallel_mesh,
+                                   num_procs=num_procs_mesh, job_id=job_id)
+        print("MRF cellZone created successfully")
 
-        # Choose solver based on rotation method
-        rotation_method = config.get("rotation_method", "none")
+    job["progress"] = 50
+
+    # Run potentialFoam for better initial conditions (helps convergence)
+    if use_parallel:
+        try:
+            await run_openfoam_command(case_dir, "potentialFoam", ["-writephi"],
+                                      parallel=use_parallel, num_procs=num_procs_solver,
+                                      job_id=job_id)
+        except job_control.JobInterrupted:
+            raise
+        except Exception as e:
+            print(f"potentialFoam skipped: {e}")
 
-        if rotation_method == "transient":
-            # Transient simulation with pimpleFoam for AMI rotation
-            # Generate transient-specific files
-            pimple_solution = generate_pimple_fv_solution(
-                quality=config.get("quality", "standard"),
-                gpu_enabled=gpu_enabled,
-                base_dir=str(BASE_DIR)
-            )
-            (case_dir / "system" / "fvSolution").write_text(pimple_solution)
-
-            transient_schemes = generate_transient_fv_schemes(config.get("quality", "standard"))
-            (case_dir / "system" / "fvSchemes").write_text(transient_schemes)
-
-            # Update controlDict for transient
-            transient_control = generate_transient_control_dict(
-                speed=config["speed"],
-                yaw=config["yaw_angles"][0],
-                wheel_radius=config["wheel_radius"],
-                air_rho=config["air"]["rho"],
-                aref=config.get("aref", 0.0225),
-                end_time=2.0,  # 2 seconds = ~2 wheel rotations at 13.9 m/s
-                delta_t=0.001
-            )
-            (case_dir / "system" / "controlDict").write_text(transient_control)
-
-            # Generate dynamicMeshDict for AMI solid body rotation
-            wheel_radius = config['wheel_radius']
-            omega = config['omega']
-            dynamic_mesh = generate_dynamic_mesh_dict(
-                zone_name="rotatingZone",
-                origin=(0, 0, wheel_radius),
-                axis=(0, 1, 0),
-                omega=omega,
-                use_ami=True
-            )
-            (case_dir / "constant" / "dynamicMeshDict").write_text(dynamic_mesh)
-            print(f"AMI rotation enabled: dynamicMeshDict generated (omega={omega:.2f} rad/s)")
 
+async def solve_case(job_id: str, case_dir: Path, config: dict,
+                     num_procs_solver: int, use_parallel: bool,
+                     gpu_enabled: bool, resume: bool = False):
+    """Run the flow solver on a meshed case."""
+    job = jobs[job_id]
+
+    # Run simulation
+    job["status"] = "solving"
+    job["progress"] = 55
+    job["updated_at"] = datetime.now().isoformat()
+
+    # Choose solver based on rotation method
+    rotation_method = config.get("rotation_method", "none")
+    if rotation_method == "transient" and not resume:
+        write_transient_case_files(case_dir, config, gpu_enabled)
+
+    # Decompose (or redistribute) first so the scaling sample times the
+    # solver alone
+    if use_parallel:
+        await decompose_case(case_dir, num_procs_solver,
+                             get_openfoam_env_cached(gpu_enabled=gpu_enabled), job_id=job_id)
+    stage_start = time.monotonic()
+
+    # Index the solver log as it grows, so residual charts never re-read it.
+    # A resumed solve appends to the log, so the residual history continues.
+    solver_log = case_dir / "log.foamRun"
+    indexer = asyncio.create_task(log_index.follow(solver_log))
+    try:
+        if rotation_method == "transient":
             print("Running transient simulation with pimpleFoam...")
             await run_openfoam_command(case_dir, "foamRun", ["-solver", "incompressibleFluid"],
                                        parallel=use_parallel, num_procs=num_procs_solver,
-                                       gpu_enabled=gpu_enabled)
+                                       gpu_enabled=gpu_enabled, job_id=job_id, append_log=resume)
         else:
             # Steady-state simulation (SIMPLE algorithm)
             # Use foamRun with incompressibleFluid solver (replaces simpleFoam in OF13)
             await run_openfoam_command(case_dir, "foamRun", ["-solver", "incompressibleFluid"],
                                        parallel=use_parallel, num_procs=num_procs_solver,
-                                       gpu_enabled=gpu_enabled)
-
-        job["progress"] = 85
-
-        # Post-process
-        job["status"] = "post-processing"
-        job["progress"] = 90
-
-        # Extract forces
-        results = await extract_results(case_dir, config)
-        job["results"] = results
-        job["progress"] = 100
-        job["status"] = "complete"
-
+                                       gpu_enabled=gpu_enabled, job_id=job_id, append_log=resume)
+    finally:
+        indexer.cancel()
+    log_meta = await asyncio.to_thread(log_index.update, solver_log, True)
+
+    # A resumed run only covers part of the iterations; don't record it
+    if not resume:
+        solve_time = time.monotonic() - stage_start
+        iterations = log_meta["rows"]
+        record_scaling_sample(job_id, case_dir, scaling_model.solver_stage(rotation_method),
+                              num_procs_solver if use_parallel else 1,
+                              solve_time, work_units=iterations)
+        # Batch scheduler wall times include time spent queued
+        if iterations and job_executor(job_id).local:
+            metrics.SOLVER_ITERATION_RATE.observe(iterations / solve_time,
+                                                  quality=config.get("quality", "standard"))
+
+    # Post-processing reads processor directories directly (foam_mesh), so
+    # reconstruction is only done on request, and then only what it reads
+    if use_parallel and config.get("reconstruct", "none") != "none":
+        await reconstruct_case(case_dir, mesh=config.get("use_parallel_mesh", False),
+                               gpu_enabled=gpu_enabled, job_id=job_id)
+
+
+async def capture_mesh_stats(job_id: str, case_dir: Path):
+    """Store the mesh statistics of a freshly meshed case in its job record."""
+    try:
+        stats = await asyncio.to_thread(mesh_stats.collect, case_dir)
     except Exception as e:
-        job["status"] = "failed"
-        job["error"] = str(e)
+        print(f"Could not collect mesh statistics: {e}")
+        return
+    if stats:
+        jobs[job_id]["mesh"] = stats
+        sync_job_to_db(job_id)
+
+
+def record_scaling_sample(job_id: str, case_dir: Path, stage: str, num_procs: int,
+                          wall_time: float, work_units: float = 1):
+    """Feed a stage measurement to the scaling model (never fails the job)."""
+    # Batch job wall times include queue waits on other hosts
+    if not job_executor(job_id).local:
+        return
+    try:
+        cells = (jobs[job_id].get("mesh") or {}).get("cells") or foam_mesh.mesh_cells(case_dir)
+        if cells:
+            scaling_model.record_sample(stage, num_procs, cells, wall_time,
+                                        work_units=work_units,
+                                        quality=jobs[job_id]["config"].get("quality"),
+                                        job_id=job_id)
+    except Exception as e:
+        print(f"Could not record scaling sample: {e}")
 
-    job["updated_at"] = datetime.now().isoformat()
-    # Persist final job state to database
-    sync_job_to_db(job_id, job)
+
+def write_transient_case_files(case_dir: Path, config: dict, gpu_enabled: bool):
+    """Overwrite the steady-state case files with PIMPLE/AMI settings."""
+    # Generate transient-specific files
+    pimple_solution = generate_pimple_fv_solution(
+        quality=config.get("quality", "standard"),
+        gpu_enabled=gpu_enabled,
+        base_dir=str(BASE_DIR)
+    )
+    (case_dir / "system" / "fvSolution").write_text(pimple_solution)
+
+    transient_schemes = generate_transient_fv_schemes(config.get("quality", "standard"))
+    (case_dir / "system" / "fvSchemes").write_text(transient_schemes)
+
+    # Update controlDict for transient
+    transient_control = generate_transient_control_dict(
+        speed=config["speed"],
+        yaw=config["yaw_angles"][0],
+        wheel_radius=config["wheel_radius"],
+        air_rho=config["air"]["rho"],
+        aref=config.get("aref", 0.0225),
+        end_time=2.0,  # 2 seconds = ~2 wheel rotations at 13.9 m/s
+        delta_t=0.001
+    ) + job_control.generate_signal_switches()
+    (case_dir / "system" / "controlDict").write_text(transient_control)
+
+    # Generate dynamicMeshDict for AMI solid body rotation
+    wheel_radius = config['wheel_radius']
+    omega = config['omega']
+    dynamic_mesh = generate_dynamic_mesh_dict(
+        zone_name="rotatingZone",
+        origin=(0, 0, wheel_radius),
+        axis=(0, 1, 0),
+        omega=omega,
+        use_ami=True
+    )
+    (case_dir / "constant" / "dynamicMeshDict").write_text(dynamic_mesh)
+    print(f"AMI rotation enabled: dynamicMeshDict generated (omega={omega:.2f} rad/s)")
 
 
 async def generate_case_files(case_dir: Path, config: dict):
@@ -949,6 +1438,7 @@ functions
         writeControl    writeTime;
 
         surfaceFormat   vtk;
+        writeFormat     {SLICE_WRITE_FORMAT};
         fields          (p U);
 
         interpolationScheme cellPoint;
@@ -1015,6 +1505,7 @@ functions
     }}
 }}
 """
+    control_dict += job_control.generate_signal_switches()
     (case_dir / "system" / "controlDict").write_text(control_dict)
 
     # fvSchemes
@@ -1907,56 +2398,21 @@ boundary
 
 
 def get_openfoam_env(gpu_enabled: bool = False, parallel: bool = False):
-    """Get OpenFOAM environment by sourcing the official bashrc.
+    """Get OpenFOAM environment as set up by the official bashrc.
 
-    This ensures all environment variables (MPI_BUFFER_SIZE, library paths,
-    etc.) are set correctly by OpenFOAM's own configuration.
+    The bashrc is sourced once and the result persisted (see
+    openfoam_env), so this no longer spawns bash on every call.
 
     Args:
         gpu_enabled: Include CUDA/AmgX libraries
         parallel: Not used anymore - bashrc handles MPI setup
     """
-    import subprocess
-
-    # Source OpenFOAM bashrc and capture the environment
-    bashrc_path = f"{OPENFOAM_DIR}/etc/bashrc"
-    cmd = f'source {bashrc_path} && env'
-
-    result = subprocess.run(
-        ['bash', '-c', cmd],
-        capture_output=True,
-        text=True
-    )
-
-    # Parse environment variables from output
-    env = {}
-    for line in result.stdout.split('\n'):
-        if '=' in line:
-            key, _, value = line.partition('=')
-            env[key] = value
-
-    # Add GPU libraries if enabled
-    if gpu_enabled:
-        ld_path = env.get('LD_LIBRARY_PATH', '')
-        gpu_paths = [
-            "/home/constantine/OpenFOAM/constantine-13/platforms/linux64GccDPInt32Opt/lib",
-            "/home/constantine/local/amgx",
-            "/usr/local/cuda-12.9/lib64"
-        ]
-        env['LD_LIBRARY_PATH'] = ':'.join(gpu_paths) + ':' + ld_path
-
-    return env
+    return openfoam_env.get_environment(gpu_enabled=gpu_enabled)
 
 
-# Cache the OpenFOAM environment to avoid repeated subprocess calls
-_openfoam_env_cache = {}
-
 def get_openfoam_env_cached(gpu_enabled: bool = False):
-    """Cached version of get_openfoam_env for better performance."""
-    cache_key = f"gpu_{gpu_enabled}"
-    if cache_key not in _openfoam_env_cache:
-        _openfoam_env_cache[cache_key] = get_openfoam_env(gpu_enabled=gpu_enabled)
-    return _openfoam_env_cache[cache_key].copy()
+    """Alias of get_openfoam_env (the environment is always cached now)."""
+    return openfoam_env.get_environment(gpu_enabled=gpu_enabled)
 
 
 def generate_decompose_dict(case_dir: Path, num_procs: int):
@@ -1978,39 +2434,31 @@ def generate_decompose_dict(case_dir: Path, num_procs: int):
         min_idx = result.index(min(result))
         result[min_idx] *= f
 
-    decompose_dict = f"""FoamFile
-{{
-    version     2.0;
-    format      ascii;
-    class       dictionary;
-    object      decomposeParDict;
-}}
-
-numberOfSubdomains {num_procs};
-
-method          scotch;
-
-simpleCoeffs
-{{
-    n               ({result[0]} {result[1]} {result[2]});
-    delta           0.001;
-}}
-
-scotchCoeffs
-{{
-}}
+    foam_dict.write_dict(case_dir / "system" / "decomposeParDict", {
+        "numberOfSubdomains": num_procs,
+        "method": "scotch",
+        "simpleCoeffs": {"n": result, "delta": 0.001},
+        "scotchCoeffs": {},
+        "distributed": "no",
+        "roots": [],
+    }, location="system")
 
-distributed     no;
-roots           ();
-"""
-    (case_dir / "system" / "decomposeParDict").write_text(decompose_dict)
 
+async def run_openfoam_command(case_dir: Path, command: str, args: list = None, parallel: bool = False, num_procs: int = 8, gpu_enabled: bool = False, job_id: str = None,
+                               append_log: bool = False):
+    """Run an OpenFOAM command, optionally in parallel with MPI
 
-async def run_openfoam_command(case_dir: Path, command: str, args: list = None, parallel: bool = False, num_procs: int = 8, gpu_enabled: bool = False):
-    """Run an OpenFOAM command, optionally in parallel with MPI"""
+    The command is run by the job's executor (this host, or a batch
+    scheduler). When job_id is given the command is registered with
+    job_control so the job can be cancelled or suspended. With append_log
+    the command's output is appended to its log instead of replacing it.
+    """
     if args is None:
         args = []
 
+    # Don't start another stage for a job that is being stopped
+    job_control.check_interrupted(job_id)
+
     # Commands that don't support parallel
     serial_only = ["blockMesh", "surfaceFeatures", "checkMesh"]
 
@@ -2021,115 +2469,155 @@ async def run_openfoam_command(case_dir: Path, command: str, args: list = None,
     env = get_openfoam_env_cached(gpu_enabled=gpu_enabled)
 
     if will_run_parallel:
-        # Generate or update decomposeParDict for the requested proc count
-        decompose_dict = case_dir / "system" / "decomposeParDict"
-        needs_new_dict = not decompose_dict.exists()
-        if decompose_dict.exists():
-            content = decompose_dict.read_text()
-            if f"numberOfSubdomains {num_procs};" not in content:
-                needs_new_dict = True
-        if needs_new_dict:
-            generate_decompose_dict(case_dir, num_procs)
-
-        # Decompose the domain first (if not already done)
-        processor_dirs = list(case_dir.glob("processor*"))
-        if not processor_dirs:
-            print(f"Decomposing domain into {num_procs} parts...")
-            decompose_proc = await asyncio.create_subprocess_exec(
-                "decomposePar",
-                cwd=case_dir,
-                env=env,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await decompose_proc.communicate()
-            if decompose_proc.returncode != 0:
-                raise Exception(f"decomposePar failed: {stderr.decode(errors='replace')}")
-
-        # Run in parallel with MPI
-        cmd = ["mpirun", "-np", str(num_procs), command, "-parallel"] + args
-        print(f"Running: {' '.join(cmd)}")
+        await decompose_case(case_dir, num_procs, env, job_id=job_id)
+        cmd = [command, "-parallel"] + args
     else:
         cmd = [command] + args
 
-    # Create log file
-    log_file = case_dir / f"log.{command}"
+    return await run_case_utility(case_dir, cmd, env, command, job_id=job_id,
+                                  num_procs=num_procs, parallel=will_run_parallel,
+                                  append_log=append_log)
+
+
+async def decompose_case(case_dir: Path, num_procs: int, env: dict, job_id: str = None):
+    """Decompose a case for num_procs ranks (nothing to do if it already is).
+
+    The case stays decomposed from meshing through solving; a different
+    proc count redistributes the existing decomposition instead of
+    starting over.
+    """
+    # Generate or update decomposeParDict for the requested proc count
+    decompose_dict = case_dir / "system" / "decomposeParDict"
+    needs_new_dict = not decompose_dict.exists()
+    if decompose_dict.exists():
+        content = decompose_dict.read_text()
+        if f"numberOfSubdomains {num_procs};" not in content:
+            needs_new_dict = True
+    if needs_new_dict:
+        generate_decompose_dict(case_dir, num_procs)
+
+    current_procs = count_processor_dirs(case_dir)
+    if current_procs == 0:
+        print(f"Decomposing domain into {num_procs} parts...")
+        await run_case_utility(case_dir, ["decomposePar"], env, "decomposePar", job_id=job_id)
+    elif current_procs != num_procs:
+        await redistribute_case(case_dir, current_procs, num_procs, env, job_id=job_id)
+
+
+def job_executor(job_id: Optional[str]) -> executors.Executor:
+    """Executor running a job's OpenFOAM commands."""
+    job = jobs.get(job_id) if job_id else None
+    name = job["config"].get("executor") if job else None
+    # Remote jobs only reach OpenFOAM on the worker, which runs them locally
+    if name != executors.SLURM:
+        name = executors.LOCAL
+    return executors.get_executor(name)
+
+
+# Fields read by post-processing (surface pressure, slices, hero image)
+RECONSTRUCT_FIELDS = ["p", "U"]
 
-    process = await asyncio.create_subprocess_exec(
-        *cmd,
-        cwd=case_dir,
-        env=env,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
+
+def count_processor_dirs(case_dir: Path) -> int:
+    """Number of processor* directories in a decomposed case."""
+    return len([d for d in case_dir.glob("processor*") if d.is_dir()])
+
+
+async def run_case_utility(case_dir: Path, cmd: list, env: dict, log_name: str,
+                           job_id: str = None, num_procs: int = 1, parallel: bool = False,
+                           append_log: bool = False) -> str:
+    """Run a command with the job's executor and write log.<log_name>.
+
+    The command is recorded as a stage of the job, named after log_name.
+    """
+    async with stage_metrics.track_stage(job_id, log_name, num_procs if parallel else 1,
+                                         case_dir=case_dir, external=True):
+        return await job_executor(job_id).run(case_dir, cmd, env, log_name,
+                                              num_procs=num_procs, parallel=parallel,
+                                              job_id=job_id, append_log=append_log)
+
+
+async def redistribute_case(case_dir: Path, from_procs: int, to_procs: int, env: dict,
+                            job_id: str = None):
+    """Move a decomposed mesh and its fields onto a different proc count.
+
+    redistributePar reads the target count from decomposeParDict and must
+    run on the larger of the two counts.
+    """
+    print(f"Redistributing domain from {from_procs} to {to_procs} parts...")
+    nprocs = max(from_procs, to_procs)
+    await run_case_utility(
+        case_dir, ["redistributePar", "-parallel", "-overwrite"], env, "redistributePar",
+        job_id=job_id, num_procs=nprocs, parallel=True
     )
 
-    stdout, stderr = await process.communicate()
-
-    # Write log
-    with open(log_file, 'w') as f:
-        f.write(stdout.decode(errors='replace'))
-        if stderr:
-            f.write("\n--- STDERR ---\n")
-            f.write(stderr.decode(errors='replace'))
-
-    if process.returncode != 0:
-        raise Exception(f"{command} failed: {stderr.decode(errors='replace')}")
-
-    # Reconstruct if parallel
-    if parallel and command not in serial_only:
-        if command == "snappyHexMesh":
-            print("Reconstructing mesh...")
-            reconstruct_proc = await asyncio.create_subprocess_exec(
-                "reconstructPar", "-constant",
-                cwd=case_dir,
-                env=env,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout_r, stderr_r = await reconstruct_proc.communicate()
-
-            # Log reconstruction output
-            log_file = case_dir / "log.reconstructPar"
-            with open(log_file, 'w') as f:
-                f.write(stdout_r.decode(errors='replace'))
-                if stderr_r:
-                    f.write("\n--- STDERR ---\n")
-                    f.write(stderr_r.decode(errors='replace'))
-
-            if reconstruct_proc.returncode != 0:
-                print(f"WARNING: reconstructPar failed: {stderr_r.decode(errors='replace')[:200]}")
-
-            # Verify mesh was reconstructed by checking for wheel patch
-            boundary_file = case_dir / "constant" / "polyMesh" / "boundary"
-            if boundary_file.exists():
-                boundary_content = boundary_file.read_text()
-                if "wheel" not in boundary_content:
-                    print("WARNING: Reconstructed mesh missing 'wheel' patch!")
-
-            # Clean up processor directories after mesh reconstruction
-            # This ensures fresh decomposition for the solver with correct BCs
-            print("Cleaning up processor directories...")
-            import shutil
-            for proc_dir in case_dir.glob("processor*"):
-                shutil.rmtree(proc_dir)
-        elif command in ["simpleFoam", "pimpleFoam", "foamRun"]:
-            print("Reconstructing fields...")
-            reconstruct_proc = await asyncio.create_subprocess_exec(
-                "reconstructPar",
-                cwd=case_dir,
-                env=env,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            await reconstruct_proc.communicate()
 
-    return stdout.decode(errors='replace')
+def refresh_decomposed_fields(case_dir: Path):
+    """Copy the initial fields into each processor after parallel meshing.
+
+    decomposePar split the 0/ fields for the blockMesh mesh, which has no
+    wheel patch. The generated fields are uniform, so they can be copied as
+    they are, with processor patches picked up from setConstraintTypes.
+    """
+    for proc_dir in case_dir.glob("processor*"):
+        if not proc_dir.is_dir():
+            continue
+        (proc_dir / "0").mkdir(exist_ok=True)
+        for field_file in (case_dir / "0").iterdir():
+            if not field_file.is_file():
+                continue
+            content = field_file.read_text()
+            if "setConstraintTypes" not in content:
+                content = content.replace(
+                    "boundaryField\n{\n",
+                    "boundaryField\n{\n    #includeEtc \"caseDicts/setConstraintTypes\"\n\n",
+                    1
+                )
+            (proc_dir / "0" / field_file.name).write_text(content)
+
+
+def reconstruct_command(mesh: bool, fields: list = None) -> list:
+    """reconstructPar arguments for the latest time and selected fields."""
+    cmd = ["reconstructPar", "-latestTime"]
+    if mesh:
+        cmd.append("-constant")
+    if fields:
+        cmd += ["-fields", f"({' '.join(fields)})"]
+    return cmd
+
+
+async def reconstruct_case(case_dir: Path, mesh: bool, gpu_enabled: bool = False,
+                           fields: list = None, job_id: str = None):
+    """Reconstruct the latest solution for post-processing.
+
+    Args:
+        mesh: Also reconstruct the mesh (needed when it was built in parallel)
+        fields: Fields to reconstruct (default: RECONSTRUCT_FIELDS)
+    """
+    if count_processor_dirs(case_dir) == 0:
+        return
+    if fields is None:
+        fields = RECONSTRUCT_FIELDS
+    env = get_openfoam_env_cached(gpu_enabled=gpu_enabled)
+    print("Reconstructing latest time...")
+    try:
+        await run_case_utility(case_dir, reconstruct_command(mesh, fields), env, "reconstructPar",
+                               job_id=job_id)
+    except job_control.JobInterrupted:
+        raise
+    except Exception as e:
+        print(f"WARNING: {str(e)[:200]}")
+        return
+
+    if mesh:
+        # Verify mesh was reconstructed by checking for wheel patch
+        poly_mesh = case_dir / "constant" / "polyMesh"
+        if (poly_mesh / "boundary").exists() and "wheel" not in foam_mesh.read_boundary(poly_mesh):
+            print("WARNING: Reconstructed mesh missing 'wheel' patch!")
 
 
 async def extract_results(case_dir: Path, config: dict) -> dict:
     """Extract simulation results"""
-    import re
-
     results = {
         "forces": {},
         "coefficients": {},
@@ -2137,54 +2625,42 @@ async def extract_results(case_dir: Path, config: dict) -> dict:
         "converged": False
     }
 
-    # Try to read forceCoeffs output (wind-direction Cd)
-    force_file = case_dir / "postProcessing" / "forceCoeffs" / "0" / "forceCoeffs.dat"
-    if force_file.exists():
-        lines = force_file.read_text().strip().split('\n')
-        if len(lines) > 1:
-            # Get last line (final iteration)
-            last_line = lines[-1]
-            if not last_line.startswith('#'):
-                parts = last_line.split()
-                if len(parts) >= 4:
-                    # Columns: Time, Cm, Cd, Cl, Cl(f), Cl(r)
-                    results["coefficients"] = {
-                        "Cm": float(parts[1]),
-                        "Cd": float(parts[2]),  # Drag in wind direction
-                        "Cl": float(parts[3]),  # Lift (Z-direction)
-                    }
-                    results["converged"] = True
+    # Try to read forceCoeffs output (wind-direction Cd); a resumed run
+    # continues it in another start-time directory
+    # Last row = final iteration
+    parts = dat_reader.last_series_row(case_dir / "postProcessing" / "forceCoeffs", "forceCoeffs.dat")
+    if parts is not None and len(parts) >= 4:
+        # Columns: Time, Cm, Cd, Cl, Cl(f), Cl(r)
+        results["coefficients"] = {
+            "Cm": float(parts[1]),
+            "Cd": float(parts[2]),  # Drag in wind direction
+            "Cl": float(parts[3]),  # Lift (Z-direction)
+        }
+        results["converged"] = True
 
     # Try to read raw forces output (fixed coordinates)
     # OpenFOAM forces function outputs: Time ((px py pz) (vx vy vz) (porousx porousy porousz))
-    raw_force_file = case_dir / "postProcessing" / "forces" / "0" / "forces.dat"
-    if raw_force_file.exists():
-        lines = raw_force_file.read_text().strip().split('\n')
-        if len(lines) > 1:
-            last_line = lines[-1]
-            if not last_line.startswith('#'):
-                # Parse the forces output format: Time ((px py pz) (vx vy vz) ...)
-                # Extract numbers using regex
-                numbers = re.findall(r'[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?', last_line)
-                if len(numbers) >= 7:
-                    # numbers[0] = time
-                    # numbers[1:4] = pressure force (Fx, Fy, Fz)
-                    # numbers[4:7] = viscous force (Fx, Fy, Fz)
-                    px, py, pz = float(numbers[1]), float(numbers[2]), float(numbers[3])
-                    vx, vy, vz = float(numbers[4]), float(numbers[5]), float(numbers[6])
-
-                    # Total force = pressure + viscous
-                    Fx = px + vx  # X-direction (forward/backward)
-                    Fy = py + vy  # Y-direction (side force)
-                    Fz = pz + vz  # Z-direction (lift)
-
-                    results["raw_forces"] = {
-                        "Fx_N": Fx,
-                        "Fy_N": Fy,
-                        "Fz_N": Fz,
-                        "pressure": {"x": px, "y": py, "z": pz},
-                        "viscous": {"x": vx, "y": vy, "z": vz},
-                    }
+    # (the reader treats the parentheses as whitespace)
+    numbers = dat_reader.last_series_row(case_dir / "postProcessing" / "forces", "forces.dat")
+    if numbers is not None and len(numbers) >= 7:
+        # numbers[0] = time
+        # numbers[1:4] = pressure force (Fx, Fy, Fz)
+        # numbers[4:7] = viscous force (Fx, Fy, Fz)
+        px, py, pz = float(numbers[1]), float(numbers[2]), float(numbers[3])
+        vx, vy, vz = float(numbers[4]), float(numbers[5]), float(numbers[6])
+
+        # Total force = pressure + viscous
+        Fx = px + vx  # X-direction (forward/backward)
+        Fy = py + vy  # Y-direction (side force)
+        Fz = pz + vz  # Z-direction (lift)
+
+        results["raw_forces"] = {
+            "Fx_N": Fx,
+            "Fy_N": Fy,
+            "Fz_N": Fz,
+            "pressure": {"x": px, "y": py, "z": pz},
+            "viscous": {"x": vx, "y": vy, "z": vz},
+        }
 
     # Calculate coefficients
     rho = config["air"]["rho"]
@@ -2263,6 +2739,9 @@ async def extract_results(case_dir: Path, config: dict) -> dict:
             results["aerocloud_comparison"]["wheelflow_Cd_wind"] = Cd
             results["aerocloud_comparison"]["Cd_wind_diff_percent"] = ((Cd - ac_data["Cd"]) / ac_data["Cd"]) * 100
 
+    # Final columnar copy of the histories for chart queries
+    await asyncio.to_thread(timeseries.compact, case_dir)
+
     return results
 
 
@@ -2286,11 +2765,20 @@ async def delete_job(job_id: str):
     if job_id not in jobs:
         raise HTTPException(404, "Job not found")
 
+    # Stop the solver first so it doesn't keep running (and writing) inside
+    # a directory we are about to remove
+    if workers.coordinator.is_managed(job_id):
+        # Remote job: drop it from the queue or revoke the worker's lease
+        workers.coordinator.cancel(job_id)
+    elif job_control.is_running(job_id):
+        await job_control.cancel_job(job_id)
+
     # Remove case directory if it exists
     case_dir = CASES_DIR / job_id
     if case_dir.exists():
         import shutil
         shutil.rmtree(case_dir)
+    dat_reader.forget(case_dir)
 
     # Remove from database and memory cache
     db.delete_job(job_id)
@@ -2300,33 +2788,528 @@ async def delete_job(job_id: str):
     return {"message": "Job deleted successfully", "job_id": job_id}
 
 
-@app.get("/api/jobs/{job_id}/results")
-async def get_results(job_id: str):
-    """Get job results"""
+# Job states in which no pipeline task is active
+FINISHED_STATUSES = ("complete", "failed", "cancelled", "suspended", "awaiting_results")
+# Job states of jobs waiting to start (locally, or for a remote worker)
+QUEUED_STATUSES = ("pending", "queued")
+
+metrics.register_job_gauges(jobs, QUEUED_STATUSES, FINISHED_STATUSES,
+                            worker_queue=lambda: len(workers.coordinator.queue))
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job.
+
+    Kills the whole process group of the current OpenFOAM stage, freeing
+    its cores. The case directory is kept; use DELETE to remove it.
+    """
     if job_id not in jobs:
         raise HTTPException(404, "Job not found")
 
     job = jobs[job_id]
-    if job["status"] != "complete":
-        raise HTTPException(400, f"Job not complete. Status: {job['status']}")
+    if job["status"] in ("complete", "failed", "cancelled"):
+        raise HTTPException(400, f"Job cannot be cancelled. Status: {job['status']}")
 
-    return job["results"]
+    if workers.coordinator.is_managed(job_id):
+        # Remote job: drop it from the queue or revoke the worker's lease
+        job["status"] = "cancelled"
+        job["updated_at"] = datetime.now().isoformat()
+        workers.coordinator.cancel(job_id)
+    elif job["status"] in ("pending", "queued", "suspended", "awaiting_results"):
+        # No pipeline task is running for this job - just mark it
+        job["status"] = "cancelled"
+        job["updated_at"] = datetime.now().isoformat()
+        sync_job_to_db(job_id, job)
+    elif not await job_control.cancel_job(job_id):
+        # No OpenFOAM process to kill (preparing, post-processing): the
+        # pipeline stops at its next stage boundary
+        return {"job_id": job_id, "status": "cancelling"}
 
+    return {"job_id": job_id, "status": "cancelled"}
 
-@app.get("/api/jobs/{job_id}/parts_breakdown")
-async def get_parts_breakdown(job_id: str):
+
+@app.post("/api/jobs/{job_id}/suspend")
+async def suspend_job(job_id: str, background_tasks: BackgroundTasks):
     """
-    Get drag breakdown by wheel component.
+    Suspend a running job so its cores can be used by another job.
 
-    Returns force contribution for each detected wheel part
-    (rim, tire, spokes, hub, disc).
+    A running solver is asked to write the current time step and stop;
+    POST /api/jobs/{job_id}/resume continues from that time step.
     """
     if job_id not in jobs:
         raise HTTPException(404, "Job not found")
 
     job = jobs[job_id]
+    if job["status"] in FINISHED_STATUSES + QUEUED_STATUSES:
+        raise HTTPException(400, f"Job is not running. Status: {job['status']}")
+    if job["config"].get("executor") in ("remote", "bundle"):
+        raise HTTPException(400, f"{job['config']['executor'].capitalize()} jobs cannot be suspended")
 
-    # Get case directory
+    # Writing the final time step can take minutes on large meshes
+    background_tasks.add_task(job_control.suspend_job, job_id)
+
+    return {"job_id": job_id, "status": "suspending"}
+
+
+@app.post("/api/jobs/{job_id}/resume")
+async def resume_job(job_id: str, background_tasks: BackgroundTasks):
+    """Resume a suspended job from its last written time step."""
+    if job_id not in jobs:
+        raise HTTPException(404, "Job not found")
+
+    job = jobs[job_id]
+    if job["status"] != "suspended":
+        raise HTTPException(400, f"Job is not suspended. Status: {job['status']}")
+
+    batch_id = job.get("batch_id") or job["config"].get("batch_id")
+    if batch_id in batch_jobs:
+        # Resuming the sub-job resumes the rest of its sweep as well
+        batch_jobs[batch_id]["status"] = "resuming"
+        background_tasks.add_task(run_batch_simulation, batch_id, batch_jobs[batch_id]["sub_jobs"])
+    else:
+        background_tasks.add_task(run_simulation, job_id, True)
+
+    return {"job_id": job_id, "status": "resuming"}
+
+
+# =============================================================================
+# Remote workers (see workers.py; worker_client.py is the worker side)
+# =============================================================================
+
+class WorkerRegistration(BaseModel):
+    hostname: str
+    cores: int
+    memory_gb: float = 0
+
+
+# Pipeline stages a worker may report; the coordinator alone decides when
+# a remote job is complete, failed or cancelled
+REMOTE_PROGRESS_STATUSES = ("preparing", "meshing", "solving")
+
+
+class LeaseProgress(BaseModel):
+    status: str
+    progress: int = 0
+
+
+class LeaseResult(BaseModel):
+    results: Optional[dict] = None
+    archive_sha256: Optional[str] = None
+    # Stages the worker measured (job_stages rows)
+    stages: List[dict] = []
+
+
+class LeaseFailure(BaseModel):
+    error: str
+
+
+async def expire_worker_leases():
+    """Requeue (or fail) jobs whose workers stopped renewing their leases."""
+    while True:
+        await asyncio.sleep(workers.EXPIRY_CHECK_INTERVAL)
+        for event in workers.coordinator.expire():
+            job = jobs.get(event["job_id"])
+            if not job:
+                continue
+            if event["action"] == "failed":
+                metrics.JOBS_FAILED.inc(stage=job["status"])
+                job["status"] = "failed"
+                job["error"] = f"Lease expired {workers.MAX_ATTEMPTS} times; no worker finished the job"
+            else:
+                job["status"] = "queued"
+            job["updated_at"] = datetime.now().isoformat()
+
+
+def _leased_job(lease: dict) -> dict:
+    """The job of a lease, or 410 (and the lease ends) if it was cancelled or deleted."""
+    job = jobs.get(lease["job_id"])
+    if job is None or job["status"] == "cancelled":
+        workers.coordinator.release(lease["lease_id"])
+        raise HTTPException(410, "Job was cancelled")
+    return job
+
+
+def require_worker(request: Request):
+    """Reject worker requests without the shared worker token."""
+    if not workers.WORKER_TOKEN:
+        raise HTTPException(403, "Remote workers are disabled; set WHEELFLOW_WORKER_TOKEN")
+    supplied = request.headers.get(workers.TOKEN_HEADER, "")
+    if not hmac.compare_digest(supplied.encode(), workers.WORKER_TOKEN.encode()):
+        raise HTTPException(401, "Invalid worker token")
+
+
+def _get_lease(lease_id: str) -> dict:
+    """An active lease, or 410 so the worker abandons the job."""
+    try:
+        return workers.coordinator.get_lease(lease_id)
+    except workers.LeaseError:
+        raise HTTPException(410, "Lease expired or revoked")
+
+
+async def prepare_remote_inputs(job_id: str) -> list:
+    """
+    Generate a remote job's case and publish it as content-addressed blobs.
+
+    The transformed STL is stored separately from the rest of the case so
+    a worker running a yaw sweep downloads the geometry only once. The
+    decomposition is regenerated on the worker for the process counts it
+    is leased with.
+    """
+    job = jobs[job_id]
+    config = job["config"]
+    case_dir = CASES_DIR / job_id
+    use_parallel = config.get("quality") in ["standard", "pro"]
+    proc_plan = scaling_model.plan_procs(config.get("quality", "standard"),
+                                         rotation_method=config.get("rotation_method"))
+
+    await prepare_case(job_id, case_dir, config,
+                       num_procs_mesh=proc_plan["mesh_procs"], use_parallel=use_parallel)
+
+    inputs = []
+    stl_path = case_dir / "constant" / "triSurface" / "wheel.stl"
+    if stl_path.exists():
+        inputs.append({"path": "constant/triSurface/wheel.stl",
+                       "sha256": await asyncio.to_thread(workers.store_blob_file, stl_path)})
+
+    archive_path = case_dir.parent / f"{job_id}.case.tar.gz"
+    try:
+        await asyncio.to_thread(workers.archive_directory, case_dir, archive_path,
+                                lambda rel: rel.parts[:2] == ("constant", "triSurface"))
+        digest = await asyncio.to_thread(workers.store_blob_file, archive_path)
+    finally:
+        archive_path.unlink(missing_ok=True)
+    inputs.append({"path": ".", "sha256": digest, "archive": True})
+    return inputs
+
+
+@app.post("/api/workers/register")
+async def register_worker(registration: WorkerRegistration, request: Request):
+    """Register a worker node; returns its id and lease settings."""
+    require_worker(request)
+    worker = workers.coordinator.register(registration.hostname, registration.cores,
+                                          registration.memory_gb)
+    return {"worker_id": worker["id"], "lease_ttl": workers.coordinator.lease_ttl}
+
+
+@app.get("/api/workers")
+async def list_workers():
+    """Registered workers, the remote job queue and active leases."""
+    return workers.coordinator.status()
+
+
+@app.post("/api/workers/{worker_id}/lease")
+async def lease_job(worker_id: str, request: Request):
+    """
+    Lease the next queued remote job (204 if there is none).
+
+    Returns the job's case as a list of blobs to download, with process
+    counts sized for the worker's cores.
+    """
+    require_worker(request)
+    if worker_id not in workers.coordinator.workers:
+        raise HTTPException(404, "Worker not registered")
+
+    while True:
+        lease = workers.coordinator.lease(worker_id)
+        if lease is None:
+            return Response(status_code=204)
+        job_id = lease["job_id"]
+        job = jobs.get(job_id)
+        if job is not None and job_id in remote_inputs:
+            break
+        # Deleted (or its inputs withdrawn) while it was queued
+        print(f"WARNING: Dropping lease for missing remote job {job_id}")
+        workers.coordinator.release(lease["lease_id"])
+    worker = workers.coordinator.workers[worker_id]
+    proc_plan = scaling_model.plan_procs(job["config"].get("quality", "standard"),
+                                         max_procs=worker["cores"],
+                                         rotation_method=job["config"].get("rotation_method"))
+
+    job["status"] = "leased"
+    job["worker_id"] = worker_id
+    job["updated_at"] = datetime.now().isoformat()
+    sync_job_to_db(job_id, job)
+    return {
+        "lease_id": lease["lease_id"],
+        "job_id": job_id,
+        "config": job["config"],
+        "proc_plan": proc_plan,
+        "inputs": remote_inputs[job_id],
+        "lease_ttl": workers.coordinator.lease_ttl,
+    }
+
+
+@app.get("/api/workers/blobs/{digest}")
+async def get_blob(digest: str, request: Request):
+    """Download a content-addressed input or result."""
+    require_worker(request)
+    try:
+        path = workers.blob_path(digest)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if not path.exists():
+        raise HTTPException(404, "Blob not found")
+    return FileResponse(path, media_type="application/octet-stream")
+
+
+@app.put("/api/workers/blobs/{digest}")
+async def put_blob(digest: str, request: Request):
+    """Upload a blob; rejected unless its sha256 matches the URL."""
+    require_worker(request)
+    if not workers.is_valid_digest(digest):
+        raise HTTPException(400, f"Invalid blob digest: {digest}")
+    length = request.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > workers.MAX_BLOB_SIZE:
+        raise HTTPException(413, f"Blob exceeds the {workers.MAX_BLOB_SIZE} byte limit")
+    # Result archives can be several GB: write the body to disk as it arrives
+    try:
+        size = await workers.store_blob_stream(request.stream(), digest)
+    except workers.BlobTooLarge as e:
+        raise HTTPException(413, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {"sha256": digest, "size": size}
+
+
+@app.post("/api/workers/leases/{lease_id}/progress")
+async def report_lease_progress(lease_id: str, report: LeaseProgress, request: Request):
+    """Record a worker's progress and renew its lease."""
+    require_worker(request)
+    if report.status not in REMOTE_PROGRESS_STATUSES:
+        raise HTTPException(400, f"Invalid progress status: {report.status}")
+    lease = _get_lease(lease_id)
+    job = _leased_job(lease)
+    workers.coordinator.renew(lease_id)
+
+    job["status"] = report.status
+    job["progress"] = min(max(report.progress, 0), 100)
+    job["updated_at"] = datetime.now().isoformat()
+    return {"expires_in": workers.coordinator.lease_ttl}
+
+
+@app.post("/api/workers/leases/{lease_id}/complete")
+async def complete_lease(lease_id: str, result: LeaseResult, request: Request):
+    """Accept a finished job: unpack the case archive and store the results."""
+    require_worker(request)
+    lease = _get_lease(lease_id)
+    job_id = lease["job_id"]
+    job = _leased_job(lease)
+
+    if result.archive_sha256:
+        try:
+            archive = workers.blob_path(result.archive_sha256)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        if not archive.exists():
+            raise HTTPException(400, "Result archive has not been uploaded")
+        await asyncio.to_thread(workers.extract_archive, archive, CASES_DIR / job_id)
+        await capture_mesh_stats(job_id, CASES_DIR / job_id)
+
+    stage_metrics.import_stages(job_id, result.stages)
+    job["results"] = result.results
+    job["status"] = "complete"
+    job["progress"] = 100
+    job["updated_at"] = datetime.now().isoformat()
+    workers.coordinator.release(lease_id)
+    return {"job_id": job_id, "status": "complete"}
+
+
+@app.post("/api/workers/leases/{lease_id}/fail")
+async def fail_lease(lease_id: str, failure: LeaseFailure, request: Request):
+    """Record that a worker's run of a job failed."""
+    require_worker(request)
+    lease = _get_lease(lease_id)
+    job = _leased_job(lease)
+    metrics.JOBS_FAILED.inc(stage=job["status"])
+    job["status"] = "failed"
+    job["error"] = failure.error
+    job["updated_at"] = datetime.now().isoformat()
+    workers.coordinator.release(lease_id)
+    return {"job_id": lease["job_id"], "status": "failed"}
+
+
+# =============================================================================
+# Case bundles (see case_bundle.py)
+# =============================================================================
+
+def decomposition_procs(case_dir: Path) -> Optional[int]:
+    """numberOfSubdomains from the case's decomposeParDict, if any."""
+    decompose_dict = case_dir / "system" / "decomposeParDict"
+    if not decompose_dict.exists():
+        return None
+    match = re.search(r'^numberOfSubdomains\s+(\d+);', decompose_dict.read_text(), re.MULTILINE)
+    return int(match.group(1)) if match else None
+
+
+@app.get("/api/jobs/{job_id}/bundle")
+async def export_case_bundle(job_id: str):
+    """
+    Download a job's generated case as a portable, checksummed bundle.
+
+    Solve it with OpenFOAM 13 anywhere (./Allrun [nprocs] && ./Allpack)
+    and upload results.tar.gz to POST /api/jobs/{job_id}/bundle/results.
+    """
+    if job_id not in jobs:
+        raise HTTPException(404, "Job not found")
+
+    job = jobs[job_id]
+    config = job["config"]
+    case_dir = CASES_DIR / job_id
+    if not (case_dir / "system" / "controlDict").exists():
+        raise HTTPException(400, f"Case has not been generated. Status: {job['status']}")
+    if job_control.is_running(job_id):
+        raise HTTPException(400, "Job is running; cancel or suspend it before exporting")
+
+    num_procs = decomposition_procs(case_dir)
+    if num_procs is None:
+        num_procs = scaling_model.plan_procs(config.get("quality", "standard"),
+                                             rotation_method=config.get("rotation_method"))["solver_procs"]
+        generate_decompose_dict(case_dir, num_procs)
+
+    bundle_path = BUNDLES_DIR / f"{job_id}.tar.gz"
+    manifest = await asyncio.to_thread(
+        case_bundle.export_bundle, case_dir, bundle_path, job_id, config, num_procs,
+        reconstruct_command(mesh=config.get("use_parallel_mesh", False), fields=RECONSTRUCT_FIELDS)
+    )
+    # Imports must come from this export
+    config["bundle_id"] = manifest["bundle_id"]
+    sync_job_to_db(job_id, job)
+
+    return FileResponse(bundle_path, media_type="application/gzip",
+                        filename=f"wheelflow_{job_id}.tar.gz")
+
+
+@app.post("/api/jobs/{job_id}/bundle/results")
+async def import_case_bundle_results(job_id: str, file: UploadFile = File(...)):
+    """
+    Ingest results.tar.gz produced by a bundle's Allpack.
+
+    postProcessing/, the latest time's fields and the mesh are verified
+    against the bundle's checksums and placed in the case, then results
+    are extracted as for a local run.
+    """
+    if job_id not in jobs:
+        raise HTTPException(404, "Job not found")
+
+    job = jobs[job_id]
+    config = job["config"]
+    case_dir = CASES_DIR / job_id
+    if not case_dir.exists():
+        raise HTTPException(400, "Case has not been generated")
+    if job_control.is_running(job_id):
+        raise HTTPException(400, "Job is running locally")
+
+    upload_path = case_dir.parent / f"{job_id}.results.tar.gz"
+    try:
+        with open(upload_path, "wb") as f:
+            while chunk := await file.read(1 << 20):
+                f.write(chunk)
+        summary = await asyncio.to_thread(case_bundle.import_results, upload_path, case_dir,
+                                          job_id, config.get("bundle_id"))
+    except case_bundle.BundleError as e:
+        raise HTTPException(400, str(e))
+    finally:
+        upload_path.unlink(missing_ok=True)
+    await capture_mesh_stats(job_id, case_dir)
+
+    job["status"] = "post-processing"
+    job["progress"] = 90
+    job["error"] = None
+    try:
+        async with stage_metrics.track_stage(job_id, "extract_results"):
+            job["results"] = await extract_results(case_dir, config)
+        job["status"] = "complete"
+        job["progress"] = 100
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+    job["updated_at"] = datetime.now().isoformat()
+    sync_job_to_db(job_id, job)
+
+    # The last imported yaw angle completes its sweep
+    batch = batch_jobs.get(config.get("batch_id"))
+    if batch and batch["status"] == "awaiting_results":
+        sub_jobs = batch["sub_jobs"]
+        if all(jobs[j]["status"] in ("complete", "failed", "cancelled") for j in sub_jobs if j in jobs):
+            batch["results"] = aggregate_batch_results(batch["id"], sub_jobs)
+            batch["status"] = "complete"
+
+    return {"job_id": job_id, "status": job["status"], **summary}
+
+
+@app.get("/api/jobs/{job_id}/timings")
+async def get_job_timings(job_id: str):
+    """Wall time, CPU time, peak memory and cell count of each stage of a job."""
+    if job_id not in jobs:
+        raise HTTPException(404, "Job not found")
+    return stage_metrics.job_timings(job_id)
+
+
+@app.get("/api/jobs/{job_id}/mesh")
+async def get_job_mesh(job_id: str):
+    """
+    Mesh statistics of a job: cells, faces, points, faces per patch,
+    cells per refinement level and mesh quality.
+
+    Captured after meshing; jobs meshed before statistics were kept get
+    theirs collected on first request.
+    """
+    if job_id not in jobs:
+        raise HTTPException(404, "Job not found")
+    job = jobs[job_id]
+    if not job.get("mesh"):
+        await capture_mesh_stats(job_id, CASES_DIR / job_id)
+    if not job.get("mesh"):
+        raise HTTPException(404, "Job has no mesh")
+    return job["mesh"]
+
+
+@app.get("/api/jobs/{job_id}/solver_profile")
+async def get_solver_profile(job_id: str):
+    """
+    Linear-solver iterations per equation, seconds per time step and the
+    extra time of write steps (fields and the function objects writing
+    with them), from the solver log and controlDict.
+    """
+    if job_id not in jobs:
+        raise HTTPException(404, "Job not found")
+
+    case_dir = CASES_DIR / job_id
+    if not case_dir.exists():
+        raise HTTPException(404, "Case directory not found")
+
+    return await asyncio.to_thread(solver_profile.solver_profile, case_dir)
+
+
+@app.get("/api/jobs/{job_id}/results")
+async def get_results(job_id: str):
+    """Get job results"""
+    if job_id not in jobs:
+        raise HTTPException(404, "Job not found")
+
+    job = jobs[job_id]
+    if job["status"] != "complete":
+        raise HTTPException(400, f"Job not complete. Status: {job['status']}")
+
+    return job["results"]
+
+
+@app.get("/api/jobs/{job_id}/parts_breakdown")
+async def get_parts_breakdown(job_id: str):
+    """
+    Get drag breakdown by wheel component.
+
+    Returns force contribution for each detected wheel part
+    (rim, tire, spokes, hub, disc).
+    """
+    if job_id not in jobs:
+        raise HTTPException(404, "Job not found")
+
+    job = jobs[job_id]
+
+    # Get case directory
     case_dir = CASES_DIR / job_id
 
     if not case_dir.exists():
@@ -2364,6 +3347,110 @@ async def get_stats():
         return {"error": str(e)}
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Service metrics in the Prometheus text format.
+
+    Built from in-memory state only, so it is cheap to scrape frequently.
+    """
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+# =============================================================================
+# Admin diagnostics (see profiler.py)
+# =============================================================================
+
+def require_admin(request: Request):
+    """Reject requests without the admin token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(403, "Admin endpoints are disabled; set WHEELFLOW_ADMIN_TOKEN")
+    supplied = request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(401, "Invalid admin token")
+
+
+@app.get("/api/admin/profile")
+async def profile_server(request: Request, seconds: float = 10, interval: float = profiler.DEFAULT_INTERVAL,
+                         format: str = "collapsed", idle: bool = False):
+    """
+    Sample the stacks of every server thread for a while.
+
+    Query params:
+        seconds: Sampling time (at most profiler.MAX_DURATION)
+        interval: Seconds between samples
+        format: "collapsed" (flamegraph.pl/speedscope text) or "json"
+            (flame-graph tree)
+        idle: Include threads blocked in waits
+
+    Errors:
+        409: Another profile is running
+    """
+    require_admin(request)
+    if format not in ("collapsed", "json"):
+        raise HTTPException(400, f"Unknown format: {format}")
+    try:
+        # The sampler thread leaves the event loop free, so it is profiled too
+        stacks = await asyncio.to_thread(profiler.collect_stacks, seconds, interval, idle)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(409, str(e))
+
+    if format == "json":
+        return {"samples": sum(stacks.values()), "flame_graph": profiler.flame_graph(stacks)}
+    return Response(profiler.collapsed_text(stacks), media_type="text/plain")
+
+
+@app.get("/api/admin/loop_lag")
+async def get_loop_lag(request: Request):
+    """Recent event loop stalls with the route or task that caused each."""
+    require_admin(request)
+    return loop_monitor.monitor.report()
+
+
+@app.post("/api/admin/tracemalloc/start")
+async def start_tracemalloc(request: Request, frames: int = 1):
+    """Start tracing allocations (frames: traceback depth per allocation)."""
+    require_admin(request)
+    return profiler.start_tracemalloc(frames)
+
+
+@app.post("/api/admin/tracemalloc/stop")
+async def stop_tracemalloc(request: Request):
+    """Stop tracing allocations."""
+    require_admin(request)
+    return profiler.stop_tracemalloc()
+
+
+@app.get("/api/admin/tracemalloc/snapshot")
+async def get_allocation_snapshot(request: Request, limit: int = 20, group_by: str = "lineno",
+                                  compare: bool = False):
+    """
+    Top allocation sites by live size.
+
+    Query params:
+        limit: Number of entries
+        group_by: "lineno", "filename" or "traceback"
+        compare: Report growth since the previous snapshot
+    """
+    require_admin(request)
+    try:
+        return await asyncio.to_thread(profiler.allocation_snapshot, limit, group_by, compare)
+    except (RuntimeError, ValueError) as e:
+        raise HTTPException(400, str(e))
+
+
+@app.get("/api/system/capabilities")
+async def get_capabilities():
+    """Get installed tool availability (probed once at startup)"""
+    return openfoam_env.get_capabilities()
+
+
+@app.get("/api/system/scaling")
+async def get_scaling():
+    """Get the fitted stage scaling model and the process counts it picks"""
+    return scaling_model.get_scaling_summary()
+
+
 @app.get("/api/jobs/{job_id}/progress")
 async def get_job_progress(job_id: str):
     """Get detailed simulation progress from OpenFOAM logs"""
@@ -2392,38 +3479,92 @@ async def dashboard(request: Request, job: str = None):
     })
 
 
-@app.get("/api/jobs/{job_id}/convergence")
-async def get_convergence_data(job_id: str):
-    """Get convergence history data for charts"""
+async def query_timeseries(job_id: str, source: str, fields: Optional[List[str]] = None,
+                           start: Optional[float] = None, end: Optional[float] = None,
+                           max_points: Optional[int] = None) -> dict:
+    """Windowed, downsampled history of a job (see timeseries.query)."""
+    if max_points is not None and max_points < 3:
+        raise HTTPException(400, "max_points must be at least 3")
+    try:
+        return await asyncio.to_thread(timeseries.query, CASES_DIR / job_id, source, fields,
+                                       start, end, max_points,
+                                       jobs[job_id].get("status") == "complete")
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+def etag_response(request: Request, payload: dict) -> Response:
+    """JSON response carrying the payload's ETag; 304 if the client has it."""
+    etag = payload.pop("etag")
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
+
+
+def precompressed_response(request: Request, path: Path, digest: str,
+                           headers: Optional[dict] = None) -> Response:
+    """
+    File response for a file written with compressed copies and a content
+    hash (pressure_surface.write_encoded): brotli or gzip as accepted, a
+    strong ETag per encoding, 304 if the client has it.
+
+    Range requests get byte ranges of the uncompressed file, so only whole
+    responses are compressed.
+    """
+    served, encoding = path, None
+    if "range" not in request.headers:
+        accepted = request.headers.get("accept-encoding", "")
+        for candidate, suffix in (("br", "br"), ("gzip", "gz")):
+            compressed = Path(f"{path}.{suffix}")
+            if candidate in accepted and compressed.exists():
+                served, encoding = compressed, candidate
+                break
+
+    # Each encoding is a different representation, with its own strong ETag
+    etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(served, media_type="application/octet-stream", headers=headers)
+
+
+@app.get("/api/jobs/{job_id}/timeseries/{source}")
+async def get_timeseries(job_id: str, source: str, request: Request, fields: Optional[str] = None,
+                         start: Optional[float] = None, end: Optional[float] = None,
+                         max_points: Optional[int] = None):
+    """
+    History of a job for charts: coefficients, forces or residuals.
+
+    Args:
+        fields: Comma-separated columns (default: all)
+        start, end: Time window
+        max_points: Downsample (LTTB) to at most this many points
+    """
     if job_id not in jobs:
         raise HTTPException(404, "Job not found")
+    if source not in timeseries.SOURCES:
+        raise HTTPException(404, f"Unknown time series: {source}")
 
-    case_dir = CASES_DIR / job_id
-    force_file = case_dir / "postProcessing" / "forceCoeffs" / "0" / "forceCoeffs.dat"
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    data = await query_timeseries(job_id, source, field_list, start, end, max_points)
+    return etag_response(request, data)
 
-    data = {
-        "time": [],
-        "Cd": [],
-        "Cl": [],
-        "Cm": []
-    }
 
-    if force_file.exists():
-        try:
-            with open(force_file, 'r') as f:
-                for line in f:
-                    if line.startswith('#') or not line.strip():
-                        continue
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        data["time"].append(float(parts[0]))
-                        data["Cm"].append(float(parts[1]))
-                        data["Cd"].append(float(parts[2]))
-                        data["Cl"].append(float(parts[3]))
-        except Exception as e:
-            data["error"] = str(e)
+@app.get("/api/jobs/{job_id}/convergence")
+async def get_convergence_data(job_id: str, request: Request, start: Optional[float] = None,
+                               end: Optional[float] = None, max_points: Optional[int] = None):
+    """Get convergence history data for charts"""
+    if job_id not in jobs:
+        raise HTTPException(404, "Job not found")
 
-    return data
+    data = await query_timeseries(job_id, "coefficients", ["Cd", "Cl", "Cm"],
+                                  start, end, max_points)
+    for name in ("Cd", "Cl", "Cm"):
+        data.setdefault(name, [])
+    return etag_response(request, data)
 
 
 @app.get("/api/yaw_sweep/{batch_prefix}")
@@ -2452,18 +3593,14 @@ async def get_yaw_sweep_data(batch_prefix: str):
             # If not in results, try to read from forceCoeffs file
             if cd is None:
                 case_dir = CASES_DIR / job_id
-                force_file = case_dir / "postProcessing" / "forceCoeffs" / "0" / "forceCoeffs.dat"
-                if force_file.exists():
-                    try:
-                        with open(force_file, 'r') as f:
-                            lines = [l for l in f if not l.startswith('#') and l.strip()]
-                            if lines:
-                                parts = lines[-1].split()
-                                if len(parts) >= 4:
-                                    cd = float(parts[2])
-                                    cl = float(parts[3])
-                    except Exception:
-                        pass
+                try:
+                    parts = dat_reader.last_series_row(case_dir / "postProcessing" / "forceCoeffs",
+                                                       "forceCoeffs.dat")
+                    if parts is not None and len(parts) >= 4:
+                        cd = float(parts[2])
+                        cl = float(parts[3])
+                except Exception:
+                    pass
 
             results.append({
                 "angle": angle,
@@ -2525,41 +3662,21 @@ async def get_hero_image(job_id: str, regenerate: bool = False):
     viz_dir.mkdir(exist_ok=True)
     hero_path = viz_dir / "hero.png"
 
+    metrics.cache_lookup("hero_image", hero_path.exists() and not regenerate)
     if not hero_path.exists() or regenerate:
-        # Try to generate with ParaView first, then fall back to matplotlib
+        # ParaView first, matplotlib fallback; rendered in a low-priority worker
         try:
-            from backend.visualization.hero_image import (
-                generate_hero_image,
-                check_paraview_available,
-                generate_simple_hero_image
+            result = await render_pool.run_render(
+                render_pool.render_hero, case_dir, hero_path,
+                openfoam_env.get_capabilities()["paraview"]
             )
-
-            available, version = check_paraview_available()
-
-            if available:
-                # Run generation with timeout handling
-                # The generate_hero_image function already has a 5-minute timeout
-                result = generate_hero_image(case_dir, hero_path)
-
-                if not result.get("success"):
-                    error_msg = result.get('error', 'Unknown error')
-                    if 'timeout' in error_msg.lower():
-                        # Fall back to simple image on timeout
-                        result = generate_simple_hero_image(case_dir, hero_path)
-                    else:
-                        # Try fallback on other errors too
-                        result = generate_simple_hero_image(case_dir, hero_path)
-            else:
-                # ParaView not available - use matplotlib fallback
-                result = generate_simple_hero_image(case_dir, hero_path)
-
-            if not result.get("success"):
-                error_msg = result.get('error', 'Unknown error')
-                raise HTTPException(500, f"Hero image generation failed: {error_msg}")
-
         except ImportError as e:
             raise HTTPException(503, f"Visualization module not available: {e}")
 
+        if not result.get("success"):
+            error_msg = result.get('error', 'Unknown error')
+            raise HTTPException(500, f"Hero image generation failed: {error_msg}")
+
     if hero_path.exists():
         return FileResponse(hero_path, media_type="image/png",
                             headers={"Cache-Control": "no-cache" if regenerate else "max-age=3600"})
@@ -2567,9 +3684,20 @@ async def get_hero_image(job_id: str, regenerate: bool = False):
         raise HTTPException(404, "Hero image not found")
 
 
+def surface_export_fresh(case_dir: Path, path: Path) -> bool:
+    """
+    Whether a surface export exists and is newer than the latest pressure
+    solution; a resumed or re-run solve, or imported results, replace it.
+    """
+    if not path.exists():
+        return False
+    written = foam_mesh.field_mtime(case_dir, "p")
+    return written is None or path.stat().st_mtime >= written
+
+
 @app.get("/api/jobs/{job_id}/viz/pressure_surface.ply")
 async def get_pressure_surface_ply(job_id: str):
-    """Get pressure surface as PLY file for Three.js visualization."""
+    """Get pressure surface as PLY file (vertices coloured by Cp) for Three.js visualization."""
     if job_id not in jobs:
         raise HTTPException(404, "Job not found")
 
@@ -2578,10 +3706,13 @@ async def get_pressure_surface_ply(job_id: str):
     viz_dir.mkdir(exist_ok=True)
     ply_path = viz_dir / "pressure_surface.ply"
 
-    if not ply_path.exists():
+    fresh = surface_export_fresh(case_dir, ply_path)
+    metrics.cache_lookup("pressure_surface_ply", fresh)
+    if not fresh:
         try:
             from backend.visualization.pressure_surface import export_pressure_surface_ply
-            result = export_pressure_surface_ply(case_dir, ply_path)
+            result = await asyncio.to_thread(export_pressure_surface_ply, case_dir, ply_path,
+                                             speed=jobs[job_id]["config"].get("speed", 13.9))
             if not result.get("success"):
                 raise HTTPException(500, f"PLY export failed: {result.get('error')}")
         except ImportError:
@@ -2605,10 +3736,13 @@ async def get_pressure_surface_json(job_id: str):
     viz_dir.mkdir(exist_ok=True)
     json_path = viz_dir / "pressure_surface.json"
 
-    if not json_path.exists():
+    fresh = surface_export_fresh(case_dir, json_path)
+    metrics.cache_lookup("pressure_surface_json", fresh)
+    if not fresh:
         try:
             from backend.visualization.pressure_surface import export_pressure_surface_json
-            result = export_pressure_surface_json(case_dir, json_path)
+            result = await asyncio.to_thread(export_pressure_surface_json, case_dir, json_path,
+                                             speed=jobs[job_id]["config"].get("speed", 13.9))
             if not result.get("success"):
                 raise HTTPException(500, f"JSON export failed: {result.get('error')}")
         except ImportError:
@@ -2620,37 +3754,97 @@ async def get_pressure_surface_json(job_id: str):
         raise HTTPException(404, "Pressure surface not found")
 
 
-@app.get("/api/jobs/{job_id}/viz/force_distribution")
-async def get_force_distribution(job_id: str):
-    """Get force coefficient history for charts."""
+@app.get("/api/jobs/{job_id}/viz/pressure_surface.bin")
+async def get_pressure_surface_bin(job_id: str, request: Request, quantized: bool = False,
+                                   max_triangles: Optional[int] = None):
+    """
+    Get pressure surface in the binary surface format (see pressure_surface)
+    for loading straight into Three.js BufferGeometry.
+
+    Args:
+        quantized: 16-bit positions and Cp instead of float32
+        max_triangles: Triangle budget; the most detailed level of detail
+            within it is served (the coarsest if none is, the full surface
+            without a budget)
+
+    Served precompressed (brotli or gzip, as accepted) with a strong ETag;
+    Range requests get byte ranges of the uncompressed file. The
+    X-Surface-Triangles and X-Surface-Full-Triangles headers give the
+    triangle counts of the served level and of the full surface.
+    """
     if job_id not in jobs:
         raise HTTPException(404, "Job not found")
 
     case_dir = CASES_DIR / job_id
+    viz_dir = case_dir / "visualizations"
+    viz_dir.mkdir(exist_ok=True)
+    bin_path = viz_dir / ("pressure_surface_q16.bin" if quantized else "pressure_surface.bin")
+
+    try:
+        from backend.visualization.pressure_surface import (
+            export_pressure_surface_bin, lod_index_path, select_level)
+    except ImportError:
+        raise HTTPException(503, "Visualization module not available")
+
+    # The index of levels is written last, so it marks a complete export of
+    # every level
+    index_path = lod_index_path(bin_path)
+    fresh = surface_export_fresh(case_dir, index_path)
+    metrics.cache_lookup("pressure_surface_bin", fresh)
+    if not fresh:
+        result = await asyncio.to_thread(export_pressure_surface_bin, case_dir, bin_path,
+                                         speed=jobs[job_id]["config"].get("speed", 13.9),
+                                         quantized=quantized)
+        if not result.get("success"):
+            raise HTTPException(500, f"Surface export failed: {result.get('error')}")
+
+    index = json.loads(index_path.read_text())
+    level = select_level(index, max_triangles)
+    # Each level is a different representation, with its own ETag
+    return precompressed_response(request, viz_dir / level["file"], level["etag"], {
+        "X-Surface-Triangles": str(level["triangles"]),
+        "X-Surface-Full-Triangles": str(index["levels"][0]["triangles"]),
+    })
+
+
+@app.get("/api/jobs/{job_id}/viz/force_distribution")
+async def get_force_distribution(job_id: str, request: Request, start: Optional[float] = None,
+                                 end: Optional[float] = None, max_points: Optional[int] = None):
+    """Get force coefficient history for charts."""
+    if job_id not in jobs:
+        raise HTTPException(404, "Job not found")
 
     try:
-        from backend.visualization.force_distribution import extract_force_distribution
-        result = extract_force_distribution(case_dir)
-        return result
+        from backend.visualization.force_distribution import coefficient_status
     except ImportError:
         # Fallback implementation
         return {"error": "Visualization module not available"}
 
+    result = await query_timeseries(job_id, "coefficients", None, start, end, max_points)
+    for name in timeseries.COEFFICIENT_COLUMNS[1:]:
+        result.setdefault(name, [])
+
+    # Convergence is judged on the full history, not the downsampled one
+    recent = timeseries.tail(CASES_DIR / job_id, "coefficients", 50)
+    if "Cl" in recent:
+        result.update(coefficient_status(recent["time"], recent["Cd"], recent["Cl"], recent["Cm"]))
+    else:
+        result.update(coefficient_status([], [], [], []))
+    return etag_response(request, result)
+
 
 @app.get("/api/jobs/{job_id}/viz/residuals")
-async def get_residual_history(job_id: str):
+async def get_residual_history(job_id: str, request: Request, start: Optional[float] = None,
+                               end: Optional[float] = None, max_points: Optional[int] = None):
     """Get residual convergence history for charts."""
     if job_id not in jobs:
         raise HTTPException(404, "Job not found")
 
-    case_dir = CASES_DIR / job_id
-
-    try:
-        from backend.visualization.force_distribution import extract_convergence_history
-        result = extract_convergence_history(case_dir)
-        return result
-    except ImportError:
-        return {"error": "Visualization module not available"}
+    result = await query_timeseries(job_id, "residuals", None, start, end, max_points)
+    result["iterations"] = result.pop("time")
+    for name in timeseries.RESIDUAL_COLUMNS[1:]:
+        result.setdefault(name, [])
+    return etag_response(request, result)
 
 
 @app.get("/api/jobs/{job_id}/viz/slices")
@@ -2715,6 +3909,17 @@ async def get_available_slices(job_id: str):
     return {"slices": slices}
 
 
+def find_slice_vtk(case_dir: Path, slice_name: str) -> Optional[Path]:
+    """The VTK file of a slice in postProcessing (by name prefix, then substring)."""
+    post_dir = case_dir / "postProcessing"
+    for f in post_dir.rglob(f"{slice_name}*.vtk"):
+        return f
+    for f in post_dir.rglob("*.vtk"):
+        if slice_name.lower() in f.name.lower():
+            return f
+    return None
+
+
 @app.get("/api/jobs/{job_id}/viz/slice/{slice_name}.png")
 async def get_slice_image(job_id: str, slice_name: str):
     """
@@ -2741,28 +3946,13 @@ async def get_slice_image(job_id: str, slice_name: str):
     if output_path.exists():
         return FileResponse(output_path, media_type="image/png")
 
-    # Find the VTK file
-    post_dir = case_dir / "postProcessing"
-    vtk_file = None
-
-    for f in post_dir.rglob(f"{slice_name}*.vtk"):
-        vtk_file = f
-        break
-
-    # Also try without the exact match
-    if not vtk_file:
-        for f in post_dir.rglob("*.vtk"):
-            if slice_name.lower() in f.name.lower():
-                vtk_file = f
-                break
-
+    vtk_file = find_slice_vtk(case_dir, slice_name)
     if not vtk_file:
         raise HTTPException(404, f"VTK file not found for slice: {slice_name}")
 
-    # Render the slice image
+    # Render the slice image in a low-priority worker
     try:
-        from backend.visualization.pressure_slices import render_vtk_slice_image
-        result = render_vtk_slice_image(vtk_file, output_path)
+        result = await render_pool.run_render(render_pool.render_slice, vtk_file, output_path)
 
         if not result.get("success"):
             raise HTTPException(500, f"Slice rendering failed: {result.get('error')}")
@@ -2773,6 +3963,58 @@ async def get_slice_image(job_id: str, slice_name: str):
         raise HTTPException(503, f"Visualization module not available: {e}")
 
 
+@app.get("/api/jobs/{job_id}/viz/slice/{slice_name}.grid")
+async def get_slice_grid(job_id: str, slice_name: str, request: Request, field: str = "p",
+                         resolution: int = 400, float16: bool = False):
+    """
+    Get a slice's field resampled to a regular grid (slice grid format, see
+    pressure_slices), for the browser to colour with any colormap and
+    range.
+
+    Args:
+        field: p, Cp, magU, Ux, Uy, Uz or another scalar of the slice
+        resolution: Grid cells along the slice's longer side
+        float16: Half-precision values instead of float32
+
+    Each slice, field and grid size is resampled once (again when the
+    slice file is newer) and served precompressed with a strong ETag.
+    """
+    if job_id not in jobs:
+        raise HTTPException(404, "Job not found")
+    if not re.fullmatch(r"\w{1,16}", field):
+        raise HTTPException(400, f"Invalid field: {field}")
+
+    try:
+        from backend.visualization.pressure_slices import MAX_GRID_RESOLUTION
+    except ImportError:
+        raise HTTPException(503, "Visualization module not available")
+
+    case_dir = CASES_DIR / job_id
+    vtk_file = find_slice_vtk(case_dir, slice_name)
+    if not vtk_file:
+        raise HTTPException(404, f"VTK file not found for slice: {slice_name}")
+
+    resolution = min(max(resolution, 2), MAX_GRID_RESOLUTION)
+    viz_dir = case_dir / "visualizations" / "slices"
+    viz_dir.mkdir(parents=True, exist_ok=True)
+    grid_path = viz_dir / f"{slice_name}.{field}.{resolution}{'.f16' if float16 else ''}.grid"
+    etag_path = Path(f"{grid_path}.etag")
+
+    # The ETag file is written last; a newer slice (more iterations) is resampled
+    fresh = etag_path.exists() and etag_path.stat().st_mtime >= vtk_file.stat().st_mtime
+    metrics.cache_lookup("slice_grid", fresh)
+    if not fresh:
+        result = await render_pool.run_render(render_pool.render_slice_grid, vtk_file, grid_path, field,
+                                              jobs[job_id]["config"].get("speed", 13.9), resolution,
+                                              float16)
+        if not result.get("success"):
+            if "fields" in result:
+                raise HTTPException(404, f"{result['error']}; available: {', '.join(result['fields'])}")
+            raise HTTPException(500, f"Slice resampling failed: {result.get('error')}")
+
+    return precompressed_response(request, grid_path, etag_path.read_text().strip())
+
+
 @app.post("/api/jobs/{job_id}/postprocess")
 async def run_postprocessing(job_id: str):
     """Run post-processing on existing case to generate pressure slices."""
@@ -2781,21 +4023,17 @@ async def run_postprocessing(job_id: str):
 
     case_dir = CASES_DIR / job_id
 
-    # Check if results exist
-    latest_time = None
-    for d in case_dir.iterdir():
-        if d.is_dir():
-            try:
-                t = float(d.name)
-                if latest_time is None or t > latest_time:
-                    latest_time = t
-            except ValueError:
-                pass
-
-    if latest_time is None:
+    # Check if results exist (in the processor directories if not reconstructed)
+    processors = foam_mesh.processor_dirs(case_dir) if foam_mesh.decomposed(case_dir) else []
+    latest_dir = foam_mesh.latest_time_dir(processors[0] if processors else case_dir)
+    if latest_dir is None:
         raise HTTPException(400, "No simulation results found")
+    latest_time = float(latest_dir.name)
 
-    env = get_openfoam_env()
+    env = get_openfoam_env_cached()
+    executor = job_executor(job_id)
+    num_procs = len(processors) or 1
+    parallel_args = ["-parallel"] if processors else []
 
     # OpenFOAM 13 uses foamPostProcess with cutPlaneSurface function
     slice_configs = [
@@ -2805,23 +4043,29 @@ async def run_postprocessing(job_id: str):
         ("(0 0 0)", "(1 0 0)"),       # X-slice at x=0
     ]
 
-    errors = []
-    for point, normal in slice_configs:
-        func_arg = f'cutPlaneSurface(point={point}, normal={normal}, fields=(p U))'
-        try:
-            proc = await asyncio.create_subprocess_exec(
-                "foamPostProcess", "-func", func_arg, "-latestTime",
-                cwd=str(case_dir),
-                env=env,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await proc.communicate()
+    # The job released its cores when it finished; bind post-processing to
+    # free ones the same way (a running job keeps its own)
+    own_cores = executor.local and affinity.get_job_cores(job_id) is None
+    if own_cores:
+        affinity.allocate_job_cores(job_id, num_procs)
 
-            if proc.returncode != 0:
-                errors.append(f"Slice {point}: {stderr.decode() or stdout.decode()}")
-        except Exception as e:
-            errors.append(f"Slice {point}: {str(e)}")
+    errors = []
+    try:
+        async with stage_metrics.track_stage(job_id, "post_processing", num_procs, external=True):
+            for i, (point, normal) in enumerate(slice_configs):
+                func_arg = (f'cutPlaneSurface(point={point}, normal={normal}, fields=(p U), '
+                            f'writeFormat={SLICE_WRITE_FORMAT})')
+                try:
+                    await executor.run(case_dir, ["foamPostProcess", "-func", func_arg, "-latestTime",
+                                                  *parallel_args],
+                                       env, "foamPostProcess", num_procs=num_procs,
+                                       parallel=bool(processors), job_id=job_id,
+                                       append_log=i > 0, background=True)
+                except Exception as e:
+                    errors.append(f"Slice {point}: {str(e)}")
+    finally:
+        if own_cores:
+            affinity.release_job_cores(job_id)
 
     if errors:
         return {
@@ -0,0 +1,357 @@
+"""
+Case Bundles for WheelFlow
+Portable, checksummed cases for solving off-site and ingesting the results
+
+An exported bundle is a gzipped tar with everything needed to solve a job
+with OpenFOAM 13 on any machine:
+
+    <job_id>/manifest.json   job config, sha256 of every file, commands,
+                             and the outputs the import expects back
+    <job_id>/Allrun          meshes (if needed), solves and reconstructs
+    <job_id>/Allpack         packs the outputs into results.tar.gz
+    <job_id>/0, constant, system (and processor* for a case meshed in
+                             parallel)
+
+Running `./Allrun && ./Allpack` produces results.tar.gz, holding the
+postProcessing/ data, the latest time's fields, the mesh, the logs and a
+MANIFEST.sha256 covering them. Importing it verifies the checksums and
+that it belongs to this job's bundle, then places the files in the case
+directory where extract_results and the dashboards read them.
+"""
+
+import hashlib
+import io
+import json
+import re
+import shlex
+import shutil
+import tarfile
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+BUNDLE_FORMAT = "wheelflow-case-bundle"
+BUNDLE_VERSION = 1
+OPENFOAM_VERSION = "13"
+
+# Case inputs copied into a bundle
+INPUT_DIRS = ["0", "constant", "system"]
+
+# Outputs the import requires, and the ones it accepts
+REQUIRED_OUTPUTS = ["postProcessing/forceCoeffs/0/forceCoeffs.dat"]
+OPTIONAL_OUTPUTS = ["postProcessing/", "constant/polyMesh/", "log.*", "<latestTime>/"]
+
+CHECKSUM_FILE = "MANIFEST.sha256"
+
+TIME_DIR_PATTERN = re.compile(r'^\d+(\.\d+)?(e[-+]?\d+)?$')
+
+
+class BundleError(Exception):
+    """An import that is malformed, tampered with, or for another job."""
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def input_files(case_dir: Path) -> List[Path]:
+    """Case input files (relative paths) that go into a bundle."""
+    files = []
+    tops = [case_dir / name for name in INPUT_DIRS]
+    tops += sorted(p for p in case_dir.glob("processor*") if p.is_dir())
+    for top in tops:
+        if top.is_dir():
+            files += [p.relative_to(case_dir) for p in sorted(top.rglob("*")) if p.is_file()]
+    return files
+
+
+def bundle_id(file_digests: Dict[str, str]) -> str:
+    """Content id of a bundle: a hash over its file paths and digests."""
+    h = hashlib.sha256()
+    for path in sorted(file_digests):
+        h.update(f"{path}\0{file_digests[path]}\n".encode())
+    return h.hexdigest()
+
+
+def is_meshed(case_dir: Path) -> bool:
+    """True once snappyHexMesh has run (serial or parallel)."""
+    return ((case_dir / "constant" / "polyMesh" / "faces").exists()
+            or (case_dir / "processor0" / "constant" / "polyMesh" / "faces").exists())
+
+
+def allrun_script(config: dict, meshed: bool, decomposed: bool, num_procs: int,
+                  reconstruct_args: List[str]) -> str:
+    """Allrun mirroring WheelFlow's meshing and solving stages."""
+    parallel_mesh = config.get("use_parallel_mesh", False)
+    mrf = config.get("rotation_method", "none") == "mrf" and config.get("rolling_enabled", True)
+
+    lines = [
+        "#!/bin/sh",
+        f"# WheelFlow case bundle: solve with OpenFOAM {OPENFOAM_VERSION}",
+        "# Usage: ./Allrun [number of processors]",
+        'cd "${0%/*}" || exit 1',
+        '. "$WM_PROJECT_DIR/bin/tools/RunFunctions"',
+        "",
+        f'NP="${{1:-{num_procs}}}"',
+    ]
+    if not decomposed:
+        lines.append('foamDictionary -entry numberOfSubdomains -set "$NP" system/decomposeParDict > /dev/null')
+    lines.append("")
+
+    if not meshed:
+        lines += ["runApplication blockMesh", "runApplication surfaceFeatures"]
+        if parallel_mesh:
+            # 0/ fields include setConstraintTypes, so they can be copied
+            # into the processors as they are
+            lines += ["runApplication decomposePar -copyZero",
+                      "runParallel snappyHexMesh -overwrite"]
+            if mrf:
+                lines.append("runParallel topoSet")
+        else:
+            lines.append("runApplication snappyHexMesh -overwrite")
+            if mrf:
+                lines.append("runApplication topoSet")
+            lines.append("runApplication decomposePar")
+    elif not decomposed:
+        lines.append("runApplication decomposePar")
+
+    lines += [
+        "runParallel potentialFoam -writephi",
+        "runParallel foamRun -solver incompressibleFluid",
+        # Arguments such as -fields '(p U)' must reach reconstructPar as one word
+        f"runApplication {' '.join(shlex.quote(arg) for arg in reconstruct_args)}",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def allpack_script() -> str:
+    """Allpack: collect the outputs the import expects."""
+    return f"""#!/bin/sh
+# Pack the solved case's outputs for import into WheelFlow
+cd "${{0%/*}}" || exit 1
+
+latest=$(foamListTimes -latestTime -noZero 2>/dev/null | tail -1)
+files=$(find postProcessing constant/polyMesh $latest -type f 2>/dev/null; ls log.* 2>/dev/null)
+
+sha256sum $files manifest.json > {CHECKSUM_FILE}
+tar czf results.tar.gz {CHECKSUM_FILE} manifest.json $files
+echo "Wrote results.tar.gz"
+"""
+
+
+def add_constraint_types(field_text: str) -> str:
+    """Let a 0/ field be copied into processors (processor patch types)."""
+    if "setConstraintTypes" in field_text:
+        return field_text
+    return field_text.replace(
+        "boundaryField\n{\n",
+        "boundaryField\n{\n    #includeEtc \"caseDicts/setConstraintTypes\"\n\n",
+        1
+    )
+
+
+def _add_bytes(tar: tarfile.TarFile, name: str, data: bytes, mode: int = 0o644):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mode = mode
+    info.mtime = int(datetime.now().timestamp())
+    tar.addfile(info, io.BytesIO(data))
+
+
+def export_bundle(case_dir: Path, bundle_path: Path, job_id: str, config: dict,
+                  num_procs: int, reconstruct_args: List[str]) -> dict:
+    """
+    Write a case bundle.
+
+    Args:
+        num_procs: Default processor count for Allrun
+        reconstruct_args: reconstructPar command line for the latest time
+
+    Returns:
+        The bundle manifest
+    """
+    meshed = is_meshed(case_dir)
+    decomposed = (case_dir / "processor0").is_dir()
+    files = input_files(case_dir)
+
+    # Unmeshed fields are rewritten so decomposePar -copyZero can copy
+    # them into the processors; hash what is shipped
+    rewritten = {}
+    digests = {}
+    for rel in files:
+        if rel.parts[0] == "0" and not meshed:
+            data = add_constraint_types((case_dir / rel).read_text(errors="replace")).encode()
+            rewritten[str(rel)] = data
+            digests[str(rel)] = hashlib.sha256(data).hexdigest()
+        else:
+            digests[str(rel)] = file_sha256(case_dir / rel)
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "openfoam": OPENFOAM_VERSION,
+        "job_id": job_id,
+        "bundle_id": bundle_id(digests),
+        "created_at": datetime.utcnow().isoformat(),
+        "meshed": meshed,
+        "decomposed": decomposed,
+        "num_procs": num_procs,
+        "config": config,
+        "files": digests,
+        "expected_outputs": {
+            "required": REQUIRED_OUTPUTS,
+            "optional": OPTIONAL_OUTPUTS,
+            "checksums": CHECKSUM_FILE,
+        },
+        "run": "./Allrun [nprocs] && ./Allpack",
+    }
+
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = bundle_path.with_suffix(".tmp")
+    with tarfile.open(tmp_path, "w:gz") as tar:
+        _add_bytes(tar, f"{job_id}/manifest.json", json.dumps(manifest, indent=2).encode())
+        _add_bytes(tar, f"{job_id}/Allrun",
+                   allrun_script(config, meshed, decomposed, num_procs, reconstruct_args).encode(), 0o755)
+        _add_bytes(tar, f"{job_id}/Allpack", allpack_script().encode(), 0o755)
+        for rel in files:
+            if str(rel) in rewritten:
+                _add_bytes(tar, f"{job_id}/{rel}", rewritten[str(rel)])
+            else:
+                # Streamed from disk: meshes can be several GB
+                tar.add(case_dir / rel, arcname=f"{job_id}/{rel}", recursive=False)
+    tmp_path.replace(bundle_path)
+    return manifest
+
+
+# =============================================================================
+# Import
+# =============================================================================
+
+def is_accepted_output(path: str) -> bool:
+    """Whether a results file may be written into the case directory."""
+    parts = Path(path).parts
+    if len(parts) <= 1:
+        return bool(parts) and parts[0].startswith("log.")
+    if parts[0] == "postProcessing":
+        return True
+    if parts[:2] == ("constant", "polyMesh"):
+        return True
+    return bool(TIME_DIR_PATTERN.match(parts[0])) and float(parts[0]) > 0
+
+
+def parse_checksums(text: str) -> Dict[str, str]:
+    """Parse sha256sum output into {path: digest}."""
+    checksums = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        digest, _, path = line.partition("  ")
+        if not re.match(r'^[0-9a-f]{64}$', digest) or not path:
+            raise BundleError(f"Malformed {CHECKSUM_FILE} line: {line!r}")
+        checksums[path.lstrip("*").removeprefix("./")] = digest
+    return checksums
+
+
+def _member_name(name: str) -> str:
+    """Member path without a leading './' or <job_id>/ directory."""
+    name = name.removeprefix("./")
+    path = Path(name)
+    if path.is_absolute() or ".." in path.parts:
+        raise BundleError(f"Unsafe path in results: {name}")
+    return name
+
+
+def import_results(archive_path: Path, case_dir: Path, job_id: str,
+                   expected_bundle_id: Optional[str] = None) -> dict:
+    """
+    Verify a results archive and place its outputs in the case directory.
+
+    Args:
+        expected_bundle_id: bundle_id of the exported case, if known
+
+    Returns:
+        Summary with the imported files and latest time
+
+    Raises:
+        BundleError: If the archive is malformed, fails verification or
+            belongs to another job
+    """
+    try:
+        tar = tarfile.open(archive_path, "r:gz")
+    except (tarfile.TarError, OSError) as e:
+        raise BundleError(f"Not a gzipped tar archive: {e}")
+
+    with tar, tempfile.TemporaryDirectory(dir=case_dir.parent) as staging:
+        staging = Path(staging)
+        members = {}
+        for member in tar.getmembers():
+            if member.isdir():
+                continue
+            if not member.isfile():
+                raise BundleError(f"Links and devices are not allowed: {member.name}")
+            members[_member_name(member.name)] = member
+
+        # Archives made from the bundle root may be nested in <job_id>/
+        prefix = ""
+        if CHECKSUM_FILE not in members and f"{job_id}/{CHECKSUM_FILE}" in members:
+            prefix = f"{job_id}/"
+        if f"{prefix}{CHECKSUM_FILE}" not in members or f"{prefix}manifest.json" not in members:
+            raise BundleError(f"Results must contain {CHECKSUM_FILE} and manifest.json (run ./Allpack)")
+
+        checksums = parse_checksums(tar.extractfile(members[f"{prefix}{CHECKSUM_FILE}"]).read().decode())
+        manifest_data = tar.extractfile(members[f"{prefix}manifest.json"]).read()
+        if checksums.get("manifest.json") != hashlib.sha256(manifest_data).hexdigest():
+            raise BundleError("manifest.json does not match its checksum")
+        manifest = json.loads(manifest_data)
+        if manifest.get("format") != BUNDLE_FORMAT or manifest.get("job_id") != job_id:
+            raise BundleError(f"Results are for job {manifest.get('job_id')}, not {job_id}")
+        if expected_bundle_id and manifest.get("bundle_id") != expected_bundle_id:
+            raise BundleError("Results were produced from a different export of this case")
+
+        imported = []
+        for name, member in members.items():
+            rel = name[len(prefix):]
+            if rel in (CHECKSUM_FILE, "manifest.json"):
+                continue
+            if not is_accepted_output(rel):
+                continue
+            if rel not in checksums:
+                raise BundleError(f"{rel} is not listed in {CHECKSUM_FILE}")
+            dest = staging / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            h = hashlib.sha256()
+            with tar.extractfile(member) as src, open(dest, "wb") as out:
+                for chunk in iter(lambda: src.read(1 << 20), b""):
+                    h.update(chunk)
+                    out.write(chunk)
+            if h.hexdigest() != checksums[rel]:
+                raise BundleError(f"Checksum mismatch for {rel}")
+            imported.append(rel)
+
+        missing = [path for path in REQUIRED_OUTPUTS if path not in imported]
+        if missing:
+            raise BundleError(f"Missing required outputs: {', '.join(missing)}")
+
+        # Everything verified: replace the previous outputs
+        if (staging / "postProcessing").exists():
+            shutil.rmtree(case_dir / "postProcessing", ignore_errors=True)
+        if (staging / "constant" / "polyMesh").exists():
+            shutil.rmtree(case_dir / "constant" / "polyMesh", ignore_errors=True)
+        for rel in imported:
+            dest = case_dir / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(staging / rel), dest)
+
+    times = [float(Path(p).parts[0]) for p in imported if TIME_DIR_PATTERN.match(Path(p).parts[0])]
+    return {
+        "files": len(imported),
+        "latest_time": max(times) if times else None,
+        "bundle_id": manifest.get("bundle_id"),
+    }
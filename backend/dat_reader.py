@@ -0,0 +1,235 @@
+"""
+Incremental .dat Reader for WheelFlow
+Shared, append-only parsing of OpenFOAM postProcessing tables
+
+Function objects such as forceCoeffs and forces append one row per time
+step to postProcessing/<name>/<startTime>/<name>.dat. The dashboard polls
+these files throughout a run, so instead of re-reading them on every
+request, the reader remembers for each file how many bytes it has parsed
+and the rows parsed so far. A poll stats the file, reads only the bytes
+appended since the last poll, converts the new rows in one vectorized step
+and appends them to a growable array, so its cost is proportional to the
+new rows rather than the file.
+
+Rows are numeric columns; parentheses in vector columns (forces.dat's
+"500 ((px py pz) (vx vy vz) ...)") are treated as whitespace. Comment
+lines are skipped, and a trailing line still being written is left for the
+next poll. A file that shrinks or is replaced is parsed again from the
+start.
+
+A run restarted from a written time (a resumed job) writes its rows to a
+new postProcessing/<name>/<startTime>/ directory; read_series joins the
+tables of every start time into one history.
+
+Configuration (environment variables):
+    WHEELFLOW_DAT_CACHE_FILES: Files whose parsed rows are kept (default 512)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+
+MAX_FILES = int(os.environ.get("WHEELFLOW_DAT_CACHE_FILES", "512"))
+
+INITIAL_CAPACITY = 1024
+
+_PAREN_TABLE = bytes.maketrans(b"()", b"  ")
+
+
+class DatTable:
+    """Rows parsed so far from one .dat file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, inode: Optional[int] = None):
+        self.inode = inode
+        self.offset = 0
+        self.mtime_ns = None
+        self.size = 0
+        self.n_cols = 0
+        self.n_rows = 0
+        self.buffer = np.empty((0, 0))
+
+    def refresh(self) -> np.ndarray:
+        """Parse what was appended since the last call; return all rows."""
+        with self.lock:
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                self.reset()
+                return self.rows()
+
+            if stat.st_ino != self.inode or stat.st_size < self.offset:
+                self.reset(stat.st_ino)
+            elif stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns:
+                return self.rows()
+
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                chunk = f.read(stat.st_size - self.offset)
+            # Leave a partially written last line for the next poll
+            end = chunk.rfind(b"\n") + 1
+            if end:
+                self.append(parse_rows(chunk[:end], self.n_cols))
+                self.offset += end
+            self.size = stat.st_size
+            self.mtime_ns = stat.st_mtime_ns
+            return self.rows()
+
+    def append(self, rows: np.ndarray):
+        if not len(rows):
+            return
+        if self.n_cols == 0:
+            self.n_cols = rows.shape[1]
+            self.buffer = np.empty((max(INITIAL_CAPACITY, len(rows)), self.n_cols))
+        needed = self.n_rows + len(rows)
+        if needed > len(self.buffer):
+            grown = np.empty((max(needed, 2 * len(self.buffer)), self.n_cols))
+            grown[:self.n_rows] = self.buffer[:self.n_rows]
+            self.buffer = grown
+        self.buffer[self.n_rows:needed] = rows
+        self.n_rows = needed
+
+    def rows(self) -> np.ndarray:
+        # Rows already handed out are never rewritten, only appended after
+        view = self.buffer[:self.n_rows]
+        view.flags.writeable = False
+        return view
+
+
+def parse_rows(data: bytes, n_cols: int = 0) -> np.ndarray:
+    """
+    Numeric rows of a block of complete .dat lines.
+
+    Args:
+        data: Lines ending in newlines
+        n_cols: Expected number of columns (0: take the first row's)
+
+    Returns:
+        Array of shape (rows, n_cols); rows with another column count or
+        non-numeric values are skipped
+    """
+    lines = [line for line in data.translate(_PAREN_TABLE).splitlines()
+             if line.strip() and not line.lstrip().startswith(b"#")]
+    if not lines:
+        return np.empty((0, n_cols))
+    if not n_cols:
+        n_cols = len(lines[0].split())
+
+    # Common case: one conversion for the whole block
+    tokens = b" ".join(lines).split()
+    if len(tokens) == len(lines) * n_cols:
+        try:
+            return np.array(tokens, dtype=np.float64).reshape(len(lines), n_cols)
+        except ValueError:
+            pass
+
+    rows = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) != n_cols:
+            continue
+        try:
+            rows.append([float(field) for field in fields])
+        except ValueError:
+            continue
+    return np.array(rows, dtype=np.float64).reshape(len(rows), n_cols)
+
+
+_tables: "OrderedDict[str, DatTable]" = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+def table(path: Path) -> DatTable:
+    key = str(Path(path).resolve())
+    with _tables_lock:
+        entry = _tables.get(key)
+        if entry is None:
+            entry = _tables[key] = DatTable(Path(key))
+            while len(_tables) > MAX_FILES:
+                _tables.popitem(last=False)
+        else:
+            _tables.move_to_end(key)
+        return entry
+
+
+def read_dat(path: Path) -> np.ndarray:
+    """
+    All rows of a .dat file as a read-only (rows, columns) array.
+
+    Missing files give an empty array.
+    """
+    return table(path).refresh()
+
+
+def last_row(path: Path) -> Optional[np.ndarray]:
+    """The latest complete row of a .dat file, or None."""
+    rows = read_dat(path)
+    return rows[-1] if len(rows) else None
+
+
+def forget(case_dir: Path):
+    """Drop the cached rows of every file under a case directory."""
+    prefix = str(Path(case_dir).resolve()) + os.sep
+    with _tables_lock:
+        for key in [key for key in _tables if key.startswith(prefix)]:
+            del _tables[key]
+
+
+def time_dirs(function_dir: Path) -> List[Path]:
+    """Start-time directories of a function object's output, in time order."""
+    try:
+        entries = list(Path(function_dir).iterdir())
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+    dirs = []
+    for entry in entries:
+        try:
+            start = float(entry.name)
+        except ValueError:
+            continue
+        if entry.is_dir():
+            dirs.append((start, entry))
+    return [entry for _, entry in sorted(dirs)]
+
+
+def read_series(function_dir: Path, file_name: str) -> np.ndarray:
+    """
+    All rows of a function object's table across restarts, in time order.
+
+    Args:
+        function_dir: postProcessing/<name>
+        file_name: Table in each start-time directory (e.g. forceCoeffs.dat)
+
+    Returns:
+        Rows of every start time joined; where runs overlap, the rows of
+        the later run replace those of the earlier one
+    """
+    tables = [rows for rows in (read_dat(d / file_name) for d in time_dirs(function_dir)) if len(rows)]
+    if not tables:
+        return np.empty((0, 0))
+    if len(tables) == 1:
+        return tables[0]
+
+    n_cols = min(rows.shape[1] for rows in tables)
+    parts = []
+    # A run's rows end where any later run starts
+    cutoff = np.inf
+    for rows in reversed(tables):
+        parts.append(rows[rows[:, 0] < cutoff, :n_cols])
+        cutoff = min(cutoff, rows[0, 0])
+    return np.concatenate(parts[::-1])
+
+
+def last_series_row(function_dir: Path, file_name: str) -> Optional[np.ndarray]:
+    """The latest complete row of a function object's table (see read_series)."""
+    rows = read_series(function_dir, file_name)
+    return rows[-1] if len(rows) else None
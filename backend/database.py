@@ -48,12 +48,73 @@ def init_db():
                 completed_at TEXT,
                 batch_id TEXT,
                 batch_yaw_angles TEXT,
-                yaw_angle REAL
+                yaw_angle REAL,
+                suspended_stage TEXT
             )
         ''')
+        _add_missing_columns(conn, 'jobs', JOB_COLUMN_MIGRATIONS)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS scaling_samples (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                host TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                num_procs INTEGER NOT NULL,
+                cells INTEGER NOT NULL,
+                wall_time REAL NOT NULL,
+                work_units REAL NOT NULL DEFAULT 1,
+                quality TEXT,
+                job_id TEXT,
+                recorded_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scaling_samples_stage
+            ON scaling_samples (host, stage)
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS job_stages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                wall_time REAL NOT NULL,
+                cpu_time REAL,
+                peak_rss INTEGER,
+                cells INTEGER,
+                num_procs INTEGER NOT NULL DEFAULT 1,
+                host TEXT,
+                cpu_scope TEXT
+            )
+        ''')
+        _add_missing_columns(conn, 'job_stages', JOB_STAGE_COLUMN_MIGRATIONS)
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_job_stages_job
+            ON job_stages (job_id)
+        ''')
         conn.commit()
 
 
+# Columns added after the initial schema: name -> SQL type.
+# Existing databases get them via ALTER TABLE on startup.
+JOB_COLUMN_MIGRATIONS = {
+    'suspended_stage': 'TEXT',
+    'mesh': 'TEXT',
+}
+
+JOB_STAGE_COLUMN_MIGRATIONS = {
+    'cpu_scope': 'TEXT',
+}
+
+
+def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]):
+    """Add any columns missing from an existing table."""
+    existing = {row['name'] for row in conn.execute(f'PRAGMA table_info({table})')}
+    for name, sql_type in columns.items():
+        if name not in existing:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {sql_type}')
+
+
 def job_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
     """Convert a database row to a job dictionary."""
     job = dict(row)
@@ -62,6 +123,8 @@ def job_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
         job['config'] = json.loads(job['config'])
     if job.get('results'):
         job['results'] = json.loads(job['results'])
+    if job.get('mesh'):
+        job['mesh'] = json.loads(job['mesh'])
     if job.get('batch_yaw_angles'):
         job['batch_yaw_angles'] = json.loads(job['batch_yaw_angles'])
     return job
@@ -116,7 +179,7 @@ def update_job(job_id: str, **updates) -> Optional[Dict[str, Any]]:
     values = [now]
 
     for key, value in updates.items():
-        if key in ('config', 'results', 'batch_yaw_angles'):
+        if key in ('config', 'results', 'batch_yaw_angles', 'mesh'):
             value = json.dumps(value) if value is not None else None
         fields.append(f'{key} = ?')
         values.append(value)
@@ -160,6 +223,7 @@ def delete_job(job_id: str) -> bool:
     """Delete a job from the database."""
     with get_db_connection() as conn:
         cursor = conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+        conn.execute('DELETE FROM job_stages WHERE job_id = ?', (job_id,))
         conn.commit()
         return cursor.rowcount > 0
 
@@ -171,5 +235,59 @@ def job_exists(job_id: str) -> bool:
         return cursor.fetchone() is not None
 
 
+def add_scaling_sample(host: str, stage: str, num_procs: int, cells: int, wall_time: float,
+                       work_units: float = 1, quality: Optional[str] = None,
+                       job_id: Optional[str] = None) -> None:
+    """Record a stage wall time measurement for the scaling model."""
+    with get_db_connection() as conn:
+        conn.execute('''
+            INSERT INTO scaling_samples
+                (host, stage, num_procs, cells, wall_time, work_units, quality, job_id, recorded_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            host, stage, num_procs, cells, wall_time, work_units, quality, job_id,
+            datetime.utcnow().isoformat()
+        ))
+        conn.commit()
+
+
+def get_scaling_samples(host: str, stage: Optional[str] = None, limit: int = 500) -> List[Dict[str, Any]]:
+    """Get the most recent scaling samples for a host (optionally one stage)."""
+    query = 'SELECT * FROM scaling_samples WHERE host = ?'
+    params: list = [host]
+    if stage:
+        query += ' AND stage = ?'
+        params.append(stage)
+    query += ' ORDER BY id DESC LIMIT ?'
+    params.append(limit)
+
+    with get_db_connection() as conn:
+        cursor = conn.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def add_job_stage(job_id: str, stage: str, status: str, started_at: str, wall_time: float,
+                  cpu_time: Optional[float] = None, peak_rss: Optional[int] = None,
+                  cells: Optional[int] = None, num_procs: int = 1,
+                  host: Optional[str] = None, cpu_scope: Optional[str] = None) -> None:
+    """Record the resources one pipeline stage of a job used."""
+    with get_db_connection() as conn:
+        conn.execute('''
+            INSERT INTO job_stages
+                (job_id, stage, status, started_at, wall_time, cpu_time, peak_rss, cells,
+                 num_procs, host, cpu_scope)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (job_id, stage, status, started_at, wall_time, cpu_time, peak_rss, cells,
+              num_procs, host, cpu_scope))
+        conn.commit()
+
+
+def get_job_stages(job_id: str) -> List[Dict[str, Any]]:
+    """Get a job's recorded stages in the order they ran."""
+    with get_db_connection() as conn:
+        cursor = conn.execute('SELECT * FROM job_stages WHERE job_id = ? ORDER BY id', (job_id,))
+        return [dict(row) for row in cursor.fetchall()]
+
+
 # Initialize database on module import
 init_db()
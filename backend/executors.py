@@ -0,0 +1,336 @@
+"""
+Executors for WheelFlow
+Where a job's OpenFOAM commands run: this host or a SLURM cluster
+
+run_openfoam_command and the decomposition utilities hand every command
+to the job's executor:
+
+    local: subprocess on this host, launched with mpirun on the job's
+        own cores (the original behaviour)
+    slurm: a batch script per command, submitted with sbatch and polled
+        with squeue. Logs and results are written straight into the case
+        directory, so CASES_DIR must be on storage shared with the compute
+        nodes.
+
+Remote workers (executor "remote", see workers.py) run the local executor
+on the worker node.
+
+SLURM configuration (environment variables):
+    WHEELFLOW_SBATCH / WHEELFLOW_SQUEUE / WHEELFLOW_SCANCEL: Scheduler commands
+        (default sbatch, squeue, scancel on PATH)
+    WHEELFLOW_SLURM_PARTITION: Partition to submit to
+    WHEELFLOW_SLURM_ACCOUNT: Account to charge
+    WHEELFLOW_SLURM_TIME: Time limit per command (default 24:00:00)
+    WHEELFLOW_SLURM_MAX_PROCS: Largest process count to request (default 256)
+    WHEELFLOW_SLURM_LAUNCHER: MPI launcher inside the allocation (default srun)
+    WHEELFLOW_SLURM_BASHRC: OpenFOAM bashrc on the compute nodes
+        (default: the local OpenFOAM bashrc)
+    WHEELFLOW_SLURM_PROLOGUE: Extra shell lines run before each command
+        (e.g. "module load openmpi")
+    WHEELFLOW_SLURM_POLL: Seconds between squeue polls (default 10)
+"""
+
+import asyncio
+import os
+import re
+import shlex
+import signal
+import subprocess
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from backend import affinity
+    from backend import job_control
+    from backend import openfoam_env
+except ImportError:
+    import affinity
+    import job_control
+    import openfoam_env
+
+
+LOCAL = "local"
+SLURM = "slurm"
+
+
+def write_log(case_dir: Path, log_name: str, stdout: str, stderr: str = "", append: bool = False):
+    """Write (or append to) log.<log_name> in the case directory."""
+    with open(case_dir / f"log.{log_name}", 'a' if append else 'w') as f:
+        f.write(stdout)
+        if stderr:
+            f.write("\n--- STDERR ---\n")
+            f.write(stderr)
+
+
+class Executor(ABC):
+    """Runs OpenFOAM commands for a job."""
+
+    name = None
+    # Runs on this host: jobs get a local core set and feed the scaling model
+    local = True
+
+    def max_procs(self) -> Optional[int]:
+        """Largest process count for one job (None: this host's cores)."""
+        return None
+
+    @abstractmethod
+    async def run(self, case_dir: Path, cmd: List[str], env: Dict[str, str], log_name: str,
+                  num_procs: int = 1, parallel: bool = False, job_id: str = None,
+                  append_log: bool = False, background: bool = False) -> str:
+        """
+        Run a command in the case directory and write log.<log_name>.
+
+        Args:
+            cmd: OpenFOAM command and arguments (including -parallel for
+                MPI runs; the executor adds the launcher)
+            num_procs: MPI ranks when parallel
+            job_id: Registers the command with job_control so the job can be
+                cancelled or suspended
+            append_log: Append to log.<log_name> (a resumed solve keeps the
+                first run's log)
+            background: Run at lowered priority, behind running jobs
+                (on-demand post-processing)
+
+        Returns:
+            The command's standard output
+
+        Raises:
+            JobInterrupted: If the job was cancelled or suspended
+            Exception: If the command failed
+        """
+
+
+class LocalExecutor(Executor):
+    """Subprocesses on this host."""
+
+    name = LOCAL
+
+    async def run(self, case_dir: Path, cmd: List[str], env: Dict[str, str], log_name: str,
+                  num_procs: int = 1, parallel: bool = False, job_id: str = None,
+                  append_log: bool = False, background: bool = False) -> str:
+        job_cores = affinity.get_job_cores(job_id)
+        if parallel:
+            cmd = ([openfoam_env.MPIRUN, "-np", str(num_procs)]
+                   + affinity.mpirun_binding_args(job_cores, num_procs) + cmd)
+            print(f"Running: {' '.join(cmd)}")
+        # Keep the job on its own cores (and cgroup, if delegated)
+        cmd = affinity.job_launch_prefix(job_cores, affinity.get_job_cgroup(job_id),
+                                         background=background) + cmd
+
+        # Own session: mpirun leads a process group containing every rank
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=case_dir,
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
+        )
+        if job_id:
+            job_control.register_process(job_id, process, log_name)
+
+        try:
+            stdout, stderr = await process.communicate()
+        finally:
+            if job_id:
+                job_control.unregister_process(job_id, process)
+
+        write_log(case_dir, log_name, stdout.decode(errors='replace'), stderr.decode(errors='replace'),
+                  append=append_log)
+
+        # A suspended solver exits cleanly after writing, so check before the
+        # return code
+        job_control.check_interrupted(job_id)
+
+        if process.returncode != 0:
+            raise Exception(f"{log_name} failed: {stderr.decode(errors='replace')}")
+        return stdout.decode(errors='replace')
+
+
+# =============================================================================
+# SLURM
+# =============================================================================
+
+# squeue states after which a job no longer runs
+SLURM_FINISHED_STATES = {"COMPLETED", "FAILED", "CANCELLED", "TIMEOUT", "NODE_FAIL",
+                         "PREEMPTED", "OUT_OF_MEMORY", "BOOT_FAIL", "DEADLINE"}
+
+
+class BatchJob:
+    """
+    A submitted batch job, standing in for a process in job_control.
+
+    Provides the parts of the asyncio process interface job_control uses
+    (returncode, wait) plus an async signal_group, which signals every task
+    of the job through the scheduler.
+    """
+
+    def __init__(self, scheduler_id: str, exit_file: Path, executor: "SlurmExecutor"):
+        self.scheduler_id = scheduler_id
+        self.exit_file = exit_file
+        self.executor = executor
+        self.returncode = None
+        self.state = "PENDING"
+
+    async def wait(self) -> int:
+        """Poll the scheduler until the job leaves the queue."""
+        while self.returncode is None:
+            self.state = await self.executor.query_state(self.scheduler_id)
+            if self.state is None or self.state in SLURM_FINISHED_STATES:
+                self.returncode = self._read_exit_code()
+                break
+            await asyncio.sleep(self.executor.poll_interval)
+        return self.returncode
+
+    def _read_exit_code(self) -> int:
+        """Exit code written by the job script (missing if it was killed)."""
+        try:
+            return int(self.exit_file.read_text().strip())
+        except (OSError, ValueError):
+            return -1
+
+    async def signal_group(self, sig) -> bool:
+        return await self.executor.signal_job(self.scheduler_id, sig)
+
+
+class SlurmExecutor(Executor):
+    """Batch scripts submitted to SLURM."""
+
+    name = SLURM
+    local = False
+
+    def __init__(self):
+        self.sbatch = os.environ.get("WHEELFLOW_SBATCH", "sbatch")
+        self.squeue = os.environ.get("WHEELFLOW_SQUEUE", "squeue")
+        self.scancel = os.environ.get("WHEELFLOW_SCANCEL", "scancel")
+        self.partition = os.environ.get("WHEELFLOW_SLURM_PARTITION")
+        self.account = os.environ.get("WHEELFLOW_SLURM_ACCOUNT")
+        self.time_limit = os.environ.get("WHEELFLOW_SLURM_TIME", "24:00:00")
+        self.max_proc_count = int(os.environ.get("WHEELFLOW_SLURM_MAX_PROCS", "256"))
+        self.launcher = os.environ.get("WHEELFLOW_SLURM_LAUNCHER", "srun")
+        self.bashrc = os.environ.get("WHEELFLOW_SLURM_BASHRC", str(openfoam_env.OPENFOAM_BASHRC))
+        self.prologue = os.environ.get("WHEELFLOW_SLURM_PROLOGUE", "")
+        self.poll_interval = float(os.environ.get("WHEELFLOW_SLURM_POLL", "10"))
+
+    def max_procs(self) -> Optional[int]:
+        return self.max_proc_count
+
+    def job_script(self, case_dir: Path, cmd: List[str], log_name: str,
+                   num_procs: int, parallel: bool, job_id: str = None,
+                   append_log: bool = False, background: bool = False) -> str:
+        """Batch script running one command in the case directory."""
+        ntasks = num_procs if parallel else 1
+        lines = [
+            "#!/bin/bash",
+            f"#SBATCH --job-name=wf-{job_id or 'case'}-{log_name}",
+            f"#SBATCH --ntasks={ntasks}",
+            f"#SBATCH --chdir={case_dir}",
+            f"#SBATCH --output={case_dir / f'log.{log_name}'}",
+            f"#SBATCH --time={self.time_limit}",
+        ]
+        if append_log:
+            lines.append("#SBATCH --open-mode=append")
+        if background:
+            lines.append("#SBATCH --nice")
+        if self.partition:
+            lines.append(f"#SBATCH --partition={self.partition}")
+        if self.account:
+            lines.append(f"#SBATCH --account={self.account}")
+
+        command = " ".join(shlex.quote(c) for c in cmd)
+        if parallel:
+            launcher = f"{self.launcher} -n {ntasks}" if self.launcher == "srun" else f"{self.launcher} -np {ntasks}"
+            command = f"{launcher} {command}"
+
+        lines += [
+            "",
+            f"source {shlex.quote(self.bashrc)} > /dev/null 2>&1",
+            self.prologue,
+            command,
+            f"echo $? > {shlex.quote(str(self.exit_file(case_dir, log_name)))}",
+            "",
+        ]
+        return "\n".join(lines)
+
+    @staticmethod
+    def exit_file(case_dir: Path, log_name: str) -> Path:
+        return case_dir / f"slurm.{log_name}.exit"
+
+    async def _scheduler(self, *cmd: str) -> subprocess.CompletedProcess:
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await process.communicate()
+        return subprocess.CompletedProcess(cmd, process.returncode,
+                                           stdout.decode(errors='replace'),
+                                           stderr.decode(errors='replace'))
+
+    async def submit(self, script_path: Path) -> str:
+        """Submit a batch script; returns the scheduler job id."""
+        result = await self._scheduler(self.sbatch, "--parsable", str(script_path))
+        if result.returncode != 0:
+            raise Exception(f"sbatch failed: {result.stderr.strip()}")
+        # --parsable prints "jobid" or "jobid;cluster"
+        match = re.match(r'\s*(\d+)', result.stdout)
+        if not match:
+            raise Exception(f"Unexpected sbatch output: {result.stdout!r}")
+        return match.group(1)
+
+    async def query_state(self, scheduler_id: str) -> Optional[str]:
+        """Current state from squeue (None once the job has left the queue)."""
+        result = await self._scheduler(self.squeue, "-h", "-j", scheduler_id, "-o", "%T")
+        state = result.stdout.strip()
+        return state.splitlines()[0] if state else None
+
+    async def signal_job(self, scheduler_id: str, sig) -> bool:
+        """Signal every task of a job (SIGTERM/SIGKILL cancel it)."""
+        if sig in (signal.SIGTERM, signal.SIGKILL):
+            cmd = [self.scancel, scheduler_id]
+        else:
+            cmd = [self.scancel, f"--signal={signal.Signals(sig).name[3:]}", scheduler_id]
+        return (await self._scheduler(*cmd)).returncode == 0
+
+    async def run(self, case_dir: Path, cmd: List[str], env: Dict[str, str], log_name: str,
+                  num_procs: int = 1, parallel: bool = False, job_id: str = None,
+                  append_log: bool = False, background: bool = False) -> str:
+        # The compute nodes source their own OpenFOAM environment
+        script_path = case_dir / f"slurm.{log_name}.sh"
+        script_path.write_text(self.job_script(case_dir, cmd, log_name, num_procs, parallel, job_id,
+                                                   append_log, background))
+        self.exit_file(case_dir, log_name).unlink(missing_ok=True)
+
+        job = BatchJob(await self.submit(script_path), self.exit_file(case_dir, log_name), self)
+        print(f"Submitted {log_name} as SLURM job {job.scheduler_id}")
+        if job_id:
+            job_control.register_process(job_id, job, log_name)
+
+        try:
+            await job.wait()
+        finally:
+            if job_id:
+                job_control.unregister_process(job_id, job)
+
+        job_control.check_interrupted(job_id)
+
+        log_file = case_dir / f"log.{log_name}"
+        output = log_file.read_text(errors='replace') if log_file.exists() else ""
+        if job.returncode != 0:
+            raise Exception(f"{log_name} failed (SLURM job {job.scheduler_id}, {job.state or 'finished'}, "
+                            f"exit {job.returncode}): {output[-2000:]}")
+        return output
+
+
+_executors = {}
+
+
+def get_executor(name: Optional[str] = None) -> Executor:
+    """The executor with the given name (default: local)."""
+    name = name or LOCAL
+    if name not in _executors:
+        if name == LOCAL:
+            _executors[name] = LocalExecutor()
+        elif name == SLURM:
+            _executors[name] = SlurmExecutor()
+        else:
+            raise ValueError(f"Unknown executor: {name}")
+    return _executors[name]
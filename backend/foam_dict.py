@@ -0,0 +1,533 @@
+"""
+OpenFOAM Dictionaries for WheelFlow
+Lazy parsing and writing of OpenFOAM dictionary files
+
+Files are memory-mapped (gzipped ones are decompressed into memory) and
+tokenized from the FoamFile header on. Entries are parsed into FoamDicts,
+but the payload of a large list is never parsed: a typed list
+(List<scalar>, List<vector>, ...) or a long counted list of numbers becomes
+a FoamList, which records where its items are and how many there are, and
+the parser seeks straight past it (a binary payload by its byte size, an
+ASCII one to its closing bracket). Looking up
+find("boundaryField", "wheel", "value") in a large p file therefore parses
+the dictionary syntax around the lists, and FoamList.read() then reads
+only the wheel's values.
+
+Values are represented as:
+    words and strings: str (strings keep their quotes)
+    numbers: int or float
+    (a b c): list, [0 2 -2 0 0 0 0]: DimensionSet
+    several items ("uniform (0 0 0)", "nonuniform List<scalar> N(...)"): tuple
+    { ... }: FoamDict
+    large lists: FoamList
+
+The writer emits the same forms in the layout OpenFOAM uses (keywords
+padded to 16 columns, 4-space indentation, a blank line between top-level
+entries); NumPy arrays are written as typed ASCII lists.
+"""
+
+import gzip
+import mmap
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+# Components per item of the field types lists may hold
+COMPONENTS = {
+    "label": 1, "scalar": 1, "vector": 3, "sphericalTensor": 1, "symmTensor": 6, "tensor": 9,
+}
+
+# Counted lists of numbers up to this size are parsed, longer ones left lazy
+EAGER_ITEMS = 64
+
+# Bytes scanned at a time when indexing the lines of an ASCII list
+LINE_CHUNK = 1 << 26
+
+KEYWORD_WIDTH = 16
+
+HEADER_RE = re.compile(rb"FoamFile\s*\{([^}]*)\}")
+HEADER_ENTRY_RE = re.compile(rb"(\w+)\s+(\"[^\"]*\"|[^;]*);")
+SPACE_RE = re.compile(rb"(?:\s+|//[^\n]*|/\*.*?\*/)*", re.DOTALL)
+LIST_HEAD_RE = re.compile(rb"(\d+)\s*([({])")
+TYPED_LIST_RE = re.compile(rb"List<(\w+)>")
+ASCII_LIST_END_RE = re.compile(rb"\)\s*\)")
+# Keywords may carry brackets: div(phi,U), grad(U)
+WORD_RE = re.compile(rb"[^\s{}()\[\];\"]+(?:\([^\s{}()\[\];\"]*\)[^\s{}()\[\];\"]*)*")
+STRING_RE = re.compile(rb"\"(?:[^\"\\]|\\.)*\"")
+INT_RE = re.compile(r"[-+]?\d+$")
+FLOAT_RE = re.compile(r"[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$")
+NUMERIC_START_RE = re.compile(rb"\s*\(?\s*[-+.\d]")
+
+_PAREN_TABLE = bytes.maketrans(b"()", b"  ")
+
+
+class FoamData:
+    """
+    An OpenFOAM file opened for reading.
+
+    Attributes:
+        path: The file read (possibly the .gz variant of the path given)
+        buffer: The file's bytes (an mmap, or bytes for gzipped files)
+        header: FoamFile header entries (str -> str)
+        binary: The file is in binary format
+        label, scalar: NumPy dtypes of binary labels and scalars
+        body: Offset of the first byte after the header
+    """
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        if not path.exists() and path.with_name(path.name + ".gz").exists():
+            path = path.with_name(path.name + ".gz")
+        self.path = path
+
+        if path.suffix == ".gz":
+            self.buffer = gzip.decompress(path.read_bytes())
+        else:
+            with open(path, "rb") as f:
+                try:
+                    self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # Empty file
+                    self.buffer = b""
+
+        match = HEADER_RE.search(self.buffer, 0, 4096)
+        self.header = {}
+        if match:
+            for key, value in HEADER_ENTRY_RE.findall(match.group(1)):
+                self.header[key.decode()] = value.decode(errors="replace").strip().strip('"')
+        self.body = match.end() if match else 0
+
+        self.binary = self.header.get("format", "ascii") == "binary"
+        arch = self.header.get("arch", "")
+        order = ">" if arch.startswith("MSB") else "<"
+        label_bits = re.search(r"label=(\d+)", arch)
+        scalar_bits = re.search(r"scalar=(\d+)", arch)
+        self.label = np.dtype(f"{order}i{int(label_bits.group(1)) // 8 if label_bits else 4}")
+        self.scalar = np.dtype(f"{order}f{int(scalar_bits.group(1)) // 8 if scalar_bits else 8}")
+
+    def dtype(self, kind: str) -> np.dtype:
+        return self.label if kind == "label" else self.scalar
+
+    def skip_space(self, pos: int) -> int:
+        """Offset of the next token (whitespace and comments skipped)."""
+        return SPACE_RE.match(self.buffer, pos).end()
+
+
+class FoamList:
+    """
+    Where a list's items are in a file, without reading them.
+
+    Attributes:
+        size: Number of items
+        width: Components per item (0: items of varying length, like faces)
+        dtype: Component dtype (used for binary lists)
+        start: Offset of the first byte after the opening bracket
+        end: Offset of the closing bracket
+        uniform: The list is written as N{value}
+    """
+
+    def __init__(self, data: FoamData, pos: int, kind: str = "scalar", width: int = 1):
+        self.data = data
+        self.kind = kind
+        self.width = width
+        self.dtype = data.dtype(kind)
+        pos = data.skip_space(pos)
+        match = LIST_HEAD_RE.match(data.buffer, pos)
+        if not match:
+            raise ValueError(f"{data.path.name}: expected a list at offset {pos}")
+        self.size = int(match.group(1))
+        self.uniform = match.group(2) == b"{"
+        self.start = match.end()
+        self._lines = None
+
+        if data.binary:
+            items = 1 if self.uniform else self.size
+            self.end = self.start + items * width * self.dtype.itemsize
+        elif self.uniform:
+            self.end = data.buffer.find(b"}", self.start)
+        elif width != 1 and self.size:
+            # Items are bracketed: the last item's ")" followed by the list's
+            self.end = ASCII_LIST_END_RE.search(data.buffer, self.start).end() - 1
+        else:
+            self.end = data.buffer.find(b")", self.start)
+        if self.end < self.start:
+            raise ValueError(f"{data.path.name}: list at offset {pos} is not closed")
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __repr__(self) -> str:
+        return f"FoamList({self.kind}, size={self.size}, width={self.width})"
+
+    @property
+    def after(self) -> int:
+        """Offset just past the closing bracket."""
+        return self.end + 1
+
+    def read(self, lo: int = 0, hi: Optional[int] = None) -> np.ndarray:
+        """Items [lo, hi) as an array of shape (n,) or (n, width)."""
+        hi = self.size if hi is None else min(hi, self.size)
+        lo = min(lo, hi)
+        if self.uniform:
+            value = self.binary_items(0, 1) if self.data.binary else self.ascii_values(self.start, self.end)
+            values = np.tile(value.reshape(1, -1), (hi - lo, 1))
+        elif self.data.binary:
+            values = self.binary_items(lo, hi).copy()
+        else:
+            lines = self.ascii_lines()
+            if lines is None:
+                values = self.ascii_values(self.start, self.end)[lo * self.width:hi * self.width]
+            elif hi > lo:
+                values = self.ascii_values(lines[0][lo], lines[1][hi - 1])
+            else:
+                values = np.empty(0)
+        return self.shape(values, hi - lo)
+
+    def take(self, indices: np.ndarray) -> np.ndarray:
+        """Items at the given (sorted, unique) indices."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if self.uniform or not len(indices):
+            return self.read(0, len(indices))
+        if self.data.binary:
+            items = self.binary_items(0, self.size).reshape(self.size, -1)
+            return self.shape(items[indices], len(indices))
+        lines = self.ascii_lines()
+        if lines is None:
+            values = self.ascii_values(self.start, self.end).reshape(self.size, self.width)[indices]
+            return self.shape(values, len(indices))
+        buffer = self.data.buffer
+        text = b"\n".join(buffer[s:e] for s, e in zip(lines[0][indices].tolist(), lines[1][indices].tolist()))
+        return self.shape(self.ascii_values_of(text), len(indices))
+
+    def binary_items(self, lo: int, hi: int) -> np.ndarray:
+        """View of items [lo, hi) in the mapped file."""
+        return np.frombuffer(self.data.buffer, dtype=self.dtype, count=(hi - lo) * self.width,
+                             offset=self.start + lo * self.width * self.dtype.itemsize)
+
+    def ascii_values(self, start: int, end: int) -> np.ndarray:
+        return self.ascii_values_of(self.data.buffer[start:end])
+
+    def ascii_values_of(self, text: bytes) -> np.ndarray:
+        dtype = np.int64 if self.dtype.kind == "i" else np.float64
+        return np.array(text.translate(_PAREN_TABLE).split(), dtype=dtype)
+
+    def ascii_lines(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (starts, ends) of each item's line, or None if items are not one per line.
+        """
+        if self._lines is not None:
+            return self._lines or None
+        newlines = []
+        for chunk_start in range(self.start, self.end, LINE_CHUNK):
+            count = min(LINE_CHUNK, self.end - chunk_start)
+            chunk = np.frombuffer(self.data.buffer, dtype=np.uint8, count=count, offset=chunk_start)
+            newlines.append(np.flatnonzero(chunk == 10) + chunk_start)
+        newlines = np.concatenate(newlines) if newlines else np.empty(0, dtype=np.int64)
+        # "(\n item\n item\n ... item\n)": one more newline than items
+        if len(newlines) == self.size + 1:
+            self._lines = (newlines[:-1] + 1, newlines[1:])
+        else:
+            self._lines = ()
+        return self._lines or None
+
+    def shape(self, values: np.ndarray, n: int) -> np.ndarray:
+        values = np.asarray(values)
+        if values.size != n * self.width:
+            raise ValueError(f"{self.data.path.name}: expected {n} items of {self.width}, "
+                             f"read {values.size} values")
+        return values.reshape(n, self.width) if self.width > 1 else values.reshape(n)
+
+
+class DimensionSet(list):
+    """A [kg m s K mol A cd] dimension set."""
+
+
+class FoamDict(dict):
+    """
+    Entries of an OpenFOAM dictionary, in file order.
+
+    Keywords that were quoted keep their quotes; they may be patterns
+    ("(inlet|outlet)") that lookup() matches names against.
+    """
+
+    header: Dict[str, str] = {}
+
+    def lookup(self, name: str) -> Any:
+        """The entry for name: its own, else the last pattern matching it."""
+        if name in self:
+            return self[name]
+        for keyword in reversed(list(self)):
+            if keyword.startswith('"'):
+                try:
+                    if re.fullmatch(keyword.strip('"'), name):
+                        return self[keyword]
+                except re.error:
+                    continue
+        return None
+
+    def find(self, *keys: str) -> Any:
+        """The entry at a path of keywords, e.g. find("boundaryField", "wheel", "value")."""
+        value = self
+        for key in keys:
+            if not isinstance(value, FoamDict):
+                return None
+            value = value.lookup(key)
+        return value
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+class Parser:
+    """Recursive-descent parser over a FoamData buffer."""
+
+    def __init__(self, data: FoamData):
+        self.data = data
+        self.buffer = data.buffer
+
+    def error(self, pos: int, message: str):
+        return ValueError(f"{self.data.path.name}: {message} at offset {pos}")
+
+    def char(self, pos: int) -> bytes:
+        return self.buffer[pos:pos + 1]
+
+    def entries(self, pos: int, close: Optional[bytes]) -> Tuple[FoamDict, int]:
+        """Entries up to the closing bracket (or the end of the file)."""
+        entries = FoamDict()
+        while True:
+            pos = self.data.skip_space(pos)
+            char = self.char(pos)
+            if not char:
+                if close is not None:
+                    raise self.error(pos, f"missing {close.decode()!r}")
+                return entries, pos
+            if char == close:
+                return entries, pos + 1
+            if char == b"#":
+                # Directive (#include, #includeEtc ...): kept as one entry
+                line_end = self.buffer.find(b"\n", pos)
+                line_end = len(self.buffer) if line_end < 0 else line_end
+                directive, _, argument = self.buffer[pos:line_end].decode(errors="replace").partition(" ")
+                entries[directive] = argument.strip()
+                pos = line_end
+                continue
+
+            keyword, pos = self.keyword(pos)
+            pos = self.data.skip_space(pos)
+            if self.char(pos) == b"{":
+                entries[keyword], pos = self.entries(pos + 1, b"}")
+            else:
+                items, pos = self.items(pos, b";")
+                entries[keyword] = items[0] if len(items) == 1 else tuple(items) if items else None
+        return entries, pos
+
+    def keyword(self, pos: int) -> Tuple[str, int]:
+        match = STRING_RE.match(self.buffer, pos) or WORD_RE.match(self.buffer, pos)
+        if not match:
+            raise self.error(pos, f"unexpected {self.char(pos)!r}")
+        return match.group(0).decode(errors="replace"), match.end()
+
+    def items(self, pos: int, close: bytes) -> Tuple[list, int]:
+        """Items of a value or list up to close (";", ")" or "]")."""
+        items = []
+        while True:
+            pos = self.data.skip_space(pos)
+            char = self.char(pos)
+            if not char:
+                raise self.error(pos, f"missing {close.decode()!r}")
+            if char == close:
+                return items, pos + 1
+            if char in b"([":
+                inner, pos = self.items(pos + 1, b")" if char == b"(" else b"]")
+                items.append(inner if char == b"(" else DimensionSet(inner))
+            elif char == b"{":
+                inner, pos = self.entries(pos + 1, b"}")
+                items.append(inner)
+            elif char == b'"':
+                match = STRING_RE.match(self.buffer, pos)
+                if not match:
+                    raise self.error(pos, "unterminated string")
+                items.append(match.group(0).decode(errors="replace"))
+                pos = match.end()
+            elif LIST_HEAD_RE.match(self.buffer, pos):
+                item, pos = self.counted_list(pos)
+                items.append(item)
+            else:
+                match = TYPED_LIST_RE.match(self.buffer, pos)
+                if match:
+                    item, pos = self.typed_list(match)
+                    items.append(item)
+                    continue
+                match = WORD_RE.match(self.buffer, pos)
+                if not match:
+                    raise self.error(pos, f"unexpected {char!r}")
+                items.append(convert(match.group(0).decode(errors="replace")))
+                pos = match.end()
+
+    def typed_list(self, match) -> Tuple[Any, int]:
+        """List<T> N(...): lazy for numeric T, parsed otherwise (List<word>)."""
+        kind = match.group(1).decode()
+        width = COMPONENTS.get(kind)
+        if width is None:
+            return self.counted_list(self.data.skip_space(match.end()), lazy=False)
+        found = FoamList(self.data, match.end(), "label" if kind == "label" else "scalar", width)
+        return found, found.after
+
+    def counted_list(self, pos: int, lazy: Optional[bool] = None) -> Tuple[Any, int]:
+        """N(...) or N{...}: lazy when long and numeric, parsed otherwise."""
+        head = LIST_HEAD_RE.match(self.buffer, pos)
+        size, bracket = int(head.group(1)), head.group(2)
+        numeric = NUMERIC_START_RE.match(self.buffer, head.end()) is not None
+        if lazy is None:
+            lazy = numeric and size > EAGER_ITEMS
+        if lazy:
+            if self.data.binary:
+                raise self.error(pos, "untyped binary list")
+            found = FoamList(self.data, pos, "scalar", self.item_width(head.end()))
+            return found, found.after
+        if bracket == b"{":
+            value, end = self.items(head.end(), b"}")
+            return [value[0] if len(value) == 1 else value] * size, end
+        items, end = self.items(head.end(), b")")
+        return pairs_to_dict(items), end
+
+    def item_width(self, pos: int) -> int:
+        """Numbers per item of an ASCII list, from its first item."""
+        pos = self.data.skip_space(pos)
+        if self.char(pos) != b"(":
+            return 1
+        return len(self.buffer[pos + 1:self.buffer.find(b")", pos)].split())
+
+
+def convert(token: str) -> Union[int, float, str]:
+    if INT_RE.match(token):
+        return int(token)
+    if FLOAT_RE.match(token):
+        return float(token)
+    return token
+
+
+def pairs_to_dict(items: list) -> Union[list, FoamDict]:
+    """A list of name {dictionary} pairs (as in boundary) as a FoamDict."""
+    if items and len(items) % 2 == 0 and all(
+            isinstance(name, str) and isinstance(value, FoamDict)
+            for name, value in zip(items[::2], items[1::2])):
+        return FoamDict(zip(items[::2], items[1::2]))
+    return items
+
+
+def read_dict(path: Path) -> FoamDict:
+    """
+    Parse an OpenFOAM dictionary file (or a list of named dictionaries, like
+    polyMesh/boundary).
+
+    Returns:
+        FoamDict of the entries; its header attribute holds the FoamFile
+        header. Large lists in it are FoamLists, read on demand.
+
+    Raises:
+        ValueError: For malformed files
+    """
+    data = FoamData(path)
+    parser = Parser(data)
+    pos = data.skip_space(data.body)
+    if LIST_HEAD_RE.match(data.buffer, pos):
+        content, _ = parser.counted_list(pos, lazy=False)
+        if not isinstance(content, FoamDict):
+            raise ValueError(f"{data.path.name}: not a dictionary")
+    else:
+        content, _ = parser.entries(pos, None)
+    content.header = data.header
+    return content
+
+
+def field_value(value: Any) -> Optional[Union[float, np.ndarray]]:
+    """
+    Values of a field entry ("uniform X" or "nonuniform List<T> N(...)").
+
+    Returns:
+        A float or array for a uniform value, an array of shape (n,) or
+        (n, components) for a nonuniform one, None for anything else
+    """
+    if not isinstance(value, tuple) or len(value) != 2:
+        return None
+    kind, values = value
+    if kind == "uniform":
+        return float(values) if isinstance(values, (int, float)) else np.asarray(values, dtype=np.float64)
+    if kind == "nonuniform":
+        if isinstance(values, FoamList):
+            return values.read()
+        return np.asarray(values, dtype=np.float64)
+    return None
+
+
+# =============================================================================
+# Writing
+# =============================================================================
+
+def format_value(value: Any) -> str:
+    """Text of a value (see the module docstring for the forms)."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, tuple):
+        return " ".join(format_value(item) for item in value)
+    if isinstance(value, DimensionSet):
+        return "[" + " ".join(format_value(item) for item in value) + "]"
+    if isinstance(value, FoamList):
+        value = value.read()
+    if isinstance(value, np.ndarray):
+        return format_array(value)
+    if isinstance(value, list):
+        return "(" + " ".join(format_value(item) for item in value) + ")"
+    if isinstance(value, dict):
+        return "{ " + " ".join(f"{key} {format_value(item)};" for key, item in value.items()) + " }"
+    return str(value)
+
+
+def format_array(values: np.ndarray) -> str:
+    """A NumPy array as a typed ASCII list: List<scalar> N (...)."""
+    width = values.shape[1] if values.ndim > 1 else 1
+    kind = "label" if values.dtype.kind in "iu" else {1: "scalar", 3: "vector", 6: "symmTensor",
+                                                      9: "tensor"}[width]
+    if width > 1:
+        rows = "\n".join("(" + " ".join(repr(v) for v in row) + ")" for row in values.tolist())
+    else:
+        rows = "\n".join(repr(v) for v in values.tolist())
+    return f"List<{kind}> \n{len(values)}\n(\n{rows}\n)\n"
+
+
+def format_entries(entries: dict, indent: int = 0) -> str:
+    """Entries in OpenFOAM's layout."""
+    pad = " " * indent
+    lines = []
+    for keyword, value in entries.items():
+        if keyword.startswith("#"):
+            lines.append(f"{pad}{keyword} {value}\n")
+        elif isinstance(value, dict):
+            lines.append(f"{pad}{keyword}\n{pad}{{\n{format_entries(value, indent + 4)}{pad}}}\n")
+        elif value is None:
+            lines.append(f"{pad}{keyword};\n")
+        else:
+            lines.append(f"{pad}{keyword.ljust(KEYWORD_WIDTH - 1)} {format_value(value)};\n")
+        if not indent:
+            lines.append("\n")
+    return "".join(lines)
+
+
+def foam_header(object_name: str, cls: str = "dictionary", location: Optional[str] = None) -> str:
+    """FoamFile header of an ASCII file."""
+    location = f'    location    "{location}";\n' if location else ""
+    return (f"FoamFile\n{{\n    version     2.0;\n    format      ascii;\n"
+            f"    class       {cls};\n{location}    object      {object_name};\n}}\n\n")
+
+
+def write_dict(path: Path, entries: dict, cls: str = "dictionary", location: Optional[str] = None):
+    """Write entries as an OpenFOAM dictionary file named after path."""
+    path = Path(path)
+    path.write_text(foam_header(path.name, cls, location) + format_entries(entries))
@@ -0,0 +1,447 @@
+"""
+OpenFOAM Mesh Reader for WheelFlow
+Memory-mapped NumPy reading of polyMesh and field files, ASCII and binary
+
+Mesh and field files are memory-mapped (gzipped ones are decompressed into
+memory) and their list data is returned as arrays. Only what a patch needs
+is read: the patch's range of the faces file and the points those faces
+use, located through the boundary file, and the patch's values of a field
+file, found with the lazy dictionary parser (foam_dict), which skips every
+other list by its size instead of parsing it.
+
+Both write formats are supported, as set by the FoamFile header:
+
+- binary: a list is "N(" followed by the raw items, so an item's offset is
+  computed and a slice is read straight from the mapped file. Label and
+  scalar sizes come from the header's arch entry (label=32;scalar=64).
+- ascii: lists with one item per line (as OpenFOAM writes them) are sliced
+  by line, using the newline positions of the list; other layouts are
+  parsed whole in one vectorized conversion.
+
+Faces are returned in compact form, (offsets, labels): face i uses
+labels[offsets[i]:offsets[i + 1]]. Both faceList ("4(0 1 2 3)" per face)
+and faceCompactList files are read.
+
+Decomposed cases are read without reconstructPar. When a case's latest
+solution exists only in its processor* directories, the case-level readers
+(read_case_patch, read_case_patch_field, mesh_size) read every processor's
+part in a thread pool and assemble the patch. Faces and values are
+concatenated in processor order. Points shared between processors are
+merged through each processor's pointProcAddressing, read only at the
+points the patch uses.
+
+Configuration (environment variables):
+    WHEELFLOW_FOAM_READ_WORKERS: Processor directories read at once (default 8)
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    from backend.foam_dict import FoamData, FoamList, field_value, read_dict
+except ImportError:
+    from foam_dict import FoamData, FoamList, field_value, read_dict
+
+READ_WORKERS = int(os.environ.get("WHEELFLOW_FOAM_READ_WORKERS", "8"))
+
+_PAREN_TABLE = bytes.maketrans(b"()", b"  ")
+
+
+# =============================================================================
+# polyMesh
+# =============================================================================
+
+def time_dirs(base: Path) -> List[Path]:
+    """Time directories of a case or processor directory, oldest first."""
+    times = []
+    for path in base.iterdir() if base.is_dir() else []:
+        try:
+            times.append((float(path.name), path))
+        except ValueError:
+            continue
+    return [path for _, path in sorted(times)]
+
+
+def has_file(directory: Path, name: str) -> bool:
+    """Whether directory holds an OpenFOAM file, compressed or not."""
+    return (directory / name).exists() or (directory / f"{name}.gz").exists()
+
+
+def latest_time_dir(base: Path, field: Optional[str] = None) -> Optional[Path]:
+    """Latest time directory (holding field, if given)."""
+    for time_dir in reversed(time_dirs(base)):
+        if field is None or has_file(time_dir, field):
+            return time_dir
+    return None
+
+
+def find_poly_mesh(case_dir: Path) -> Optional[Path]:
+    """constant/polyMesh, or the polyMesh of the latest time written."""
+    poly_mesh = case_dir / "constant" / "polyMesh"
+    if (poly_mesh / "boundary").exists():
+        return poly_mesh
+    for time_dir in reversed(time_dirs(case_dir)):
+        if (time_dir / "polyMesh" / "boundary").exists():
+            return time_dir / "polyMesh"
+    return None
+
+
+def read_boundary(poly_mesh: Path) -> Dict[str, dict]:
+    """
+    Patches of a polyMesh.
+
+    Returns:
+        Dict of patch name to {type, n_faces, start_face}, in file order
+    """
+    return {
+        name: {
+            "type": patch.get("type"),
+            "n_faces": int(patch.get("nFaces", 0)),
+            "start_face": int(patch.get("startFace", 0)),
+        }
+        for name, patch in read_dict(poly_mesh / "boundary").items()
+    }
+
+
+def read_faces(path: Path, start: int = 0, count: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Faces [start, start + count) of a faces file.
+
+    Returns:
+        (offsets, labels): face i uses labels[offsets[i]:offsets[i + 1]]
+    """
+    data = FoamData(path)
+    if data.header.get("class") == "faceCompactList":
+        offsets_list = FoamList(data, data.body, "label")
+        labels_list = FoamList(data, offsets_list.after, "label")
+        n_faces = offsets_list.size - 1
+        stop = n_faces if count is None else min(start + count, n_faces)
+        offsets = offsets_list.read(start, stop + 1).astype(np.int64)
+        if not len(offsets):
+            return np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64)
+        labels = labels_list.read(int(offsets[0]), int(offsets[-1])).astype(np.int64)
+        return offsets - offsets[0], labels
+
+    if data.binary:
+        raise ValueError(f"{data.path.name}: binary faces must be a faceCompactList")
+    faces = FoamList(data, data.body, "label", width=0)
+    stop = faces.size if count is None else min(start + count, faces.size)
+    lines = faces.ascii_lines()
+    if lines is not None and stop > start:
+        text = data.buffer[lines[0][start]:lines[1][stop - 1]]
+        face_lines = text.split(b"\n")
+        if len(face_lines) == stop - start and all(b"(" in line for line in face_lines):
+            return face_list_arrays(face_lines)
+    # Faces not one per line: parse all of them
+    tokens = faces.ascii_values(faces.start, faces.end)
+    sizes = []
+    position = 0
+    while position < len(tokens) and len(sizes) < stop:
+        sizes.append(int(tokens[position]))
+        position += sizes[-1] + 1
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(np.asarray(sizes, dtype=np.int64) + 1, out=offsets[1:])
+    keep = np.ones(position, dtype=bool)
+    keep[offsets[:-1]] = False
+    labels = tokens[:position][keep]
+    face_offsets = offsets - np.arange(len(offsets))
+    return face_offsets[start:stop + 1] - face_offsets[start], \
+        labels[face_offsets[start]:face_offsets[stop]]
+
+
+def face_list_arrays(face_lines: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """(offsets, labels) of faceList lines "n(v0 v1 ...)"."""
+    heads, tails = zip(*(line.split(b"(", 1) for line in face_lines))
+    sizes = np.array(heads, dtype=np.int64)
+    labels = np.array(b" ".join(tails).translate(_PAREN_TABLE).split(), dtype=np.int64)
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    if offsets[-1] != len(labels):
+        raise ValueError("face sizes do not match their labels")
+    return offsets, labels
+
+
+def read_points(path: Path, indices: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Points of a points file, all or those at the given sorted unique indices.
+
+    Returns:
+        float64 array of shape (n, 3)
+    """
+    data = FoamData(path)
+    points = FoamList(data, data.body, "scalar", width=3)
+    values = points.read() if indices is None else points.take(indices)
+    return values.astype(np.float64, copy=False)
+
+
+def read_labels(path: Path, indices: Optional[np.ndarray] = None) -> np.ndarray:
+    """A labelList file (owner, neighbour, *ProcAddressing), all or at sorted unique indices."""
+    data = FoamData(path)
+    labels = FoamList(data, data.body, "label")
+    values = labels.read() if indices is None else labels.take(indices)
+    return values.astype(np.int64, copy=False)
+
+
+def read_patch(poly_mesh: Path, patch_name: str) -> Optional[dict]:
+    """
+    The faces of one patch and the points they use.
+
+    Returns:
+        Dict with points (n, 3), offsets and labels (faces in compact form,
+        labels indexing points), point_ids (the points' mesh indices),
+        type, n_faces and start_face; None if there is no such patch
+    """
+    patch = read_boundary(poly_mesh).get(patch_name)
+    if patch is None:
+        return None
+    offsets, labels = read_faces(poly_mesh / "faces", patch["start_face"], patch["n_faces"])
+    point_ids, local = np.unique(labels, return_inverse=True)
+    return {
+        "points": read_points(poly_mesh / "points", point_ids),
+        "offsets": offsets,
+        "labels": local.reshape(-1).astype(np.int64),
+        "point_ids": point_ids,
+        **patch,
+    }
+
+
+# =============================================================================
+# Fields
+# =============================================================================
+
+def read_patch_field(path: Path, patch_name: str) -> Optional[Union[float, np.ndarray]]:
+    """
+    Values of a field on one patch.
+
+    Returns:
+        Array of shape (n_faces,) or (n_faces, components) for a nonuniform
+        value, a float or array for a uniform one, None if the patch has
+        no value entry
+    """
+    return field_value(read_dict(path).find("boundaryField", patch_name, "value"))
+
+
+# =============================================================================
+# Decomposed cases
+# =============================================================================
+
+def processor_dirs(case_dir: Path) -> List[Path]:
+    """processor<N> directories, by N."""
+    found = []
+    for path in case_dir.glob("processor*") if case_dir.is_dir() else []:
+        number = path.name[len("processor"):]
+        if path.is_dir() and number.isdigit():
+            found.append((int(number), path))
+    return [path for _, path in sorted(found)]
+
+
+def decomposed(case_dir: Path) -> bool:
+    """
+    Results are to be read from the processor directories.
+
+    True when the case is decomposed and its latest solution (or mesh) was
+    not reconstructed: processor0 has a later time than the case, or the
+    case has no mesh of its own, or processor0's mesh was written after it.
+    """
+    processors = processor_dirs(case_dir)
+    if not processors:
+        return False
+    case_times = time_dirs(case_dir)
+    processor_times = time_dirs(processors[0])
+    if processor_times and (not case_times
+                            or float(processor_times[-1].name) > float(case_times[-1].name)):
+        return True
+    case_mesh = find_poly_mesh(case_dir)
+    processor_mesh = find_poly_mesh(processors[0])
+    if case_mesh is None:
+        return processor_mesh is not None
+    return processor_mesh is not None and \
+        (processor_mesh / "boundary").stat().st_mtime > (case_mesh / "boundary").stat().st_mtime
+
+
+def field_mtime(case_dir: Path, field: str) -> Optional[float]:
+    """
+    When the latest solution of field was written (in processor0 for a
+    decomposed case), or None if it never was.
+    """
+    base = processor_dirs(case_dir)[0] if decomposed(case_dir) else case_dir
+    time_dir = latest_time_dir(base, field)
+    if time_dir is None:
+        return None
+    path = time_dir / field
+    if not path.exists():
+        path = time_dir / f"{field}.gz"
+    return path.stat().st_mtime
+
+
+def map_processors(function, processors: List[Path]) -> list:
+    """function(processor_dir) for every processor, READ_WORKERS at a time."""
+    if len(processors) <= 1:
+        return [function(processor) for processor in processors]
+    with ThreadPoolExecutor(max_workers=max(1, min(READ_WORKERS, len(processors)))) as pool:
+        return list(pool.map(function, processors))
+
+
+def read_processor_patch(processor: Path, patch_name: str) -> Optional[dict]:
+    """read_patch of one processor, with the mesh indices of its points (global_ids)."""
+    poly_mesh = find_poly_mesh(processor)
+    patch = read_patch(poly_mesh, patch_name) if poly_mesh else None
+    if patch is None:
+        return None
+    addressing = poly_mesh / "pointProcAddressing"
+    if has_file(addressing.parent, addressing.name):
+        patch["global_ids"] = read_labels(addressing, patch["point_ids"])
+    else:
+        patch["global_ids"] = None
+    return patch
+
+
+def read_case_patch(case_dir: Path, patch_name: str) -> Optional[dict]:
+    """
+    read_patch of a case, reconstructed or decomposed.
+
+    For a decomposed case the processors' faces are concatenated in
+    processor order and shared points are merged (point_ids are then mesh
+    indices; without pointProcAddressing they are not merged and
+    point_ids is None).
+    """
+    if not decomposed(case_dir):
+        poly_mesh = find_poly_mesh(case_dir)
+        return read_patch(poly_mesh, patch_name) if poly_mesh else None
+
+    parts = [part for part in map_processors(lambda p: read_processor_patch(p, patch_name),
+                                             processor_dirs(case_dir)) if part]
+    if not parts:
+        return None
+
+    offsets = [np.zeros(1, dtype=np.int64)]
+    labels = []
+    face_base = point_base = 0
+    for part in parts:
+        offsets.append(part["offsets"][1:] + face_base)
+        labels.append(part["labels"] + point_base)
+        face_base += int(part["offsets"][-1])
+        point_base += len(part["points"])
+    points = np.concatenate([part["points"] for part in parts])
+    labels = np.concatenate(labels)
+
+    point_ids = None
+    if all(part["global_ids"] is not None for part in parts):
+        point_ids, merged = np.unique(np.concatenate([part["global_ids"] for part in parts]),
+                                      return_inverse=True)
+        merged = merged.reshape(-1)
+        merged_points = np.empty((len(point_ids), 3))
+        merged_points[merged] = points
+        points, labels = merged_points, merged[labels]
+
+    return {
+        "points": points,
+        "offsets": np.concatenate(offsets),
+        "labels": labels,
+        "point_ids": point_ids,
+        "type": parts[0]["type"],
+        "n_faces": sum(part["n_faces"] for part in parts),
+        "start_face": None,
+        "processors": len(parts),
+    }
+
+
+def read_case_patch_field(case_dir: Path, field: str, patch_name: str,
+                          time: Optional[str] = None) -> Optional[Union[float, np.ndarray]]:
+    """
+    read_patch_field of a case at a time (default: the latest with the field),
+    reconstructed or decomposed. For a decomposed case, values are in
+    read_case_patch's face order; a uniform value is returned as a float only
+    if every processor has the same one.
+    """
+    if not decomposed(case_dir):
+        time_dir = case_dir / time if time else latest_time_dir(case_dir, field)
+        if time_dir is None or not has_file(time_dir, field):
+            return None
+        return read_patch_field(time_dir / field, patch_name)
+
+    processors = processor_dirs(case_dir)
+    time_dir = processors[0] / time if time else latest_time_dir(processors[0], field)
+    if time_dir is None:
+        return None
+
+    def read_part(processor: Path):
+        poly_mesh = find_poly_mesh(processor)
+        patch = read_boundary(poly_mesh).get(patch_name) if poly_mesh else None
+        if patch is None:
+            return None
+        if not has_file(processor / time_dir.name, field):
+            return patch["n_faces"], None
+        return patch["n_faces"], read_patch_field(processor / time_dir.name / field, patch_name)
+
+    parts = [part for part in map_processors(read_part, processors) if part]
+    if not parts or any(values is None for _, values in parts):
+        return None
+    uniform = {values for _, values in parts if isinstance(values, float)}
+    if len(uniform) == 1 and all(isinstance(values, float) for _, values in parts):
+        return uniform.pop()
+    return np.concatenate([np.full(n_faces, values) if isinstance(values, float) else values
+                           for n_faces, values in parts])
+
+
+def mesh_size(case_dir: Path) -> Optional[dict]:
+    """
+    Cells, faces, internal faces and points of a case's mesh.
+
+    Counts come from the owner file's header note (written by OpenFOAM), so
+    no list is read; a decomposed case sums its processors, counting faces
+    on processor boundaries once and points shared between processors once
+    (through pointProcAddressing).
+
+    Returns:
+        Dict with cells, faces, internal_faces, points and processors, or
+        None if the case has no mesh
+    """
+    processors = processor_dirs(case_dir) if decomposed(case_dir) else []
+    meshes = [find_poly_mesh(processor) for processor in processors] or [find_poly_mesh(case_dir)]
+    if any(poly_mesh is None for poly_mesh in meshes):
+        return None
+    sizes = map_processors(poly_mesh_size, meshes)
+
+    total = {key: sum(size[key] for size in sizes) for key in ("cells", "faces", "internal_faces", "points")}
+    total["processors"] = len(processors)
+    if processors:
+        shared_faces = sum(patch["n_faces"] for poly_mesh in meshes
+                           for patch in read_boundary(poly_mesh).values() if patch["type"] == "processor")
+        total["faces"] -= shared_faces // 2
+        total["internal_faces"] += shared_faces // 2
+        addressing = [poly_mesh / "pointProcAddressing" for poly_mesh in meshes]
+        if all(path.exists() for path in addressing):
+            total["points"] = max(map_processors(lambda path: int(read_labels(path).max(initial=-1)),
+                                                 addressing)) + 1
+    return total
+
+
+def mesh_cells(case_dir: Path) -> Optional[int]:
+    """Cell count of a case's mesh (see mesh_size), or None if it has none."""
+    size = mesh_size(case_dir)
+    return size["cells"] if size else None
+
+
+def poly_mesh_size(poly_mesh: Path) -> dict:
+    """Sizes of one polyMesh, from the owner note (else from the lists)."""
+    data = FoamData(poly_mesh / "owner")
+    note = dict(re.findall(r"(\w+):\s*(\d+)", data.header.get("note", "")))
+    if {"nCells", "nFaces", "nInternalFaces", "nPoints"} <= set(note):
+        return {"cells": int(note["nCells"]), "faces": int(note["nFaces"]),
+                "internal_faces": int(note["nInternalFaces"]), "points": int(note["nPoints"])}
+
+    owner = FoamList(data, data.body, "label")
+    neighbour = FoamData(poly_mesh / "neighbour")
+    points = FoamData(poly_mesh / "points")
+    return {
+        "cells": int(owner.read().max(initial=-1)) + 1,
+        "faces": owner.size,
+        "internal_faces": FoamList(neighbour, neighbour.body, "label").size,
+        "points": FoamList(points, points.body, "scalar", 3).size,
+    }
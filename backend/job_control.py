@@ -0,0 +1,253 @@
+"""
+Job Control for WheelFlow
+Cancellation and checkpoint-based suspension of running OpenFOAM jobs
+
+Every OpenFOAM process is started in its own session, so the launcher
+(mpirun or the serial binary) leads a process group containing all MPI
+ranks. Cancelling signals that whole group. Suspending first asks the
+solver to write the current time step and stop (OpenFOAM's
+stopAtWriteNow signal), so the job can later restart from latestTime.
+"""
+
+import asyncio
+import os
+import re
+import signal
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Signal OpenFOAM maps to "write now and stop" via OptimisationSwitches.
+# SIGUSR2 is forwarded by mpirun to every rank.
+STOP_AT_WRITE_NOW_SIGNAL = signal.SIGUSR2
+
+# Commands that install the stopAtWriteNow handler (they construct Time
+# and loop over time steps). Anything else is simply terminated.
+WRITE_NOW_COMMANDS = ["foamRun", "simpleFoam", "pimpleFoam"]
+
+# Writing a 16M-cell pro case can take a few minutes
+WRITE_NOW_TIMEOUT = 600
+TERMINATE_TIMEOUT = 10
+
+CANCEL = "cancel"
+SUSPEND = "suspend"
+
+
+class JobInterrupted(Exception):
+    """Raised inside the pipeline when a job was cancelled or suspended."""
+
+    def __init__(self, job_id: str, action: str):
+        super().__init__(f"Job {job_id} {action} requested")
+        self.job_id = job_id
+        self.action = action
+
+
+class JobCancelled(JobInterrupted):
+    def __init__(self, job_id: str):
+        super().__init__(job_id, CANCEL)
+
+
+class JobSuspended(JobInterrupted):
+    def __init__(self, job_id: str):
+        super().__init__(job_id, SUSPEND)
+
+
+# job_id -> (process, command) for the OpenFOAM process currently running
+_running: Dict[str, tuple] = {}
+
+# job_id -> pending action (cancel or suspend)
+_requests: Dict[str, str] = {}
+
+
+def generate_signal_switches() -> str:
+    """
+    controlDict block that makes OpenFOAM write and stop on our signal.
+
+    Appended to every generated controlDict so a suspended solve leaves a
+    complete time directory behind.
+    """
+    return f"""
+OptimisationSwitches
+{{
+    stopAtWriteNowSignal {int(STOP_AT_WRITE_NOW_SIGNAL)};
+}}
+"""
+
+
+def register_process(job_id: str, process, command: str):
+    """Track the OpenFOAM process running for a job."""
+    _running[job_id] = (process, command)
+
+
+def unregister_process(job_id: str, process):
+    """Forget a finished process (only if it is still the registered one)."""
+    entry = _running.get(job_id)
+    if entry and entry[0] is process:
+        del _running[job_id]
+
+
+def is_running(job_id: str) -> bool:
+    """Check whether a job currently has a live OpenFOAM process."""
+    entry = _running.get(job_id)
+    return entry is not None and entry[0].returncode is None
+
+
+def get_process(job_id: str):
+    """The process registered for a job's current stage, if any."""
+    entry = _running.get(job_id)
+    return entry[0] if entry else None
+
+
+def get_request(job_id: str) -> Optional[str]:
+    """Get the pending action for a job, if any."""
+    return _requests.get(job_id)
+
+
+def clear_request(job_id: str):
+    """Drop any pending action (called when a job (re)starts)."""
+    _requests.pop(job_id, None)
+
+
+def check_interrupted(job_id: Optional[str]):
+    """Raise JobCancelled/JobSuspended if an action is pending for the job."""
+    if job_id is None:
+        return
+    action = _requests.get(job_id)
+    if action == CANCEL:
+        raise JobCancelled(job_id)
+    if action == SUSPEND:
+        raise JobSuspended(job_id)
+
+
+async def signal_process_group(process, sig) -> bool:
+    """
+    Send a signal to the process group led by process.
+
+    Batch scheduler jobs (executors.BatchJob) are signalled through the
+    scheduler instead.
+
+    Returns:
+        False if the process has already exited
+    """
+    if hasattr(process, "signal_group"):
+        return await process.signal_group(sig)
+    try:
+        os.killpg(os.getpgid(process.pid), sig)
+        return True
+    except (ProcessLookupError, PermissionError):
+        return False
+
+
+async def signal_launcher(process, sig) -> bool:
+    """
+    Send a signal to process only, not to the rest of its group.
+
+    Batch scheduler jobs have no local launcher, so the scheduler signals
+    every task of the job.
+
+    Returns:
+        False if the process has already exited
+    """
+    if hasattr(process, "signal_group"):
+        return await process.signal_group(sig)
+    try:
+        process.send_signal(sig)
+        return True
+    except ProcessLookupError:
+        return False
+
+
+async def _wait_for_exit(process, timeout: float) -> bool:
+    """Wait for a process to exit; returns False on timeout."""
+    try:
+        await asyncio.wait_for(process.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def _terminate(process):
+    """SIGTERM the whole process group, escalating to SIGKILL."""
+    if process.returncode is not None:
+        return
+    await signal_process_group(process, signal.SIGTERM)
+    if not await _wait_for_exit(process, TERMINATE_TIMEOUT):
+        await signal_process_group(process, signal.SIGKILL)
+        await process.wait()
+
+
+async def cancel_job(job_id: str) -> bool:
+    """
+    Cancel a job, killing every process of its current stage.
+
+    Returns:
+        True if a running process was stopped
+    """
+    _requests[job_id] = CANCEL
+    entry = _running.get(job_id)
+    if not entry or entry[0].returncode is not None:
+        return False
+
+    await _terminate(entry[0])
+    return True
+
+
+async def suspend_job(job_id: str, timeout: float = WRITE_NOW_TIMEOUT) -> bool:
+    """
+    Suspend a job at a checkpoint.
+
+    Solvers are asked to write the current time step and exit; other stages
+    (meshing, decomposition) are terminated and re-run on resume.
+
+    Returns:
+        True if a running process was stopped
+    """
+    _requests[job_id] = SUSPEND
+    entry = _running.get(job_id)
+    if not entry or entry[0].returncode is not None:
+        return False
+
+    process, command = entry
+    if command in WRITE_NOW_COMMANDS:
+        # Signal only the launcher: mpirun forwards SIGUSR2 to the ranks, and
+        # OpenFOAM resets the handler after the first delivery.
+        if not await signal_launcher(process, STOP_AT_WRITE_NOW_SIGNAL):
+            return False
+        if await _wait_for_exit(process, timeout):
+            return True
+        print(f"WARNING: Job {job_id} solver did not stop within {timeout}s, terminating")
+
+    await _terminate(process)
+    return True
+
+
+def latest_written_time(case_dir: Path) -> Optional[float]:
+    """
+    Find the latest written (non-zero) time, in the case or in processor0.
+
+    Returns:
+        Latest time value, or None if the solver never wrote a time step
+    """
+    latest = None
+    for base in (case_dir, case_dir / "processor0"):
+        if not base.is_dir():
+            continue
+        for d in base.iterdir():
+            if not d.is_dir():
+                continue
+            try:
+                t = float(d.name)
+            except ValueError:
+                continue
+            if t > 0 and (latest is None or t > latest):
+                latest = t
+    return latest
+
+
+def set_start_from_latest(case_dir: Path):
+    """Point controlDict at latestTime so a resumed solve continues."""
+    control_dict = case_dir / "system" / "controlDict"
+    content = control_dict.read_text()
+    content = re.sub(r'^startFrom\s+\w+;', 'startFrom       latestTime;',
+                     content, count=1, flags=re.MULTILINE)
+    control_dict.write_text(content)
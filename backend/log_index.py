@@ -0,0 +1,311 @@
+"""
+Solver Log Index for WheelFlow
+Single-pass parsing of OpenFOAM solver logs into per-time-step records
+
+The solver log is read once, line by line, and every time step becomes one
+aligned record: the time, deltaT and Courant numbers (transient), the
+initial and final residual, linear-solver iterations and solve count of
+each solved field, the continuity errors, and ExecutionTime/ClockTime. A
+step's record is complete at its ExecutionTime line; when a field is solved
+several times in a step (PIMPLE correctors), the record keeps the first
+initial residual, the last final residual, and sums iterations and solves.
+
+Records are stored next to the log as a fixed-width float64 table,
+<log>.index (row i = time step i + 1, NaN where a step has no value),
+described by <log>.index.json: the columns, the row count, the names of
+the linear solvers, and the byte offset of the log up to which records are
+complete. Updating the index parses only the log written after that
+offset, so the index can be appended while the solver runs and residual
+charts and diagnostics never scan the raw log again. A log that is
+truncated, rewritten or replaced is indexed from the start. That is
+detected by its size, its inode and a fingerprint of its header. The
+header covers the Date/Time/PID lines, since the banner before them is
+the same in every run.
+
+Configuration (environment variables):
+    WHEELFLOW_LOG_INDEX_INTERVAL: Seconds between index updates while a
+        solver runs (default 5)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+FOLLOW_INTERVAL = float(os.environ.get("WHEELFLOW_LOG_INDEX_INTERVAL", "5"))
+
+# Solver logs, in the order they are looked for
+SOLVER_LOGS = ("log.foamRun", "log.simpleFoam", "log.pimpleFoam")
+
+STEP_COLUMNS = (
+    "time", "delta_t", "courant_mean", "courant_max",
+    "continuity_local", "continuity_global", "continuity_cumulative",
+    "execution_time", "clock_time",
+)
+FIELD_STATS = ("initial", "final", "iterations", "solves")
+
+# Past the OpenFOAM banner, through the run's Date, Time, Host and PID lines
+FINGERPRINT_BYTES = 2048
+
+SOLVING_RE = re.compile(
+    rb"(\w+):\s+Solving for (\w+), Initial residual = ([-\d.eE+]+), "
+    rb"Final residual = ([-\d.eE+]+), No Iterations (\d+)"
+)
+TIME_RE = re.compile(rb"^Time = ([-\d.eE+]+)")
+EXECUTION_TIME_RE = re.compile(rb"^ExecutionTime = ([-\d.eE+]+) s\s+ClockTime = ([-\d.eE+]+) s")
+CONTINUITY_RE = re.compile(
+    rb"^time step continuity errors : sum local = ([-\d.eE+]+), "
+    rb"global = ([-\d.eE+]+), cumulative = ([-\d.eE+]+)"
+)
+COURANT_RE = re.compile(rb"^Courant Number mean: ([-\d.eE+]+) max: ([-\d.eE+]+)")
+DELTA_T_RE = re.compile(rb"^deltaT = ([-\d.eE+]+)")
+
+_lock = threading.Lock()
+
+
+def field_columns(field: str) -> List[str]:
+    return [f"{field}_{stat}" for stat in FIELD_STATS]
+
+
+def index_paths(log_file: Path):
+    return log_file.with_name(log_file.name + ".index"), log_file.with_name(log_file.name + ".index.json")
+
+
+def fingerprint(log_file: Path) -> str:
+    with open(log_file, "rb") as f:
+        return hashlib.sha1(f.read(FINGERPRINT_BYTES)).hexdigest()
+
+
+def find_solver_log(case_dir: Path) -> Optional[Path]:
+    """The case's solver log, if one has been written."""
+    for name in SOLVER_LOGS:
+        if (case_dir / name).exists():
+            return case_dir / name
+    return None
+
+
+class LogParser:
+    """Turns log lines into step records (dicts of column -> value)."""
+
+    def __init__(self):
+        self.solvers: Dict[str, str] = {}
+        self.step: dict = {}
+
+    def feed(self, line: bytes) -> Optional[dict]:
+        """Parse one line; return the record of a step it completes."""
+        if b"Solving for" in line:
+            match = SOLVING_RE.search(line)
+            if match:
+                solver, field, initial, final, iterations = match.groups()
+                field = field.decode()
+                self.solvers.setdefault(field, solver.decode())
+                if f"{field}_initial" not in self.step:
+                    self.step[f"{field}_initial"] = float(initial)
+                    self.step[f"{field}_iterations"] = 0.0
+                    self.step[f"{field}_solves"] = 0.0
+                self.step[f"{field}_final"] = float(final)
+                self.step[f"{field}_iterations"] += int(iterations)
+                self.step[f"{field}_solves"] += 1
+            return None
+
+        if line.startswith(b"Time = "):
+            match = TIME_RE.match(line)
+            if match:
+                self.step["time"] = float(match.group(1))
+        elif line.startswith(b"ExecutionTime"):
+            match = EXECUTION_TIME_RE.match(line)
+            if match:
+                self.step["execution_time"] = float(match.group(1))
+                self.step["clock_time"] = float(match.group(2))
+                return self.flush()
+        elif line.startswith(b"time step continuity"):
+            match = CONTINUITY_RE.match(line)
+            if match:
+                local, global_, cumulative = (float(value) for value in match.groups())
+                self.step.update(continuity_local=local, continuity_global=global_,
+                                 continuity_cumulative=cumulative)
+        elif line.startswith(b"Courant Number"):
+            match = COURANT_RE.match(line)
+            if match:
+                self.step["courant_mean"] = float(match.group(1))
+                self.step["courant_max"] = float(match.group(2))
+        elif line.startswith(b"deltaT"):
+            match = DELTA_T_RE.match(line)
+            if match:
+                self.step["delta_t"] = float(match.group(1))
+        elif line.startswith(b"End"):
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[dict]:
+        """Complete the current step (if it solved anything)."""
+        step, self.step = self.step, {}
+        if not any(key.endswith("_solves") for key in step):
+            # Courant/deltaT of a step that never started: keep for the next
+            self.step = {key: value for key, value in step.items()
+                         if key in ("courant_mean", "courant_max", "delta_t")}
+            return None
+        return step
+
+
+def read_meta(log_file: Path) -> Optional[dict]:
+    try:
+        return json.loads(index_paths(log_file)[1].read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_meta(log_file: Path, meta: dict):
+    meta_path = index_paths(log_file)[1]
+    tmp = meta_path.with_name(meta_path.name + ".tmp")
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, meta_path)
+
+
+def empty_meta() -> dict:
+    return {"columns": list(STEP_COLUMNS), "rows": 0, "offset": 0, "solvers": {},
+            "fingerprint": None, "inode": None, "final": False}
+
+
+def update(log_file: Path, final: bool = False) -> dict:
+    """
+    Index what the solver has logged since the last update.
+
+    Args:
+        log_file: Solver log
+        final: The solver has exited; a last step without an ExecutionTime
+            line is recorded too
+
+    Returns:
+        The index meta: columns, rows, offset, solvers
+    """
+    with _lock:
+        meta = read_meta(log_file)
+        try:
+            stat = log_file.stat()
+        except FileNotFoundError:
+            return meta or empty_meta()
+        size = stat.st_size
+
+        current = fingerprint(log_file)
+        if meta is None or size < meta["offset"] \
+                or (meta["fingerprint"] and meta["fingerprint"] != current) \
+                or meta.get("inode", stat.st_ino) not in (None, stat.st_ino):
+            meta = empty_meta()
+            index_paths(log_file)[0].write_bytes(b"")
+        meta["inode"] = stat.st_ino
+        if meta["fingerprint"] is None and size >= FINGERPRINT_BYTES:
+            meta["fingerprint"] = current
+        if size == meta["offset"] and (meta["final"] or not final):
+            return meta
+
+        parser = LogParser()
+        records = []
+        offset = meta["offset"]
+        with open(log_file, "rb") as f:
+            f.seek(offset)
+            position = offset
+            for line in f:
+                position += len(line)
+                if not line.endswith(b"\n"):
+                    break
+                record = parser.feed(line)
+                if record is not None:
+                    records.append(record)
+                    # Everything up to here is indexed; later lines are parsed again
+                    offset = position
+        if final:
+            record = parser.flush()
+            if record is not None:
+                records.append(record)
+                offset = size
+        meta["solvers"].update(parser.solvers)
+
+        if records:
+            append_records(log_file, meta, records)
+        meta["offset"] = offset
+        meta["final"] = final
+        write_meta(log_file, meta)
+        return meta
+
+
+def append_records(log_file: Path, meta: dict, records: List[dict]):
+    """Append records to the table, adding columns for newly solved fields."""
+    index_path = index_paths(log_file)[0]
+    new_fields = []
+    for record in records:
+        for key in record:
+            if key.endswith("_solves") and key[:-len("_solves")] not in new_fields \
+                    and key not in meta["columns"]:
+                new_fields.append(key[:-len("_solves")])
+
+    if new_fields:
+        columns = meta["columns"] + [c for field in new_fields for c in field_columns(field)]
+        if meta["rows"]:
+            # Rare (a field first solved mid-run): widen the stored rows
+            old = load_table(log_file, meta)
+            widened = np.full((meta["rows"], len(columns)), np.nan)
+            widened[:, :len(meta["columns"])] = old
+            index_path.write_bytes(widened.astype("<f8").tobytes())
+        meta["columns"] = columns
+
+    position = {name: i for i, name in enumerate(meta["columns"])}
+    rows = np.full((len(records), len(meta["columns"])), np.nan)
+    for i, record in enumerate(records):
+        for key, value in record.items():
+            rows[i, position[key]] = value
+    with open(index_path, "ab") as f:
+        # Drop rows of an append interrupted before the meta was written
+        f.truncate(meta["rows"] * len(meta["columns"]) * 8)
+        f.write(rows.astype("<f8").tobytes())
+    meta["rows"] += len(records)
+
+
+def load_table(log_file: Path, meta: dict) -> np.ndarray:
+    """The stored records as a (rows, columns) array (memory-mapped)."""
+    if not meta["rows"]:
+        return np.empty((0, len(meta["columns"])))
+    return np.memmap(index_paths(log_file)[0], dtype="<f8", mode="r",
+                     shape=(meta["rows"], len(meta["columns"])))
+
+
+def records(log_file: Path, columns: Optional[Sequence[str]] = None,
+            final: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Columns of the up-to-date index.
+
+    Args:
+        log_file: Solver log
+        columns: Columns to return (default: all); unknown ones are omitted
+        final: See update()
+
+    Returns:
+        Dict of column name to values, one per time step
+    """
+    meta = update(log_file, final=final)
+    table = load_table(log_file, meta)
+    wanted = columns or meta["columns"]
+    return {name: table[:, meta["columns"].index(name)] for name in wanted
+            if name in meta["columns"]}
+
+
+def solved_fields(meta: dict) -> List[str]:
+    """Fields with residual columns, in the order first solved."""
+    return [name[:-len("_initial")] for name in meta["columns"] if name.endswith("_initial")]
+
+
+async def follow(log_file: Path, interval: float = FOLLOW_INTERVAL):
+    """Keep the index current while a solver writes the log (until cancelled)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(update, log_file)
+        except Exception as e:
+            print(f"Could not index {log_file.name}: {e}")
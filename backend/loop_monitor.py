@@ -0,0 +1,217 @@
+"""
+Event Loop Monitor for WheelFlow
+Scheduling-lag measurement and attribution of stalls to routes and tasks
+
+A heartbeat coroutine sleeps for INTERVAL seconds at a time; how late it
+wakes up is the loop's scheduling lag, recorded in the
+wheelflow_event_loop_lag_seconds histogram. A watchdog thread checks the
+heartbeat, and once it is more than THRESHOLD seconds overdue, the loop is
+stalled by synchronous work. While a stall lasts, the watchdog samples the
+loop thread's stack and attributes it to the API route whose endpoint is
+on the stack (e.g. "GET /api/jobs/{job_id}/viz/hero.png") or, for
+background work, to the outermost WheelFlow coroutine of the task (e.g.
+"task run_optimization_task"). Each finished stall is counted per culprit
+and kept in a bounded list of recent offenders.
+
+Configuration (environment variables):
+    WHEELFLOW_LOOP_LAG_INTERVAL: Heartbeat interval in seconds (default 0.1)
+    WHEELFLOW_LOOP_LAG_THRESHOLD: Lag that counts as a stall (default 0.25)
+"""
+
+import asyncio
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from backend import metrics
+except ImportError:
+    import metrics
+
+
+INTERVAL = float(os.environ.get("WHEELFLOW_LOOP_LAG_INTERVAL", "0.1"))
+THRESHOLD = float(os.environ.get("WHEELFLOW_LOOP_LAG_THRESHOLD", "0.25"))
+
+# Recent stalls kept for /api/admin/loop_lag
+HISTORY = 100
+# Innermost frames kept with each stall
+STACK_DEPTH = 15
+
+BACKEND_DIR = Path(__file__).parent
+
+LOOP_LAG = metrics.registry.register(metrics.Histogram(
+    "wheelflow_event_loop_lag_seconds", "Event loop scheduling lag.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)))
+
+LOOP_STALLS = metrics.registry.register(metrics.Counter(
+    "wheelflow_event_loop_stalls_total", "Event loop stalls over the threshold, by culprit.",
+    labels=("culprit",)))
+
+LOOP_STALL_SECONDS = metrics.registry.register(metrics.Counter(
+    "wheelflow_event_loop_stall_seconds_total", "Time the event loop was stalled, by culprit.",
+    labels=("culprit",)))
+
+
+def frame_location(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+
+
+def is_backend_frame(frame) -> bool:
+    return Path(frame.f_code.co_filename).parent == BACKEND_DIR
+
+
+class LoopMonitor:
+    """Measures one event loop's lag and records what stalled it."""
+
+    def __init__(self, interval: float = INTERVAL, threshold: float = THRESHOLD,
+                 history: int = HISTORY):
+        self.interval = interval
+        self.threshold = threshold
+        self.offenders: deque = deque(maxlen=history)
+        # culprit -> {count, total_seconds, max_seconds}
+        self.by_culprit: Dict[str, dict] = {}
+        self._route_codes: Dict[object, str] = {}
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def set_routes(self, routes: Iterable):
+        """Learn the endpoint functions of the application's routes."""
+        for route in routes:
+            code = getattr(getattr(route, "endpoint", None), "__code__", None)
+            if code is None:
+                continue
+            methods = sorted(getattr(route, "methods", None) or [])
+            methods = [m for m in methods if m != "HEAD"] or methods
+            name = f"{','.join(methods)} {route.path}" if methods else route.path
+            self._route_codes[code] = name
+
+    def start(self, routes: Iterable = ()):
+        """Start monitoring the running event loop."""
+        self.set_routes(routes)
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    async def _beat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            LOOP_LAG.observe(max(0.0, now - expected))
+            self._heartbeat = now
+
+    def attribute(self, frame) -> Tuple[str, str, List[str]]:
+        """
+        Culprit, location and stack of the loop thread's current frame.
+
+        The culprit is the route whose endpoint is on the stack, else the
+        outermost WheelFlow coroutine, else the outermost coroutine.
+        """
+        stack = []
+        location = None
+        app_coroutine = None
+        coroutine = None
+        route = None
+        while frame is not None:
+            if len(stack) < STACK_DEPTH:
+                stack.append(frame_location(frame))
+            code = frame.f_code
+            if route is None and code in self._route_codes:
+                route = self._route_codes[code]
+            if is_backend_frame(frame):
+                if location is None:
+                    location = frame_location(frame)
+                if code.co_flags & inspect.CO_COROUTINE:
+                    app_coroutine = code.co_name
+            if code.co_flags & inspect.CO_COROUTINE:
+                coroutine = code.co_name
+            frame = frame.f_back
+
+        if route:
+            culprit = route
+        elif app_coroutine or coroutine:
+            culprit = f"task {app_coroutine or coroutine}"
+        else:
+            culprit = "event loop"
+        return culprit, location or (stack[0] if stack else ""), stack
+
+    def _watch(self):
+        stall = None
+        while not self._stop.wait(min(self.interval, self.threshold) / 2):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self.interval
+
+            if stall is not None and heartbeat != stall["heartbeat"]:
+                # The loop ran again: the stall lasted until this heartbeat
+                self._record(stall, heartbeat - stall["heartbeat"] - self.interval)
+                stall = None
+                continue
+            if overdue < self.threshold:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            culprit, location, stack = self.attribute(frame)
+            del frame
+            if stall is None:
+                stall = {"heartbeat": heartbeat, "started_at": datetime.now().isoformat(),
+                         "culprits": Counter(), "locations": Counter(), "stacks": {}}
+            stall["culprits"][culprit] += 1
+            stall["locations"][location] += 1
+            stall["stacks"].setdefault(culprit, stack)
+
+    def _record(self, stall: dict, duration: float):
+        culprit = stall["culprits"].most_common(1)[0][0]
+        LOOP_STALLS.inc(culprit=culprit)
+        LOOP_STALL_SECONDS.inc(duration, culprit=culprit)
+        with self._lock:
+            self.offenders.append({
+                "culprit": culprit,
+                "duration": round(duration, 3),
+                "started_at": stall["started_at"],
+                "location": stall["locations"].most_common(1)[0][0],
+                "stack": stall["stacks"][culprit],
+            })
+            entry = self.by_culprit.setdefault(culprit, {"count": 0, "total_seconds": 0.0,
+                                                         "max_seconds": 0.0})
+            entry["count"] += 1
+            entry["total_seconds"] += duration
+            entry["max_seconds"] = max(entry["max_seconds"], duration)
+        print(f"Event loop stalled {duration:.2f}s by {culprit}")
+
+    def report(self) -> dict:
+        """Recent stalls (newest first) and totals per culprit."""
+        with self._lock:
+            offenders = list(reversed(self.offenders))
+            by_culprit = {name: dict(entry) for name, entry in self.by_culprit.items()}
+        return {
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "stalls": offenders,
+            "by_culprit": dict(sorted(by_culprit.items(), key=lambda item: -item[1]["total_seconds"])),
+        }
+
+
+monitor = LoopMonitor()
@@ -0,0 +1,174 @@
+"""
+Mesh Statistics for WheelFlow
+Cell, face and point counts and mesh quality, captured once after meshing
+
+Statistics are collected right after snappyHexMesh and stored in the job
+record, so result pages and the scaling model read exact numbers without
+opening the mesh again:
+
+- cells, faces, internal faces and points, from the FoamFile header note of
+  the owner file (summed over processors for a decomposed case, see
+  foam_mesh.mesh_size)
+- faces per boundary patch, from the boundary files
+- cells per refinement level, from the last "Cells per refinement level"
+  table of log.snappyHexMesh
+- the faces snappyHexMesh found in error in its final mesh check, and its
+  count of illegal faces
+- the checkMesh quality metrics (non-orthogonality, skewness, aspect ratio,
+  volumes, failed checks) when the case has a log.checkMesh
+
+Each source is optional; what a case does not have is left out.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from backend import foam_mesh
+except ImportError:
+    import foam_mesh
+
+
+SNAPPY_LOG = "log.snappyHexMesh"
+CHECK_MESH_LOG = "log.checkMesh"
+
+NUMBER = r"([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)"
+
+REFINEMENT_LEVEL_RE = re.compile(r"^\s+(\d+)\s+(\d+)\s*$")
+ERROR_FACES_RE = re.compile(r"^\s+(.+?)\s+:\s+(\d+)\s*$")
+ILLEGAL_FACES_RE = re.compile(r"Finished meshing with (\d+) illegal faces")
+MESHING_TIME_RE = re.compile(r"Finished meshing in = " + NUMBER)
+
+# checkMesh quality lines -> statistic
+CHECK_MESH_PATTERNS = {
+    "max_aspect_ratio": re.compile(r"Max aspect ratio = " + NUMBER),
+    "min_face_area": re.compile(r"Minimum face area = " + NUMBER),
+    "min_volume": re.compile(r"Min volume = " + NUMBER),
+    "max_non_orthogonality": re.compile(r"Mesh non-orthogonality Max: " + NUMBER),
+    "avg_non_orthogonality": re.compile(r"Mesh non-orthogonality Max: [^ ]+ average: " + NUMBER),
+    "severely_non_orthogonal_faces": re.compile(r"Number of severely non-orthogonal .*faces: (\d+)"),
+    "max_skewness": re.compile(r"Max skewness = " + NUMBER),
+    "failed_checks": re.compile(r"Failed (\d+) mesh checks"),
+}
+
+
+def collect(case_dir: Path) -> Optional[Dict]:
+    """
+    Statistics of a meshed case.
+
+    Returns:
+        Dict with cells, faces, internal_faces, points, processors,
+        patches (name -> faces) and, when the logs have them,
+        refinement_levels, snappy and quality; None if the case has no mesh
+    """
+    size = foam_mesh.mesh_size(case_dir)
+    if size is None:
+        return None
+
+    stats = dict(size)
+    stats["patches"] = patch_faces(case_dir)
+
+    snappy = parse_snappy_log(case_dir / SNAPPY_LOG)
+    if snappy.get("refinement_levels"):
+        stats["refinement_levels"] = snappy.pop("refinement_levels")
+    if snappy:
+        stats["snappy"] = snappy
+
+    quality = parse_check_mesh_log(case_dir / CHECK_MESH_LOG)
+    if quality:
+        stats["quality"] = quality
+    return stats
+
+
+def patch_faces(case_dir: Path) -> Dict[str, int]:
+    """Faces of each boundary patch (processor patches left out)."""
+    processors = foam_mesh.processor_dirs(case_dir) if foam_mesh.decomposed(case_dir) else []
+    meshes = [foam_mesh.find_poly_mesh(processor) for processor in processors] or \
+        [foam_mesh.find_poly_mesh(case_dir)]
+
+    counts: Dict[str, int] = {}
+    for boundary in foam_mesh.map_processors(foam_mesh.read_boundary, [m for m in meshes if m]):
+        for name, patch in boundary.items():
+            if patch["type"] != "processor":
+                counts[name] = counts.get(name, 0) + patch["n_faces"]
+    return counts
+
+
+def parse_snappy_log(log_file: Path) -> Dict:
+    """
+    Refinement histogram and final mesh check of a snappyHexMesh log.
+
+    Returns:
+        Dict with refinement_levels (list of cell counts, index = level),
+        error_faces (check -> faces), illegal_faces and meshing_time, each
+        only if found
+    """
+    if not log_file.exists():
+        return {}
+
+    result: Dict = {}
+    levels: Optional[List[int]] = None
+    errors: Optional[Dict[str, int]] = None
+    with open(log_file, errors="replace") as f:
+        for line in f:
+            if levels is not None:
+                match = REFINEMENT_LEVEL_RE.match(line)
+                if match:
+                    level, cells = int(match.group(1)), int(match.group(2))
+                    levels.extend([0] * (level + 1 - len(levels)))
+                    levels[level] = cells
+                    continue
+                # The last table is the final mesh's
+                result["refinement_levels"] = levels
+                levels = None
+            if errors is not None:
+                match = ERROR_FACES_RE.match(line)
+                if match:
+                    errors[match.group(1)] = int(match.group(2))
+                    continue
+                result["error_faces"] = errors
+                errors = None
+
+            if line.startswith("Cells per refinement level"):
+                levels = []
+            elif line.startswith("Checking faces in error"):
+                errors = {}
+            elif line.startswith("Finished meshing"):
+                illegal = ILLEGAL_FACES_RE.search(line)
+                if illegal:
+                    result["illegal_faces"] = int(illegal.group(1))
+                meshing_time = MESHING_TIME_RE.search(line)
+                if meshing_time:
+                    result["meshing_time"] = float(meshing_time.group(1))
+
+    if levels:
+        result["refinement_levels"] = levels
+    if errors:
+        result["error_faces"] = errors
+    return result
+
+
+def parse_check_mesh_log(log_file: Path) -> Dict:
+    """
+    Quality metrics of a checkMesh log.
+
+    Returns:
+        Dict of the statistics in CHECK_MESH_PATTERNS that were found, and
+        mesh_ok; empty if there is no log
+    """
+    if not log_file.exists():
+        return {}
+
+    text = log_file.read_text(errors="replace")
+    quality: Dict = {}
+    for key, pattern in CHECK_MESH_PATTERNS.items():
+        matches = pattern.findall(text)
+        if matches:
+            value = matches[-1]
+            quality[key] = int(value) if value.isdigit() else float(value)
+    if "Mesh OK." in text:
+        quality["failed_checks"] = 0
+    if "failed_checks" in quality:
+        quality["mesh_ok"] = quality["failed_checks"] == 0
+    return quality
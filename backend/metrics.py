@@ -0,0 +1,242 @@
+"""
+Service Metrics for WheelFlow
+Counters, gauges and histograms exported in the Prometheus text format
+
+GET /metrics renders every registered metric. Everything is kept in
+memory and updated where it happens (stage ends, requests, cache
+lookups); gauges describing current state are computed from the in-memory
+job store at scrape time, so a scrape never reads case directories or the
+database.
+"""
+
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds: from utilities that finish instantly to multi-hour pro solves
+STAGE_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400, 28800, 86400)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+ITERATION_RATE_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 250)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric(ABC):
+    """A named metric family with fixed label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines of every labelled series."""
+
+    def render(self) -> str:
+        return "\n".join(self.header() + self.samples())
+
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.labels, key)} {_format_value(v)}" for key, v in values]
+
+
+class Gauge(Metric):
+    """A value computed by a callback when metrics are scraped.
+
+    The callback returns {label values tuple: value}.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (),
+                 collect: Callable[[], Dict[LabelValues, float]] = None):
+        super().__init__(name, documentation, labels)
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        values = self.collect() if self.collect else {}
+        return [f"{self.name}{_label_text(self.labels, key)} {_format_value(v)}"
+                for key, v in sorted(values.items())]
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (),
+                 buckets: Iterable[float] = STAGE_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> (bucket counts, sum)
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels) -> int:
+        counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+        return sum(counts)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _label_text(self.labels + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_text(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The metrics exported by this process."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = Registry()
+
+
+# =============================================================================
+# WheelFlow metrics
+# =============================================================================
+
+STAGE_DURATION = registry.register(Histogram(
+    "wheelflow_stage_duration_seconds", "Wall time of job pipeline stages.",
+    labels=("stage", "status"), buckets=STAGE_BUCKETS))
+
+JOBS_FAILED = registry.register(Counter(
+    "wheelflow_jobs_failed_total", "Jobs that failed, by the pipeline stage they failed in.",
+    labels=("stage",)))
+
+SOLVER_ITERATION_RATE = registry.register(Histogram(
+    "wheelflow_solver_iterations_per_second", "Solver iterations per second of finished solves.",
+    labels=("quality",), buckets=ITERATION_RATE_BUCKETS))
+
+REQUEST_LATENCY = registry.register(Histogram(
+    "wheelflow_http_request_duration_seconds", "API request latency by route.",
+    labels=("method", "route", "status"), buckets=REQUEST_BUCKETS))
+
+CACHE_REQUESTS = registry.register(Counter(
+    "wheelflow_cache_requests_total", "Artifact cache lookups, by cache and result (hit/miss).",
+    labels=("cache", "result")))
+
+
+def cache_lookup(cache: str, hit: bool):
+    """Count a cache hit or miss."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def register_job_gauges(jobs: Dict[str, dict], queued_statuses: Iterable[str],
+                        idle_statuses: Iterable[str], worker_queue: Callable[[], int] = None,
+                        target: Registry = None):
+    """
+    Gauges computed from the in-memory job store at scrape time.
+
+    Args:
+        jobs: The job store (job_id -> job record)
+        queued_statuses: Statuses of jobs waiting to start
+        idle_statuses: Statuses of jobs with no pipeline stage active
+        worker_queue: Returns the number of jobs waiting for a remote worker
+        target: Registry to add the gauges to (default: the process registry)
+    """
+    target = target or registry
+    queued_statuses = set(queued_statuses)
+    idle_statuses = set(idle_statuses) | queued_statuses
+
+    def queue_depth():
+        depth = sum(1 for job in list(jobs.values()) if job.get("status") in queued_statuses)
+        return {(): depth}
+
+    def running_by_stage():
+        counts: Dict[LabelValues, float] = {}
+        for job in list(jobs.values()):
+            status = job.get("status")
+            if status and status not in idle_statuses:
+                counts[(status,)] = counts.get((status,), 0) + 1
+        return counts
+
+    target.register(Gauge("wheelflow_queue_depth", "Jobs waiting to start.",
+                            collect=queue_depth))
+    target.register(Gauge("wheelflow_jobs_running", "Jobs with an active pipeline stage, by stage.",
+                            labels=("stage",), collect=running_by_stage))
+    if worker_queue is not None:
+        target.register(Gauge("wheelflow_worker_queue_depth",
+                                "Remote jobs waiting for a worker lease.",
+                                collect=lambda: {(): worker_queue()}))
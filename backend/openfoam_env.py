@@ -0,0 +1,211 @@
+"""
+OpenFOAM Environment for WheelFlow
+Installation paths, a persisted environment snapshot and capability probes
+
+Sourcing OpenFOAM's bashrc costs a bash process and a few hundred
+milliseconds. The resulting environment is captured once, validated and
+written to data/openfoam_env.json keyed by the bashrc path and mtime, so
+restarts and new worker processes reuse it until OpenFOAM is updated.
+
+Installation paths come from environment variables:
+    WHEELFLOW_OPENFOAM_DIR: OpenFOAM installation (default /opt/openfoam13)
+    WHEELFLOW_OPENFOAM_BASHRC: bashrc to source (default <OPENFOAM_DIR>/etc/bashrc)
+    WHEELFLOW_MPIRUN: mpirun executable (default: found on PATH)
+    WHEELFLOW_CUDA_HOME: CUDA toolkit (default $CUDA_HOME or /usr/local/cuda)
+    WHEELFLOW_AMGX_DIR: AmgX installation (default $AMGX_DIR or ~/local/amgx)
+    WHEELFLOW_GPU_LIB_PATHS: Colon-separated library paths for GPU runs
+        (overrides the paths derived from the settings above)
+    WHEELFLOW_ENV_SNAPSHOT: Snapshot file (default data/openfoam_env.json)
+
+ParaView's pvpython is configured in visualization/hero_image.py
+(WHEELFLOW_PVPYTHON).
+"""
+
+import json
+import os
+import shutil
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+
+BASE_DIR = Path(__file__).parent.parent
+
+OPENFOAM_DIR = Path(os.environ.get("WHEELFLOW_OPENFOAM_DIR", "/opt/openfoam13"))
+OPENFOAM_BASHRC = Path(os.environ.get("WHEELFLOW_OPENFOAM_BASHRC", str(OPENFOAM_DIR / "etc" / "bashrc")))
+OPENFOAM_BIN = OPENFOAM_DIR / "platforms/linux64GccDPInt32Opt/bin"
+MPIRUN = os.environ.get("WHEELFLOW_MPIRUN", "mpirun")
+CUDA_HOME = Path(os.environ.get("WHEELFLOW_CUDA_HOME", os.environ.get("CUDA_HOME", "/usr/local/cuda")))
+AMGX_DIR = Path(os.environ.get("WHEELFLOW_AMGX_DIR", os.environ.get("AMGX_DIR", str(Path.home() / "local" / "amgx"))))
+SNAPSHOT_PATH = Path(os.environ.get("WHEELFLOW_ENV_SNAPSHOT", str(BASE_DIR / "data" / "openfoam_env.json")))
+
+# Variables a usable OpenFOAM environment must define
+REQUIRED_VARIABLES = ["WM_PROJECT_DIR", "FOAM_APPBIN", "PATH", "LD_LIBRARY_PATH"]
+
+# In-process copy of the snapshot environment
+_env_cache: Optional[Dict[str, str]] = None
+
+# Capability probe results (filled at startup)
+_capabilities: Optional[Dict] = None
+
+
+def snapshot_key(bashrc: Path = None) -> Optional[Dict]:
+    """Identify the bashrc a snapshot was taken from (None if it is missing)."""
+    bashrc = bashrc or OPENFOAM_BASHRC
+    try:
+        mtime = bashrc.stat().st_mtime
+    except OSError:
+        return None
+    return {"bashrc": str(bashrc), "mtime": mtime}
+
+
+def capture_environment(bashrc: Path = None) -> Dict[str, str]:
+    """Source the bashrc in a fresh bash and return the resulting environment."""
+    bashrc = bashrc or OPENFOAM_BASHRC
+    result = subprocess.run(
+        ['bash', '-c', f'source "{bashrc}" >/dev/null 2>&1 && env -0'],
+        capture_output=True
+    )
+
+    env = {}
+    for entry in result.stdout.decode(errors='replace').split('\0'):
+        if '=' in entry:
+            key, _, value = entry.partition('=')
+            env[key] = value
+    return env
+
+
+def validate_environment(env: Dict[str, str]) -> Optional[str]:
+    """
+    Check that a captured environment can run OpenFOAM.
+
+    Returns:
+        Error message, or None if the environment is usable
+    """
+    missing = [var for var in REQUIRED_VARIABLES if not env.get(var)]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    if not Path(env["WM_PROJECT_DIR"]).is_dir():
+        return f"WM_PROJECT_DIR {env['WM_PROJECT_DIR']} does not exist"
+    return None
+
+
+def load_snapshot(key: Dict) -> Optional[Dict[str, str]]:
+    """Read the persisted environment if it matches the current bashrc."""
+    try:
+        snapshot = json.loads(SNAPSHOT_PATH.read_text())
+    except (OSError, ValueError):
+        return None
+    if snapshot.get("key") != key:
+        return None
+    return snapshot.get("env")
+
+
+def save_snapshot(key: Dict, env: Dict[str, str]):
+    """Persist a validated environment (written atomically)."""
+    SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = SNAPSHOT_PATH.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({
+        "key": key,
+        "captured_at": datetime.utcnow().isoformat(),
+        "env": env
+    }))
+    tmp_path.replace(SNAPSHOT_PATH)
+
+
+def load_environment(refresh: bool = False) -> Dict[str, str]:
+    """
+    The OpenFOAM environment, from memory, the snapshot file or bash.
+
+    Args:
+        refresh: Ignore cached copies and source the bashrc again
+    """
+    global _env_cache
+    if _env_cache is not None and not refresh:
+        return _env_cache
+
+    key = snapshot_key()
+    env = None if (refresh or key is None) else load_snapshot(key)
+    if env is None:
+        env = capture_environment()
+        error = validate_environment(env)
+        if error:
+            # Not persisted, so a fixed installation is picked up next time
+            print(f"WARNING: OpenFOAM environment from {OPENFOAM_BASHRC} is unusable: {error}")
+        elif key is not None:
+            save_snapshot(key, env)
+
+    _env_cache = env
+    return _env_cache
+
+
+def gpu_library_paths(env: Dict[str, str]) -> list:
+    """Library paths added for GPU (AmgX) runs."""
+    configured = os.environ.get("WHEELFLOW_GPU_LIB_PATHS")
+    if configured:
+        return [p for p in configured.split(":") if p]
+
+    paths = []
+    # User-compiled solver libraries (e.g. libamgxSolvers) live in FOAM_USER_LIBBIN
+    if env.get("FOAM_USER_LIBBIN"):
+        paths.append(env["FOAM_USER_LIBBIN"])
+    paths.append(str(AMGX_DIR))
+    paths.append(str(CUDA_HOME / "lib64"))
+    return paths
+
+
+def get_environment(gpu_enabled: bool = False) -> Dict[str, str]:
+    """
+    Environment for running OpenFOAM commands (a copy, safe to modify).
+
+    Args:
+        gpu_enabled: Include CUDA/AmgX libraries
+    """
+    env = dict(load_environment())
+    if gpu_enabled:
+        ld_path = env.get('LD_LIBRARY_PATH', '')
+        env['LD_LIBRARY_PATH'] = ':'.join(gpu_library_paths(env)) + ':' + ld_path
+    return env
+
+
+# =============================================================================
+# Capability probes
+# =============================================================================
+
+def probe_capabilities() -> Dict:
+    """
+    Probe installed tools once (OpenFOAM, MPI, ParaView, NVIDIA driver).
+
+    Called at server startup; later calls use get_capabilities().
+    """
+    global _capabilities
+
+    env = load_environment()
+    openfoam_error = validate_environment(env)
+    search_path = env.get("PATH") or os.environ.get("PATH", "")
+
+    try:
+        from backend.visualization.hero_image import check_paraview_available
+    except ImportError:
+        from visualization.hero_image import check_paraview_available
+    paraview_available, paraview_version = check_paraview_available()
+
+    _capabilities = {
+        "openfoam": openfoam_error is None,
+        "openfoam_error": openfoam_error,
+        "openfoam_dir": str(OPENFOAM_DIR),
+        "mpirun": shutil.which(MPIRUN, path=search_path),
+        "paraview": paraview_available,
+        "paraview_version": paraview_version,
+        "nvidia_smi": shutil.which("nvidia-smi") is not None,
+        "probed_at": datetime.utcnow().isoformat(),
+    }
+    return _capabilities
+
+
+def get_capabilities() -> Dict:
+    """Cached capability probe results (probing on first use)."""
+    if _capabilities is None:
+        return probe_capabilities()
+    return _capabilities
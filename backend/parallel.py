@@ -10,6 +10,11 @@ from pathlib import Path
 from typing import Optional, Dict, List
 import multiprocessing
 
+try:
+    from backend import openfoam_env
+except ImportError:
+    import openfoam_env
+
 
 def get_system_info() -> Dict:
     """
@@ -17,7 +22,7 @@ def get_system_info() -> Dict:
     """
     info = {
         "cpu_count": multiprocessing.cpu_count(),
-        "mpi_available": shutil.which("mpirun") is not None,
+        "mpi_available": shutil.which(openfoam_env.MPIRUN) is not None,
         "decompose_available": False,
         "gpu_available": False,
         "gpu_info": None
@@ -152,7 +157,7 @@ async def run_parallel_command(
         num_procs = max(1, multiprocessing.cpu_count() - 1)  # Leave 1 core free
 
     # Check if MPI is available
-    if not shutil.which("mpirun"):
+    if not shutil.which(openfoam_env.MPIRUN):
         raise RuntimeError("MPI not available. Install OpenMPI: apt-get install openmpi-bin")
 
     # Generate decomposeParDict if not exists
@@ -196,7 +201,7 @@ async def run_parallel_command(
                 return result
 
         # Step 2: Run parallel command
-        cmd = ["mpirun", "-np", str(num_procs), command, "-parallel"] + args
+        cmd = [openfoam_env.MPIRUN, "-np", str(num_procs), command, "-parallel"] + args
 
         process = await asyncio.create_subprocess_exec(
             *cmd,
@@ -0,0 +1,224 @@
+"""
+In-process Profiling for WheelFlow
+Stack sampling over all threads and tracemalloc allocation snapshots
+
+The stack sampler runs in its own thread and reads every other thread's
+current frame (sys._current_frames) at a fixed interval, so it needs no
+instrumentation and costs little more than one frame walk per thread per
+sample. Samples are aggregated as collapsed stacks ("root;...;leaf count",
+the input format of flamegraph.pl and speedscope) or as a nested
+flame-graph tree (d3-flame-graph's {name, value, children}). Frames of the
+event loop thread show whichever request handler or task was running, so
+synchronous work inside async endpoints appears under the handler.
+
+Allocation tracking uses tracemalloc, which slows allocation noticeably,
+so it only runs between start_tracemalloc() and stop_tracemalloc() (or
+from startup when WHEELFLOW_TRACEMALLOC gives a frame depth).
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+DEFAULT_INTERVAL = 0.01
+MIN_INTERVAL = 0.001
+MAX_DURATION = 120
+
+# Leaf frames of threads that are blocked waiting rather than working
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("socket.py", "accept"),
+    ("socketserver.py", "serve_forever"),
+    ("thread.py", "_worker"),
+    ("connection.py", "_recv"),
+    ("connection.py", "poll"),
+}
+
+# Only one profile at a time: concurrent samplers would profile each other
+_profile_lock = threading.Lock()
+
+# Last snapshot, for compare=True
+_last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another one runs."""
+
+
+def frame_label(code) -> str:
+    """Collapsed-stack name of a function: name (file:first line)."""
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def is_idle(frame) -> bool:
+    """Whether a thread's leaf frame is a blocking wait."""
+    code = frame.f_code
+    return (Path(code.co_filename).name, code.co_name) in IDLE_LEAVES
+
+
+def thread_names() -> Dict[int, str]:
+    return {thread.ident: thread.name for thread in threading.enumerate()}
+
+
+def collect_stacks(duration: float, interval: float = DEFAULT_INTERVAL,
+                   include_idle: bool = False) -> Counter:
+    """
+    Sample every thread's stack for a while.
+
+    Args:
+        duration: Seconds to sample
+        interval: Seconds between samples
+        include_idle: Keep samples of threads blocked in waits (event loop
+            select, idle thread-pool workers)
+
+    Returns:
+        Counter of collapsed stacks ("thread;outer;...;inner") to samples
+
+    Raises:
+        ProfilerBusy: If another profile is running
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+
+    try:
+        duration = min(max(duration, 0.0), MAX_DURATION)
+        interval = max(interval, MIN_INTERVAL)
+        own_ident = threading.get_ident()
+        names = thread_names()
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + duration
+
+        while True:
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                if not include_idle and is_idle(frame):
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                if ident not in names:
+                    names = thread_names()
+                labels.append(names.get(ident, f"thread-{ident}"))
+                stacks[";".join(reversed(labels))] += 1
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(interval)
+        return stacks
+    finally:
+        _profile_lock.release()
+
+
+def collapsed_text(stacks: Counter) -> str:
+    """Collapsed stacks, one "stack count" line each, heaviest first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def flame_graph(stacks: Counter) -> dict:
+    """Nested {name, value, children} tree of the sampled stacks."""
+    root = {"name": "all", "value": 0, "children": {}}
+    for stack, count in stacks.items():
+        root["value"] += count
+        node = root
+        for label in stack.split(";"):
+            node = node["children"].setdefault(label, {"name": label, "value": 0, "children": {}})
+            node["value"] += count
+
+    def to_lists(node: dict) -> dict:
+        children = sorted(node["children"].values(), key=lambda child: -child["value"])
+        return {"name": node["name"], "value": node["value"],
+                "children": [to_lists(child) for child in children]}
+
+    return to_lists(root)
+
+
+# =============================================================================
+# Allocations
+# =============================================================================
+
+def start_tracemalloc(frames: int = 1) -> dict:
+    """Start tracing allocations, keeping `frames` frames per traceback."""
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(max(1, frames))
+        _last_snapshot = None
+    return tracemalloc_status()
+
+
+def stop_tracemalloc() -> dict:
+    """Stop tracing allocations and free the traces."""
+    global _last_snapshot
+    tracemalloc.stop()
+    _last_snapshot = None
+    return tracemalloc_status()
+
+
+def tracemalloc_status() -> dict:
+    tracing = tracemalloc.is_tracing()
+    current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+    return {
+        "tracing": tracing,
+        "frames": tracemalloc.get_traceback_limit() if tracing else None,
+        "traced_bytes": current,
+        "peak_traced_bytes": peak,
+    }
+
+
+def allocation_snapshot(limit: int = 20, group_by: str = "lineno", compare: bool = False) -> dict:
+    """
+    The largest allocation sites currently alive.
+
+    Args:
+        limit: Number of entries
+        group_by: "lineno", "filename" or "traceback"
+        compare: Report growth since the previous snapshot instead
+
+    Raises:
+        RuntimeError: If tracemalloc is not tracing
+        ValueError: For an unknown group_by
+    """
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not tracing; start it first")
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise ValueError(f"Unknown group_by: {group_by}")
+
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    entries: List[dict] = []
+    compared = compare and _last_snapshot is not None
+    if compared:
+        for diff in snapshot.compare_to(_last_snapshot, group_by)[:limit]:
+            entries.append({
+                "traceback": diff.traceback.format(),
+                "size": diff.size, "size_diff": diff.size_diff,
+                "count": diff.count, "count_diff": diff.count_diff,
+            })
+    else:
+        for stat in snapshot.statistics(group_by)[:limit]:
+            entries.append({"traceback": stat.traceback.format(), "size": stat.size, "count": stat.count})
+    _last_snapshot = snapshot
+
+    return {
+        **tracemalloc_status(),
+        "group_by": group_by,
+        "compared": compared,
+        "top": entries,
+    }
+
+
+# Trace from startup when asked (frame depth)
+if os.environ.get("WHEELFLOW_TRACEMALLOC"):
+    start_tracemalloc(int(os.environ["WHEELFLOW_TRACEMALLOC"]))
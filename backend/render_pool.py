@@ -0,0 +1,126 @@
+"""
+Render Pool for WheelFlow
+Low-priority worker processes for rendering and post-processing
+
+Matplotlib slice rendering and ParaView hero images are CPU heavy and used
+to run inside request handlers, on the event loop and at the same priority
+as the solver ranks. They now run in a small persistent process pool whose
+workers are niced and set to idle I/O priority, so they only use cycles
+the solvers leave free and never block other requests.
+
+Workers live as long as the server and import the renderers when they
+start, so each image reuses the worker's matplotlib figures, colormaps and
+cached triangulations (see pressure_slices) rather than paying for them
+per request.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    from backend.affinity import lower_priority
+except ImportError:
+    from affinity import lower_priority
+
+
+RENDER_WORKERS = int(os.environ.get("WHEELFLOW_RENDER_WORKERS", "2"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Start the worker pool on first use."""
+    global _pool
+    if _pool is None:
+        # spawn: forking the server would copy its event loop and threads
+        _pool = ProcessPoolExecutor(
+            max_workers=RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker
+        )
+    return _pool
+
+
+def init_worker():
+    """Lower the worker's priority and import the slice renderer."""
+    lower_priority()
+    try:
+        try:
+            import backend.visualization.pressure_slices  # noqa: F401
+        except ImportError:
+            import visualization.pressure_slices  # noqa: F401
+        import matplotlib.figure  # noqa: F401
+        import matplotlib.backends.backend_agg  # noqa: F401
+    except ImportError:
+        # Reported by the render call instead
+        pass
+
+
+def shutdown_pool():
+    """Stop the worker pool (on server shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def run_render(func: Callable, *args):
+    """Run a module-level function in a low-priority worker."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pool(), func, *args)
+
+
+def render_slice(vtk_file: Path, output_path: Path) -> dict:
+    """Render a pressure slice PNG (runs in a worker)."""
+    try:
+        from backend.visualization.pressure_slices import render_vtk_slice_image
+    except ImportError:
+        from visualization.pressure_slices import render_vtk_slice_image
+    return render_vtk_slice_image(vtk_file, output_path)
+
+
+def render_slice_grid(vtk_file: Path, output_path: Path, field: str, speed: float,
+                      resolution: int, float16: bool) -> dict:
+    """Resample a slice field to a slice grid file (runs in a worker)."""
+    try:
+        from backend.visualization.pressure_slices import export_slice_grid
+    except ImportError:
+        from visualization.pressure_slices import export_slice_grid
+    return export_slice_grid(vtk_file, output_path, field, speed, resolution, float16)
+
+
+def render_hero(case_dir: Path, hero_path: Path, paraview_available: Optional[bool] = None) -> dict:
+    """
+    Render the hero image (runs in a worker).
+
+    Uses ParaView when available, falling back to the matplotlib image
+    if ParaView is missing or fails.
+
+    Args:
+        paraview_available: Result of the startup probe (probed here if None)
+    """
+    try:
+        from backend.visualization.hero_image import (
+            generate_hero_image,
+            check_paraview_available,
+            generate_simple_hero_image
+        )
+    except ImportError:
+        from visualization.hero_image import (
+            generate_hero_image,
+            check_paraview_available,
+            generate_simple_hero_image
+        )
+
+    if paraview_available is None:
+        paraview_available, _ = check_paraview_available()
+    if paraview_available:
+        # generate_hero_image has its own 5-minute timeout
+        result = generate_hero_image(case_dir, hero_path)
+        if result.get("success"):
+            return result
+    return generate_simple_hero_image(case_dir, hero_path)
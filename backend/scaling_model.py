@@ -0,0 +1,267 @@
+"""
+Scaling Model for WheelFlow
+Pick MPI process counts per stage from measured wall times on this host
+
+Every meshing and solver run records (procs, cells, wall time) in the
+scaling_samples table. For each stage a strong-scaling model
+
+    T(n, C) = C * (a + b / n) + c * n
+
+is fitted by least squares: a is the per-cell serial cost, b the per-cell
+parallel cost and c the per-rank overhead (communication, startup). The
+chosen process count is the largest one whose predicted parallel
+efficiency stays above MIN_EFFICIENCY while keeping at least
+MIN_CELLS_PER_CORE cells on each rank. Until a stage has enough samples
+the previous fixed limits are used; a count of 1 means the stage runs
+serially.
+
+Solver samples are fitted separately per rotation method: MRF adds
+per-cell work and transient PIMPLE/AMI steps scale differently from
+steady SIMPLE iterations.
+"""
+
+import multiprocessing
+import re
+import socket
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from backend import database as db
+except ImportError:
+    import database as db
+
+
+MESH = "mesh"
+SOLVER = "solver"
+
+# Solver stage per rotation method (steady runs without rotation keep the
+# original "solver" samples)
+SOLVER_STAGES = {"none": SOLVER, "mrf": "solver_mrf", "transient": "solver_transient"}
+
+# Limits used before any measurements exist (benchmarked on the original
+# workstation: 8 cores for snappyHexMesh, solver capped at 16)
+DEFAULT_MAX_PROCS = {MESH: 8, **{stage: 16 for stage in SOLVER_STAGES.values()}}
+MIN_PROCS = 4
+
+# Rough final cell counts per quality preset, until real meshes are recorded
+DEFAULT_CELL_ESTIMATES = {
+    "basic": 500_000,
+    "standard": 2_000_000,
+    "pro": 15_000_000,
+}
+
+# Stop adding ranks once predicted efficiency falls below this
+MIN_EFFICIENCY = 0.6
+
+# Below this many cells per rank communication dominates
+MIN_CELLS_PER_CORE = {MESH: 100_000, **{stage: 50_000 for stage in SOLVER_STAGES.values()}}
+
+# A fit needs this many samples spread over at least two process counts
+MIN_SAMPLES = 3
+
+
+@dataclass
+class ScalingFit:
+    """Fitted strong-scaling coefficients for one stage."""
+    stage: str
+    serial_per_cell: float
+    parallel_per_cell: float
+    per_rank: float
+    num_samples: int
+
+    def predict(self, num_procs: int, cells: int) -> float:
+        """Predicted wall time per work unit in seconds."""
+        return (cells * (self.serial_per_cell + self.parallel_per_cell / num_procs)
+                + self.per_rank * num_procs)
+
+    def efficiency(self, num_procs: int, cells: int) -> float:
+        """Predicted parallel efficiency T(1) / (n * T(n))."""
+        t_n = self.predict(num_procs, cells)
+        if t_n <= 0:
+            return 0.0
+        return self.predict(1, cells) / (num_procs * t_n)
+
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.stage,
+            "serial_per_cell": self.serial_per_cell,
+            "parallel_per_cell": self.parallel_per_cell,
+            "per_rank": self.per_rank,
+            "num_samples": self.num_samples,
+        }
+
+
+def solver_stage(rotation_method: Optional[str] = None) -> str:
+    """Stage name the solver's samples are recorded and fitted under."""
+    return SOLVER_STAGES.get(rotation_method or "none", SOLVER)
+
+
+def get_host() -> str:
+    """Samples are only comparable on the machine that produced them."""
+    return socket.gethostname()
+
+
+def available_procs() -> int:
+    """Cores available to a single job (half the logical CPUs, as before)."""
+    return max(1, multiprocessing.cpu_count() // 2)
+
+
+def record_sample(stage: str, num_procs: int, cells: int, wall_time: float,
+                  work_units: float = 1, quality: Optional[str] = None,
+                  job_id: Optional[str] = None):
+    """
+    Store a stage measurement.
+
+    Args:
+        work_units: What wall_time covers (solver iterations, 1 for meshing)
+    """
+    if cells <= 0 or wall_time <= 0 or work_units <= 0:
+        return
+    db.add_scaling_sample(get_host(), stage, num_procs, cells, wall_time,
+                          work_units=work_units, quality=quality, job_id=job_id)
+
+
+def fit_stage(samples: List[Dict], stage: str) -> Optional[ScalingFit]:
+    """
+    Fit the scaling model to a stage's samples.
+
+    Returns:
+        ScalingFit, or None when the samples cannot separate the terms
+    """
+    if len(samples) < MIN_SAMPLES:
+        return None
+    if len({s["num_procs"] for s in samples}) < 2:
+        return None
+
+    n = np.array([s["num_procs"] for s in samples], dtype=float)
+    cells = np.array([s["cells"] for s in samples], dtype=float)
+    t = np.array([s["wall_time"] / s["work_units"] for s in samples], dtype=float)
+
+    design = np.column_stack([cells, cells / n, n])
+    coeffs, *_ = np.linalg.lstsq(design, t, rcond=None)
+
+    # Negative costs are noise; drop the term and refit the rest
+    if np.any(coeffs < 0):
+        keep = coeffs >= 0
+        coeffs = np.zeros(3)
+        if keep.any():
+            coeffs[keep], *_ = np.linalg.lstsq(design[:, keep], t, rcond=None)
+            coeffs = np.clip(coeffs, 0, None)
+
+    if coeffs[0] + coeffs[1] <= 0:
+        return None
+
+    return ScalingFit(
+        stage=stage,
+        serial_per_cell=float(coeffs[0]),
+        parallel_per_cell=float(coeffs[1]),
+        per_rank=float(coeffs[2]),
+        num_samples=len(samples),
+    )
+
+
+def get_fit(stage: str) -> Optional[ScalingFit]:
+    """Fit a stage from this host's recorded samples."""
+    return fit_stage(db.get_scaling_samples(get_host(), stage), stage)
+
+
+def estimate_cells(quality: str) -> int:
+    """Predicted cell count for a quality preset (median of recorded meshes)."""
+    samples = [s for s in db.get_scaling_samples(get_host(), MESH)
+               if s.get("quality") == quality]
+    if samples:
+        return int(np.median([s["cells"] for s in samples]))
+    return DEFAULT_CELL_ESTIMATES.get(quality, DEFAULT_CELL_ESTIMATES["standard"])
+
+
+def default_procs(stage: str, max_procs: int) -> int:
+    """Process count used before a stage has been measured (never above max_procs)."""
+    return min(max_procs, max(MIN_PROCS, DEFAULT_MAX_PROCS[stage]))
+
+
+def choose_procs(stage: str, cells: int, max_procs: Optional[int] = None,
+                 fit: Optional[ScalingFit] = None) -> int:
+    """
+    Choose the process count for a stage.
+
+    Args:
+        stage: MESH or a solver stage (see solver_stage)
+        cells: Predicted cell count
+        max_procs: Cores available (default: available_procs())
+        fit: Scaling fit to use (default: fitted from recorded samples)
+    """
+    if max_procs is None:
+        max_procs = available_procs()
+    if fit is None:
+        fit = get_fit(stage)
+    if fit is None:
+        return default_procs(stage, max_procs)
+
+    # Largest count above the efficiency knee with enough cells per rank
+    cell_limit = max(1, cells // MIN_CELLS_PER_CORE[stage])
+    best = 1
+    for n in range(2, max_procs + 1):
+        if n > cell_limit:
+            break
+        if fit.efficiency(n, cells) < MIN_EFFICIENCY:
+            break
+        best = n
+    return best
+
+
+def plan_procs(quality: str, max_procs: Optional[int] = None,
+               rotation_method: Optional[str] = None) -> Dict:
+    """
+    Process counts for meshing and solving a case of the given quality.
+
+    Returns:
+        Dict with cells, mesh_procs, solver_procs and whether each came
+        from a fitted model
+    """
+    if max_procs is None:
+        max_procs = available_procs()
+    cells = estimate_cells(quality)
+    stage = solver_stage(rotation_method)
+    mesh_fit = get_fit(MESH)
+    solver_fit = get_fit(stage)
+    return {
+        "cells": cells,
+        "mesh_procs": choose_procs(MESH, cells, max_procs, mesh_fit),
+        "solver_procs": choose_procs(stage, cells, max_procs, solver_fit),
+        "mesh_fitted": mesh_fit is not None,
+        "solver_fitted": solver_fit is not None,
+    }
+
+
+def get_scaling_summary() -> Dict:
+    """Fits and current choices per quality, for the API."""
+    max_procs = available_procs()
+    fits = {stage: get_fit(stage) for stage in (MESH, *SOLVER_STAGES.values())}
+    plans = {}
+    for quality in DEFAULT_CELL_ESTIMATES:
+        cells = estimate_cells(quality)
+        plans[quality] = {
+            "cells": cells,
+            "mesh_procs": choose_procs(MESH, cells, max_procs, fits[MESH]),
+            "solver_procs": {
+                method: choose_procs(stage, cells, max_procs, fits[stage])
+                for method, stage in SOLVER_STAGES.items()
+            },
+        }
+    return {
+        "host": get_host(),
+        "available_procs": max_procs,
+        "fits": {stage: fit.to_dict() if fit else None for stage, fit in fits.items()},
+        "plans": plans,
+    }
+
+
+def count_time_steps(log_file: Path) -> int:
+    """Number of solver iterations/time steps in a solver log."""
+    if not log_file.exists():
+        return 0
+    return len(re.findall(r'^Time = ', log_file.read_text(errors='replace'), re.MULTILINE))
@@ -0,0 +1,188 @@
+"""
+Solver Profile for WheelFlow
+Where a solve spends its time: per equation and on write steps
+
+OpenFOAM 13 has no per-section timers, so the profile is built from what
+every run writes: the solver log, through its index (log_index), and the
+case's controlDict.
+
+- Per equation (p, U, k, omega): linear solver, solves and iterations
+  (total, mean and most in one time step) and the last initial residual.
+- Per time step: the ExecutionTime increment. Write steps also write the
+  fields and run the function objects that output at write time (the
+  pressureSlices cutting planes), so their cost is the time they take
+  beyond an ordinary step (the median step). Which steps write follows
+  from the controlDict's writeControl and writeInterval; the first step,
+  which includes start-up, is left out of both.
+
+Function objects that execute every step (forceCoeffs, forces) are part
+of every step's time and cannot be told apart from the solve in the log.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+try:
+    from backend import foam_dict
+    from backend import log_index
+except ImportError:
+    import foam_dict
+    import log_index
+
+
+# Vector fields whose component solves (Ux, Uy, Uz) are reported together
+VECTOR_FIELDS = ("U",)
+
+# writeControl values whose write steps follow from the time column
+TIME_STEP_CONTROLS = ("timeStep",)
+RUN_TIME_CONTROLS = ("runTime", "adjustableRunTime")
+
+
+def equation_name(field: str) -> str:
+    """Equation a solved field belongs to (Ux -> U)."""
+    if len(field) > 1 and field[-1] in "xyz" and field[:-1] in VECTOR_FIELDS:
+        return field[:-1]
+    return field
+
+
+def parse_solver_log(log_file: Path) -> dict:
+    """
+    Linear-solver iterations per equation and time per step from a log.
+
+    Reads the log's index (log_index), which is brought up to date first.
+
+    Returns:
+        Dict with time_steps, execution_time, seconds_per_step,
+        equations {name: {solver, solves, iterations, mean_iterations,
+        max_iterations (most in one time step), final_initial_residual}}
+        and the time and ExecutionTime of each step (times,
+        execution_times)
+    """
+    meta = log_index.update(log_file)
+    if not meta["rows"]:
+        return {"time_steps": 0, "execution_time": None, "seconds_per_step": None, "equations": {}}
+
+    table = log_index.load_table(log_file, meta)
+
+    def column(name: str) -> np.ndarray:
+        return table[:, meta["columns"].index(name)]
+
+    equations: Dict[str, dict] = {}
+    for field in log_index.solved_fields(meta):
+        solves = column(f"{field}_solves")
+        iterations = column(f"{field}_iterations")
+        initial = column(f"{field}_initial")
+        entry = equations.setdefault(equation_name(field), {
+            "solver": meta["solvers"].get(field), "solves": 0, "iterations": 0, "max_iterations": 0,
+            "final_initial_residual": None,
+        })
+        entry["solves"] += int(np.nansum(solves))
+        entry["iterations"] += int(np.nansum(iterations))
+        entry["max_iterations"] = max(entry["max_iterations"], int(np.nanmax(iterations)))
+        solved = initial[~np.isnan(initial)]
+        if len(solved):
+            last = float(solved[-1])
+            current = entry["final_initial_residual"]
+            entry["final_initial_residual"] = last if current is None else max(current, last)
+
+    for entry in equations.values():
+        entry["mean_iterations"] = round(entry["iterations"] / entry["solves"], 2)
+
+    execution_time = column("execution_time")
+    executed = execution_time[~np.isnan(execution_time)]
+    total = float(executed[-1]) if len(executed) else None
+    time_steps = meta["rows"]
+    return {
+        "time_steps": time_steps,
+        "execution_time": total,
+        "seconds_per_step": total / time_steps if total else None,
+        "equations": equations,
+        "times": column("time"),
+        "execution_times": execution_time,
+    }
+
+
+def write_schedule(case_dir: Path) -> Optional[dict]:
+    """writeControl, writeInterval and deltaT of the case's controlDict."""
+    try:
+        control = foam_dict.read_dict(case_dir / "system" / "controlDict")
+    except (OSError, ValueError):
+        return None
+    write_control, interval = control.get("writeControl"), control.get("writeInterval")
+    if write_control not in TIME_STEP_CONTROLS + RUN_TIME_CONTROLS or not isinstance(interval, (int, float)):
+        return None
+    delta_t = control.get("deltaT", 1)
+    return {"write_control": write_control, "write_interval": interval,
+            "delta_t": delta_t if isinstance(delta_t, (int, float)) and delta_t > 0 else 1}
+
+
+def write_steps(times: np.ndarray, schedule: dict) -> np.ndarray:
+    """Which time steps (rows of the log) wrote the fields; the last one always does."""
+    if schedule["write_control"] in TIME_STEP_CONTROLS:
+        index = np.round(times / schedule["delta_t"]).astype(np.int64)
+        writes = index % max(int(schedule["write_interval"]), 1) == 0
+    else:
+        # A write each time the run time passes a multiple of the interval
+        tolerance = 1e-6 * schedule["write_interval"]
+        periods = np.floor((times + tolerance) / schedule["write_interval"])
+        previous = np.concatenate([[np.floor(tolerance / schedule["write_interval"])], periods[:-1]])
+        writes = periods > previous
+    writes[-1] = True
+    return writes
+
+
+def write_cost(times: np.ndarray, execution_times: np.ndarray, schedule: Optional[dict]) -> Optional[dict]:
+    """
+    Time write steps take beyond an ordinary step.
+
+    Returns:
+        Dict with steps (write steps timed), seconds_per_step (median
+        ordinary step), seconds_per_write (mean extra time of a write step)
+        and time (total extra time); None if the log has too few steps or
+        the write schedule is unknown
+    """
+    if schedule is None or len(times) < 3:
+        return None
+    durations = np.diff(execution_times)
+    writes = write_steps(times, schedule)[1:]
+    valid = ~np.isnan(durations)
+    ordinary = durations[valid & ~writes]
+    written = durations[valid & writes]
+    if not len(ordinary) or not len(written):
+        return None
+    baseline = float(np.median(ordinary))
+    extra = np.maximum(written - baseline, 0)
+    return {
+        "write_control": schedule["write_control"],
+        "write_interval": schedule["write_interval"],
+        "steps": int(len(written)),
+        "seconds_per_step": round(baseline, 6),
+        "seconds_per_write": round(float(extra.mean()), 6),
+        "time": round(float(extra.sum()), 6),
+    }
+
+
+def solver_profile(case_dir: Path, log_name: str = "log.foamRun") -> dict:
+    """
+    Iterations per equation, seconds per step and the cost of write steps.
+
+    The write cost's time_fraction is relative to the solver's
+    ExecutionTime.
+    """
+    log = parse_solver_log(case_dir / log_name)
+    writes = None
+    if log["time_steps"]:
+        writes = write_cost(log["times"], log["execution_times"], write_schedule(case_dir))
+    if writes is not None:
+        total = log["execution_time"]
+        writes["time_fraction"] = round(writes["time"] / total, 4) if total else None
+
+    return {
+        "total_time": log["execution_time"],
+        "time_steps": log["time_steps"],
+        "seconds_per_step": log["seconds_per_step"],
+        "equations": log["equations"],
+        "write_steps": writes,
+    }
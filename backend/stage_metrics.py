@@ -0,0 +1,265 @@
+"""
+Stage Metrics for WheelFlow
+Wall time, CPU time, peak memory and mesh size of every pipeline stage
+
+Each stage of a job (geometry transform, case generation, each OpenFOAM
+command, result extraction, post-processing) runs inside track_stage(),
+which writes one row to the job_stages table when the stage ends,
+whether it completed, failed or was interrupted.
+
+For stages that run an external command, CPU time and peak RSS cover the
+command's process tree (mpirun and every rank), sampled every
+SAMPLE_INTERVAL seconds, so processes shorter than the interval are
+under-counted (a command that ends before the first sample reports the
+CPU time it was reaped with and no memory). Stages that run inside the
+server can't be separated from whatever else the server does meanwhile
+(other jobs, API requests), so they report the whole server process's
+CPU time and resident memory. Each row's cpu_scope says which it is
+("tree" or "process"), and job totals leave process-wide CPU time out.
+Commands handed to a batch scheduler only report wall time.
+
+Configuration (environment variables):
+    WHEELFLOW_STAGE_SAMPLE_INTERVAL: Seconds between process tree samples (default 1)
+"""
+
+import asyncio
+import os
+import resource
+import socket
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from backend import database as db
+    from backend import foam_mesh
+    from backend import job_control
+    from backend import metrics
+except ImportError:
+    import database as db
+    import foam_mesh
+    import job_control
+    import metrics
+
+
+SAMPLE_INTERVAL = float(os.environ.get("WHEELFLOW_STAGE_SAMPLE_INTERVAL", "1"))
+
+# cpu_scope of a stage's measurements
+TREE_SCOPE = "tree"
+PROCESS_SCOPE = "process"
+
+INTERRUPTED_STATUS = {job_control.CANCEL: "cancelled", job_control.SUSPEND: "suspended"}
+
+
+class ResourceSampler:
+    """Accumulates CPU time and peak RSS over samples of process trees."""
+
+    def __init__(self):
+        # (pid, create_time) -> CPU seconds at the last sample
+        self.cpu: Dict[Tuple[int, float], float] = {}
+        self.peak_rss = 0
+
+    @property
+    def seen_process(self) -> bool:
+        return bool(self.cpu)
+
+    @property
+    def cpu_time(self) -> float:
+        return sum(self.cpu.values())
+
+    def sample_tree(self, pid: int):
+        """Sample a process and all of its descendants."""
+        if psutil is None:
+            return
+        try:
+            root = psutil.Process(pid)
+            procs = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return
+
+        rss = 0
+        for proc in procs:
+            try:
+                with proc.oneshot():
+                    times = proc.cpu_times()
+                    rss += proc.memory_info().rss
+                    self.cpu[(proc.pid, proc.create_time())] = times.user + times.system
+            except psutil.Error:
+                continue
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def sample_self(self):
+        """Sample the server process's resident memory."""
+        if psutil is None:
+            return
+        self.peak_rss = max(self.peak_rss, psutil.Process().memory_info().rss)
+
+
+def children_cpu_time() -> float:
+    """CPU seconds used by this process's terminated, waited-for children."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class StageTracker:
+    """A stage being measured; see track_stage."""
+
+    def __init__(self, job_id: str, external: bool):
+        self.job_id = job_id
+        self.external = external
+        self.sampler = ResourceSampler()
+        self.process = None
+        # Ran under a batch scheduler, on other hosts
+        self.off_host = False
+        self.cpu_start = time.process_time()
+        self.children_cpu_start = children_cpu_time()
+
+    def watch(self, process):
+        """Measure a process the stage started without job_control."""
+        self.process = process
+        self.external = True
+
+    def sample(self):
+        if not self.external:
+            self.sampler.sample_self()
+            return
+        process = self.process or job_control.get_process(self.job_id)
+        if process is None:
+            return
+        if not hasattr(process, "pid"):
+            self.off_host = True
+        elif process.returncode is None:
+            self.sampler.sample_tree(process.pid)
+
+    async def run_sampler(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(SAMPLE_INTERVAL)
+
+    def resources(self) -> Tuple[Optional[float], Optional[int], Optional[str]]:
+        """CPU seconds, peak RSS and what they cover for the finished stage."""
+        if not self.external:
+            self.sampler.sample_self()
+            return time.process_time() - self.cpu_start, self.sampler.peak_rss or None, PROCESS_SCOPE
+        if self.off_host:
+            return None, None, None
+        if self.sampler.seen_process:
+            return self.sampler.cpu_time, self.sampler.peak_rss or None, TREE_SCOPE
+        # Finished before the first sample: its CPU time was added to this
+        # process's children when it was reaped
+        return children_cpu_time() - self.children_cpu_start, None, TREE_SCOPE
+
+
+@asynccontextmanager
+async def track_stage(job_id: Optional[str], stage: str, num_procs: int = 1,
+                      case_dir: Optional[Path] = None, external: bool = False):
+    """
+    Measure a pipeline stage and record it for the job.
+
+    Args:
+        job_id: Job the stage belongs to (None: nothing is recorded)
+        stage: Stage name, e.g. "snappyHexMesh" or "extract_results"
+        num_procs: Processes the stage ran on
+        case_dir: Case whose mesh cell count is recorded with the stage
+        external: The stage runs a command registered with job_control;
+            its process tree is measured instead of the whole server
+
+    Yields:
+        The StageTracker, whose watch() adds a process to measure
+    """
+    if job_id is None:
+        yield None
+        return
+
+    tracker = StageTracker(job_id, external)
+    started_at = datetime.now().isoformat()
+    wall_start = time.monotonic()
+    sampler = asyncio.create_task(tracker.run_sampler())
+    status = "complete"
+    try:
+        yield tracker
+    except job_control.JobInterrupted as e:
+        status = INTERRUPTED_STATUS.get(e.action, "failed")
+        raise
+    except BaseException:
+        status = "failed"
+        raise
+    finally:
+        sampler.cancel()
+        wall_time = time.monotonic() - wall_start
+        cpu_time, peak_rss, cpu_scope = tracker.resources()
+        metrics.STAGE_DURATION.observe(wall_time, stage=stage, status=status)
+        record_stage(job_id, stage, status, started_at, wall_time,
+                     cpu_time=cpu_time, peak_rss=peak_rss,
+                     cells=stage_cells(case_dir), num_procs=num_procs, cpu_scope=cpu_scope)
+
+
+def stage_cells(case_dir: Optional[Path]) -> Optional[int]:
+    """Mesh cell count at the end of a stage (None before meshing)."""
+    if case_dir is None:
+        return None
+    try:
+        return foam_mesh.mesh_cells(case_dir)
+    except (OSError, ValueError):
+        return None
+
+
+def record_stage(job_id: str, stage: str, status: str, started_at: str, wall_time: float,
+                 cpu_time: Optional[float] = None, peak_rss: Optional[int] = None,
+                 cells: Optional[int] = None, num_procs: int = 1, host: Optional[str] = None,
+                 cpu_scope: Optional[str] = None):
+    """Store a stage measurement (never fails the job)."""
+    try:
+        db.add_job_stage(job_id, stage, status, started_at, wall_time,
+                         cpu_time=cpu_time, peak_rss=peak_rss, cells=cells,
+                         num_procs=num_procs, host=host or socket.gethostname(),
+                         cpu_scope=cpu_scope)
+    except Exception as e:
+        print(f"Could not record stage {stage} of job {job_id}: {e}")
+
+
+def job_timings(job_id: str) -> dict:
+    """
+    A job's recorded stages with totals.
+
+    Returns:
+        stages in the order they ran, totals over all of them, and
+        per-stage totals (a stage re-run after a resume appears once per run).
+        The total CPU time only counts stages measured on their own
+        process tree, not process-wide server samples.
+    """
+    stages = db.get_job_stages(job_id)
+    by_stage: Dict[str, dict] = {}
+    for row in stages:
+        entry = by_stage.setdefault(row["stage"], {"runs": 0, "wall_time": 0.0, "cpu_time": 0.0})
+        entry["runs"] += 1
+        entry["wall_time"] += row["wall_time"]
+        entry["cpu_time"] += row["cpu_time"] or 0.0
+
+    return {
+        "job_id": job_id,
+        "stages": stages,
+        "by_stage": by_stage,
+        "total": {
+            "wall_time": sum(row["wall_time"] for row in stages),
+            "cpu_time": sum(row["cpu_time"] or 0.0 for row in stages
+                            if row["cpu_scope"] != PROCESS_SCOPE),
+            "peak_rss": max((row["peak_rss"] or 0 for row in stages), default=0) or None,
+        },
+    }
+
+
+def import_stages(job_id: str, stages: List[dict]):
+    """Store stages measured elsewhere (by a remote worker) for a job."""
+    for row in stages:
+        record_stage(job_id, row["stage"], row["status"], row["started_at"], row["wall_time"],
+                     cpu_time=row.get("cpu_time"), peak_rss=row.get("peak_rss"),
+                     cells=row.get("cells"), num_procs=row.get("num_procs", 1),
+                     host=row.get("host"), cpu_scope=row.get("cpu_scope"))
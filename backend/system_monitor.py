@@ -10,6 +10,11 @@ from pathlib import Path
 from typing import Dict, Optional
 import re
 
+try:
+    from backend.openfoam_env import get_capabilities
+except ImportError:
+    from openfoam_env import get_capabilities
+
 
 def get_system_stats() -> Dict:
     """
@@ -85,6 +90,10 @@ def get_gpu_stats() -> Dict:
         "devices": []
     }
 
+    # Don't spawn nvidia-smi on every poll when the startup probe found none
+    if not get_capabilities()["nvidia_smi"]:
+        return gpu_stats
+
     try:
         # Query GPU info
         result = subprocess.run(
@@ -0,0 +1,316 @@
+"""
+Time-series Store for WheelFlow
+Columnar per-job histories with downsampled, windowed chart queries
+
+Force coefficient, force and residual histories of a job are kept in
+<case>/timeseries/<source>/, one raw little-endian float64 file per column
+(<column>.f8) plus meta.json with the column names and row count. New rows
+are appended to the column files, so syncing a running job costs only the
+rows written since the last sync: the .dat sources come from the
+incremental dat_reader, residuals from the solver log index. The store is
+compacted one final time when results are extracted; after that, queries
+read it without looking at the source files again.
+
+Queries memory-map only the columns they need, cut the requested time
+window with a binary search on the (sorted) time column and downsample
+each field with Largest-Triangle-Three-Buckets, which keeps peaks and
+oscillations that striding would drop. Residuals are downsampled on a log
+scale, the way they are plotted. Every query carries an ETag derived from
+the store's generation and row count, so a chart poll of an unchanged
+store gets a 304.
+
+Sources:
+    coefficients: postProcessing/forceCoeffs (time, Cm, Cd, Cl, Cl_front, Cl_rear)
+    forces: postProcessing/forces (time, pressure and viscous force components)
+    residuals: initial residual per solved field, from the solver log index
+        (time = time step number)
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from backend import dat_reader
+    from backend import log_index
+except ImportError:
+    import dat_reader
+    import log_index
+
+
+STORE_DIR = "timeseries"
+
+COEFFICIENT_COLUMNS = ("time", "Cm", "Cd", "Cl", "Cl_front", "Cl_rear")
+FORCE_COLUMNS = ("time", "px", "py", "pz", "vx", "vy", "vz", "porous_x", "porous_y", "porous_z")
+# Residual fields the charts always expect (other solved fields are stored too)
+RESIDUAL_COLUMNS = ("time", "p", "Ux", "Uy", "Uz", "k", "omega")
+
+# Sources whose values are plotted (and so downsampled) on a log scale
+LOG_SOURCES = ("residuals",)
+
+SOURCES = ("coefficients", "forces", "residuals")
+
+_lock = threading.Lock()
+
+
+# =============================================================================
+# Sources
+# =============================================================================
+
+def dat_source(function_dir: Path, file_name: str, names: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    rows = dat_reader.read_series(function_dir, file_name)
+    n_cols = min(rows.shape[1], len(names))
+    return list(names[:n_cols]), rows[:, :n_cols]
+
+
+def residual_source(case_dir: Path, final: bool = False) -> Tuple[List[str], np.ndarray]:
+    """Initial residual of every solved field per time step, from the log index."""
+    log_file = log_index.find_solver_log(case_dir)
+    if log_file is None:
+        return [], np.empty((0, 0))
+    meta = log_index.update(log_file, final=final)
+    fields = log_index.solved_fields(meta)
+    table = log_index.load_table(log_file, meta)
+    rows = np.empty((meta["rows"], len(fields) + 1))
+    rows[:, 0] = np.arange(1, meta["rows"] + 1)
+    for column, field in enumerate(fields, start=1):
+        rows[:, column] = table[:, meta["columns"].index(f"{field}_initial")]
+    return ["time"] + fields, rows
+
+
+def load_source(case_dir: Path, source: str, final: bool = False) -> Tuple[List[str], np.ndarray]:
+    """Current full history of a source, read from the case's output."""
+    post_dir = case_dir / "postProcessing"
+    if source == "coefficients":
+        return dat_source(post_dir / "forceCoeffs", "forceCoeffs.dat", COEFFICIENT_COLUMNS)
+    if source == "forces":
+        return dat_source(post_dir / "forces", "forces.dat", FORCE_COLUMNS)
+    if source == "residuals":
+        return residual_source(case_dir, final=final)
+    raise ValueError(f"Unknown time-series source: {source}")
+
+
+# =============================================================================
+# Store
+# =============================================================================
+
+def source_dir(case_dir: Path, source: str) -> Path:
+    return case_dir / STORE_DIR / source
+
+
+def read_meta(case_dir: Path, source: str) -> Optional[dict]:
+    try:
+        return json.loads((source_dir(case_dir, source) / "meta.json").read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_meta(directory: Path, meta: dict):
+    tmp = directory / "meta.json.tmp"
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, directory / "meta.json")
+
+
+def read_column(case_dir: Path, source: str, meta: dict, name: str) -> np.ndarray:
+    """Stored values of one column (memory-mapped)."""
+    if not meta["rows"]:
+        return np.empty(0)
+    path = source_dir(case_dir, source) / f"{name}.f8"
+    return np.memmap(path, dtype="<f8", mode="r", shape=(meta["rows"],))
+
+
+def sync(case_dir: Path, source: str, final: bool = False) -> dict:
+    """
+    Bring a source's store up to date with the case output.
+
+    Rows written since the last sync are appended; if the output no longer
+    extends what is stored (a rewritten or truncated file), the store is
+    rebuilt. A final store is not synced again.
+
+    Returns:
+        The store's meta: columns, rows, generation and final
+    """
+    with _lock:
+        meta = read_meta(case_dir, source)
+        if meta and meta.get("final"):
+            return meta
+
+        names, rows = load_source(case_dir, source, final=final)
+        if meta is None and not len(rows):
+            # Nothing to store yet (the case may not even exist)
+            return {"columns": names, "rows": 0, "generation": 0, "final": False}
+
+        directory = source_dir(case_dir, source)
+        stored = meta["rows"] if meta else 0
+
+        rebuild = (
+            meta is None
+            or meta["columns"] != names
+            or len(rows) < stored
+            or (stored and rows[stored - 1, 0] != read_column(case_dir, source, meta, "time")[-1])
+        )
+        if rebuild:
+            directory.mkdir(parents=True, exist_ok=True)
+            for path in directory.glob("*.f8"):
+                path.unlink()
+            generation = (meta["generation"] + 1) if meta else 1
+            meta = {"columns": names, "rows": 0, "generation": generation, "final": False}
+            stored = 0
+
+        if len(rows) > stored:
+            for column, name in enumerate(names):
+                with open(directory / f"{name}.f8", "ab") as f:
+                    # Drop rows of an append interrupted before meta.json was written
+                    f.truncate(stored * 8)
+                    f.write(np.ascontiguousarray(rows[stored:, column], dtype="<f8").tobytes())
+            meta["rows"] = len(rows)
+        meta["final"] = final
+        if rebuild or len(rows) > stored or final:
+            write_meta(directory, meta)
+        return meta
+
+
+def compact(case_dir: Path):
+    """Final sync of every source, once the run's output is complete."""
+    for source in SOURCES:
+        try:
+            sync(case_dir, source, final=True)
+        except Exception as e:
+            print(f"Could not store {source} history for {case_dir.name}: {e}")
+
+
+def forget(case_dir: Path):
+    """Let a job's store be rebuilt (e.g. when the case is solved again)."""
+    for source in SOURCES:
+        meta = read_meta(case_dir, source)
+        if meta and meta.get("final"):
+            meta["final"] = False
+            write_meta(source_dir(case_dir, source), meta)
+
+
+# =============================================================================
+# Queries
+# =============================================================================
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; in between, each bucket
+    contributes the point forming the largest triangle with the point kept
+    from the previous bucket and the mean of the next bucket. n_out must be
+    at least 3.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        xs, ys = x[start:end], y[start:end]
+        area = np.abs((x[previous] - next_x) * (ys - y[previous])
+                      - (x[previous] - xs) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        indices[bucket + 1] = previous
+    return indices
+
+
+def downsample(time: np.ndarray, fields: Dict[str, np.ndarray], max_points: int,
+               log_scale: bool = False) -> np.ndarray:
+    """Indices that keep the shape of every field within max_points in total."""
+    if len(time) <= max_points:
+        return np.arange(len(time))
+    budget = max(3, max_points // max(len(fields), 1))
+    keep = [np.array([0, len(time) - 1])]
+    for values in fields.values():
+        y = np.asarray(values, dtype=np.float64)
+        if log_scale:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                y = np.log10(np.abs(y))
+        y = np.where(np.isfinite(y), y, 0.0)
+        keep.append(lttb(np.asarray(time, dtype=np.float64), y, budget))
+    return np.unique(np.concatenate(keep))
+
+
+def to_list(values: np.ndarray) -> list:
+    """JSON-ready values (NaN as null)."""
+    return [None if math.isnan(value) else value for value in values.tolist()]
+
+
+def etag(source: str, meta: Optional[dict], **params) -> str:
+    state = f"{source}:{meta['generation']}:{meta['rows']}" if meta else f"{source}:empty"
+    query = json.dumps(params, sort_keys=True, default=str)
+    return '"' + hashlib.sha1(f"{state}:{query}".encode()).hexdigest()[:16] + '"'
+
+
+def query(case_dir: Path, source: str, fields: Optional[Sequence[str]] = None,
+          start: Optional[float] = None, end: Optional[float] = None,
+          max_points: Optional[int] = None, final: bool = False) -> dict:
+    """
+    History of a source, windowed and downsampled for a chart.
+
+    Args:
+        case_dir: Job case directory
+        source: "coefficients", "forces" or "residuals"
+        fields: Columns to return (default: all)
+        start, end: Time window (inclusive)
+        max_points: Upper bound on returned points (default: all)
+        final: Mark the store final after syncing (the job is complete)
+
+    Returns:
+        Dict with time, one list per field, rows (stored rows), window_rows
+        (rows in the window), columns (available) and etag
+
+    Raises:
+        ValueError: For an unknown source or field
+    """
+    meta = sync(case_dir, source, final=final)
+    columns = meta["columns"]
+    fields = [name for name in (fields or columns) if name != "time"]
+    unknown = [name for name in fields if name not in columns]
+    if unknown and meta["rows"]:
+        raise ValueError(f"Unknown {source} fields: {', '.join(unknown)}")
+    fields = [name for name in fields if name in columns]
+
+    time = read_column(case_dir, source, meta, "time")
+    lo = int(np.searchsorted(time, start, side="left")) if start is not None else 0
+    hi = int(np.searchsorted(time, end, side="right")) if end is not None else len(time)
+    time = time[lo:hi]
+    values = {name: read_column(case_dir, source, meta, name)[lo:hi] for name in fields}
+
+    if max_points:
+        keep = downsample(time, values, max_points, log_scale=source in LOG_SOURCES)
+        time = time[keep]
+        values = {name: column[keep] for name, column in values.items()}
+
+    result = {"time": to_list(np.asarray(time))}
+    for name, column in values.items():
+        result[name] = to_list(np.asarray(column))
+    result["rows"] = meta["rows"]
+    result["window_rows"] = hi - lo
+    result["columns"] = columns
+    result["etag"] = etag(source, meta, fields=fields, start=start, end=end, max_points=max_points)
+    return result
+
+
+def tail(case_dir: Path, source: str, n_rows: int) -> Dict[str, np.ndarray]:
+    """The last n_rows stored rows of every column, as of the last sync."""
+    meta = read_meta(case_dir, source)
+    if not meta:
+        return {}
+    return {name: np.array(read_column(case_dir, source, meta, name)[-n_rows:])
+            for name in meta["columns"]}
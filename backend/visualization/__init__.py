@@ -18,7 +18,8 @@ from .results_summary import generate_results_summary
 from .hero_image import generate_hero_image, check_paraview_available
 from .pressure_surface import (
     export_pressure_surface_ply,
-    export_pressure_surface_json
+    export_pressure_surface_json,
+    export_pressure_surface_bin
 )
 
 __all__ = [
@@ -32,4 +33,5 @@ __all__ = [
     'check_paraview_available',
     'export_pressure_surface_ply',
     'export_pressure_surface_json',
+    'export_pressure_surface_bin',
 ]
@@ -5,7 +5,17 @@ Extracts and processes force coefficient data from OpenFOAM postProcessing
 
 from pathlib import Path
 from typing import Dict, List, Optional
-import re
+
+import numpy as np
+
+try:
+    from backend import dat_reader
+    from backend import foam_mesh
+    from backend import log_index
+except ImportError:
+    import dat_reader
+    import foam_mesh
+    import log_index
 
 
 def extract_force_distribution(case_dir: Path) -> Dict:
@@ -20,7 +30,7 @@ def extract_force_distribution(case_dir: Path) -> Dict:
     - converged: bool indicating if simulation converged
     - final_values: dict with final Cd, Cl, Cm
     """
-    force_file = case_dir / "postProcessing" / "forceCoeffs" / "0" / "forceCoeffs.dat"
+    force_dir = case_dir / "postProcessing" / "forceCoeffs"
 
     result = {
         "time": [],
@@ -33,40 +43,18 @@ def extract_force_distribution(case_dir: Path) -> Dict:
         "final_values": {}
     }
 
-    if not force_file.exists():
+    if not force_dir.exists():
         return result
 
     try:
-        with open(force_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith('#') or not line:
-                    continue
-
-                parts = line.split()
-                if len(parts) >= 6:
-                    # Columns: Time, Cm, Cd, Cl, Cl(f), Cl(r)
-                    result["time"].append(float(parts[0]))
-                    result["Cm"].append(float(parts[1]))
-                    result["Cd"].append(float(parts[2]))
-                    result["Cl"].append(float(parts[3]))
-                    result["Cl_front"].append(float(parts[4]))
-                    result["Cl_rear"].append(float(parts[5]))
-
-        if result["time"]:
-            result["converged"] = True
-            result["final_values"] = {
-                "Cd": result["Cd"][-1],
-                "Cl": result["Cl"][-1],
-                "Cm": result["Cm"][-1],
-                "time": result["time"][-1]
-            }
-
-            # Check convergence by looking at last 50 iterations
-            if len(result["Cd"]) >= 50:
-                recent_cd = result["Cd"][-50:]
-                cd_variation = max(recent_cd) - min(recent_cd)
-                result["converged"] = cd_variation < 0.01  # Less than 1% variation
+        # Every start-time directory: a resumed run continues the history
+        rows = dat_reader.read_series(force_dir, "forceCoeffs.dat")
+        if rows.shape[1] >= 6:
+            # Columns: Time, Cm, Cd, Cl, Cl(f), Cl(r)
+            for column, name in enumerate(("time", "Cm", "Cd", "Cl", "Cl_front", "Cl_rear")):
+                result[name] = rows[:, column].tolist()
+
+        result.update(coefficient_status(result["time"], result["Cd"], result["Cl"], result["Cm"]))
 
     except Exception as e:
         result["error"] = str(e)
@@ -74,11 +62,41 @@ def extract_force_distribution(case_dir: Path) -> Dict:
     return result
 
 
+def coefficient_status(time, cd, cl, cm) -> Dict:
+    """
+    Convergence flag and final values of a coefficient history.
+
+    Only the last 50 values are looked at, so the histories may be the
+    tails of longer ones.
+    """
+    if not len(time):
+        return {"converged": False, "final_values": {}}
+
+    status = {
+        "converged": True,
+        "final_values": {
+            "Cd": float(cd[-1]),
+            "Cl": float(cl[-1]),
+            "Cm": float(cm[-1]),
+            "time": float(time[-1])
+        }
+    }
+
+    # Check convergence by looking at last 50 iterations
+    if len(cd) >= 50:
+        recent_cd = cd[-50:]
+        cd_variation = max(recent_cd) - min(recent_cd)
+        status["converged"] = bool(cd_variation < 0.01)  # Less than 1% variation
+
+    return status
+
+
 def extract_convergence_history(case_dir: Path) -> Dict:
     """
-    Extract residual history from OpenFOAM log files.
+    Extract residual history from the solver log's index.
 
-    Returns dict with residual histories for p, U, k, omega
+    Returns dict with initial residual histories for p, U, k, omega, one
+    value per time step (None where a field was not solved in a step)
     """
     result = {
         "iterations": [],
@@ -90,41 +108,23 @@ def extract_convergence_history(case_dir: Path) -> Dict:
         "omega": []
     }
 
-    # Try to find solver log
-    log_files = list(case_dir.glob("log.*")) + list(case_dir.glob("*.log"))
+    log_file = log_index.find_solver_log(case_dir)
+    if log_file is None:
+        return result
 
-    for log_file in log_files:
-        try:
-            with open(log_file, 'r') as f:
-                content = f.read()
-
-            # Parse residuals using regex
-            # Pattern: "Solving for p, Initial residual = 0.123, Final residual = 0.001"
-            p_pattern = r"Solving for p,.*?Initial residual = ([\d.e+-]+)"
-            ux_pattern = r"Solving for Ux,.*?Initial residual = ([\d.e+-]+)"
-            k_pattern = r"Solving for k,.*?Initial residual = ([\d.e+-]+)"
-            omega_pattern = r"Solving for omega,.*?Initial residual = ([\d.e+-]+)"
-
-            p_matches = re.findall(p_pattern, content)
-            ux_matches = re.findall(ux_pattern, content)
-            k_matches = re.findall(k_pattern, content)
-            omega_matches = re.findall(omega_pattern, content)
-
-            if p_matches:
-                result["p"] = [float(x) for x in p_matches]
-                result["iterations"] = list(range(1, len(p_matches) + 1))
-            if ux_matches:
-                result["Ux"] = [float(x) for x in ux_matches]
-            if k_matches:
-                result["k"] = [float(x) for x in k_matches]
-            if omega_matches:
-                result["omega"] = [float(x) for x in omega_matches]
-
-            if result["iterations"]:
-                break  # Found data, stop searching
-
-        except Exception:
-            continue
+    try:
+        fields = [name for name in result if name != "iterations"]
+        records = log_index.records(log_file, [f"{name}_initial" for name in fields])
+    except Exception:
+        return result
+
+    for name in fields:
+        values = records.get(f"{name}_initial")
+        if values is not None and not np.isnan(values).all():
+            # NaN (not solved in that step) is the only value unequal to itself
+            result[name] = [v if v == v else None for v in values.tolist()]
+    if result["p"]:
+        result["iterations"] = list(range(1, len(result["p"]) + 1))
 
     return result
 
@@ -226,7 +226,9 @@ def detect_wheel_parts(case_dir: Path) -> List[str]:
     """
     Parse boundary file to find wheel sub-patches.
 
-    Looks for patches matching known wheel component names.
+    Looks for patches matching known wheel component names. A case that
+    was meshed in parallel and not reconstructed only has the background
+    mesh at case level, so its processor mesh is read instead.
 
     Args:
         case_dir: OpenFOAM case directory
@@ -234,23 +236,17 @@ def detect_wheel_parts(case_dir: Path) -> List[str]:
     Returns:
         List of detected part patch names
     """
-    boundary_file = case_dir / "constant" / "polyMesh" / "boundary"
+    processors = foam_mesh.processor_dirs(case_dir) if foam_mesh.decomposed(case_dir) else []
+    # Every processor mesh lists all of the case's patches
+    poly_mesh = foam_mesh.find_poly_mesh(processors[0] if processors else case_dir)
 
-    if not boundary_file.exists():
+    if poly_mesh is None:
         return []
 
     detected_parts = []
 
     try:
-        with open(boundary_file, 'r') as f:
-            content = f.read()
-
-        # Find all patch names in the boundary file
-        # Format: patchName { type ...; nFaces ...; startFace ...; }
-        patch_pattern = r'^\s*(\w+)\s*\n\s*\{'
-        matches = re.findall(patch_pattern, content, re.MULTILINE)
-
-        for patch_name in matches:
+        for patch_name in foam_mesh.read_boundary(poly_mesh):
             patch_lower = patch_name.lower()
             # Check if it matches any known wheel part name
             for known_part in KNOWN_WHEEL_PARTS:
@@ -302,43 +298,24 @@ def extract_per_part_forces(case_dir: Path) -> Dict:
         # Extract part name from directory (forceCoeffs_rim -> rim)
         part_name = force_dir.name.replace("forceCoeffs_", "")
 
-        # Find the data file
-        data_file = force_dir / "0" / "forceCoeffs.dat"
-        if not data_file.exists():
-            # Try latest time directory
-            time_dirs = sorted([d for d in force_dir.iterdir() if d.is_dir()])
-            if time_dirs:
-                data_file = time_dirs[-1] / "forceCoeffs.dat"
-
-        if not data_file.exists():
-            continue
-
-        # Parse the data file
+        # Latest row over every start-time directory
         try:
-            with open(data_file, 'r') as f:
-                lines = f.readlines()
-
-            # Get last non-comment line
-            for line in reversed(lines):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        Cm = float(parts[1])
-                        Cd = float(parts[2])
-                        Cl = float(parts[3])
-
-                        parts_data.append({
-                            "name": part_name,
-                            "Cd": Cd,
-                            "Cl": Cl,
-                            "Cm": Cm
-                        })
-                        total_cd += abs(Cd)
-                        break
+            parts = dat_reader.last_series_row(force_dir, "forceCoeffs.dat")
+            if parts is not None and len(parts) >= 4:
+                Cm = float(parts[1])
+                Cd = float(parts[2])
+                Cl = float(parts[3])
+
+                parts_data.append({
+                    "name": part_name,
+                    "Cd": Cd,
+                    "Cl": Cl,
+                    "Cm": Cm
+                })
+                total_cd += abs(Cd)
 
         except Exception as e:
-            print(f"Error parsing {data_file}: {e}")
+            print(f"Error parsing {force_dir}: {e}")
 
     # Calculate percentages
     if parts_data and total_cd > 0:
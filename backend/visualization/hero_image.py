@@ -5,18 +5,31 @@ Generates publication-quality 3D visualization of flow around the wheel
 using ParaView's Python API (pvpython) in headless mode.
 """
 
+import os
 import subprocess
 import tempfile
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple, Optional
 import shutil
 
+try:
+    from backend import foam_mesh
+except ImportError:
+    import foam_mesh
+
+
+# ParaView installation (pvpython executable and its Python modules)
+PVPYTHON = os.environ.get("WHEELFLOW_PVPYTHON", "pvpython")
+PARAVIEW_PYTHON_PATH = os.environ.get("WHEELFLOW_PARAVIEW_PYTHONPATH", "/usr/lib/paraview")
 
+
+@lru_cache(maxsize=1)
 def check_paraview_available() -> Tuple[bool, str]:
-    """Check if ParaView is available for rendering."""
+    """Check if ParaView is available for rendering (probed once per process)."""
     try:
         result = subprocess.run(
-            ["pvpython", "--version"],
+            [PVPYTHON, "--version"],
             capture_output=True,
             text=True,
             timeout=10
@@ -68,10 +81,13 @@ def generate_hero_image(case_dir: Path,
             "fallback": "Use OpenFOAM postProcess for basic visualization"
         }
 
+    # A case left decomposed is read from its processor directories
+    case_type = "Decomposed Case" if foam_mesh.decomposed(case_dir) else "Reconstructed Case"
+
     # Create the ParaView Python script
     pvscript = f'''
 import sys
-sys.path.insert(0, '/usr/lib/paraview')
+sys.path.insert(0, '{PARAVIEW_PYTHON_PATH}')
 
 from paraview.simple import *
 
@@ -88,6 +104,7 @@ if not os.path.exists(case_file):
         pass
 
 foam = OpenFOAMReader(FileName=case_file)
+foam.CaseType = '{case_type}'
 foam.MeshRegions = ['internalMesh', 'wheel']
 foam.CellArrays = ['U', 'p']
 
@@ -196,7 +213,7 @@ print("Hero image saved to {output_path}")
 
         # Run ParaView in headless mode
         result = subprocess.run(
-            ["pvpython", script_path],
+            [PVPYTHON, script_path],
             capture_output=True,
             text=True,
             timeout=300,  # 5 minute timeout
@@ -240,8 +257,9 @@ def generate_simple_hero_image(case_dir: Path, output_path: Path) -> dict:
         import matplotlib
         matplotlib.use('Agg')
         import matplotlib.pyplot as plt
-        import numpy as np
-        from scipy.interpolate import griddata
+        from backend.visualization.pressure_slices import (
+            AXIS_LABELS, draw_slice, plane_axes, read_slice, symmetric_range
+        )
 
         # Look for VTK slice data in postProcessing
         post_dir = case_dir / "postProcessing"
@@ -264,63 +282,22 @@ def generate_simple_hero_image(case_dir: Path, output_path: Path) -> dict:
             # Try to generate slice data by reading forceCoeffs
             return generate_placeholder_hero_image(case_dir, output_path)
 
-        # Parse VTK file
-        from backend.visualization.pressure_slices import parse_vtk_file
-        data = parse_vtk_file(vtk_file)
-
-        if not data or "error" in data or not data.get("points"):
+        # Read the slice with its own polygons (no interpolation grid)
+        data = read_slice(vtk_file)
+        if data is None:
             return generate_placeholder_hero_image(case_dir, output_path)
 
-        points = np.array(data["points"])
-        values = np.array(data["values"])
-        bounds = data["bounds"]
-
-        # Determine slice orientation
-        x_var = np.var(points[:, 0])
-        y_var = np.var(points[:, 1])
-        z_var = np.var(points[:, 2])
-
-        min_var = min(x_var, y_var, z_var)
-        if min_var == y_var:
-            # XZ plane slice (side view)
-            h_coord = points[:, 0]
-            v_coord = points[:, 2]
-            h_label, v_label = 'X (m)', 'Z (m)'
-            h_bounds = (bounds["x_min"], bounds["x_max"])
-            v_bounds = (bounds["z_min"], bounds["z_max"])
-        else:
-            # Default XZ view
-            h_coord = points[:, 0]
-            v_coord = points[:, 2]
-            h_label, v_label = 'X (m)', 'Z (m)'
-            h_bounds = (bounds["x_min"], bounds["x_max"])
-            v_bounds = (bounds["z_min"], bounds["z_max"])
-
-        # Create regular grid
-        resolution = 300
-        hi = np.linspace(h_bounds[0], h_bounds[1], resolution)
-        vi = np.linspace(v_bounds[0], v_bounds[1], resolution)
-        hi_grid, vi_grid = np.meshgrid(hi, vi)
-
-        # Interpolate values to grid
-        grid_values = griddata((h_coord, v_coord), values,
-                               (hi_grid, vi_grid), method='linear')
+        # In the slice's plane (side view for the preferred Y-slice)
+        axes = plane_axes(data["points"])
+        h_label, v_label = AXIS_LABELS[axes[0]], AXIS_LABELS[axes[1]]
 
         # Create figure
         fig, ax = plt.subplots(figsize=(16, 9), facecolor='#0f1419')
         ax.set_facecolor('#0f1419')
 
-        # Plot pressure contour
-        v_min, v_max = data["value_range"]["min"], data["value_range"]["max"]
-
-        # Center colormap around zero
-        if v_min < 0 < v_max:
-            v_abs = max(abs(v_min), abs(v_max))
-            v_min, v_max = -v_abs, v_abs
-
-        im = ax.pcolormesh(hi_grid, vi_grid, grid_values,
-                           cmap='RdBu_r', vmin=v_min, vmax=v_max,
-                           shading='auto')
+        # Plot pressure, colormap centred around zero
+        v_min, v_max = symmetric_range(data["value_range"])
+        im = draw_slice(ax, data, axes, 'RdBu_r', v_min, v_max)
 
         # Add colorbar
         cbar = plt.colorbar(im, ax=ax, label='Pressure (Pa)', shrink=0.8)
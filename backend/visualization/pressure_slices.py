@@ -1,13 +1,52 @@
 """
 Pressure Slice Visualization
 Generates 2D pressure/velocity slices through the flow domain
+
+Slice images are drawn from the cutting plane's own polygons: the VTK file
+(legacy or XML, ASCII or binary) is read into arrays (vtk_reader), the
+polygons are fan-triangulated and coloured with tripcolor, so no
+triangulation of the points is rebuilt per render. Slices written without
+polygons are Delaunay-triangulated once per geometry and cached.
+
+Rendering runs in the render pool's persistent workers: each worker keeps
+its matplotlib figures and colormaps and redraws into them, instead of
+creating a figure (and a pyplot figure manager) per image.
+
+Slice grids (.grid) carry a slice's field resampled to a regular grid, for
+the browser to colour with any colormap and range without a new render.
+All values little-endian; a 64-byte header:
+
+    offset  type        field
+    0       char[4]     magic "WFSG"
+    4       uint16      version (1)
+    6       uint16      flags: 1 = float16 values
+    8       uint32      width (columns, along the horizontal axis)
+    12      uint32      height (rows, along the vertical axis)
+    16      uint8[2]    horizontal and vertical axis (0 = x, 1 = y, 2 = z)
+    18      uint16      reserved (0)
+    20      float32[4]  extent: horizontal min, max, vertical min, max
+    36      float32[2]  value range (minimum, maximum)
+    44      float32     position of the plane along its normal axis
+    48      char[16]    field name (ASCII, NUL padded)
+
+followed by height rows of width float32 (or float16) values, the first
+row at the vertical minimum; NaN where the grid is outside the slice.
+Cell values are constant over their polygon, point values are
+interpolated linearly.
 """
 
+import hashlib
+import struct
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import subprocess
 import json
 
+import numpy as np
+
+from . import vtk_reader
+
 
 def generate_slice_function_object(positions: List[float] = None) -> str:
     """
@@ -211,95 +250,199 @@ def slice_to_image_data(slice_data: Dict, resolution: int = 100) -> Dict:
     }
 
 
-def parse_vtk_file(vtk_path: Path) -> Optional[Dict]:
+# Slice axes by the normal axis (smallest extent): horizontal, vertical
+PLANE_AXES = {0: (1, 2), 1: (0, 2), 2: (0, 1)}
+AXIS_LABELS = ["X (m)", "Y (m)", "Z (m)"]
+
+# Fields derived from the sampled p and U: name -> (source, part)
+DERIVED_FIELDS = {
+    "Cp": ("p", "cp"),
+    "magU": ("U", "mag"),
+    "Ux": ("U", 0),
+    "Uy": ("U", 1),
+    "Uz": ("U", 2),
+}
+
+# Delaunay triangulations of slices written without polygons
+MAX_CACHED_TRIANGULATIONS = 8
+_triangulations: "OrderedDict[str, object]" = OrderedDict()
+
+# Per render worker: figure, axes and colorbar axes by theme, and colormaps
+_figures: Dict[bool, Tuple] = {}
+_colormaps: Dict[str, object] = {}
+
+# Slice image width (inches); the height follows the slice
+FIGURE_WIDTH = 8
+
+THEMES = {
+    True: {"background": "#0f1419", "text": "#a0a0b0"},
+    False: {"background": "white", "text": "black"},
+}
+
+
+def slice_field(surface: Dict, field: str, speed: float = 13.9) -> Optional[Tuple[str, np.ndarray]]:
     """
-    Parse VTK legacy format file to extract points and pressure values.
+    Values of a field of a slice surface (vtk_reader), including the
+    fields derived from p and U (DERIVED_FIELDS).
 
-    Returns dict with points, values, and bounds.
+    Returns:
+        (location, values): "point" or "cell", one value each; None if the
+        slice does not have the field or it is not a scalar
     """
-    try:
-        with open(vtk_path, 'r') as f:
-            content = f.read()
+    source, part = DERIVED_FIELDS.get(field, (field, None))
+    for location in ("point", "cell"):
+        values = surface[f"{location}_data"].get(source)
+        if values is None:
+            continue
+        if part == "mag":
+            values = np.linalg.norm(values, axis=1)
+        elif part == "cp":
+            values = calculate_pressure_coefficient(values, speed)
+        elif part is not None:
+            values = values[:, part]
+        if values.ndim != 1:
+            return None
+        return location, values.astype(np.float64)
+    return None
 
-        # Parse VTK STRUCTURED_GRID or POLYDATA format
-        lines = content.split('\n')
-        points = []
-        values = []
-        reading_points = False
-        reading_scalars = False
-        n_points = 0
 
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
+def available_fields(surface: Dict) -> List[str]:
+    """Scalar and derived fields of a slice surface."""
+    names = [name for location in ("point", "cell")
+             for name, values in surface[f"{location}_data"].items() if values.ndim == 1]
+    return names + [name for name in DERIVED_FIELDS if slice_field(surface, name) is not None
+                    and name not in names]
 
-            if line.startswith('POINTS'):
-                parts = line.split()
-                n_points = int(parts[1])
-                reading_points = True
-                i += 1
-                continue
-
-            if reading_points and len(points) < n_points:
-                # Parse point coordinates
-                coords = line.split()
-                for j in range(0, len(coords), 3):
-                    if j + 2 < len(coords):
-                        points.append([
-                            float(coords[j]),
-                            float(coords[j + 1]),
-                            float(coords[j + 2])
-                        ])
-                i += 1
-                continue
-
-            if line.startswith('SCALARS') or line.startswith('POINT_DATA'):
-                reading_points = False
-
-            if line.startswith('SCALARS'):
-                # Next line is LOOKUP_TABLE, then data
-                i += 2  # Skip LOOKUP_TABLE line
-                reading_scalars = True
-                continue
-
-            if reading_scalars:
-                vals = line.split()
-                for v in vals:
-                    try:
-                        values.append(float(v))
-                    except ValueError:
-                        pass
-
-            i += 1
-
-        if not points or not values:
-            return None
 
-        # Compute bounds
-        xs = [p[0] for p in points]
-        ys = [p[1] for p in points]
-        zs = [p[2] for p in points]
+def read_slice(vtk_path: Path, field: Optional[str] = None, speed: float = 13.9) -> Optional[Dict]:
+    """
+    Read a slice surface and one of its scalar fields.
 
-        return {
-            "points": points,
-            "values": values[:len(points)],  # Ensure same length
-            "bounds": {
-                "x_min": min(xs), "x_max": max(xs),
-                "y_min": min(ys), "y_max": max(ys),
-                "z_min": min(zs), "z_max": max(zs)
-            },
-            "value_range": {
-                "min": min(values[:len(points)]) if values else 0,
-                "max": max(values[:len(points)]) if values else 1
-            }
-        }
+    Args:
+        field: Field to read, a scalar of the file or a derived field
+            (default p, or the first scalar field)
+        speed: Freestream speed (m/s) for Cp
+
+    Returns:
+        Dict with points, triangles, values (per point or per triangle),
+        location ("point" or "cell"), field, fields (all available),
+        bounds and value_range; None if the file has no points or not
+        the field
+    """
+    from .pressure_surface import triangulate
 
+    surface = vtk_reader.read_vtk(vtk_path)
+    if surface is None or not len(surface["points"]):
+        return None
+
+    fields = available_fields(surface)
+    if field is None:
+        field = "p" if "p" in fields else next(iter(fields), None)
+    found = slice_field(surface, field, speed) if field else None
+    if found is None:
+        return None
+    location, values = found
+
+    points = surface["points"]
+    triangles, tri_face = triangulate(surface["offsets"], surface["labels"])
+    if location == "cell":
+        values = values[tri_face]
+
+    lower, upper = points.min(axis=0), points.max(axis=0)
+    return {
+        "points": points,
+        "triangles": triangles,
+        "values": values,
+        "location": location,
+        "field": field,
+        "fields": fields,
+        "bounds": {f"{axis}_{end}": float(bound[k])
+                   for k, axis in enumerate("xyz") for end, bound in (("min", lower), ("max", upper))},
+        "value_range": {"min": float(values.min()), "max": float(values.max())},
+    }
+
+
+def parse_vtk_file(vtk_path: Path) -> Optional[Dict]:
+    """
+    Parse a VTK slice file to extract points and pressure values.
+
+    Returns dict with points, values (per point or per triangle, see
+    read_slice), bounds and value_range.
+    """
+    try:
+        return read_slice(vtk_path)
     except Exception as e:
         return {"error": str(e)}
 
 
+def plane_axes(points: np.ndarray) -> Tuple[int, int]:
+    """Horizontal and vertical axes of a slice (the normal has the least variance)."""
+    return PLANE_AXES[int(np.argmin(points.var(axis=0)))]
+
+
+def slice_triangulation(h_coord: np.ndarray, v_coord: np.ndarray, triangles: np.ndarray):
+    """
+    matplotlib Triangulation of a slice in plane coordinates: its own
+    triangles, or a cached Delaunay triangulation if it has none.
+    """
+    import matplotlib.tri as mtri
+
+    if len(triangles):
+        return mtri.Triangulation(h_coord, v_coord, triangles)
+
+    key = hashlib.blake2b(h_coord.tobytes() + v_coord.tobytes(), digest_size=16).hexdigest()
+    if key in _triangulations:
+        _triangulations.move_to_end(key)
+    else:
+        _triangulations[key] = mtri.Triangulation(h_coord, v_coord)
+        if len(_triangulations) > MAX_CACHED_TRIANGULATIONS:
+            _triangulations.popitem(last=False)
+    return _triangulations[key]
+
+
+def draw_slice(ax, slice_data: Dict, axes: Tuple[int, int], colormap: str, v_min: float, v_max: float):
+    """Draw a slice (read_slice) on ax with tripcolor; returns the mappable."""
+    points = slice_data["points"]
+    triangulation = slice_triangulation(points[:, axes[0]], points[:, axes[1]], slice_data["triangles"])
+    if slice_data["location"] == "cell" and len(slice_data["triangles"]):
+        return ax.tripcolor(triangulation, facecolors=slice_data["values"],
+                            cmap=get_colormap(colormap), vmin=v_min, vmax=v_max)
+    return ax.tripcolor(triangulation, slice_data["values"], shading="gouraud",
+                        cmap=get_colormap(colormap), vmin=v_min, vmax=v_max)
+
+
+def symmetric_range(value_range: Dict) -> Tuple[float, float]:
+    """Colour range of values, centred on zero if they span it."""
+    v_min, v_max = value_range["min"], value_range["max"]
+    if v_min < 0 < v_max:
+        v_abs = max(abs(v_min), abs(v_max))
+        v_min, v_max = -v_abs, v_abs
+    return v_min, v_max
+
+
+def get_colormap(name: str):
+    """A matplotlib colormap, looked up once per worker (the registry copies)."""
+    if name not in _colormaps:
+        import matplotlib
+        _colormaps[name] = matplotlib.colormaps[name]
+    return _colormaps[name]
+
+
+def slice_figure(dark_theme: bool) -> Tuple:
+    """The worker's figure for slice images: (figure, axes, colorbar axes)."""
+    if dark_theme not in _figures:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        figure = Figure(figsize=(FIGURE_WIDTH, 6), facecolor=THEMES[dark_theme]["background"])
+        FigureCanvasAgg(figure)
+        ax = figure.add_axes([0.1, 0.1, 0.68, 0.8])
+        cax = figure.add_axes([0.82, 0.1, 0.03, 0.8])
+        _figures[dark_theme] = (figure, ax, cax)
+    return _figures[dark_theme]
+
+
 def render_vtk_slice_image(vtk_path: Path, output_path: Path,
-                            resolution: int = 400,
                             colormap: str = 'RdBu_r',
                             dark_theme: bool = True) -> Dict:
     """
@@ -308,7 +451,6 @@ def render_vtk_slice_image(vtk_path: Path, output_path: Path,
     Args:
         vtk_path: Path to VTK file
         output_path: Path to save PNG image
-        resolution: Grid resolution for interpolation
         colormap: Matplotlib colormap name
         dark_theme: Use dark background
 
@@ -316,109 +458,55 @@ def render_vtk_slice_image(vtk_path: Path, output_path: Path,
         dict with status and image info
     """
     try:
-        import matplotlib
-        matplotlib.use('Agg')  # Non-GUI backend
-        import matplotlib.pyplot as plt
-        import numpy as np
-        from scipy.interpolate import griddata
-
-        # Parse VTK file
-        data = parse_vtk_file(vtk_path)
-        if not data or "error" in data:
-            return {"success": False, "error": data.get("error", "Could not parse VTK file")}
-
-        points = np.array(data["points"])
-        values = np.array(data["values"])
-        bounds = data["bounds"]
-
-        # Determine slice orientation based on coordinate variance
-        x_var = np.var(points[:, 0])
-        y_var = np.var(points[:, 1])
-        z_var = np.var(points[:, 2])
-
-        min_var = min(x_var, y_var, z_var)
-        if min_var == x_var:
-            # YZ plane slice
-            h_coord = points[:, 1]
-            v_coord = points[:, 2]
-            h_label, v_label = 'Y (m)', 'Z (m)'
-            h_bounds = (bounds["y_min"], bounds["y_max"])
-            v_bounds = (bounds["z_min"], bounds["z_max"])
-        elif min_var == y_var:
-            # XZ plane slice
-            h_coord = points[:, 0]
-            v_coord = points[:, 2]
-            h_label, v_label = 'X (m)', 'Z (m)'
-            h_bounds = (bounds["x_min"], bounds["x_max"])
-            v_bounds = (bounds["z_min"], bounds["z_max"])
-        else:
-            # XY plane slice
-            h_coord = points[:, 0]
-            v_coord = points[:, 1]
-            h_label, v_label = 'X (m)', 'Y (m)'
-            h_bounds = (bounds["x_min"], bounds["x_max"])
-            v_bounds = (bounds["y_min"], bounds["y_max"])
-
-        # Create regular grid
-        hi = np.linspace(h_bounds[0], h_bounds[1], resolution)
-        vi = np.linspace(v_bounds[0], v_bounds[1], resolution)
-        hi_grid, vi_grid = np.meshgrid(hi, vi)
-
-        # Interpolate values to grid
-        grid_values = griddata((h_coord, v_coord), values,
-                               (hi_grid, vi_grid), method='linear')
-
-        # Create figure with dark theme
-        if dark_theme:
-            plt.style.use('dark_background')
-            fig_bg = '#0f1419'
-            text_color = '#a0a0b0'
-        else:
-            fig_bg = 'white'
-            text_color = 'black'
-
-        fig, ax = plt.subplots(figsize=(8, 6), facecolor=fig_bg)
-        ax.set_facecolor(fig_bg)
-
-        # Plot pressure contour
-        v_min, v_max = data["value_range"]["min"], data["value_range"]["max"]
-
-        # Center colormap around zero if range spans zero
-        if v_min < 0 < v_max:
-            v_abs = max(abs(v_min), abs(v_max))
-            v_min, v_max = -v_abs, v_abs
-
-        im = ax.pcolormesh(hi_grid, vi_grid, grid_values,
-                           cmap=colormap, vmin=v_min, vmax=v_max,
-                           shading='auto')
-
-        # Add colorbar
-        cbar = plt.colorbar(im, ax=ax, label='Pressure (Pa)')
-        cbar.ax.yaxis.label.set_color(text_color)
-        cbar.ax.tick_params(colors=text_color)
-
-        # Labels and title
-        ax.set_xlabel(h_label, color=text_color)
-        ax.set_ylabel(v_label, color=text_color)
-        ax.tick_params(colors=text_color)
-        ax.set_aspect('equal')
-
-        # Determine title from file name
-        slice_name = vtk_path.stem
-        ax.set_title(f'Pressure Distribution - {slice_name}',
-                     color=text_color, fontsize=12)
-
-        # Save image
-        plt.tight_layout()
-        plt.savefig(output_path, dpi=150, facecolor=fig_bg,
-                    bbox_inches='tight', pad_inches=0.1)
-        plt.close(fig)
+        data = read_slice(vtk_path)
+        if data is None:
+            return {"success": False, "error": "Could not parse VTK file"}
+
+        theme = THEMES[dark_theme]
+        text_color = theme["text"]
+        figure, ax, cax = slice_figure(dark_theme)
+        try:
+            ax.set_facecolor(theme["background"])
+            axes = plane_axes(data["points"])
+            # Figure height follows the slice's shape (cheaper than a
+            # tight bounding box, which draws the figure twice)
+            extent = np.ptp(data["points"][:, axes], axis=0)
+            plot_height = FIGURE_WIDTH * 0.68 * extent[1] / max(extent[0], 1e-12)
+            figure.set_size_inches(FIGURE_WIDTH, min(max(plot_height / 0.8, 3.0), 8.0))
+            v_min, v_max = symmetric_range(data["value_range"])
+            mappable = draw_slice(ax, data, axes, colormap, v_min, v_max)
+
+            # Add colorbar
+            cbar = figure.colorbar(mappable, cax=cax, label='Pressure (Pa)')
+            cbar.ax.yaxis.label.set_color(text_color)
+            cbar.ax.tick_params(colors=text_color)
+
+            # Labels and title
+            ax.set_xlabel(AXIS_LABELS[axes[0]], color=text_color)
+            ax.set_ylabel(AXIS_LABELS[axes[1]], color=text_color)
+            ax.tick_params(colors=text_color)
+            for spine in list(ax.spines.values()) + list(cax.spines.values()):
+                spine.set_color(text_color)
+            ax.set_aspect('equal')
+            ax.set_title(f'Pressure Distribution - {vtk_path.stem}',
+                         color=text_color, fontsize=12)
+            # Colorbar as tall as the plot, which the aspect ratio shrinks
+            ax.apply_aspect()
+            box = ax.get_position()
+            cax.set_position([box.x1 + 0.03, box.y0, 0.03, box.height])
+
+            figure.savefig(output_path, dpi=150, facecolor=theme["background"])
+        finally:
+            # The figure is reused; drop this slice's artists
+            ax.clear()
+            cax.clear()
 
         return {
             "success": True,
             "output_path": str(output_path),
-            "resolution": resolution,
-            "bounds": bounds,
+            "field": data["field"],
+            "n_triangles": len(data["triangles"]),
+            "bounds": data["bounds"],
             "value_range": data["value_range"]
         }
 
@@ -426,3 +514,172 @@ def render_vtk_slice_image(vtk_path: Path, output_path: Path,
         return {"success": False, "error": f"Missing dependency: {e}"}
     except Exception as e:
         return {"success": False, "error": str(e)}
+
+
+GRID_MAGIC = b"WFSG"
+GRID_VERSION = 1
+GRID_HEADER = struct.Struct("<4sHHIIBBH4f2ff16s")
+GRID_FLOAT16 = 1
+
+# Longest side of a slice grid: default and limit
+GRID_RESOLUTION = 400
+MAX_GRID_RESOLUTION = 2048
+
+# Grid cells tested per rasterization chunk (bounds memory)
+RASTER_CHUNK = 1 << 20
+
+
+def rasterize(h_coord: np.ndarray, v_coord: np.ndarray, triangles: np.ndarray, values: np.ndarray,
+              location: str, extent: Tuple[float, float, float, float], width: int, height: int) -> np.ndarray:
+    """
+    Triangles sampled at the centres of a width x height grid over extent
+    (rows along v): point values interpolated with barycentric weights,
+    cell values (one per triangle) constant; NaN outside all triangles.
+    """
+    grid = np.full((height, width), np.nan, dtype=np.float32)
+    if not len(triangles):
+        return grid
+    h_min, h_max, v_min, v_max = extent
+    # Corners in grid coordinates: cell (i, j) has its centre at (i, j)
+    x = (h_coord[triangles] - h_min) / max(h_max - h_min, 1e-30) * width - 0.5
+    y = (v_coord[triangles] - v_min) / max(v_max - v_min, 1e-30) * height - 0.5
+
+    # Grid cells within each triangle's bounding box
+    i0 = np.maximum(np.ceil(x.min(axis=1)), 0).astype(np.int64)
+    i1 = np.minimum(np.floor(x.max(axis=1)), width - 1).astype(np.int64)
+    j0 = np.maximum(np.ceil(y.min(axis=1)), 0).astype(np.int64)
+    j1 = np.minimum(np.floor(y.max(axis=1)), height - 1).astype(np.int64)
+    ni, nj = np.maximum(i1 - i0 + 1, 0), np.maximum(j1 - j0 + 1, 0)
+    counts = ni * nj
+    ends = np.cumsum(counts)
+    firsts = ends - counts
+
+    start = 0
+    while start < len(triangles):
+        stop = max(int(np.searchsorted(ends, firsts[start] + RASTER_CHUNK, side="right")), start + 1)
+        tri = np.repeat(np.arange(start, stop), counts[start:stop])
+        # k-th cell of each triangle's bounding box
+        k = np.arange(firsts[start], ends[stop - 1]) - firsts[tri]
+        i = i0[tri] + k % ni[tri]
+        j = j0[tri] + k // ni[tri]
+
+        # Barycentric weights of the cell centres
+        (x1, x2, x3), (y1, y2, y3) = x[tri].T, y[tri].T
+        det = (y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3)
+        safe = np.where(det != 0, det, 1)
+        w1 = ((y2 - y3) * (i - x3) + (x3 - x2) * (j - y3)) / safe
+        w2 = ((y3 - y1) * (i - x3) + (x1 - x3) * (j - y3)) / safe
+        w3 = 1 - w1 - w2
+        inside = (det != 0) & (w1 >= -1e-9) & (w2 >= -1e-9) & (w3 >= -1e-9)
+
+        if location == "cell":
+            sampled = values[tri]
+        else:
+            corner = values[triangles[tri]]
+            sampled = w1 * corner[:, 0] + w2 * corner[:, 1] + w3 * corner[:, 2]
+        grid[j[inside], i[inside]] = sampled[inside]
+        start = stop
+    return grid
+
+
+def resample_slice(slice_data: Dict, resolution: int = GRID_RESOLUTION) -> Dict:
+    """
+    A slice (read_slice) resampled to a regular grid in its plane, with
+    resolution cells along its longer side.
+
+    Returns:
+        Dict with values (height x width float32), axes, extent, plane
+        (position along the normal), field and value_range
+    """
+    points = slice_data["points"]
+    axes = plane_axes(points)
+    normal = 3 - sum(axes)
+    h_coord, v_coord = points[:, axes[0]], points[:, axes[1]]
+    extent = (float(h_coord.min()), float(h_coord.max()), float(v_coord.min()), float(v_coord.max()))
+    h_size, v_size = extent[1] - extent[0], extent[3] - extent[2]
+    resolution = min(max(int(resolution), 2), MAX_GRID_RESOLUTION)
+    if h_size >= v_size:
+        width, height = resolution, max(2, round(resolution * v_size / max(h_size, 1e-30)))
+    else:
+        width, height = max(2, round(resolution * h_size / v_size)), resolution
+
+    triangles = slice_data["triangles"]
+    location = slice_data["location"]
+    if not len(triangles):
+        # Points only: the cached Delaunay triangulation
+        triangles = slice_triangulation(h_coord, v_coord, triangles).triangles
+        location = "point"
+    values = rasterize(h_coord, v_coord, triangles, slice_data["values"], location, extent, width, height)
+    return {
+        "values": values,
+        "axes": axes,
+        "extent": extent,
+        "plane": float(points[:, normal].mean()),
+        "field": slice_data["field"],
+        "value_range": slice_data["value_range"],
+    }
+
+
+def encode_grid(grid: Dict, float16: bool = False) -> bytes:
+    """A resampled slice (resample_slice) in the slice grid format (see module docs)."""
+    values = grid["values"]
+    height, width = values.shape
+    header = GRID_HEADER.pack(GRID_MAGIC, GRID_VERSION, GRID_FLOAT16 if float16 else 0, width, height,
+                              grid["axes"][0], grid["axes"][1], 0, *grid["extent"],
+                              grid["value_range"]["min"], grid["value_range"]["max"], grid["plane"],
+                              grid["field"].encode("ascii", "replace")[:16])
+    return header + values.astype("<f2" if float16 else "<f4").tobytes()
+
+
+def decode_grid(data: bytes) -> Dict:
+    """Arrays and metadata of a slice grid."""
+    (magic, version, flags, width, height, h_axis, v_axis, _,
+     h_min, h_max, v_min, v_max, low, high, plane, field) = GRID_HEADER.unpack_from(data)
+    if magic != GRID_MAGIC or version != GRID_VERSION:
+        raise ValueError("Not a version 1 WheelFlow slice grid")
+    dtype = "<f2" if flags & GRID_FLOAT16 else "<f4"
+    values = np.frombuffer(data, dtype=dtype, count=width * height, offset=GRID_HEADER.size)
+    return {
+        "values": values.astype(np.float32).reshape(height, width),
+        "axes": (h_axis, v_axis),
+        "extent": (h_min, h_max, v_min, v_max),
+        "plane": plane,
+        "field": field.rstrip(b"\0").decode("ascii"),
+        "value_range": {"min": low, "max": high},
+    }
+
+
+def export_slice_grid(vtk_path: Path, output_path: Path, field: str = "p", speed: float = 13.9,
+                      resolution: int = GRID_RESOLUTION, float16: bool = False) -> Dict:
+    """
+    Resample a slice's field to a grid and write it in the slice grid
+    format, with a gzip copy and ETag file (pressure_surface.write_encoded).
+
+    Returns:
+        dict with status, etag, fields of the slice, grid size and file sizes
+    """
+    from .pressure_surface import write_encoded
+
+    try:
+        data = read_slice(vtk_path, field, speed)
+        if data is None:
+            surface = vtk_reader.read_vtk(vtk_path)
+            fields = available_fields(surface) if surface else []
+            return {"success": False, "error": f"Field {field} not in slice", "fields": fields}
+
+        grid = resample_slice(data, resolution)
+        etag, sizes = write_encoded(encode_grid(grid, float16), output_path)
+        height, width = grid["values"].shape
+        return {
+            "success": True,
+            "output_path": str(output_path),
+            "etag": etag,
+            "sizes": sizes,
+            "field": field,
+            "fields": data["fields"],
+            "width": width,
+            "height": height,
+        }
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
@@ -3,74 +3,123 @@
 
 Exports the wheel surface with pressure values for interactive
 3D visualization in the browser using Three.js.
+
+The export works on whole arrays: faces are fan-triangulated with index
+arithmetic, OpenFOAM's face-centred pressure is averaged to the points
+weighted by face area, and converted to Cp = p / (0.5 U^2) (p is
+kinematic). PLY and JSON files are written from those arrays in one call.
+
+Binary surface format (.bin), for the viewer to load into typed arrays
+without parsing. All values little-endian; a 64-byte header:
+
+    offset  type        field
+    0       char[4]     magic "WFSF"
+    4       uint16      version (1)
+    6       uint16      flags: 1 = positions quantized, 2 = Cp quantized,
+                        4 = 16-bit indices, 8 = Cp present
+    8       uint32      number of vertices (n)
+    12      uint32      number of triangles (m)
+    16      uint32      number of (untriangulated) patch faces
+    20      float32[3]  position bounds, minimum
+    32      float32[3]  position bounds, maximum
+    44      float32[2]  Cp range (minimum, maximum)
+    52      float32[2]  pressure range, kinematic (minimum, maximum)
+    60      uint32      reserved (0)
+
+followed by sections, each starting on a 4-byte boundary:
+
+    positions   n x 3 float32, or uint16 q with x = min + q / 65535 * (max - min)
+    cp          n float32, or uint16 q with cp = cp_min + q / 65535 * (cp_max - cp_min)
+                (only if flag 8)
+    indices     m x 3 uint32, or uint16 (flag 4, when n <= 65536)
+
+Quantizing positions and Cp to 16 bits halves those sections; on a wheel
+positions stay within about 10 micrometres. The file is also written
+gzip- (and, with the brotli package, brotli-) compressed for serving.
+
+Levels of detail: next to the full surface, decimated copies for smaller
+triangle budgets (surface_lod) are written in the same format as
+<stem>.lod1.bin, <stem>.lod2.bin, ... (coarser each time), and an index of
+all levels, full surface first, to <output>.lods.json:
+
+    {"levels": [{"file": "pressure_surface.bin", "triangles": 1000000,
+                 "vertices": 500000, "etag": "..."}, ...]}
+
+The viewer paints a coarse level first and loads the full surface on
+demand.
+
+Configuration (environment variables):
+    WHEELFLOW_SURFACE_LOD_TRIANGLES: Comma-separated triangle budgets of the
+        levels of detail (default: 250000,50000,10000; empty for none)
 """
 
-import struct
+import gzip
+import hashlib
 import json
+import os
+import struct
+import uuid
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-import re
+
+import numpy as np
+
+from .pressure_slices import calculate_pressure_coefficient
+from . import surface_lod
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SURFACE_MAGIC = b"WFSF"
+SURFACE_VERSION = 1
+SURFACE_HEADER = struct.Struct("<4sHHIII3f3f2f2fI")
+QUANTIZED_POSITIONS, QUANTIZED_CP, SHORT_INDICES, HAS_CP = 1, 2, 4, 8
+# Content-Encoding -> suffix of the precompressed copy
+ENCODING_SUFFIXES = {"br": "br", "gzip": "gz"}
+
+LOD_TRIANGLES = [int(budget) for budget in
+                 os.environ.get("WHEELFLOW_SURFACE_LOD_TRIANGLES", "250000,50000,10000").split(",")
+                 if budget.strip()]
+
+# ASCII digits of 000..999, for formatting numbers three digits at a time
+DIGIT_GROUPS = np.array([list(f"{k:03d}".encode()) for k in range(1000)], dtype=np.uint8)
+
+try:
+    from backend import foam_mesh
+except ImportError:
+    import foam_mesh
 
 
 def parse_openfoam_boundary_mesh(case_dir: Path, patch_name: str = "wheel") -> Optional[Dict]:
     """
     Parse OpenFOAM boundary mesh to extract wheel surface geometry.
 
+    Only the patch's faces and the points they use are read (foam_mesh),
+    from ASCII or binary polyMesh files, or from the processor directories
+    of a case that was not reconstructed.
+
     Args:
         case_dir: OpenFOAM case directory
         patch_name: Name of the patch to extract
 
     Returns:
-        dict with vertices, faces, and face centers
+        dict with points (those of the patch) and faces (indexing points)
     """
-    # Find the polyMesh directory (could be in constant or latest time)
-    poly_mesh = case_dir / "constant" / "polyMesh"
-    if not poly_mesh.exists():
-        # Try reconstructed mesh
-        time_dirs = sorted([d for d in case_dir.iterdir() if d.is_dir() and d.name.replace('.', '').isdigit()])
-        if time_dirs:
-            poly_mesh = time_dirs[-1] / "polyMesh"
-
-    if not poly_mesh.exists():
-        return None
-
     try:
-        # Read boundary file to find patch faces
-        boundary_file = poly_mesh / "boundary"
-        if not boundary_file.exists():
-            return None
-
-        boundary_content = boundary_file.read_text()
-
-        # Parse boundary to find wheel patch
-        # OpenFOAM format: patchName { type ...; nFaces N; startFace S; }
-        patch_pattern = rf'{patch_name}\s*\{{\s*type\s+(\w+);\s*nFaces\s+(\d+);\s*startFace\s+(\d+);'
-        match = re.search(patch_pattern, boundary_content)
-
-        if not match:
+        patch = foam_mesh.read_case_patch(case_dir, patch_name)
+        if patch is None:
             return None
 
-        patch_type = match.group(1)
-        n_faces = int(match.group(2))
-        start_face = int(match.group(3))
-
-        # Read points
-        points_file = poly_mesh / "points"
-        points = parse_openfoam_vector_file(points_file)
-
-        # Read faces
-        faces_file = poly_mesh / "faces"
-        all_faces = parse_openfoam_faces_file(faces_file)
-
-        # Extract only the patch faces
-        patch_faces = all_faces[start_face:start_face + n_faces]
-
+        offsets, labels = patch["offsets"], patch["labels"]
+        faces = [face.tolist() for face in np.split(labels, offsets[1:-1])] if patch["n_faces"] else []
         return {
-            "points": points,
-            "faces": patch_faces,
-            "n_faces": n_faces,
+            "points": [tuple(point) for point in patch["points"].tolist()],
+            "faces": faces,
+            "n_faces": patch["n_faces"],
             "patch_name": patch_name,
-            "patch_type": patch_type
+            "patch_type": patch["type"]
         }
 
     except Exception as e:
@@ -79,223 +128,251 @@ def parse_openfoam_boundary_mesh(case_dir: Path, patch_name: str = "wheel") -> O
 
 def parse_openfoam_vector_file(file_path: Path) -> List[Tuple[float, float, float]]:
     """Parse OpenFOAM vector field file (like points)."""
-    content = file_path.read_text()
-
-    # Find the data section (after the FoamFile header)
-    # OpenFOAM format: N ( (x y z) (x y z) ... )
-    data_match = re.search(r'\)\s*(\d+)\s*\((.*)\)', content, re.DOTALL)
-
-    if not data_match:
-        # Try alternative format
-        lines = content.split('\n')
-        points = []
-        in_data = False
-        for line in lines:
-            line = line.strip()
-            if line.startswith('(') and not in_data:
-                in_data = True
-                continue
-            if in_data:
-                if line == ')':
-                    break
-                # Parse (x y z) format
-                if line.startswith('(') and line.endswith(')'):
-                    coords = line[1:-1].split()
-                    if len(coords) >= 3:
-                        points.append((float(coords[0]), float(coords[1]), float(coords[2])))
-        return points
-
-    n_points = int(data_match.group(1))
-    data_str = data_match.group(2)
-
-    # Parse individual points
-    point_pattern = r'\(([^)]+)\)'
-    matches = re.findall(point_pattern, data_str)
-
-    points = []
-    for match in matches[:n_points]:
-        coords = match.split()
-        if len(coords) >= 3:
-            points.append((float(coords[0]), float(coords[1]), float(coords[2])))
-
-    return points
+    return [tuple(point) for point in foam_mesh.read_points(file_path).tolist()]
 
 
 def parse_openfoam_faces_file(file_path: Path) -> List[List[int]]:
-    """Parse OpenFOAM faces file."""
-    content = file_path.read_text()
-
-    # Find data section
-    lines = content.split('\n')
-    faces = []
-    in_data = False
-    brace_count = 0
-
-    for line in lines:
-        line = line.strip()
-
-        if not in_data:
-            # Look for start of face list
-            if line.isdigit():
-                in_data = True
-            continue
-
-        if line == '(':
-            brace_count += 1
-            continue
-        if line == ')':
-            brace_count -= 1
-            if brace_count <= 0:
-                break
-            continue
-
-        # Parse face: N(v1 v2 v3 ...)
-        match = re.match(r'(\d+)\(([^)]+)\)', line)
-        if match:
-            n_verts = int(match.group(1))
-            verts = [int(v) for v in match.group(2).split()]
-            faces.append(verts[:n_verts])
-
-    return faces
-
-
-def read_pressure_field(case_dir: Path, time: str = "latestTime") -> Optional[Dict]:
+    """Parse OpenFOAM faces file (faceList or faceCompactList)."""
+    offsets, labels = foam_mesh.read_faces(file_path)
+    if len(offsets) < 2:
+        return []
+    return [face.tolist() for face in np.split(labels, offsets[1:-1])]
+
+
+def read_pressure_field(case_dir: Path, time: str = "latestTime",
+                        patch_name: str = "wheel") -> Optional[Dict]:
     """
     Read pressure field from OpenFOAM results.
 
+    Values of a decomposed case come from its processor directories, in
+    the face order of parse_openfoam_boundary_mesh.
+
     Args:
         case_dir: Case directory
         time: Time step to read ("latestTime" for latest)
+        patch_name: Patch whose values are read
 
     Returns:
         dict with boundary field values
     """
-    # Find time directory
-    if time == "latestTime":
-        time_dirs = sorted([d for d in case_dir.iterdir()
-                            if d.is_dir() and d.name.replace('.', '').isdigit()],
-                           key=lambda x: float(x.name))
-        if not time_dirs:
+    try:
+        values = foam_mesh.read_case_patch_field(case_dir, "p", patch_name,
+                                                 time=None if time == "latestTime" else time)
+        if values is None:
             return None
-        time_dir = time_dirs[-1]
-    else:
-        time_dir = case_dir / time
+        if isinstance(values, float):
+            # Single value for all faces
+            return {"type": "uniform", "value": values}
+        return {"type": "nonuniform", "values": values.tolist(), "count": len(values)}
 
-    p_file = time_dir / "p"
-    if not p_file.exists():
-        return None
+    except Exception as e:
+        return {"error": str(e)}
 
-    try:
-        content = p_file.read_text()
-
-        # Parse boundary field values
-        # Look for: wheel { type ...; value uniform X; } or value nonuniform List<scalar>
-        wheel_pattern = r'wheel\s*\{[^}]*value\s+(uniform\s+[\d.e+-]+|nonuniform\s+List<scalar>[^;]+);'
-        match = re.search(wheel_pattern, content, re.DOTALL)
-
-        if match:
-            value_str = match.group(1)
-            if value_str.startswith('uniform'):
-                # Single value for all faces
-                value = float(value_str.split()[1])
-                return {"type": "uniform", "value": value}
-            else:
-                # Non-uniform - parse list
-                # Format: nonuniform List<scalar> N ( v1 v2 ... )
-                list_pattern = r'List<scalar>\s*(\d+)\s*\(([^)]+)\)'
-                list_match = re.search(list_pattern, value_str)
-                if list_match:
-                    n = int(list_match.group(1))
-                    values = [float(v) for v in list_match.group(2).split()]
-                    return {"type": "nonuniform", "values": values[:n], "count": n}
 
+def triangulate(offsets: np.ndarray, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fan-triangulate polygon faces (quads as (0 1 2), (0 2 3)).
+
+    Returns:
+        (triangles, n x 3 point indices; face index of each triangle)
+    """
+    sizes = np.diff(offsets)
+    tri_counts = np.maximum(sizes - 2, 0)
+    tri_face = np.repeat(np.arange(len(sizes)), tri_counts)
+    # Position of each triangle within its face, 1..size-2
+    first_tri = np.cumsum(tri_counts) - tri_counts
+    j = np.arange(len(tri_face)) - first_tri[tri_face] + 1
+    start = offsets[:-1][tri_face]
+    triangles = np.stack([labels[start], labels[start + j], labels[start + j + 1]], axis=1)
+    return triangles.astype(np.int32), tri_face
+
+
+def triangle_areas(points: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """Area of each triangle."""
+    origin = points[triangles[:, 0]]
+    ax, ay, az = (points[triangles[:, 1]] - origin).T
+    bx, by, bz = (points[triangles[:, 2]] - origin).T
+    # |a x b| / 2, written out (faster than np.cross on n x 3 arrays)
+    return 0.5 * np.sqrt((ay * bz - az * by) ** 2 + (az * bx - ax * bz) ** 2 + (ax * by - ay * bx) ** 2)
+
+
+def vertex_values(offsets: np.ndarray, labels: np.ndarray, face_values: np.ndarray,
+                  face_areas: np.ndarray, n_points: int) -> np.ndarray:
+    """
+    Face-centred values averaged to the points, weighted by face area.
+
+    The average is the product of the point-face incidence matrix (one
+    entry per face label) with the area-weighted values, summed per point
+    with bincount.
+    """
+    label_face = np.repeat(np.arange(len(face_values)), np.diff(offsets))
+    weights = face_areas[label_face]
+    total = np.bincount(labels, weights=weights * face_values[label_face], minlength=n_points)
+    area = np.bincount(labels, weights=weights, minlength=n_points)
+    return total / np.where(area > 0, area, 1)
+
+
+def diverging_colors(values: np.ndarray, value_range: Tuple[float, float]) -> np.ndarray:
+    """Blue-white-red colours (uint8 RGB) of values over value_range."""
+    low, high = value_range
+    t = np.clip((values - low) / max(high - low, 1e-10), 0, 1)
+    colors = np.empty((len(values), 3), dtype=np.float64)
+    # Blue to white below the middle, white to red above
+    colors[:, 0] = np.minimum(2 * t, 1)
+    colors[:, 1] = 1 - np.abs(2 * t - 1)
+    colors[:, 2] = np.minimum(2 - 2 * t, 1)
+    return np.round(colors * 255).astype(np.uint8)
+
+
+def read_surface(case_dir: Path, patch_name: str = "wheel", speed: float = 13.9) -> Optional[Dict]:
+    """
+    The patch as triangles with pressure on faces and Cp on points.
+
+    Args:
+        case_dir: OpenFOAM case directory (reconstructed or decomposed)
+        patch_name: Patch to read
+        speed: Freestream speed (m/s) that Cp is relative to
+
+    Returns:
+        dict of arrays: points (n x 3), triangles (m x 3), face_p (per
+        original face), vertex_cp (per point); face_p and vertex_cp are
+        None without a pressure field. None if there is no such patch.
+    """
+    patch = foam_mesh.read_case_patch(case_dir, patch_name)
+    if patch is None:
         return None
 
-    except Exception as e:
-        return {"error": str(e)}
+    points = patch["points"]
+    offsets, labels = patch["offsets"], patch["labels"]
+    triangles, tri_face = triangulate(offsets, labels)
+
+    face_p = foam_mesh.read_case_patch_field(case_dir, "p", patch_name)
+    vertex_cp = None
+    if face_p is not None:
+        face_p = np.broadcast_to(np.asarray(face_p, dtype=np.float64), (patch["n_faces"],))
+        # Face area = sum of its triangles' areas
+        face_areas = np.bincount(tri_face, weights=triangle_areas(points, triangles),
+                                 minlength=patch["n_faces"])
+        vertex_p = vertex_values(offsets, labels, face_p, face_areas, len(points))
+        vertex_cp = calculate_pressure_coefficient(vertex_p, U_inf=speed)
+
+    return {
+        "points": points,
+        "triangles": triangles,
+        "face_p": face_p,
+        "vertex_cp": vertex_cp,
+        "n_faces": patch["n_faces"],
+    }
+
+
+def json_array(values: np.ndarray, decimals: int = 0, chunk: int = 1 << 20) -> bytes:
+    """
+    JSON text of a numeric array, formatted with array arithmetic.
+
+    Numbers are written in fixed point with up to decimals digits after
+    the point (trailing zeros dropped): each row of a character table is
+    filled from 3-digit lookups and the characters kept are selected by a
+    mask, which is many times faster than encoding each float's repr.
+    Falls back to json for values that are not finite or too large.
+    """
+    values = np.asarray(values).ravel()
+    if not len(values):
+        return b"[]"
+    scale = 10 ** decimals
+    magnitude = np.abs(values.astype(np.float64))
+    if not np.isfinite(magnitude).all() or magnitude.max() * scale >= 1e17:
+        return json.dumps(values.tolist(), separators=(",", ":")).encode()
+
+    n_groups = -(-max(len(str(int(round(magnitude.max() * scale)))), decimals + 1) // 3)
+    width = 3 * n_groups
+    n_int = width - decimals
+    divisors = 1000 ** np.arange(n_groups - 1, -1, -1, dtype=np.int64)
+    columns = np.arange(width)
+
+    parts = []
+    for lo in range(0, len(values), chunk):
+        scaled = np.rint(magnitude[lo:lo + chunk] * scale).astype(np.int64)
+        digits = DIGIT_GROUPS[(scaled[:, None] // divisors) % 1000].reshape(len(scaled), width)
+        significant = digits != ord("0")
+        # The units digit is always written
+        significant[:, n_int - 1] = True
+        first = np.argmax(significant[:, :n_int], axis=1)
+        # Fraction digits written = decimals - trailing zeros
+        fraction = decimals - np.argmax(significant[:, n_int - 1:][:, ::-1], axis=1)
+
+        # Columns: sign, integer digits, point, fraction digits, comma
+        chars = np.empty((len(scaled), width + 3), dtype=np.uint8)
+        keep = np.empty(chars.shape, dtype=bool)
+        chars[:, 0] = ord("-")
+        keep[:, 0] = (values[lo:lo + chunk] < 0) & (scaled > 0)
+        chars[:, 1:n_int + 1] = digits[:, :n_int]
+        keep[:, 1:n_int + 1] = columns[:n_int] >= first[:, None]
+        chars[:, n_int + 1] = ord(".")
+        keep[:, n_int + 1] = fraction > 0
+        chars[:, n_int + 2:-1] = digits[:, n_int:]
+        keep[:, n_int + 2:-1] = columns[:decimals] < fraction[:, None]
+        chars[:, -1] = ord(",")
+        keep[:, -1] = True
+        parts.append(chars[keep].tobytes())
+    return b"[" + b"".join(parts)[:-1] + b"]"
+
+
+def value_range(values: Optional[np.ndarray]) -> Optional[List[float]]:
+    """[min, max] of values, or None."""
+    if values is None or not len(values):
+        return None
+    return [float(values.min()), float(values.max())]
 
 
 def export_pressure_surface_ply(case_dir: Path,
                                  output_path: Path,
                                  patch_name: str = "wheel",
-                                 field: str = "p") -> Dict:
+                                 speed: float = 13.9) -> Dict:
     """
-    Export wheel surface as PLY file with pressure as vertex colors.
+    Export wheel surface as PLY file with Cp as vertex colors.
 
-    PLY format is well-supported by Three.js PLYLoader.
+    PLY format is well-supported by Three.js PLYLoader. Vertices carry
+    their Cp (property cp) and its blue-white-red colour; faces are
+    triangles. Vertex and face records are each written in one call.
 
     Args:
         case_dir: OpenFOAM case directory
         output_path: Path to save PLY file
         patch_name: Patch to export
-        field: Field to use for coloring (p, U magnitude, etc.)
+        speed: Freestream speed (m/s) for Cp
 
     Returns:
         dict with status and file info
     """
-    # Get mesh
-    mesh = parse_openfoam_boundary_mesh(case_dir, patch_name)
-    if not mesh or "error" in mesh:
-        return {"success": False, "error": mesh.get("error", "Could not read mesh")}
-
-    # Get pressure field
-    pressure = read_pressure_field(case_dir)
-
-    # Prepare vertex colors based on pressure
-    # Map pressure to RGB using a colormap
-    def pressure_to_color(p: float, p_min: float = -200, p_max: float = 200) -> Tuple[int, int, int]:
-        """Map pressure value to RGB color (blue-white-red diverging)."""
-        # Normalize to [0, 1]
-        t = max(0, min(1, (p - p_min) / (p_max - p_min)))
-
-        if t < 0.5:
-            # Blue to white
-            r = int(255 * (t * 2))
-            g = int(255 * (t * 2))
-            b = 255
-        else:
-            # White to red
-            r = 255
-            g = int(255 * (2 - t * 2))
-            b = int(255 * (2 - t * 2))
-
-        return (r, g, b)
-
-    points = mesh["points"]
-    faces = mesh["faces"]
-
-    # For PLY, we need to output vertex positions with colors
-    # Since pressure is face-centered in OpenFOAM, we'll use face colors
-
-    # Write PLY file
     try:
-        # Collect unique vertices used by patch faces
-        used_vertices = set()
-        for face in faces:
-            used_vertices.update(face)
-
-        # Create vertex index mapping
-        vertex_map = {v: i for i, v in enumerate(sorted(used_vertices))}
-        used_points = [points[v] for v in sorted(used_vertices)]
-
-        # Default colors (gray) if no pressure data
-        if pressure and pressure.get("type") == "nonuniform":
-            p_values = pressure["values"]
-            p_min = min(p_values)
-            p_max = max(p_values)
+        surface = read_surface(case_dir, patch_name, speed)
+        if surface is None:
+            return {"success": False, "error": "Could not read mesh"}
+
+        points, triangles, cp = surface["points"], surface["triangles"], surface["vertex_cp"]
+        cp_range = value_range(cp)
+
+        vertices = np.empty(len(points), dtype=[("xyz", "<f4", 3), ("cp", "<f4"), ("rgb", "u1", 3)])
+        vertices["xyz"] = points
+        if cp is None:
+            # No pressure data: grey
+            vertices["cp"] = 0
+            vertices["rgb"] = 180
         else:
-            p_values = None
-            p_min, p_max = -100, 100
+            vertices["cp"] = cp
+            vertices["rgb"] = diverging_colors(cp, cp_range)
 
-        # Write binary PLY
-        with open(output_path, 'wb') as f:
-            # Header
-            header = f"""ply
+        faces = np.empty(len(triangles), dtype=[("n", "u1"), ("vertex_indices", "<i4", 3)])
+        faces["n"] = 3
+        faces["vertex_indices"] = triangles
+
+        header = f"""ply
 format binary_little_endian 1.0
-element vertex {len(used_points)}
+element vertex {len(vertices)}
 property float x
 property float y
 property float z
+property float cp
 property uchar red
 property uchar green
 property uchar blue
@@ -303,41 +380,19 @@ element face {len(faces)}
 property list uchar int vertex_indices
 end_header
 """
+        with open(output_path, 'wb') as f:
             f.write(header.encode('ascii'))
-
-            # Write vertices with colors
-            for i, (x, y, z) in enumerate(used_points):
-                # Get color - for now use gray since we have face-centered data
-                r, g, b = 180, 180, 180
-                f.write(struct.pack('<fffBBB', x, y, z, r, g, b))
-
-            # Write faces
-            for i, face in enumerate(faces):
-                n_verts = len(face)
-                mapped_verts = [vertex_map[v] for v in face]
-
-                # For triangular faces
-                if n_verts == 3:
-                    f.write(struct.pack('<B', 3))
-                    f.write(struct.pack('<iii', *mapped_verts))
-                elif n_verts == 4:
-                    # Split quad into two triangles
-                    f.write(struct.pack('<B', 3))
-                    f.write(struct.pack('<iii', mapped_verts[0], mapped_verts[1], mapped_verts[2]))
-                    f.write(struct.pack('<B', 3))
-                    f.write(struct.pack('<iii', mapped_verts[0], mapped_verts[2], mapped_verts[3]))
-                else:
-                    # Fan triangulation for polygons
-                    for j in range(1, n_verts - 1):
-                        f.write(struct.pack('<B', 3))
-                        f.write(struct.pack('<iii', mapped_verts[0], mapped_verts[j], mapped_verts[j + 1]))
+            vertices.tofile(f)
+            faces.tofile(f)
 
         return {
             "success": True,
             "output_path": str(output_path),
-            "n_vertices": len(used_points),
-            "n_faces": len(faces),
-            "pressure_range": [p_min, p_max] if p_values else None
+            "n_vertices": len(vertices),
+            "n_faces": surface["n_faces"],
+            "n_triangles": len(triangles),
+            "pressure_range": value_range(surface["face_p"]),
+            "cp_range": cp_range
         }
 
     except Exception as e:
@@ -346,79 +401,236 @@ end_header
 
 def export_pressure_surface_json(case_dir: Path,
                                   output_path: Path,
-                                  patch_name: str = "wheel") -> Dict:
+                                  patch_name: str = "wheel",
+                                  speed: float = 13.9) -> Dict:
     """
     Export wheel surface as JSON for direct use in Three.js.
 
     JSON format includes:
     - vertices: flat array of [x, y, z, x, y, z, ...]
-    - indices: flat array of face indices
-    - pressures: array of pressure values per face
+    - indices: flat array of triangle vertex indices
+    - pressures: array of pressure values per (untriangulated) face
+    - vertex_cp: array of Cp values per vertex (area-weighted face average)
+
+    This format is efficient for Three.js BufferGeometry. The document is
+    encoded from whole arrays and written in one call.
+    """
+    try:
+        surface = read_surface(case_dir, patch_name, speed)
+        if surface is None:
+            return {"success": False, "error": "Could not read mesh"}
+
+        face_p, cp = surface["face_p"], surface["vertex_cp"]
+        summary = {
+            "n_vertices": len(surface["points"]),
+            "n_faces": surface["n_faces"],
+            "n_triangles": len(surface["triangles"]),
+            "pressure_range": value_range(face_p),
+            "cp_range": value_range(cp),
+        }
+        # Points to the micrometre, Cp to 1e-4 (Three.js keeps float32 anyway)
+        arrays = {
+            "vertices": json_array(surface["points"], 6),
+            "indices": json_array(surface["triangles"]),
+            "pressures": json_array(face_p, 4) if face_p is not None else b"[]",
+            "vertex_cp": json_array(cp, 4) if cp is not None else b"[]",
+        }
+        document = b"{" + b"".join(f'"{key}":'.encode() + text + b"," for key, text in arrays.items()) + \
+            json.dumps(summary, separators=(",", ":")).encode()[1:]
+        output_path.write_bytes(document)
+
+        return {
+            "success": True,
+            "output_path": str(output_path),
+            **summary
+        }
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def quantize(values: np.ndarray, low, high) -> np.ndarray:
+    """values mapped linearly from [low, high] to uint16 0..65535."""
+    span = np.maximum(np.asarray(high, dtype=np.float64) - low, 1e-30)
+    return np.rint(np.clip((values - low) / span, 0, 1) * 65535).astype("<u2")
+
 
-    This format is efficient for Three.js BufferGeometry.
+def padded(data: bytes) -> bytes:
+    """data padded with zeros to a multiple of 4 bytes."""
+    return data + b"\0" * (-len(data) % 4)
+
+
+def encode_surface(surface: Dict, quantized: bool = False) -> bytes:
     """
-    mesh = parse_openfoam_boundary_mesh(case_dir, patch_name)
-    if not mesh or "error" in mesh:
-        return {"success": False, "error": mesh.get("error", "Could not read mesh")}
-
-    pressure = read_pressure_field(case_dir)
-
-    points = mesh["points"]
-    faces = mesh["faces"]
-
-    # Collect unique vertices
-    used_vertices = set()
-    for face in faces:
-        used_vertices.update(face)
-
-    vertex_map = {v: i for i, v in enumerate(sorted(used_vertices))}
-    used_points = [points[v] for v in sorted(used_vertices)]
-
-    # Flatten vertices
-    vertices = []
-    for x, y, z in used_points:
-        vertices.extend([x, y, z])
-
-    # Flatten face indices (triangulated)
-    indices = []
-    for face in faces:
-        mapped = [vertex_map[v] for v in face]
-        if len(mapped) == 3:
-            indices.extend(mapped)
-        elif len(mapped) == 4:
-            # Quad to triangles
-            indices.extend([mapped[0], mapped[1], mapped[2]])
-            indices.extend([mapped[0], mapped[2], mapped[3]])
+    read_surface's arrays in the binary surface format (see module docs).
+
+    Args:
+        surface: Result of read_surface
+        quantized: Store positions and Cp as 16-bit values
+    """
+    points, triangles, cp = surface["points"], surface["triangles"], surface["vertex_cp"]
+    bounds_min = points.min(axis=0) if len(points) else np.zeros(3)
+    bounds_max = points.max(axis=0) if len(points) else np.zeros(3)
+    cp_range = value_range(cp) or [0.0, 0.0]
+    p_range = value_range(surface["face_p"]) or [0.0, 0.0]
+
+    flags = 0
+    if quantized:
+        flags |= QUANTIZED_POSITIONS
+        positions = quantize(points, bounds_min, bounds_max)
+    else:
+        positions = points.astype("<f4")
+    sections = [positions.tobytes()]
+    if cp is not None:
+        flags |= HAS_CP
+        if quantized:
+            flags |= QUANTIZED_CP
+            sections.append(quantize(cp, *cp_range).tobytes())
         else:
-            # Fan triangulation
-            for j in range(1, len(mapped) - 1):
-                indices.extend([mapped[0], mapped[j], mapped[j + 1]])
-
-    # Pressure values
-    pressures = []
-    if pressure and pressure.get("type") == "nonuniform":
-        pressures = pressure["values"]
-    elif pressure and pressure.get("type") == "uniform":
-        pressures = [pressure["value"]] * len(faces)
-
-    result = {
-        "vertices": vertices,
-        "indices": indices,
-        "pressures": pressures,
-        "n_vertices": len(used_points),
-        "n_triangles": len(indices) // 3,
-        "pressure_range": [min(pressures), max(pressures)] if pressures else None
-    }
+            sections.append(cp.astype("<f4").tobytes())
+    if len(points) <= 1 << 16:
+        flags |= SHORT_INDICES
+        sections.append(triangles.astype("<u2").tobytes())
+    else:
+        sections.append(triangles.astype("<u4").tobytes())
+
+    header = SURFACE_HEADER.pack(SURFACE_MAGIC, SURFACE_VERSION, flags, len(points), len(triangles),
+                                 surface["n_faces"], *bounds_min, *bounds_max, *cp_range, *p_range, 0)
+    return header + b"".join(padded(section) for section in sections)
+
+
+def decode_surface(data: bytes) -> Dict:
+    """Arrays of a binary surface (dequantized): points, triangles, vertex_cp."""
+    (magic, version, flags, n_vertices, n_triangles, n_faces, *ranges) = SURFACE_HEADER.unpack_from(data)
+    if magic != SURFACE_MAGIC or version != SURFACE_VERSION:
+        raise ValueError("Not a version 1 WheelFlow surface")
+    bounds_min, bounds_max = np.array(ranges[0:3]), np.array(ranges[3:6])
+    cp_min, cp_max = ranges[6:8]
+
+    offset = SURFACE_HEADER.size
+
+    def section(dtype: str, count: int) -> np.ndarray:
+        nonlocal offset
+        values = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        offset += -(-values.nbytes // 4) * 4
+        return values
+
+    if flags & QUANTIZED_POSITIONS:
+        points = bounds_min + section("<u2", 3 * n_vertices).reshape(-1, 3) / 65535 * (bounds_max - bounds_min)
+    else:
+        points = section("<f4", 3 * n_vertices).reshape(-1, 3).astype(np.float64)
+    cp = None
+    if flags & HAS_CP:
+        if flags & QUANTIZED_CP:
+            cp = cp_min + section("<u2", n_vertices) / 65535 * (cp_max - cp_min)
+        else:
+            cp = section("<f4", n_vertices).astype(np.float64)
+    triangles = section("<u2" if flags & SHORT_INDICES else "<u4", 3 * n_triangles).reshape(-1, 3)
+    return {"points": points, "triangles": triangles.astype(np.int64), "vertex_cp": cp,
+            "n_faces": n_faces, "cp_range": [cp_min, cp_max], "pressure_range": list(ranges[8:10])}
+
+
+def replace_file(path: Path, data: bytes):
+    """
+    Write a file through a uniquely named temporary file and rename it
+    into place, so a response streaming the old file (or a concurrent
+    export of the same output) never sees a truncated one.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
 
-    # Write JSON
+
+def write_encoded(data: bytes, output_path: Path) -> Tuple[str, Dict[str, int]]:
+    """
+    Write data to output_path with its compressed copies and ETag file.
+
+    Returns:
+        (etag, sizes by encoding)
+    """
+    etag = hashlib.sha256(data).hexdigest()[:32]
+    replace_file(output_path, data)
+    sizes = {"identity": len(data)}
+    # Binary arrays gain little from higher levels, which are several times slower
+    compressed = {"gzip": gzip.compress(data, compresslevel=4, mtime=0)}
+    if brotli is not None:
+        compressed["br"] = brotli.compress(data, quality=5)
+    for encoding, payload in compressed.items():
+        replace_file(Path(f"{output_path}.{ENCODING_SUFFIXES[encoding]}"), payload)
+        sizes[encoding] = len(payload)
+    # Written last: a complete set of files has an ETag
+    replace_file(Path(f"{output_path}.etag"), etag.encode())
+    return etag, sizes
+
+
+def lod_index_path(output_path: Path) -> Path:
+    """Path of the index of output_path's levels of detail."""
+    return Path(f"{output_path}.lods.json")
+
+
+def select_level(index: Dict, max_triangles: Optional[int]) -> Dict:
+    """
+    The level of a LOD index to serve for a triangle budget: the most
+    detailed one within max_triangles, or the coarsest if none is
+    (the full surface if there is no budget).
+    """
+    levels = index["levels"]
+    if max_triangles is None:
+        return levels[0]
+    fitting = [level for level in levels if level["triangles"] <= max_triangles]
+    return fitting[0] if fitting else levels[-1]
+
+
+def export_pressure_surface_bin(case_dir: Path,
+                                output_path: Path,
+                                patch_name: str = "wheel",
+                                speed: float = 13.9,
+                                quantized: bool = False,
+                                lod_triangles: Optional[List[int]] = None) -> Dict:
+    """
+    Export wheel surface in the binary surface format, plus compressed
+    copies and levels of detail.
+
+    Writes output_path, output_path.gz and (if brotli is installed)
+    output_path.br, and the strong ETag of the content (a hash of the
+    uncompressed bytes) to output_path.etag; the same for each level of
+    detail, and the index of levels (lod_index_path) last.
+
+    Args:
+        lod_triangles: Triangle budgets of the levels of detail
+            (default LOD_TRIANGLES); budgets above the full surface's
+            triangle count are skipped
+
+    Returns:
+        dict with status, etag, file sizes and levels
+    """
     try:
-        with open(output_path, 'w') as f:
-            json.dump(result, f)
+        surface = read_surface(case_dir, patch_name, speed)
+        if surface is None:
+            return {"success": False, "error": "Could not read mesh"}
+
+        budgets = LOD_TRIANGLES if lod_triangles is None else lod_triangles
+        levels = []
+        for k, level in enumerate(surface_lod.levels(surface, budgets)):
+            path = output_path if k == 0 else output_path.with_name(
+                f"{output_path.stem}.lod{k}{output_path.suffix}")
+            etag, sizes = write_encoded(encode_surface(level, quantized), path)
+            levels.append({"file": path.name, "triangles": len(level["triangles"]),
+                           "vertices": len(level["points"]), "etag": etag, "sizes": sizes})
+        replace_file(lod_index_path(output_path), json.dumps({"levels": levels}).encode())
 
         return {
             "success": True,
             "output_path": str(output_path),
-            **{k: v for k, v in result.items() if k != "vertices" and k != "indices" and k != "pressures"}
+            "etag": levels[0]["etag"],
+            "sizes": levels[0]["sizes"],
+            "n_vertices": len(surface["points"]),
+            "n_triangles": len(surface["triangles"]),
+            "levels": levels,
+            "quantized": quantized
         }
 
     except Exception as e:
@@ -7,14 +7,20 @@ from pathlib import Path
 from typing import Dict, Optional
 from .force_distribution import extract_force_distribution, calculate_forces, extract_convergence_history
 
+try:
+    from backend import mesh_stats
+except ImportError:
+    import mesh_stats
 
-def generate_results_summary(case_dir: Path, config: Dict) -> Dict:
+
+def generate_results_summary(case_dir: Path, config: Dict, mesh: Optional[Dict] = None) -> Dict:
     """
     Generate comprehensive results summary for a simulation.
 
     Args:
         case_dir: Path to OpenFOAM case directory
         config: Simulation configuration dict
+        mesh: Mesh statistics stored in the job record (mesh_stats), if any
 
     Returns:
         Complete results summary dict
@@ -31,7 +37,7 @@ def generate_results_summary(case_dir: Path, config: Dict) -> Dict:
             "quality": config.get("quality", "standard"),
             "reynolds": config.get("reynolds", 0),
         },
-        "mesh": get_mesh_info(case_dir),
+        "mesh": get_mesh_info(case_dir, mesh),
         "convergence": {},
         "coefficients": {},
         "forces": {},
@@ -85,9 +91,10 @@ def generate_results_summary(case_dir: Path, config: Dict) -> Dict:
     return summary
 
 
-def get_mesh_info(case_dir: Path) -> Dict:
+def get_mesh_info(case_dir: Path, mesh: Optional[Dict] = None) -> Dict:
     """
-    Extract mesh information from checkMesh output or polyMesh files.
+    Mesh information of a case: the job's stored mesh statistics, or else
+    collected from the mesh header notes and meshing logs.
     """
     mesh_info = {
         "cells": 0,
@@ -96,40 +103,14 @@ def get_mesh_info(case_dir: Path) -> Dict:
         "quality": {}
     }
 
-    # Try to read from polyMesh
-    poly_mesh = case_dir / "constant" / "polyMesh"
-    if poly_mesh.exists():
-        # Count cells from owner file
-        owner_file = poly_mesh / "owner"
-        if owner_file.exists():
-            try:
-                with open(owner_file, 'r') as f:
-                    content = f.read()
-                    # Find the number in parentheses after FoamFile block
-                    import re
-                    match = re.search(r'\n(\d+)\n\(', content)
-                    if match:
-                        mesh_info["faces"] = int(match.group(1))
-            except Exception:
-                pass
-
-        # Count points
-        points_file = poly_mesh / "points"
-        if points_file.exists():
-            try:
-                with open(points_file, 'r') as f:
-                    content = f.read()
-                    import re
-                    match = re.search(r'\n(\d+)\n\(', content)
-                    if match:
-                        mesh_info["points"] = int(match.group(1))
-            except Exception:
-                pass
-
-        # Estimate cells from faces (rough approximation)
-        # For hex mesh: cells ≈ faces / 6
-        if mesh_info["faces"] > 0:
-            mesh_info["cells"] = mesh_info["faces"] // 6
+    if mesh is None:
+        try:
+            mesh = mesh_stats.collect(case_dir)
+        except Exception as e:
+            print(f"Could not read mesh statistics: {e}")
+    if mesh:
+        mesh_info.update(mesh)
+        mesh_info["quality"] = mesh.get("quality", {})
 
     return mesh_info
 
@@ -0,0 +1,190 @@
+"""
+Surface Levels of Detail for WheelFlow
+Decimated copies of a result surface that preserve its scalar field
+
+A pro-quality wheel patch has up to millions of triangles, far more than a
+dashboard viewport shows. Each level of detail is a simplification of the
+full surface to a triangle budget by quadric-error vertex clustering, done
+on whole arrays:
+
+- every vertex carries the quadric (sum of squared distances to the planes
+  of its triangles, weighted by area) of Garland and Heckbert
+- vertices are grouped by grid cell and by Cp band, so a cluster never
+  spans a large change of Cp and colour contours survive decimation (the
+  attribute error of a cluster is bounded by the band width)
+- each cluster is placed where its summed quadric is smallest, regularized
+  towards the cluster's centroid where the quadric is flat (and at the
+  centroid if that point is more than a cell away), and takes the
+  area-weighted mean Cp of its vertices
+- triangles are re-indexed to clusters; collapsed and duplicate triangles
+  are dropped
+
+The grid cell size is refined until the triangle count is within the
+budget.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+# Cp bands a cluster may not cross
+CP_BANDS = 24
+
+# Regularization of the cluster position towards its centroid, relative
+# to the quadric's scale
+CENTROID_WEIGHT = 1e-3
+
+# Refinements of the grid cell size to meet a budget
+MAX_PASSES = 6
+
+# Unique entries of a symmetric 4x4 quadric: aa ab ac ad bb bc bd cc cd dd
+QUADRIC_ROWS = np.array([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+QUADRIC_COLS = np.array([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+# Entries of the 3x3 part (A) and of the linear part (b)
+A_ENTRIES = np.array([0, 1, 2, 4, 5, 7])
+B_ENTRIES = np.array([3, 6, 8])
+
+
+def triangle_planes(points: np.ndarray, triangles: np.ndarray):
+    """Unit normal, plane offset and area of each triangle."""
+    origin = points[triangles[:, 0]]
+    cross = np.cross(points[triangles[:, 1]] - origin, points[triangles[:, 2]] - origin)
+    length = np.linalg.norm(cross, axis=1)
+    normals = cross / np.where(length > 0, length, 1)[:, None]
+    offsets = -np.einsum("ij,ij->i", normals, origin)
+    return normals, offsets, 0.5 * length
+
+
+def vertex_quadrics(points: np.ndarray, triangles: np.ndarray):
+    """
+    Area-weighted plane quadric (10 unique entries) and area (a third of
+    each incident triangle) of each vertex.
+    """
+    normals, offsets, areas = triangle_planes(points, triangles)
+    planes = np.column_stack([normals, offsets])
+    quadrics = areas[:, None] * planes[:, QUADRIC_ROWS] * planes[:, QUADRIC_COLS]
+
+    corners = triangles.ravel()
+    n = len(points)
+    vertex_q = np.column_stack([
+        np.bincount(corners, weights=np.repeat(quadrics[:, k], 3), minlength=n)
+        for k in range(quadrics.shape[1])
+    ])
+    vertex_area = np.bincount(corners, weights=np.repeat(areas / 3, 3), minlength=n)
+    return vertex_q, vertex_area
+
+
+def cluster(surface: Dict, cell: float, quadrics: np.ndarray, vertex_area: np.ndarray,
+            cp_band: Optional[np.ndarray]) -> Dict:
+    """The surface with its vertices clustered by grid cells of size cell."""
+    points, triangles, cp = surface["points"], surface["triangles"], surface["vertex_cp"]
+    grid = np.floor((points - points.min(axis=0)) / cell).astype(np.int64)
+    keys = [grid[:, 0], grid[:, 1], grid[:, 2]] + ([cp_band] if cp_band is not None else [])
+    key = np.ravel_multi_index(keys, [int(k.max()) + 1 for k in keys])
+    _, cluster_of = np.unique(key, return_inverse=True)
+    cluster_of = cluster_of.ravel()
+
+    # Re-index triangles; drop collapsed ones and duplicates
+    tris = cluster_of[triangles]
+    tris = tris[(tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 0] != tris[:, 2])]
+    n_clusters = int(cluster_of.max()) + 1
+    corners = np.sort(tris, axis=1)
+    if n_clusters < 1 << 21:
+        # One int64 key per triangle: much faster than unique rows
+        corners = (corners[:, 0] << 42) | (corners[:, 1] << 21) | corners[:, 2]
+        _, first = np.unique(corners, return_index=True)
+    else:
+        _, first = np.unique(corners, axis=0, return_index=True)
+    tris = tris[np.sort(first)]
+
+    # Only clusters still used by a triangle are kept
+    used, tris = np.unique(tris, return_inverse=True)
+    tris = tris.reshape(-1, 3)
+
+    def sums(values: np.ndarray) -> np.ndarray:
+        return np.bincount(cluster_of, weights=values, minlength=n_clusters)[used]
+
+    weight = sums(np.ones(len(points)))
+    centroid = np.column_stack([sums(points[:, k]) for k in range(3)]) / weight[:, None]
+    q = np.column_stack([sums(quadrics[:, k]) for k in range(quadrics.shape[1])])
+
+    # Minimize x'Ax + 2b'x + lambda |x - centroid|^2
+    a = np.empty((len(used), 3, 3))
+    a[:, QUADRIC_ROWS[A_ENTRIES], QUADRIC_COLS[A_ENTRIES]] = q[:, A_ENTRIES]
+    a[:, QUADRIC_COLS[A_ENTRIES], QUADRIC_ROWS[A_ENTRIES]] = q[:, A_ENTRIES]
+    b = q[:, B_ENTRIES]
+    scale = CENTROID_WEIGHT * np.trace(a, axis1=1, axis2=2) / 3 + 1e-30
+    a += scale[:, None, None] * np.eye(3)
+    positions = np.linalg.solve(a, (scale[:, None] * centroid - b)[:, :, None])[:, :, 0]
+    # Tangent planes of a strongly curved cluster can meet far from it;
+    # such clusters stay at their centroid
+    outside = np.linalg.norm(positions - centroid, axis=1) > cell
+    positions[outside] = centroid[outside]
+
+    vertex_cp = None
+    if cp is not None:
+        area = sums(vertex_area)
+        vertex_cp = sums(vertex_area * cp) / np.where(area > 0, area, 1)
+        vertex_cp = np.where(area > 0, vertex_cp, sums(cp) / weight)
+
+    return {
+        "points": positions,
+        "triangles": tris.astype(np.int32),
+        "vertex_cp": vertex_cp,
+        "face_p": surface.get("face_p"),
+        "n_faces": surface["n_faces"],
+    }
+
+
+def decimate(surface: Dict, max_triangles: int) -> Dict:
+    """
+    A simplification of surface (read_surface's arrays) with at most
+    max_triangles triangles (or the closest found).
+    """
+    if len(surface["triangles"]) <= max_triangles:
+        return surface
+    quadrics, vertex_area = vertex_quadrics(surface["points"], surface["triangles"])
+    return decimate_with(surface, max_triangles, quadrics, vertex_area)
+
+
+def decimate_with(surface: Dict, max_triangles: int, quadrics: np.ndarray,
+                  vertex_area: np.ndarray) -> Dict:
+    """decimate, with the vertex quadrics computed by the caller."""
+    cp = surface["vertex_cp"]
+    cp_band = None
+    if cp is not None and cp.max() > cp.min():
+        cp_band = np.minimum((cp - cp.min()) / (cp.max() - cp.min()) * CP_BANDS, CP_BANDS - 1).astype(np.int64)
+
+    # About two triangles per occupied cell of a surface
+    total_area = vertex_area.sum()
+    cell = np.sqrt(2 * total_area / max(max_triangles, 1))
+    best = None
+    for _ in range(MAX_PASSES):
+        result = cluster(surface, cell, quadrics, vertex_area, cp_band)
+        n = len(result["triangles"])
+        if n <= max_triangles and (best is None or n > len(best["triangles"])):
+            best = result
+        if 0.8 * max_triangles <= n <= max_triangles:
+            break
+        # Triangle count scales with the inverse square of the cell size
+        cell *= np.sqrt(max(n, 1) / (0.9 * max_triangles))
+    return best if best is not None else result
+
+
+def levels(surface: Dict, budgets: List[int]) -> List[Dict]:
+    """
+    Levels of detail of surface for the triangle budgets smaller than the
+    full surface, coarsest last; the full surface comes first.
+    """
+    full = len(surface["triangles"])
+    result = [surface]
+    budgets = sorted({b for b in budgets if b < full}, reverse=True)
+    if not budgets:
+        return result
+    quadrics, vertex_area = vertex_quadrics(surface["points"], surface["triangles"])
+    for budget in budgets:
+        lod = decimate_with(surface, budget, quadrics, vertex_area)
+        if len(lod["triangles"]) < len(result[-1]["triangles"]):
+            result.append(lod)
+    return result
@@ -0,0 +1,286 @@
+"""
+VTK Surface Reader
+Reads OpenFOAM sampled surfaces (legacy and XML VTK) into arrays
+
+Cutting planes and other sampled surfaces are written by OpenFOAM's
+surfaces function object as VTK polydata. Both file flavours are read
+straight into numpy arrays, without a Python object per number:
+
+- legacy .vtk, ASCII or BINARY (big-endian), with the classic POLYGONS
+  layout (a count before each polygon) or the 5.1 OFFSETS/CONNECTIVITY
+  layout, and point/cell data as SCALARS, VECTORS or FIELD arrays
+- XML .vtp (PolyData), with ascii, base64 binary (optionally zlib
+  compressed) or appended (raw or base64) data arrays
+
+Polygons are returned the way foam_mesh returns patch faces, as offsets
+and labels, so they can be triangulated with pressure_surface.triangulate.
+"""
+
+import base64
+import re
+import zlib
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+# Legacy VTK data types -> numpy types (big-endian in BINARY files)
+LEGACY_TYPES = {
+    "unsigned_char": "u1", "char": "i1",
+    "unsigned_short": "u2", "short": "i2",
+    "unsigned_int": "u4", "int": "i4",
+    "unsigned_long": "u8", "long": "i8",
+    "vtktypeint32": "i4", "vtktypeint64": "i8", "vtkidtype": "i8",
+    "float": "f4", "double": "f8",
+}
+
+# XML VTK data types -> numpy types
+XML_TYPES = {
+    "Int8": "i1", "UInt8": "u1", "Int16": "i2", "UInt16": "u2",
+    "Int32": "i4", "UInt32": "u4", "Int64": "i8", "UInt64": "u8",
+    "Float32": "f4", "Float64": "f8",
+}
+
+# Legacy dataset keywords that are skipped with their counts
+LEGACY_CELL_SECTIONS = ("VERTICES", "LINES", "TRIANGLE_STRIPS")
+
+WORD_RE = re.compile(rb"\s*(\S+)")
+
+
+def read_vtk(path: Path) -> Optional[Dict]:
+    """
+    Read a VTK polydata surface.
+
+    Returns:
+        Dict with points (n x 3), offsets and labels of the polygons,
+        point_data and cell_data (name -> array, n x components for
+        vectors); None if the file is not polydata this reader knows
+    """
+    data = Path(path).read_bytes()
+    if data.lstrip().startswith(b"<"):
+        return read_xml(data)
+    return read_legacy(data)
+
+
+class LegacyTokens:
+    """Words and arrays of a legacy file body, ASCII or BINARY."""
+
+    def __init__(self, data: bytes, binary: bool):
+        self.data = data
+        self.binary = binary
+        self.pos = 0
+        self.index = 0
+        # ASCII files are split into words once; numbers are converted by
+        # numpy in bulk
+        self.tokens = [] if binary else data.split()
+
+    def word(self) -> Optional[str]:
+        """The next word (None at the end)."""
+        if not self.binary:
+            if self.index >= len(self.tokens):
+                return None
+            self.index += 1
+            return self.tokens[self.index - 1].decode("ascii", "replace")
+        match = WORD_RE.match(self.data, self.pos)
+        if match is None:
+            return None
+        self.pos = match.end()
+        return match.group(1).decode("ascii", "replace")
+
+    def peek(self) -> Optional[str]:
+        """The next word, left unread."""
+        index, pos = self.index, self.pos
+        word = self.word()
+        self.index, self.pos = index, pos
+        return word
+
+    def array(self, count: int, vtk_type: str) -> np.ndarray:
+        """The next count values of a legacy type."""
+        dtype = LEGACY_TYPES[vtk_type.lower()]
+        if not self.binary:
+            values = np.array(self.tokens[self.index:self.index + count]).astype(dtype)
+            self.index += count
+            return values
+        # Binary data starts after the end of the keyword line
+        start = self.data.index(b"\n", self.pos) + 1
+        values = np.frombuffer(self.data, dtype=">" + dtype, count=count, offset=start)
+        self.pos = start + values.nbytes
+        return values.astype(dtype)
+
+
+def legacy_polygons(cells: np.ndarray, n_cells: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Offsets and labels of polygons in the classic layout (count, labels...)."""
+    cells = cells.astype(np.int64)
+    # Cutting planes are often all triangles or all quads
+    for size in (3, 4):
+        if len(cells) == n_cells * (size + 1) and (cells[::size + 1] == size).all():
+            labels = cells.reshape(n_cells, size + 1)[:, 1:].ravel()
+            return np.arange(n_cells + 1, dtype=np.int64) * size, labels
+    starts = np.empty(n_cells, dtype=np.int64)
+    counts = np.empty(n_cells, dtype=np.int64)
+    values = cells.tolist()
+    pos = 0
+    for k in range(n_cells):
+        starts[k], counts[k] = pos + 1, values[pos]
+        pos += values[pos] + 1
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    # Label positions: each polygon's start, then consecutive
+    index = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+    return offsets, cells[index]
+
+
+def read_legacy(data: bytes) -> Optional[Dict]:
+    """Read a legacy VTK polydata file (see read_vtk)."""
+    lines = data.split(b"\n", 4)
+    if len(lines) < 5 or not lines[0].startswith(b"# vtk DataFile"):
+        return None
+    binary = lines[2].strip().upper() == b"BINARY"
+    if lines[3].split()[:2] != [b"DATASET", b"POLYDATA"]:
+        return None
+
+    tokens = LegacyTokens(lines[4], binary)
+    result = {"points": np.zeros((0, 3)), "offsets": np.zeros(1, dtype=np.int64),
+              "labels": np.zeros(0, dtype=np.int64), "point_data": {}, "cell_data": {}}
+    attributes = None
+    count = 0
+
+    while True:
+        word = tokens.word()
+        if word is None:
+            break
+        keyword = word.upper()
+        if keyword == "POINTS":
+            n, vtk_type = int(tokens.word()), tokens.word()
+            result["points"] = tokens.array(3 * n, vtk_type).reshape(-1, 3).astype(np.float64)
+        elif keyword == "POLYGONS" or keyword in LEGACY_CELL_SECTIONS:
+            n, size = int(tokens.word()), int(tokens.word())
+            if tokens.peek() == "OFFSETS":
+                tokens.word()
+                offsets = tokens.array(n, tokens.word()).astype(np.int64)
+                tokens.word()  # CONNECTIVITY
+                labels = tokens.array(size, tokens.word()).astype(np.int64)
+            else:
+                offsets, labels = legacy_polygons(tokens.array(size, "int"), n)
+            if keyword == "POLYGONS":
+                result["offsets"], result["labels"] = offsets, labels
+        elif keyword in ("POINT_DATA", "CELL_DATA"):
+            count = int(tokens.word())
+            attributes = result["point_data" if keyword == "POINT_DATA" else "cell_data"]
+        elif keyword == "SCALARS" and attributes is not None:
+            name, vtk_type = tokens.word(), tokens.word()
+            components = 1 if tokens.peek() == "LOOKUP_TABLE" else int(tokens.word())
+            tokens.word()  # LOOKUP_TABLE
+            tokens.word()  # table name
+            attributes[name] = shaped(tokens.array(count * components, vtk_type), components)
+        elif keyword in ("VECTORS", "NORMALS") and attributes is not None:
+            name, vtk_type = tokens.word(), tokens.word()
+            attributes[name] = tokens.array(3 * count, vtk_type).reshape(-1, 3)
+        elif keyword == "FIELD":
+            # Dataset field data (before POINT_DATA/CELL_DATA) is read and dropped
+            fields = attributes if attributes is not None else {}
+            tokens.word()  # field data name
+            for _ in range(int(tokens.word())):
+                name, components, tuples, vtk_type = (tokens.word(), int(tokens.word()),
+                                                      int(tokens.word()), tokens.word())
+                fields[name] = shaped(tokens.array(components * tuples, vtk_type), components)
+    return result
+
+
+def shaped(values: np.ndarray, components: int) -> np.ndarray:
+    """values as a 1-D array, or n x components."""
+    return values if components == 1 else values.reshape(-1, components)
+
+
+def decode_base64(text: bytes) -> bytes:
+    """
+    Bytes of base64 text that may be several padded chunks (VTK encodes an
+    array's header and data separately).
+    """
+    chunks = re.split(rb"(?<==)(?=[^=])", b"".join(text.split()))
+    return b"".join(base64.b64decode(chunk) for chunk in chunks if chunk)
+
+
+def binary_payload(raw: bytes, header_type: str, compressed: bool, offset: int = 0) -> bytes:
+    """Payload of a binary data array (header, then data) starting at offset of raw."""
+    header = np.dtype("<" + XML_TYPES[header_type])
+    size = header.itemsize
+    if not compressed:
+        n_bytes = int(np.frombuffer(raw, dtype=header, count=1, offset=offset)[0])
+        start = offset + size
+        return raw[start:start + n_bytes]
+    # Compressed: blocks, block size, last block size, compressed sizes
+    n_blocks = int(np.frombuffer(raw, dtype=header, count=1, offset=offset)[0])
+    sizes = np.frombuffer(raw, dtype=header, count=n_blocks, offset=offset + 3 * size).astype(np.int64)
+    start = offset + (3 + n_blocks) * size
+    ends = start + np.cumsum(sizes)
+    return b"".join(zlib.decompress(raw[int(a):int(b)])
+                    for a, b in zip(np.concatenate([[start], ends[:-1]]), ends))
+
+
+def read_xml(data: bytes) -> Optional[Dict]:
+    """Read an XML VTK PolyData file (see read_vtk)."""
+    # Appended raw data is not XML: cut it out before parsing
+    appended = b""
+    appended_encoding = None
+    start = data.find(b"<AppendedData")
+    if start >= 0:
+        open_end = data.index(b">", start)
+        appended_encoding = re.search(rb'encoding="(\w+)"', data[start:open_end])
+        appended_encoding = appended_encoding.group(1).decode() if appended_encoding else "raw"
+        marker = data.index(b"_", open_end) + 1
+        end = data.rindex(b"</AppendedData>")
+        appended = data[marker:end]
+        data = data[:open_end + 1] + data[end:]
+
+    root = ET.fromstring(data)
+    if root.get("type") != "PolyData":
+        return None
+    if root.get("byte_order", "LittleEndian") != "LittleEndian":
+        return None
+    header_type = root.get("header_type", "UInt32")
+    compressed = root.get("compressor") is not None
+    piece = root.find("PolyData/Piece")
+    if piece is None:
+        return None
+    appended_offsets = [int(element.get("offset", 0)) for element in root.iter("DataArray")
+                        if element.get("format") == "appended"]
+
+    def array(element: ET.Element) -> np.ndarray:
+        dtype = np.dtype("<" + XML_TYPES[element.get("type")])
+        data_format = element.get("format", "ascii")
+        if data_format == "ascii":
+            values = np.array((element.text or "").split()).astype(dtype)
+        elif data_format == "binary":
+            raw = decode_base64((element.text or "").encode())
+            values = np.frombuffer(binary_payload(raw, header_type, compressed), dtype=dtype)
+        else:
+            offset = int(element.get("offset", 0))
+            if appended_encoding == "base64":
+                # Offsets count characters; an array ends where the next begins
+                end = min([o for o in appended_offsets if o > offset], default=len(appended))
+                payload = binary_payload(decode_base64(appended[offset:end]), header_type, compressed)
+            else:
+                payload = binary_payload(appended, header_type, compressed, offset)
+            values = np.frombuffer(payload, dtype=dtype)
+        return shaped(values, int(element.get("NumberOfComponents", 1)))
+
+    def named(section: Optional[ET.Element]) -> Dict[str, np.ndarray]:
+        if section is None:
+            return {}
+        return {element.get("Name"): array(element) for element in section.findall("DataArray")}
+
+    points = piece.find("Points/DataArray")
+    polys = named(piece.find("Polys"))
+    connectivity = polys.get("connectivity", np.zeros(0)).astype(np.int64)
+    offsets = polys.get("offsets", np.zeros(0)).astype(np.int64)
+    return {
+        "points": (array(points).reshape(-1, 3).astype(np.float64)
+                   if points is not None else np.zeros((0, 3))),
+        # XML offsets are polygon ends
+        "offsets": np.concatenate([[0], offsets]).astype(np.int64),
+        "labels": connectivity,
+        "point_data": named(piece.find("PointData")),
+        "cell_data": named(piece.find("CellData")),
+    }
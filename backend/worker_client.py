@@ -0,0 +1,382 @@
+"""
+Remote Worker for WheelFlow
+Worker side of the pull-based worker protocol
+
+Runs on a compute node with OpenFOAM installed and a checkout of this
+repository. The worker registers with the coordinator, leases one job at
+a time, downloads its inputs (cached by sha256, so a yaw sweep fetches the
+geometry once), meshes and solves the prepared case locally, and uploads
+the finished case. Progress reports renew the lease; if the coordinator
+refuses one (the job was cancelled, or the lease expired and was given to
+another worker) the run is stopped.
+
+Cases are unpacked under WORK_DIR and stages are recorded in WORKER_DB,
+both separate from the coordinator's, so a worker can run on the
+coordinator's own host.
+
+Usage:
+    WHEELFLOW_WORKER_TOKEN=... python -m backend.worker_client --server http://head-node:8000 \
+        [--cores 64] [--work-dir DIR]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from backend import workers
+    from backend import affinity
+except ImportError:
+    import workers
+    import affinity
+
+
+BASE_DIR = Path(__file__).parent.parent
+WORK_DIR = BASE_DIR / "data" / "worker" / "cases"
+WORKER_DB = BASE_DIR / "data" / "worker" / "wheelflow.db"
+CACHE_DIR = BASE_DIR / "data" / "worker_cache"
+
+# Request bodies are streamed from disk in chunks of this size
+UPLOAD_CHUNK = 1 << 20
+
+# Seconds between lease requests while the queue is empty
+POLL_INTERVAL = 5
+
+
+def run_openfoam_job(job: dict, case_dir: Path, proc_plan: dict, stop: threading.Event) -> dict:
+    """
+    Mesh, solve and post-process a prepared case with the local pipeline.
+
+    Args:
+        job: Shared job record; status and progress are read by the
+            progress reporter while this runs
+        case_dir: Unpacked case (<work dir>/<job_id>); the pipeline's
+            CASES_DIR points at its parent for the duration of the run
+        proc_plan: mesh_procs/solver_procs chosen by the coordinator
+        stop: Set when the lease is lost; the run is cancelled
+
+    Returns:
+        The job results (the measured stages are left in job["stages"])
+
+    Raises:
+        RuntimeError: If the run did not complete
+    """
+    try:
+        from backend import database as db
+    except ImportError:
+        import database as db
+
+    # Point the database at the worker's own before the pipeline is
+    # imported: its stages are sent to the coordinator, which records them
+    saved_db_path = db.DB_PATH
+    db.DB_PATH = WORKER_DB
+    db.init_db()
+
+    try:
+        from backend import app as server
+        from backend import job_control
+    except ImportError:
+        import app as server
+        import job_control
+
+    job_id = job["id"]
+    saved_cases_dir = server.CASES_DIR
+    server.CASES_DIR = case_dir.parent
+
+    job["config"] = dict(job["config"], executor="local")
+    server.jobs[job_id] = job
+
+    async def run():
+        task = asyncio.create_task(server.run_simulation(job_id, prepared=True, proc_plan=proc_plan))
+        cancelled = False
+        while not task.done():
+            if stop.is_set() and not cancelled:
+                cancelled = True
+                await job_control.cancel_job(job_id)
+            await asyncio.wait({task}, timeout=1)
+        await task
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.jobs.pop(job_id, None)
+        job["stages"] = db.get_job_stages(job_id)
+        server.CASES_DIR = saved_cases_dir
+        db.DB_PATH = saved_db_path
+
+    if job["status"] != "complete":
+        raise RuntimeError(job.get("error") or f"Job ended with status {job['status']}")
+    return job["results"]
+
+
+class WorkerClient:
+    """Leases jobs from a coordinator and runs them on this node."""
+
+    def __init__(self, server: str, cores: Optional[int] = None, memory_gb: Optional[float] = None,
+                 work_dir: Path = None, cache_dir: Path = None,
+                 runner: Callable = None, poll_interval: float = POLL_INTERVAL,
+                 token: Optional[str] = None):
+        """
+        Args:
+            server: Coordinator base URL
+            cores: Cores to advertise (default: usable physical cores)
+            token: Shared worker token (default: WHEELFLOW_WORKER_TOKEN)
+            runner: Called as runner(job, case_dir, proc_plan, stop) and
+                returns results; defaults to the local OpenFOAM pipeline
+        """
+        self.server = server.rstrip("/")
+        self.cores = cores or sum(len(c) for c in affinity.get_numa_nodes().values())
+        if memory_gb is None:
+            memory_gb = psutil.virtual_memory().total / 1e9 if psutil else 0
+        self.memory_gb = memory_gb
+        self.work_dir = Path(work_dir or WORK_DIR)
+        self.cache_dir = Path(cache_dir or CACHE_DIR)
+        self.runner = runner or run_openfoam_job
+        self.poll_interval = poll_interval
+        self.token = token or workers.WORKER_TOKEN
+        self.worker_id = None
+        self.lease_ttl = workers.LEASE_TTL
+
+    # HTTP -------------------------------------------------------------------
+
+    def request(self, method: str, path: str, payload: dict = None, data=None,
+                timeout: float = 60, length: int = None):
+        """
+        Send a request to the coordinator.
+
+        Args:
+            data: Raw body - bytes, or an iterable of chunks with its total
+                length given as length
+
+        Returns:
+            (status code, decoded JSON body or None)
+        """
+        headers = {workers.TOKEN_HEADER: self.token or ""}
+        if payload is not None:
+            data = json.dumps(payload).encode()
+            headers["Content-Type"] = "application/json"
+        elif data is not None:
+            headers["Content-Type"] = "application/octet-stream"
+        if length is not None:
+            headers["Content-Length"] = str(length)
+        req = urllib.request.Request(self.server + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                body = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            body = e.read()
+            status = e.code
+        if not body:
+            return status, None
+        try:
+            return status, json.loads(body)
+        except ValueError:
+            return status, body
+
+    def register(self) -> str:
+        status, body = self.request("POST", "/api/workers/register", {
+            "hostname": socket.gethostname(),
+            "cores": self.cores,
+            "memory_gb": self.memory_gb,
+        })
+        if status != 200:
+            raise RuntimeError(f"Registration failed ({status}): {body}")
+        self.worker_id = body["worker_id"]
+        self.lease_ttl = body["lease_ttl"]
+        print(f"Registered as worker {self.worker_id} ({self.cores} cores)")
+        return self.worker_id
+
+    # Blobs ------------------------------------------------------------------
+
+    def fetch_blob(self, digest: str) -> Path:
+        """Download a blob (or reuse the cached copy), verifying its hash."""
+        path = workers.blob_path(digest, self.cache_dir)
+        if path.exists():
+            return path
+
+        req = urllib.request.Request(f"{self.server}/api/workers/blobs/{digest}",
+                                     headers={workers.TOKEN_HEADER: self.token or ""})
+        path.parent.mkdir(parents=True, exist_ok=True)
+        h = hashlib.sha256()
+        tmp = path.with_suffix(".tmp")
+        with urllib.request.urlopen(req, timeout=300) as response, open(tmp, "wb") as f:
+            for chunk in iter(lambda: response.read(1 << 20), b""):
+                h.update(chunk)
+                f.write(chunk)
+        if h.hexdigest() != digest:
+            tmp.unlink()
+            raise RuntimeError(f"Blob {digest} failed hash verification")
+        tmp.replace(path)
+        return path
+
+    def upload_blob(self, path: Path) -> str:
+        """Upload a file as a blob, streamed from disk."""
+        digest = workers.file_digest(path)
+        with open(path, "rb") as f:
+            status, body = self.request("PUT", f"/api/workers/blobs/{digest}",
+                                        data=iter(lambda: f.read(UPLOAD_CHUNK), b""),
+                                        length=path.stat().st_size, timeout=600)
+        if status != 200:
+            raise RuntimeError(f"Upload failed ({status}): {body}")
+        return digest
+
+    def unpack_inputs(self, job_id: str, inputs: list) -> Path:
+        """Assemble a leased job's case directory from its input blobs."""
+        case_dir = self.work_dir / job_id
+        if case_dir.exists():
+            shutil.rmtree(case_dir)
+        case_dir.mkdir(parents=True)
+
+        for item in inputs:
+            blob = self.fetch_blob(item["sha256"])
+            rel = Path(item["path"])
+            if rel.is_absolute() or ".." in rel.parts:
+                raise RuntimeError(f"Unsafe input path: {item['path']}")
+            if item.get("archive"):
+                workers.extract_archive(blob, case_dir / rel)
+            else:
+                dest = case_dir / rel
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(blob, dest)
+        return case_dir
+
+    # Leases -----------------------------------------------------------------
+
+    def report_progress(self, lease_id: str, job: dict, stop: threading.Event, done: threading.Event):
+        """Post progress (renewing the lease) until the run ends."""
+        interval = max(0.2, self.lease_ttl / 4)
+        while not done.wait(interval):
+            try:
+                status, _ = self.request("POST", f"/api/workers/leases/{lease_id}/progress", {
+                    "status": job.get("status", "running"),
+                    "progress": job.get("progress", 0),
+                }, timeout=interval)
+            except OSError as e:
+                # Coordinator unreachable - keep running, the lease may survive
+                print(f"Progress report failed: {e}")
+                continue
+            if status in (404, 410):
+                print(f"Lease {lease_id[:8]} lost, stopping job {job['id']}")
+                stop.set()
+                return
+
+    def run_lease(self, lease: dict):
+        """Run one leased job and report its outcome."""
+        lease_id = lease["lease_id"]
+        job = {"id": lease["job_id"], "config": lease["config"], "status": "preparing", "progress": 10}
+        stop = threading.Event()
+        done = threading.Event()
+        reporter = threading.Thread(target=self.report_progress, args=(lease_id, job, stop, done),
+                                    daemon=True)
+        reporter.start()
+
+        try:
+            case_dir = self.unpack_inputs(job["id"], lease["inputs"])
+            results = self.runner(job, case_dir, lease["proc_plan"], stop)
+        except Exception as e:
+            done.set()
+            reporter.join()
+            if not stop.is_set():
+                self.request("POST", f"/api/workers/leases/{lease_id}/fail", {"error": str(e)})
+            print(f"Job {job['id']} failed: {e}")
+            return
+        done.set()
+        reporter.join()
+        if stop.is_set():
+            return
+
+        # Return the finished case; the coordinator already has the geometry.
+        # Processor directories only matter when the case was left decomposed.
+        keep_decomposed = lease["config"].get("reconstruct", "none") == "none"
+
+        def exclude(rel: Path) -> bool:
+            if rel.parts[:2] == ("constant", "triSurface"):
+                return True
+            return rel.parts[0].startswith("processor") and not keep_decomposed
+
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = Path(tmp) / "results.tar.gz"
+            workers.archive_directory(case_dir, archive, exclude)
+            digest = self.upload_blob(archive)
+
+        status, body = self.request("POST", f"/api/workers/leases/{lease_id}/complete", {
+            "results": results,
+            "archive_sha256": digest,
+            "stages": job.get("stages", []),
+        })
+        if status != 200:
+            print(f"Coordinator rejected results for job {job['id']} ({status}): {body}")
+        else:
+            print(f"Job {job['id']} complete")
+
+    def run_once(self) -> bool:
+        """
+        Lease and run one job.
+
+        Returns:
+            False if the queue was empty
+        """
+        if self.worker_id is None:
+            self.register()
+        status, lease = self.request("POST", f"/api/workers/{self.worker_id}/lease")
+        if status == 404:
+            # Coordinator restarted or dropped us - register again
+            self.register()
+            return False
+        if status == 204 or lease is None:
+            return False
+        if status != 200:
+            raise RuntimeError(f"Lease request failed ({status}): {lease}")
+        print(f"Leased job {lease['job_id']}")
+        self.run_lease(lease)
+        return True
+
+    def run_forever(self, stop: threading.Event = None):
+        """Poll for work until stop is set."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                leased = self.run_once()
+            except OSError as e:
+                print(f"Coordinator unreachable: {e}")
+                leased = False
+            if not leased:
+                stop.wait(self.poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run WheelFlow jobs leased from a coordinator")
+    parser.add_argument("--server", default=os.environ.get("WHEELFLOW_SERVER", "http://localhost:8000"),
+                        help="Coordinator URL")
+    parser.add_argument("--cores", type=int, help="Cores to advertise (default: all usable)")
+    parser.add_argument("--work-dir", type=Path, default=WORK_DIR,
+                        help="Where leased cases are unpacked and run")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    args = parser.parse_args()
+
+    client = WorkerClient(args.server, cores=args.cores, work_dir=args.work_dir,
+                          poll_interval=args.poll_interval)
+    try:
+        client.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+Remote Workers for WheelFlow
+Coordinator side of the pull-based worker protocol
+
+Worker processes on other nodes register with the coordinator (the
+WheelFlow server), advertising their cores and memory, then repeatedly ask
+for a lease on the next queued job. A lease carries the job config and a
+list of content-addressed inputs (the transformed STL and the generated
+case) that the worker downloads from the blob store. While running, the
+worker reports progress, which also renews the lease. Results come back
+as a content-addressed archive of the finished case.
+
+A lease that is not renewed within LEASE_TTL seconds (worker crashed,
+network partition) expires and its job goes back to the front of the
+queue. After MAX_ATTEMPTS expiries the job is failed. Cancelling a leased
+job revokes its lease; the worker stops when its next progress report is
+refused.
+
+The protocol is plain HTTP + JSON (see the /api/workers endpoints in
+app.py); worker_client.py is the worker side. Every request carries a
+shared token in X-Worker-Token.
+
+Configuration (environment variables):
+    WHEELFLOW_WORKER_TOKEN: Shared secret of the coordinator and its workers
+        (remote workers are disabled when it is unset)
+    WHEELFLOW_BLOBS_DIR: Blob store directory (default data/blobs)
+    WHEELFLOW_LEASE_TTL: Seconds a lease lasts without a progress report (default 120)
+    WHEELFLOW_MAX_BLOB_GB: Largest blob a worker may upload (default 50)
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import tarfile
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+
+BASE_DIR = Path(__file__).parent.parent
+BLOBS_DIR = Path(os.environ.get("WHEELFLOW_BLOBS_DIR", str(BASE_DIR / "data" / "blobs")))
+
+WORKER_TOKEN = os.environ.get("WHEELFLOW_WORKER_TOKEN")
+TOKEN_HEADER = "X-Worker-Token"
+
+# Uploads larger than this are refused (result archives of pro cases are a few GB)
+MAX_BLOB_SIZE = int(float(os.environ.get("WHEELFLOW_MAX_BLOB_GB", "50")) * 1e9)
+
+LEASE_TTL = float(os.environ.get("WHEELFLOW_LEASE_TTL", "120"))
+# Workers not seen for this long are dropped from the registry
+WORKER_TIMEOUT = 3 * LEASE_TTL
+MAX_ATTEMPTS = 3
+
+# Expired leases are checked this often by the server
+EXPIRY_CHECK_INTERVAL = 10
+
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+# =============================================================================
+# Content-addressed blob store
+# =============================================================================
+
+class BlobTooLarge(ValueError):
+    """An upload exceeded MAX_BLOB_SIZE."""
+
+
+def is_valid_digest(digest: str) -> bool:
+    return bool(SHA256_PATTERN.match(digest or ""))
+
+
+def blob_path(digest: str, blobs_dir: Path = None) -> Path:
+    """Location of a blob (sharded by the first two hex digits)."""
+    if not is_valid_digest(digest):
+        raise ValueError(f"Invalid blob digest: {digest}")
+    blobs_dir = blobs_dir or BLOBS_DIR
+    return blobs_dir / digest[:2] / digest
+
+
+def file_digest(path: Path) -> str:
+    """sha256 of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _temp_path(dest: Path) -> Path:
+    """A unique name next to dest, so concurrent writers never share a file."""
+    return dest.with_name(f"{dest.name}.{uuid.uuid4().hex}.tmp")
+
+
+def store_blob_file(path: Path, blobs_dir: Path = None) -> str:
+    """Copy a file into the blob store; returns its digest."""
+    digest = file_digest(path)
+    dest = blob_path(digest, blobs_dir)
+    if not dest.exists():
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _temp_path(dest)
+        shutil.copyfile(path, tmp)
+        tmp.replace(dest)
+    return digest
+
+
+def store_blob_bytes(data: bytes, expected_digest: str = None, blobs_dir: Path = None) -> str:
+    """
+    Store bytes in the blob store.
+
+    Raises:
+        ValueError: If the content does not match expected_digest
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if expected_digest is not None and digest != expected_digest:
+        raise ValueError(f"Blob digest mismatch: expected {expected_digest}, got {digest}")
+    dest = blob_path(digest, blobs_dir)
+    if not dest.exists():
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _temp_path(dest)
+        tmp.write_bytes(data)
+        tmp.replace(dest)
+    return digest
+
+
+async def store_blob_stream(chunks: AsyncIterator[bytes], expected_digest: str,
+                            blobs_dir: Path = None, max_size: int = None) -> int:
+    """
+    Store a blob received in chunks (e.g. an HTTP request body) without
+    holding it in memory; returns its size.
+
+    The chunks are hashed as they are written to a temporary file, which
+    only replaces the blob once the whole content has arrived.
+
+    Raises:
+        BlobTooLarge: If more than max_size bytes arrive (default MAX_BLOB_SIZE)
+        ValueError: If the content does not match expected_digest
+    """
+    max_size = MAX_BLOB_SIZE if max_size is None else max_size
+    dest = blob_path(expected_digest, blobs_dir)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_path(dest)
+    h = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp, 'wb') as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_size:
+                    raise BlobTooLarge(f"Blob exceeds the {max_size} byte limit")
+                h.update(chunk)
+                f.write(chunk)
+        digest = h.hexdigest()
+        if digest != expected_digest:
+            raise ValueError(f"Blob digest mismatch: expected {expected_digest}, got {digest}")
+        tmp.replace(dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return size
+
+
+def archive_directory(src_dir: Path, archive_path: Path, exclude: Callable[[Path], bool] = None):
+    """
+    Write a gzipped tar of a directory (paths relative to src_dir).
+
+    Args:
+        exclude: Called with each path relative to src_dir; True skips it
+    """
+    with tarfile.open(archive_path, "w:gz") as tar:
+        for path in sorted(src_dir.rglob("*")):
+            rel = path.relative_to(src_dir)
+            if exclude and exclude(rel):
+                continue
+            if path.is_file():
+                tar.add(path, arcname=str(rel), recursive=False)
+
+
+def extract_archive(archive_path: Path, dest_dir: Path):
+    """Extract an archive, refusing absolute paths, '..' and links."""
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(archive_path, "r:gz") as tar:
+        for member in tar.getmembers():
+            name = Path(member.name)
+            if name.is_absolute() or ".." in name.parts or not (member.isfile() or member.isdir()):
+                raise ValueError(f"Unsafe archive member: {member.name}")
+        tar.extractall(dest_dir)
+
+
+# =============================================================================
+# Coordinator state
+# =============================================================================
+
+class LeaseError(Exception):
+    """Lease unknown, expired or owned by another worker."""
+
+
+class Coordinator:
+    """Worker registry, remote job queue and leases."""
+
+    def __init__(self, lease_ttl: float = None, clock: Callable[[], float] = time.monotonic):
+        self.lease_ttl = lease_ttl if lease_ttl is not None else LEASE_TTL
+        self.clock = clock
+        self.workers: Dict[str, dict] = {}
+        self.queue: deque = deque()
+        self.leases: Dict[str, dict] = {}
+        self.job_leases: Dict[str, str] = {}
+        self.attempts: Dict[str, int] = {}
+        self._done: Dict[str, asyncio.Event] = {}
+
+    # Workers ----------------------------------------------------------------
+
+    def register(self, hostname: str, cores: int, memory_gb: float = 0) -> dict:
+        """Register a worker node."""
+        worker_id = str(uuid.uuid4())[:8]
+        self.workers[worker_id] = {
+            "id": worker_id,
+            "hostname": hostname,
+            "cores": cores,
+            "memory_gb": memory_gb,
+            "registered_at": datetime.now().isoformat(),
+            "last_seen": self.clock(),
+        }
+        print(f"Worker {worker_id} registered: {hostname}, {cores} cores, {memory_gb:.0f} GB")
+        return self.workers[worker_id]
+
+    def touch(self, worker_id: str) -> dict:
+        """Record that a worker is alive."""
+        worker = self.workers.get(worker_id)
+        if worker is None:
+            raise LeaseError(f"Unknown worker {worker_id}")
+        worker["last_seen"] = self.clock()
+        return worker
+
+    # Queue ------------------------------------------------------------------
+
+    def enqueue(self, job_id: str, front: bool = False):
+        """Queue a job for the next free worker."""
+        if job_id in self.queue or job_id in self.job_leases:
+            return
+        if front:
+            self.queue.appendleft(job_id)
+        else:
+            self.queue.append(job_id)
+        self._done.setdefault(job_id, asyncio.Event())
+
+    def is_managed(self, job_id: str) -> bool:
+        """True while the job is queued or leased."""
+        return job_id in self.queue or job_id in self.job_leases
+
+    async def wait(self, job_id: str):
+        """Wait until a queued job completes, fails or is cancelled."""
+        event = self._done.setdefault(job_id, asyncio.Event())
+        await event.wait()
+        self._done.pop(job_id, None)
+
+    def _finish(self, job_id: str):
+        self.attempts.pop(job_id, None)
+        event = self._done.get(job_id)
+        if event is not None:
+            event.set()
+
+    # Leases -----------------------------------------------------------------
+
+    def lease(self, worker_id: str) -> Optional[dict]:
+        """Lease the next queued job to a worker (None if the queue is empty)."""
+        self.touch(worker_id)
+        if not self.queue:
+            return None
+        job_id = self.queue.popleft()
+        lease_id = str(uuid.uuid4())
+        self.leases[lease_id] = {
+            "lease_id": lease_id,
+            "job_id": job_id,
+            "worker_id": worker_id,
+            "expires_at": self.clock() + self.lease_ttl,
+        }
+        self.job_leases[job_id] = lease_id
+        self.attempts[job_id] = self.attempts.get(job_id, 0) + 1
+        return self.leases[lease_id]
+
+    def get_lease(self, lease_id: str) -> dict:
+        lease = self.leases.get(lease_id)
+        if lease is None:
+            raise LeaseError(f"Lease {lease_id} is not active")
+        return lease
+
+    def renew(self, lease_id: str) -> dict:
+        """Extend a lease (on each progress report)."""
+        lease = self.get_lease(lease_id)
+        lease["expires_at"] = self.clock() + self.lease_ttl
+        if lease["worker_id"] in self.workers:
+            self.touch(lease["worker_id"])
+        return lease
+
+    def release(self, lease_id: str) -> str:
+        """End a lease whose job finished (completed, failed or cancelled)."""
+        lease = self.leases.pop(lease_id, None)
+        if lease is None:
+            raise LeaseError(f"Lease {lease_id} is not active")
+        self.job_leases.pop(lease["job_id"], None)
+        self._finish(lease["job_id"])
+        return lease["job_id"]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a remote job.
+
+        Queued jobs are dropped. A leased job's lease is revoked, so the
+        worker's next progress report is refused and it stops the run.
+
+        Returns:
+            True if the coordinator was managing the job
+        """
+        if job_id in self.queue:
+            self.queue.remove(job_id)
+            self._finish(job_id)
+            return True
+        lease_id = self.job_leases.get(job_id)
+        if lease_id:
+            self.release(lease_id)
+            return True
+        return False
+
+    def expire(self) -> List[dict]:
+        """
+        Requeue jobs whose leases ran out and drop silent workers.
+
+        Returns:
+            One {"job_id", "action"} entry per expired lease, where action
+            is "requeued" or "failed" (attempts exhausted)
+        """
+        now = self.clock()
+        events = []
+        for lease_id, lease in list(self.leases.items()):
+            if lease["expires_at"] > now:
+                continue
+            job_id = lease["job_id"]
+            del self.leases[lease_id]
+            self.job_leases.pop(job_id, None)
+
+            if self.attempts.get(job_id, 0) >= MAX_ATTEMPTS:
+                self._finish(job_id)
+                events.append({"job_id": job_id, "action": "failed"})
+            else:
+                # Front of the queue: it has already waited its turn
+                self.queue.appendleft(job_id)
+                events.append({"job_id": job_id, "action": "requeued"})
+            print(f"Lease {lease_id[:8]} for job {job_id} expired ({events[-1]['action']})")
+
+        for worker_id, worker in list(self.workers.items()):
+            if now - worker["last_seen"] > WORKER_TIMEOUT:
+                del self.workers[worker_id]
+        return events
+
+    def status(self) -> dict:
+        """Snapshot for GET /api/workers."""
+        now = self.clock()
+        return {
+            "workers": [
+                {**w, "last_seen_s": round(now - w["last_seen"], 1),
+                 "leases": [l["job_id"] for l in self.leases.values() if l["worker_id"] == w["id"]]}
+                for w in self.workers.values()
+            ],
+            "queue": list(self.queue),
+            "leases": [
+                {"lease_id": l["lease_id"], "job_id": l["job_id"], "worker_id": l["worker_id"],
+                 "expires_in": round(l["expires_at"] - now, 1)}
+                for l in self.leases.values()
+            ],
+        }
+
+
+# Process-wide coordinator used by the API
+coordinator = Coordinator()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Measure stage scaling on this host and feed the scaling model.
+
+Usage:
+    python scripts/benchmark_scaling.py <case_dir> [--stage solver|solver_mrf|solver_transient|mesh]
+                                        [--procs 1,2,4,8,16] [--iterations 20]
+    python scripts/benchmark_scaling.py cases/7a430d2b_00 --procs 4,8,16
+
+This script:
+1. Copies a finished case to a scratch directory for each process count
+   (reconstructing its mesh if it was meshed in parallel)
+2. Runs the stage (a few solver iterations, or blockMesh + snappyHexMesh),
+   decomposing first so only the stage itself is timed
+3. Records wall time, process count and cell count in scaling_samples
+
+Pick the solver stage matching the case's rotation method; the case's own
+settings decide whether the solve is steady or transient.
+
+Jobs also record samples as they complete; this just fills in process
+counts the scheduler would not otherwise try.
+"""
+
+import argparse
+import asyncio
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import foam_mesh, scaling_model
+from backend.app import decompose_case, get_openfoam_env_cached, run_openfoam_command
+
+
+def copy_case(case_dir: Path, dest: Path, with_mesh: bool) -> bool:
+    """
+    Copy the case inputs (mesh, settings, initial fields) without results.
+
+    A case meshed in parallel has its mesh only in processor*/constant;
+    constant/polyMesh is still the blockMesh background mesh. With
+    with_mesh, those processor meshes are copied instead of it.
+
+    Returns:
+        True if the mesh has to be reconstructed from the processor meshes
+    """
+    for name in ["0", "constant", "system"]:
+        src = case_dir / name
+        if src.exists():
+            shutil.copytree(src, dest / name)
+
+    if not with_mesh or not foam_mesh.decomposed(case_dir):
+        return False
+    shutil.rmtree(dest / "constant" / "polyMesh", ignore_errors=True)
+    for processor in foam_mesh.processor_dirs(case_dir):
+        shutil.copytree(processor / "constant", dest / processor.name / "constant")
+    return True
+
+
+def limit_iterations(case_dir: Path, iterations: int):
+    """Run only a few steps and write nothing."""
+    control_dict = case_dir / "system" / "controlDict"
+    content = control_dict.read_text()
+    delta_t = 1.0
+    match = re.search(r'^deltaT\s+([\d.eE+-]+);', content, re.MULTILINE)
+    if match:
+        delta_t = float(match.group(1))
+    content = re.sub(r'^startFrom\s+\w+;', 'startFrom       startTime;', content, flags=re.MULTILINE)
+    content = re.sub(r'^endTime\s+[^;]+;', f'endTime         {iterations * delta_t};',
+                     content, flags=re.MULTILINE)
+    content = re.sub(r'^writeControl\s+\w+;', 'writeControl    timeStep;', content, flags=re.MULTILINE)
+    content = re.sub(r'^writeInterval\s+[^;]+;', f'writeInterval   {iterations + 1};',
+                     content, flags=re.MULTILINE)
+    control_dict.write_text(content)
+
+
+async def benchmark(case_dir: Path, stage: str, num_procs: int, iterations: int) -> dict:
+    """Run one stage at one process count and record the sample."""
+    with tempfile.TemporaryDirectory(prefix="wheelflow_bench_") as tmp:
+        work_dir = Path(tmp)
+        parallel = num_procs > 1
+
+        if stage == scaling_model.MESH:
+            copy_case(case_dir, work_dir, with_mesh=False)
+            await run_openfoam_command(work_dir, "blockMesh")
+            if parallel:
+                # Time snappyHexMesh alone, as jobs do
+                await decompose_case(work_dir, num_procs, get_openfoam_env_cached())
+            start = time.monotonic()
+            await run_openfoam_command(work_dir, "snappyHexMesh", ["-overwrite"],
+                                       parallel=parallel, num_procs=num_procs)
+            wall_time = time.monotonic() - start
+            work_units = 1
+        else:
+            if copy_case(case_dir, work_dir, with_mesh=True):
+                # Solve on the snappyHexMesh mesh, not the background mesh
+                await run_openfoam_command(work_dir, "reconstructPar", ["-constant"])
+                for processor in foam_mesh.processor_dirs(work_dir):
+                    shutil.rmtree(processor)
+            limit_iterations(work_dir, iterations)
+            if parallel:
+                # Time the solver alone, as jobs do
+                await decompose_case(work_dir, num_procs, get_openfoam_env_cached())
+            start = time.monotonic()
+            await run_openfoam_command(work_dir, "foamRun", ["-solver", "incompressibleFluid"],
+                                       parallel=parallel, num_procs=num_procs)
+            wall_time = time.monotonic() - start
+            work_units = scaling_model.count_time_steps(work_dir / "log.foamRun")
+
+        cells = foam_mesh.mesh_cells(work_dir) or 0
+        scaling_model.record_sample(stage, num_procs, cells, wall_time, work_units=work_units)
+
+    return {"procs": num_procs, "cells": cells, "wall_time": wall_time, "work_units": work_units}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stage scaling on this host")
+    parser.add_argument("case_dir", type=Path, help="Finished (meshed) case to benchmark")
+    parser.add_argument("--stage", choices=[*scaling_model.SOLVER_STAGES.values(), scaling_model.MESH],
+                        default=scaling_model.SOLVER)
+    parser.add_argument("--procs", default="1,2,4,8,16",
+                        help="Comma-separated process counts")
+    parser.add_argument("--iterations", type=int, default=20,
+                        help="Solver iterations per run")
+    args = parser.parse_args()
+
+    if not (args.case_dir / "system" / "controlDict").exists():
+        print(f"Error: {args.case_dir} is not an OpenFOAM case")
+        sys.exit(1)
+
+    max_procs = scaling_model.available_procs()
+    proc_counts = [int(p) for p in args.procs.split(",") if int(p) <= max_procs]
+
+    for num_procs in proc_counts:
+        result = asyncio.run(benchmark(args.case_dir, args.stage, num_procs, args.iterations))
+        per_unit = result["wall_time"] / max(result["work_units"], 1)
+        print(f"{args.stage} np={num_procs}: {result['wall_time']:.1f}s "
+              f"({per_unit:.3f}s per unit, {result['cells']} cells)")
+
+    fit = scaling_model.get_fit(args.stage)
+    if fit:
+        print(f"Fitted model: {fit.to_dict()}")
+        cells = foam_mesh.mesh_cells(args.case_dir) or 0
+        print(f"Chosen procs for {cells} cells: "
+              f"{scaling_model.choose_procs(args.stage, cells, fit=fit)}")
+
+
+if __name__ == "__main__":
+    main()
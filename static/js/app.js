@@ -1213,7 +1213,7 @@ async function renderConvergenceChart(jobId, containerId) {
     if (!container) return;
 
     try {
-        const response = await fetch(`/api/jobs/${jobId}/convergence`);
+        const response = await fetch(`/api/jobs/${jobId}/convergence?max_points=400`);
         if (!response.ok) {
             container.innerHTML = '<p class="chart-error">Convergence data not available</p>';
             return;
@@ -1334,7 +1334,7 @@ async function renderForceDistributionChart(jobId, containerId, forceType = 'dra
     if (!container) return;
 
     try {
-        const response = await fetch(`/api/jobs/${jobId}/viz/force_distribution`);
+        const response = await fetch(`/api/jobs/${jobId}/viz/force_distribution?max_points=400`);
         if (!response.ok) {
             container.innerHTML = '<p class="chart-error">Force data not available</p>';
             return;
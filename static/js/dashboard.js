@@ -588,8 +588,9 @@ async function updateConvergenceChart(job) {
     if (!convergenceChart) return;
 
     try {
-        // Fetch real convergence data
-        const response = await fetch(`/api/jobs/${currentJobId}/convergence`);
+        // Fetch real convergence data, downsampled by the server (max 500
+        // points, keeping the last one). Unchanged data comes back as a 304.
+        const response = await fetch(`/api/jobs/${currentJobId}/convergence?max_points=500`);
         if (response.ok) {
             const data = await response.json();
 
@@ -597,39 +598,15 @@ async function updateConvergenceChart(job) {
                 // Hide placeholder
                 hideChartPlaceholder('convergence-chart');
 
-                // Sample data for performance (max 500 points)
-                let times = data.time;
-                let cdValues = data.Cd;
-                const maxPoints = 500;
-
-                if (times.length > maxPoints) {
-                    const step = Math.ceil(times.length / maxPoints);
-                    const sampledTimes = [];
-                    const sampledCd = [];
-
-                    for (let i = 0; i < times.length; i += step) {
-                        sampledTimes.push(times[i]);
-                        sampledCd.push(cdValues[i]);
-                    }
-
-                    // Always include the last point
-                    if (sampledTimes[sampledTimes.length - 1] !== times[times.length - 1]) {
-                        sampledTimes.push(times[times.length - 1]);
-                        sampledCd.push(cdValues[cdValues.length - 1]);
-                    }
-
-                    times = sampledTimes;
-                    cdValues = sampledCd;
-                }
-
                 // Use real data
-                convergenceChart.data.labels = times;
-                convergenceChart.data.datasets[0].data = cdValues;
+                convergenceChart.data.labels = data.time;
+                convergenceChart.data.datasets[0].data = data.Cd;
                 convergenceChart.update('none');
 
                 // Update iteration count (show total, not sampled)
-                document.getElementById('iterations').textContent = data.time.length;
-                document.getElementById('of-iteration').textContent = data.time.length;
+                const totalRows = data.rows ?? data.time.length;
+                document.getElementById('iterations').textContent = totalRows;
+                document.getElementById('of-iteration').textContent = totalRows;
 
                 // Update final Cd value in the metrics
                 if (data.Cd && data.Cd.length > 0) {
@@ -1327,7 +1304,7 @@ async function exportExcel() {
 
         // Try to get convergence data for additional sheet
         try {
-            const convResponse = await fetch(`/api/jobs/${currentJobId}/convergence`);
+            const convResponse = await fetch(`/api/jobs/${currentJobId}/convergence?max_points=500`);
             if (convResponse.ok) {
                 const convData = await convResponse.json();
                 if (convData.time && convData.time.length > 0) {
@@ -1337,9 +1314,8 @@ async function exportExcel() {
                         ['Iteration', 'Cd', 'Cl', 'Cm']
                     ];
 
-                    // Sample every N points to keep file size reasonable
-                    const step = Math.max(1, Math.floor(convData.time.length / 500));
-                    for (let i = 0; i < convData.time.length; i += step) {
+                    // Already downsampled to 500 points to keep file size reasonable
+                    for (let i = 0; i < convData.time.length; i++) {
                         convergenceRows.push([
                             convData.time[i],
                             convData.Cd?.[i]?.toFixed(6) || '',
@@ -1733,72 +1709,208 @@ function updateSpeedometer(speedKmh, maxSpeed = 80) {
     speedDialFill.style.strokeDashoffset = offset;
 }
 
-// Load actual pressure surface from simulation
+// Binary surface format flags (see backend/visualization/pressure_surface.py)
+const SURFACE_QUANTIZED_POSITIONS = 1;
+const SURFACE_QUANTIZED_CP = 2;
+const SURFACE_SHORT_INDICES = 4;
+const SURFACE_HAS_CP = 8;
+
+// Parse a binary surface; unquantized sections are views on the response bytes
+function parseSurfaceBinary(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'WFSF' || view.getUint16(4, true) !== 1) {
+        return null;
+    }
+    const flags = view.getUint16(6, true);
+    const nVertices = view.getUint32(8, true);
+    const nTriangles = view.getUint32(12, true);
+    const float = (offset) => view.getFloat32(offset, true);
+    const boundsMin = [float(20), float(24), float(28)];
+    const boundsMax = [float(32), float(36), float(40)];
+    const cpRange = [float(44), float(48)];
+
+    // Sections start on 4-byte boundaries after the 64-byte header
+    let offset = 64;
+    const section = (ArrayType, count) => {
+        const array = new ArrayType(buffer, offset, count);
+        offset += Math.ceil(array.byteLength / 4) * 4;
+        return array;
+    };
+
+    let positions;
+    if (flags & SURFACE_QUANTIZED_POSITIONS) {
+        const quantized = section(Uint16Array, nVertices * 3);
+        positions = new Float32Array(quantized.length);
+        for (let i = 0; i < quantized.length; i++) {
+            const axis = i % 3;
+            positions[i] = boundsMin[axis] + quantized[i] / 65535 * (boundsMax[axis] - boundsMin[axis]);
+        }
+    } else {
+        positions = section(Float32Array, nVertices * 3);
+    }
+
+    let cp = null;
+    if (flags & SURFACE_HAS_CP) {
+        if (flags & SURFACE_QUANTIZED_CP) {
+            const quantized = section(Uint16Array, nVertices);
+            cp = Float32Array.from(quantized, q => cpRange[0] + q / 65535 * (cpRange[1] - cpRange[0]));
+        } else {
+            cp = section(Float32Array, nVertices);
+        }
+    }
+    const indices = section((flags & SURFACE_SHORT_INDICES) ? Uint16Array : Uint32Array, nTriangles * 3);
+
+    return {
+        positions,
+        indices,
+        colors: cp ? createVertexColors(cp, cpRange) : createPressureColors(positions, indices, null),
+        legend: cp ? `Cp: ${cpRange[0].toFixed(2)} to ${cpRange[1].toFixed(2)}` : null,
+        nVertices,
+        nTriangles
+    };
+}
+
+// Triangle budget of the first paint; the full surface loads on demand
+const SURFACE_PREVIEW_TRIANGLES = 50000;
+let fullSurfaceLoader = null;
+
+// Fetch the binary (16-bit quantized) surface, the level of detail within
+// maxTriangles if given; null if not available
+async function fetchSurfaceBinary(jobId, maxTriangles = null) {
+    let url = `/api/jobs/${jobId}/viz/pressure_surface.bin?quantized=true`;
+    if (maxTriangles) {
+        url += `&max_triangles=${maxTriangles}`;
+    }
+    const response = await fetch(url);
+    if (!response.ok) {
+        return null;
+    }
+    const surface = parseSurfaceBinary(await response.arrayBuffer());
+    if (surface) {
+        const full = parseInt(response.headers.get('X-Surface-Full-Triangles'), 10);
+        surface.fullTriangles = Number.isNaN(full) ? surface.nTriangles : full;
+    }
+    return surface;
+}
+
+// Fetch the JSON surface (vertex_cp is missing from older exports)
+async function fetchSurfaceJson(jobId) {
+    const response = await fetch(`/api/jobs/${jobId}/viz/pressure_surface.json`);
+    if (!response.ok) {
+        return null;
+    }
+    const data = await response.json();
+    if (!data.vertices || !data.indices || data.vertices.length === 0) {
+        return null;
+    }
+
+    const hasCp = data.vertex_cp && data.vertex_cp.length === data.n_vertices;
+    let legend = null;
+    if (hasCp && data.cp_range) {
+        legend = `Cp: ${data.cp_range[0].toFixed(2)} to ${data.cp_range[1].toFixed(2)}`;
+    } else if (data.pressure_range) {
+        legend = `Pressure: ${data.pressure_range[0].toFixed(1)} to ${data.pressure_range[1].toFixed(1)} Pa`;
+    }
+    return {
+        positions: new Float32Array(data.vertices),
+        indices: new Uint32Array(data.indices),
+        colors: hasCp
+            ? createVertexColors(data.vertex_cp, data.cp_range)
+            : createPressureColors(data.vertices, data.indices, data.pressures, data.pressure_range),
+        legend,
+        nVertices: data.n_vertices,
+        nTriangles: data.n_triangles
+    };
+}
+
+// Load actual pressure surface from simulation: a coarse level of detail
+// first, the full surface once the user starts moving the view
 async function loadPressureSurface(jobId) {
     if (!scene3d || !jobId) return;
 
     try {
-        // Fetch JSON geometry with pressure data
-        const response = await fetch(`/api/jobs/${jobId}/viz/pressure_surface.json`);
-        if (!response.ok) {
+        // Binary geometry with pressure data, or JSON where unavailable
+        let surface = null;
+        try {
+            surface = await fetchSurfaceBinary(jobId, SURFACE_PREVIEW_TRIANGLES);
+        } catch (error) {
+            console.log('Binary pressure surface unavailable:', error);
+        }
+        if (!surface) {
+            surface = await fetchSurfaceJson(jobId);
+        }
+        if (!surface) {
             console.log('Pressure surface not available yet');
             return;
         }
 
-        const data = await response.json();
+        showPressureSurface(surface, true);
 
-        if (!data.vertices || !data.indices || data.vertices.length === 0) {
-            console.log('Pressure surface data incomplete');
-            return;
+        if (controls3d && fullSurfaceLoader) {
+            controls3d.removeEventListener('start', fullSurfaceLoader);
+            fullSurfaceLoader = null;
         }
-
-        // Remove existing wheel mesh
-        if (wheelMesh) {
-            scene3d.remove(wheelMesh);
-            wheelMesh = null;
+        if (controls3d && surface.fullTriangles > surface.nTriangles) {
+            const loadFull = async () => {
+                controls3d.removeEventListener('start', loadFull);
+                fullSurfaceLoader = null;
+                try {
+                    const full = await fetchSurfaceBinary(jobId);
+                    // Skip if another job was loaded meanwhile
+                    if (full && jobId === currentJobId) {
+                        showPressureSurface(full, false);
+                    }
+                } catch (error) {
+                    console.log('Could not load full pressure surface:', error);
+                }
+            };
+            fullSurfaceLoader = loadFull;
+            controls3d.addEventListener('start', loadFull);
         }
 
-        // Create BufferGeometry from JSON data
-        const geometry = new THREE.BufferGeometry();
-
-        // Set vertices
-        const vertices = new Float32Array(data.vertices);
-        geometry.setAttribute('position', new THREE.BufferAttribute(vertices, 3));
-
-        // Set indices
-        const indices = new Uint32Array(data.indices);
-        geometry.setIndex(new THREE.BufferAttribute(indices, 1));
-
-        // Compute normals for proper lighting
-        geometry.computeVertexNormals();
-
-        // Create vertex colors based on pressure
-        const colors = createPressureColors(
-            data.vertices,
-            data.indices,
-            data.pressures,
-            data.pressure_range
-        );
-        geometry.setAttribute('color', new THREE.BufferAttribute(colors, 3));
-
-        // Create mesh with vertex colors
-        const material = new THREE.MeshPhongMaterial({
-            vertexColors: true,
-            side: THREE.DoubleSide,
-            shininess: 30,
-            specular: 0x222222
-        });
+    } catch (error) {
+        console.log('Could not load pressure surface:', error);
+    }
+}
+
+// Replace the wheel mesh with a surface; fitCamera frames it
+function showPressureSurface(surface, fitCamera) {
+    // Remove existing wheel mesh
+    if (wheelMesh) {
+        scene3d.remove(wheelMesh);
+        wheelMesh.geometry.dispose();
+        wheelMesh = null;
+    }
+
+    // Create BufferGeometry straight from the typed arrays
+    const geometry = new THREE.BufferGeometry();
+    geometry.setAttribute('position', new THREE.BufferAttribute(surface.positions, 3));
+    geometry.setIndex(new THREE.BufferAttribute(surface.indices, 1));
 
-        wheelMesh = new THREE.Mesh(geometry, material);
+    // Compute normals for proper lighting
+    geometry.computeVertexNormals();
+    geometry.setAttribute('color', new THREE.BufferAttribute(surface.colors, 3));
 
-        // Center the geometry
-        geometry.computeBoundingBox();
-        const center = new THREE.Vector3();
-        geometry.boundingBox.getCenter(center);
-        wheelMesh.position.sub(center);
+    // Create mesh with vertex colors
+    const material = new THREE.MeshPhongMaterial({
+        vertexColors: true,
+        side: THREE.DoubleSide,
+        shininess: 30,
+        specular: 0x222222
+    });
 
-        scene3d.add(wheelMesh);
+    wheelMesh = new THREE.Mesh(geometry, material);
+
+    // Center the geometry
+    geometry.computeBoundingBox();
+    const center = new THREE.Vector3();
+    geometry.boundingBox.getCenter(center);
+    wheelMesh.position.sub(center);
+
+    scene3d.add(wheelMesh);
 
+    if (fitCamera) {
         // Update camera to fit the new geometry
         const box = geometry.boundingBox;
         const size = box.getSize(new THREE.Vector3());
@@ -1809,22 +1921,47 @@ async function loadPressureSurface(jobId) {
             controls3d.target.set(0, 0, 0);
             controls3d.update();
         }
+    }
 
-        // Update pressure range display
-        if (data.pressure_range) {
-            const pMin = data.pressure_range[0].toFixed(1);
-            const pMax = data.pressure_range[1].toFixed(1);
-            const legendEl = document.getElementById('pressure-legend');
-            if (legendEl) {
-                legendEl.textContent = `Pressure: ${pMin} to ${pMax} Pa`;
-            }
-        }
+    // Update pressure range display
+    const legendEl = document.getElementById('pressure-legend');
+    if (legendEl && surface.legend) {
+        legendEl.textContent = surface.legend;
+    }
 
-        console.log(`Pressure surface loaded: ${data.n_vertices} vertices, ${data.n_triangles} triangles`);
+    console.log(`Pressure surface loaded: ${surface.nVertices} vertices, ${surface.nTriangles} triangles`);
+}
 
-    } catch (error) {
-        console.log('Could not load pressure surface:', error);
+// Blue-white-red diverging colormap of a value normalized to [0, 1]
+function divergingColor(t) {
+    if (t < 0.5) {
+        // Blue to white (low pressure)
+        const s = t * 2;
+        return [s, s, 1.0];
     }
+    // White to red (high pressure)
+    const s = (t - 0.5) * 2;
+    return [1.0, 1.0 - s, 1.0 - s];
+}
+
+// Create vertex colors from per-vertex values
+function createVertexColors(values, valueRange) {
+    const colors = new Float32Array(values.length * 3);
+    let vMin = valueRange ? valueRange[0] : Math.min(...values);
+    let vMax = valueRange ? valueRange[1] : Math.max(...values);
+    if (vMax - vMin < 1e-10) {
+        vMax = vMin + 1;
+    }
+
+    for (let i = 0; i < values.length; i++) {
+        const t = Math.max(0, Math.min(1, (values[i] - vMin) / (vMax - vMin)));
+        const [r, g, b] = divergingColor(t);
+        colors[i * 3] = r;
+        colors[i * 3 + 1] = g;
+        colors[i * 3 + 2] = b;
+    }
+
+    return colors;
 }
 
 // Create vertex colors based on face pressure values
@@ -1956,15 +2093,167 @@ async function loadAvailableSlices() {
     }
 }
 
+// Slice grids already fetched, by job, slice, field, with their ETags.
+// Every load revalidates, so a grid resampled after a re-run replaces it.
+const sliceGrids = new Map();
+let currentSliceGrid = null;
+
+// Sequential colormaps as evenly spaced stops
+const SLICE_COLORMAPS = {
+    viridis: [[0.267, 0.005, 0.329], [0.229, 0.322, 0.546], [0.128, 0.567, 0.551],
+              [0.369, 0.789, 0.383], [0.993, 0.906, 0.144]],
+    gray: [[0, 0, 0], [1, 1, 1]]
+};
+
+// Diverging fields (about zero) are coloured over a symmetric range
+const SLICE_DIVERGING_FIELDS = new Set(['p', 'Cp', 'Ux', 'Uy', 'Uz']);
+
+function sliceColor(colormap, t) {
+    const stops = SLICE_COLORMAPS[colormap];
+    if (!stops) return divergingColor(t);
+    const x = t * (stops.length - 1);
+    const i = Math.min(Math.floor(x), stops.length - 2);
+    const f = x - i;
+    return stops[i].map((c, k) => c + (stops[i + 1][k] - c) * f);
+}
+
+// Float16 values of a slice grid, by their 16 bits
+let float16Table = null;
+
+function float16Values(buffer, offset, count) {
+    if (!float16Table) {
+        float16Table = new Float32Array(65536);
+        for (let h = 0; h < 65536; h++) {
+            const sign = h & 0x8000 ? -1 : 1;
+            const exponent = (h >> 10) & 0x1f;
+            const fraction = h & 0x3ff;
+            if (exponent === 0) float16Table[h] = sign * fraction * Math.pow(2, -24);
+            else if (exponent === 31) float16Table[h] = fraction ? NaN : sign * Infinity;
+            else float16Table[h] = sign * (1 + fraction / 1024) * Math.pow(2, exponent - 15);
+        }
+    }
+    const bits = new Uint16Array(buffer, offset, count);
+    const values = new Float32Array(count);
+    for (let i = 0; i < count; i++) values[i] = float16Table[bits[i]];
+    return values;
+}
+
+// Parse a slice grid (format in backend/visualization/pressure_slices.py)
+function parseSliceGrid(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'WFSG' || view.getUint16(4, true) !== 1) {
+        throw new Error('Not a WheelFlow slice grid');
+    }
+    const float16 = (view.getUint16(6, true) & 1) !== 0;
+    const width = view.getUint32(8, true);
+    const height = view.getUint32(12, true);
+    const count = width * height;
+    const field = String.fromCharCode(...new Uint8Array(buffer, 48, 16)).replace(/\0+$/, '');
+    return {
+        width,
+        height,
+        axes: [view.getUint8(16), view.getUint8(17)],
+        extent: [0, 1, 2, 3].map(k => view.getFloat32(20 + 4 * k, true)),
+        valueRange: [view.getFloat32(36, true), view.getFloat32(40, true)],
+        plane: view.getFloat32(44, true),
+        field,
+        values: float16 ? float16Values(buffer, 64, count) : new Float32Array(buffer, 64, count)
+    };
+}
+
+async function fetchSliceGrid(jobId, sliceName, field) {
+    const key = `${jobId}/${sliceName}/${field}`;
+    const cached = sliceGrids.get(key);
+    const headers = cached && cached.etag ? { 'If-None-Match': cached.etag } : {};
+    const response = await fetch(`/api/jobs/${jobId}/viz/slice/${sliceName}.grid?field=${encodeURIComponent(field)}`,
+                                 { headers });
+    if (response.status === 304 && cached) return cached.grid;
+    if (!response.ok) throw new Error(`Slice grid not available (${response.status})`);
+    const grid = parseSliceGrid(await response.arrayBuffer());
+    sliceGrids.set(key, { etag: response.headers.get('ETag'), grid });
+    return grid;
+}
+
+// Clear the range inputs (back to the automatic range), e.g. for a new field
+function resetSliceRange() {
+    for (const id of ['slice-min', 'slice-max']) {
+        const input = document.getElementById(id);
+        if (input) input.value = '';
+    }
+}
+
+// Colour the current slice grid into the canvas with the selected colormap
+function drawSliceGrid() {
+    const canvas = document.getElementById('slice-canvas');
+    const grid = currentSliceGrid;
+    if (!canvas || !grid) return;
+
+    const colormapEl = document.getElementById('slice-colormap');
+    const colormap = colormapEl ? colormapEl.value : 'diverging';
+    let [vMin, vMax] = grid.valueRange;
+    if (SLICE_DIVERGING_FIELDS.has(grid.field) && colormap === 'diverging') {
+        const limit = Math.max(Math.abs(vMin), Math.abs(vMax));
+        [vMin, vMax] = [-limit, limit];
+    }
+    // Range inputs override the automatic range; empty ones show it
+    const minEl = document.getElementById('slice-min');
+    const maxEl = document.getElementById('slice-max');
+    if (minEl) {
+        minEl.placeholder = `min ${vMin.toPrecision(3)}`;
+        if (Number.isFinite(parseFloat(minEl.value))) vMin = parseFloat(minEl.value);
+    }
+    if (maxEl) {
+        maxEl.placeholder = `max ${vMax.toPrecision(3)}`;
+        if (Number.isFinite(parseFloat(maxEl.value))) vMax = parseFloat(maxEl.value);
+    }
+    if (vMax - vMin < 1e-10) vMax = vMin + 1;
+
+    canvas.width = grid.width;
+    canvas.height = grid.height;
+    const ctx = canvas.getContext('2d');
+    const image = ctx.createImageData(grid.width, grid.height);
+    const pixels = image.data;
+    // 256-entry lookup instead of a colormap evaluation per pixel
+    const lut = new Uint8ClampedArray(256 * 3);
+    for (let i = 0; i < 256; i++) {
+        const [r, g, b] = sliceColor(colormap, i / 255);
+        lut[i * 3] = r * 255;
+        lut[i * 3 + 1] = g * 255;
+        lut[i * 3 + 2] = b * 255;
+    }
+    const scale = 255 / (vMax - vMin);
+
+    for (let row = 0; row < grid.height; row++) {
+        // Grid rows start at the bottom, canvas rows at the top
+        const source = row * grid.width;
+        const target = (grid.height - 1 - row) * grid.width;
+        for (let col = 0; col < grid.width; col++) {
+            const value = grid.values[source + col];
+            const o = (target + col) * 4;
+            if (Number.isNaN(value)) continue;  // Outside the slice: transparent
+            const k = Math.max(0, Math.min(255, Math.round((value - vMin) * scale))) * 3;
+            pixels[o] = lut[k];
+            pixels[o + 1] = lut[k + 1];
+            pixels[o + 2] = lut[k + 2];
+            pixels[o + 3] = 255;
+        }
+    }
+    ctx.putImageData(image, 0, 0);
+}
+
 async function loadSliceImage() {
     const selector = document.getElementById('slice-selector');
     if (!selector || !selector.value || !currentJobId) return;
 
     const sliceName = selector.value;
+    const fieldEl = document.getElementById('slice-field');
+    const field = fieldEl ? fieldEl.value : 'p';
     const container = document.getElementById('slice-container');
     const placeholder = document.getElementById('slice-placeholder');
     const loading = document.getElementById('slice-loading');
     const image = document.getElementById('slice-image');
+    const canvas = document.getElementById('slice-canvas');
 
     if (!container || !image) return;
 
@@ -1972,6 +2261,21 @@ async function loadSliceImage() {
     if (placeholder) placeholder.classList.add('hidden');
     if (loading) loading.classList.remove('hidden');
     image.classList.add('hidden');
+    if (canvas) canvas.classList.add('hidden');
+
+    // The field grid is coloured here; colormap changes need no request
+    if (canvas) {
+        try {
+            currentSliceGrid = await fetchSliceGrid(currentJobId, sliceName, field);
+            drawSliceGrid();
+            canvas.classList.remove('hidden');
+            if (loading) loading.classList.add('hidden');
+            return;
+        } catch (error) {
+            console.log('Slice grid not available, using rendered image:', error);
+            currentSliceGrid = null;
+        }
+    }
 
     try {
         const imageUrl = `/api/jobs/${currentJobId}/viz/slice/${sliceName}.png`;
@@ -2001,14 +2305,21 @@ async function loadSliceImage() {
 }
 
 function downloadSliceImage() {
+    const canvas = document.getElementById('slice-canvas');
     const image = document.getElementById('slice-image');
-    if (!image || image.classList.contains('hidden') || !image.src) {
+    let href = null;
+    if (canvas && currentSliceGrid && !canvas.classList.contains('hidden')) {
+        href = canvas.toDataURL('image/png');
+    } else if (image && !image.classList.contains('hidden') && image.src) {
+        href = image.src;
+    }
+    if (!href) {
         alert('No slice image to download');
         return;
     }
 
     const link = document.createElement('a');
-    link.href = image.src;
+    link.href = href;
     link.download = `pressure_slice_${currentJobId}.png`;
     link.click();
 }
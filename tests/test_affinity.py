@@ -0,0 +1,144 @@
+"""
+Tests for per-job core sets, MPI binding and low-priority render workers.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import affinity
+from backend import render_pool
+
+
+class TestCpuLists:
+    """Tests for kernel CPU list parsing."""
+
+    def test_parse_ranges(self):
+        assert affinity.parse_cpu_list("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+
+    def test_parse_empty(self):
+        assert affinity.parse_cpu_list("") == []
+
+    def test_format(self):
+        assert affinity.format_cpu_list([3, 1, 2]) == "1,2,3"
+
+
+class TestCoreAllocator:
+    """Tests for NUMA-aware core allocation."""
+
+    @pytest.fixture
+    def allocator(self):
+        # Two sockets with 8 cores each
+        return affinity.CoreAllocator({0: list(range(0, 8)), 1: list(range(8, 16))})
+
+    def test_job_fits_on_one_node(self, allocator):
+        cpus = allocator.allocate("a", 4)
+        assert len(cpus) == 4
+        assert all(c < 8 for c in cpus) or all(c >= 8 for c in cpus)
+
+    def test_concurrent_jobs_get_disjoint_cores(self, allocator):
+        a = allocator.allocate("a", 6)
+        b = allocator.allocate("b", 6)
+        assert not set(a) & set(b)
+        # Each still fits on a single socket
+        for cpus in (a, b):
+            assert all(c < 8 for c in cpus) or all(c >= 8 for c in cpus)
+
+    def test_prefers_fullest_node_that_fits(self, allocator):
+        allocator.allocate("a", 6)  # leaves 2 on one node
+        cpus = allocator.allocate("b", 2)
+        a_node = 0 if allocator.get("a")[0] < 8 else 1
+        assert all((c < 8) == (a_node == 0) for c in cpus)
+
+    def test_large_job_spans_nodes(self, allocator):
+        cpus = allocator.allocate("a", 12)
+        assert len(set(cpus)) == 12
+
+    def test_not_enough_cores(self, allocator):
+        allocator.allocate("a", 12)
+        assert allocator.allocate("b", 8) is None
+
+    def test_release_frees_cores(self, allocator):
+        allocator.allocate("a", 16)
+        allocator.release("a")
+        assert allocator.allocate("b", 16) is not None
+
+    def test_allocate_is_idempotent(self, allocator):
+        assert allocator.allocate("a", 4) == allocator.allocate("a", 4)
+
+
+class TestMpirunBinding:
+    """Tests for mpirun binding options."""
+
+    def test_binds_one_rank_per_core(self):
+        args = affinity.mpirun_binding_args([4, 5, 6, 7], 4)
+        assert args == ["--cpu-set", "4,5,6,7", "--map-by", "core", "--bind-to", "core"]
+
+    def test_unbound_without_allocation(self):
+        assert affinity.mpirun_binding_args(None, 8) == []
+
+    def test_oversubscribed_not_bound_to_core(self):
+        args = affinity.mpirun_binding_args([0, 1], 4)
+        assert args[-2:] == ["--bind-to", "none"]
+
+
+class TestProcessIsolation:
+    """Tests for settings applied to launched processes."""
+
+    def test_prefix_pins_child(self):
+        cpu = min(os.sched_getaffinity(0))
+        prefix = affinity.job_launch_prefix([cpu], None)
+        result = subprocess.run(
+            prefix + [sys.executable, "-c", "import os; print(sorted(os.sched_getaffinity(0)))"],
+            capture_output=True, text=True
+        )
+        assert result.stdout.strip() == f"[{cpu}]"
+
+    def test_no_prefix_when_unbound(self):
+        assert affinity.job_launch_prefix(None, None) == []
+
+    def test_prefix_joins_cgroup_and_keeps_pid(self, tmp_path):
+        (tmp_path / "cgroup.procs").write_text("")
+        prefix = affinity.job_launch_prefix(None, tmp_path, background=True)
+        process = subprocess.Popen(
+            prefix + [sys.executable, "-c", "import os; print(os.getpid(), os.nice(0))"],
+            stdout=subprocess.PIPE, text=True
+        )
+        pid, nice = map(int, process.communicate()[0].split())
+        # Every wrapper execs, so the launcher is the process that was started
+        assert pid == process.pid
+        assert nice >= affinity.BACKGROUND_NICE
+        assert (tmp_path / "cgroup.procs").read_text().strip() == str(pid)
+
+    def test_lower_priority(self):
+        result = subprocess.run(
+            [sys.executable, "-c", "import os; print(os.nice(0))"],
+            capture_output=True, text=True, preexec_fn=affinity.lower_priority
+        )
+        assert int(result.stdout) >= affinity.BACKGROUND_NICE
+
+    def test_cgroups_unavailable_is_harmless(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(affinity, "CGROUP_ROOT", tmp_path / "wheelflow")
+        assert affinity.create_job_cgroup("job-1", [0]) is None
+        assert affinity.get_job_cgroup("job-1") is None
+
+
+class TestRenderPool:
+    """Render work runs in niced worker processes."""
+
+    def test_worker_runs_at_background_priority(self):
+        async def scenario():
+            return await render_pool.run_render(os.nice, 0)
+
+        try:
+            niceness = asyncio.run(scenario())
+        finally:
+            render_pool.shutdown_pool()
+
+        assert niceness >= affinity.BACKGROUND_NICE
@@ -0,0 +1,269 @@
+"""
+Tests for portable case bundles: export, the Allpack results format and
+verified import.
+"""
+
+import hashlib
+import io
+import json
+import os
+import struct
+import subprocess
+import sys
+import tarfile
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import case_bundle
+
+
+FORCE_COEFFS = "# Time Cm Cd Cl Cl(f) Cl(r)\n1 0.01 0.60 0.10 0.05 0.05\n500 0.01 0.52 0.08 0.04 0.04\n"
+
+FORCES = "# Time forces\n500 ((0.5 0 0.1) (0.05 0 0) (0 0 0))\n"
+
+FIELD = "FoamFile\n{\n    object p;\n}\n\ninternalField   uniform 0;\n\nboundaryField\n{\n    wheel\n    {\n        type zeroGradient;\n    }\n}\n"
+
+
+@pytest.fixture
+def case_dir(tmp_path):
+    """A generated (unmeshed) case."""
+    case = tmp_path / "cases" / "job1"
+    for d in ["0", "constant/triSurface", "system"]:
+        (case / d).mkdir(parents=True)
+    (case / "0" / "p").write_text(FIELD)
+    (case / "constant" / "triSurface" / "wheel.stl").write_bytes(b"solid wheel\nendsolid wheel\n")
+    (case / "system" / "controlDict").write_text("endTime 500;\n")
+    (case / "system" / "decomposeParDict").write_text("numberOfSubdomains 8;\n")
+    (case / "log.blockMesh").write_text("not exported")
+    return case
+
+
+def read_bundle(path: Path) -> dict:
+    with tarfile.open(path, "r:gz") as tar:
+        return {m.name: tar.extractfile(m).read() for m in tar.getmembers() if m.isfile()}
+
+
+def make_results(files: dict, manifest: dict, checksums: dict = None) -> bytes:
+    """A results.tar.gz as Allpack writes it."""
+    files = dict(files)
+    files["manifest.json"] = json.dumps(manifest).encode()
+    if checksums is None:
+        checksums = {path: hashlib.sha256(data).hexdigest() for path, data in files.items()}
+    listing = "".join(f"{digest}  {path}\n" for path, digest in checksums.items()).encode()
+    files[case_bundle.CHECKSUM_FILE] = listing
+
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for path, data in files.items():
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+@pytest.fixture
+def exported(case_dir, tmp_path):
+    bundle_path = tmp_path / "bundle.tar.gz"
+    manifest = case_bundle.export_bundle(case_dir, bundle_path, "job1", {"rotation_method": "mrf"}, 8,
+                                         ["reconstructPar", "-latestTime"])
+    return bundle_path, manifest
+
+
+class TestExport:
+    """Tests for bundle contents."""
+
+    def test_manifest_checksums_match_contents(self, exported):
+        bundle_path, manifest = exported
+        contents = read_bundle(bundle_path)
+        for path, digest in manifest["files"].items():
+            assert hashlib.sha256(contents[f"job1/{path}"]).hexdigest() == digest
+        assert json.loads(contents["job1/manifest.json"])["bundle_id"] == manifest["bundle_id"]
+
+    def test_only_inputs_exported(self, exported):
+        bundle_path, _ = exported
+        names = read_bundle(bundle_path)
+        assert "job1/log.blockMesh" not in names
+        assert "job1/constant/triSurface/wheel.stl" in names
+
+    def test_unmeshed_case_meshes_in_allrun(self, exported):
+        bundle_path, manifest = exported
+        allrun = read_bundle(bundle_path)["job1/Allrun"].decode()
+        assert not manifest["meshed"]
+        assert "runApplication blockMesh" in allrun
+        assert "runApplication topoSet" in allrun
+        assert 'NP="${1:-8}"' in allrun
+        assert allrun.rstrip().endswith("runApplication reconstructPar -latestTime")
+
+    def test_allrun_is_valid_shell(self, case_dir, tmp_path):
+        bundle_path = tmp_path / "bundle.tar.gz"
+        case_bundle.export_bundle(case_dir, bundle_path, "job1", {}, 8,
+                                  ["reconstructPar", "-latestTime", "-fields", "(p U)"])
+        script = tmp_path / "Allrun"
+        script.write_bytes(read_bundle(bundle_path)["job1/Allrun"])
+        assert subprocess.run(["sh", "-n", str(script)], capture_output=True).returncode == 0
+        assert "runApplication reconstructPar -latestTime -fields '(p U)'" in script.read_text()
+
+    def test_fields_ready_for_copy_zero(self, exported):
+        bundle_path, _ = exported
+        field = read_bundle(bundle_path)["job1/0/p"].decode()
+        assert '#includeEtc "caseDicts/setConstraintTypes"' in field
+
+    def test_meshed_case_skips_meshing(self, case_dir, tmp_path):
+        (case_dir / "constant" / "polyMesh").mkdir()
+        (case_dir / "constant" / "polyMesh" / "faces").write_text("()")
+        case_bundle.export_bundle(case_dir, tmp_path / "b.tar.gz", "job1", {}, 8, ["reconstructPar"])
+        allrun = read_bundle(tmp_path / "b.tar.gz")["job1/Allrun"].decode()
+        assert "blockMesh" not in allrun
+        assert "runApplication decomposePar\n" in allrun
+
+
+class TestImport:
+    """Tests for verified result ingestion."""
+
+    def outputs(self):
+        return {
+            "postProcessing/forceCoeffs/0/forceCoeffs.dat": FORCE_COEFFS.encode(),
+            "500/p": b"p field",
+            "500/U": b"U field",
+            "constant/polyMesh/faces": b"()",
+            "log.foamRun": b"End",
+        }
+
+    def import_archive(self, case_dir, data, bundle_id=None):
+        archive = case_dir.parent / "results.tar.gz"
+        archive.write_bytes(data)
+        return case_bundle.import_results(archive, case_dir, "job1", bundle_id)
+
+    def test_outputs_placed_in_case(self, case_dir, exported):
+        _, manifest = exported
+        summary = self.import_archive(case_dir, make_results(self.outputs(), manifest),
+                                      manifest["bundle_id"])
+        assert summary["latest_time"] == 500
+        assert (case_dir / "postProcessing" / "forceCoeffs" / "0" / "forceCoeffs.dat").read_text() == FORCE_COEFFS
+        assert (case_dir / "500" / "U").read_bytes() == b"U field"
+
+    def test_tampered_file_rejected(self, case_dir, exported):
+        _, manifest = exported
+        checksums = {path: hashlib.sha256(data).hexdigest() for path, data in self.outputs().items()}
+        checksums["manifest.json"] = hashlib.sha256(json.dumps(manifest).encode()).hexdigest()
+        checksums["500/p"] = "0" * 64
+        with pytest.raises(case_bundle.BundleError, match="Checksum mismatch"):
+            self.import_archive(case_dir, make_results(self.outputs(), manifest, checksums))
+        assert not (case_dir / "postProcessing").exists()
+
+    def test_other_export_rejected(self, case_dir, exported):
+        _, manifest = exported
+        with pytest.raises(case_bundle.BundleError, match="different export"):
+            self.import_archive(case_dir, make_results(self.outputs(), manifest), "f" * 64)
+
+    def test_other_job_rejected(self, case_dir, exported):
+        _, manifest = exported
+        with pytest.raises(case_bundle.BundleError, match="not job1"):
+            self.import_archive(case_dir, make_results(self.outputs(), dict(manifest, job_id="job2")))
+
+    def test_missing_forces_rejected(self, case_dir, exported):
+        _, manifest = exported
+        outputs = self.outputs()
+        del outputs["postProcessing/forceCoeffs/0/forceCoeffs.dat"]
+        with pytest.raises(case_bundle.BundleError, match="Missing required"):
+            self.import_archive(case_dir, make_results(outputs, manifest))
+
+    def test_inputs_not_overwritten(self, case_dir, exported):
+        _, manifest = exported
+        outputs = dict(self.outputs(), **{"system/controlDict": b"evil"})
+        self.import_archive(case_dir, make_results(outputs, manifest))
+        assert (case_dir / "system" / "controlDict").read_text() == "endTime 500;\n"
+
+    def test_path_traversal_rejected(self, case_dir, exported):
+        _, manifest = exported
+        outputs = dict(self.outputs(), **{"../escape": b"x"})
+        with pytest.raises(case_bundle.BundleError, match="Unsafe"):
+            self.import_archive(case_dir, make_results(outputs, manifest))
+
+    def test_allpack_output_imports(self, case_dir, exported, tmp_path):
+        """The shipped Allpack script produces an importable archive."""
+        bundle_path, manifest = exported
+        with tarfile.open(bundle_path, "r:gz") as tar:
+            tar.extractall(tmp_path / "remote", filter="data")
+        solved = tmp_path / "remote" / "job1"
+        for path, data in self.outputs().items():
+            (solved / path).parent.mkdir(parents=True, exist_ok=True)
+            (solved / path).write_bytes(data)
+
+        # foamListTimes stand-in
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        (bin_dir / "foamListTimes").write_text("#!/bin/sh\necho 500\n")
+        (bin_dir / "foamListTimes").chmod(0o755)
+        env = dict(os.environ, PATH=f"{bin_dir}:{os.environ['PATH']}")
+        subprocess.run(["sh", str(solved / "Allpack")], check=True, env=env, capture_output=True)
+
+        summary = self.import_archive(case_dir, (solved / "results.tar.gz").read_bytes(),
+                                      manifest["bundle_id"])
+        assert summary["latest_time"] == 500
+        assert (case_dir / "log.foamRun").read_text() == "End"
+
+
+class TestBundleApi:
+    """Export and import through the API for a job using executor=bundle."""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import app as app_module
+        from backend import database as db
+
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "test_wheelflow.db")
+        db.init_db()
+        for name in ("UPLOAD_DIR", "CASES_DIR", "BUNDLES_DIR"):
+            (tmp_path / name).mkdir()
+            monkeypatch.setattr(app_module, name, tmp_path / name)
+
+        # A wheel-sized tetrahedron in millimetres
+        vertices = [(0, 0, 0), (600, 0, 0), (300, 600, 0), (300, 300, 30)]
+        with open(tmp_path / "UPLOAD_DIR" / "wheel01.stl", "wb") as f:
+            f.write(b"binary test wheel".ljust(80, b"\x00"))
+            f.write(struct.pack("<I", 4))
+            for face in [(0, 2, 1), (0, 1, 3), (1, 2, 3), (2, 0, 3)]:
+                f.write(struct.pack("<3f", 0, 0, 0))
+                for i in face:
+                    f.write(struct.pack("<3f", *vertices[i]))
+                f.write(struct.pack("<H", 0))
+
+        return TestClient(app_module.app), app_module
+
+    def test_round_trip(self, client):
+        client, app_module = client
+        response = client.post("/api/simulate", data={
+            "file_id": "wheel01", "name": "bundle", "quality": "basic", "executor": "bundle"})
+        job_id = response.json()["job_id"]
+        assert app_module.jobs[job_id]["status"] == "awaiting_results"
+
+        response = client.get(f"/api/jobs/{job_id}/bundle")
+        assert response.status_code == 200
+        with tarfile.open(fileobj=io.BytesIO(response.content), mode="r:gz") as tar:
+            manifest = json.loads(tar.extractfile(f"{job_id}/manifest.json").read())
+        assert manifest["job_id"] == job_id
+
+        results = make_results({
+            "postProcessing/forceCoeffs/0/forceCoeffs.dat": FORCE_COEFFS.encode(),
+            "postProcessing/forces/0/forces.dat": FORCES.encode(),
+        }, manifest)
+        response = client.post(f"/api/jobs/{job_id}/bundle/results",
+                               files={"file": ("results.tar.gz", results, "application/gzip")})
+        assert response.status_code == 200, response.text
+        job = app_module.jobs[job_id]
+        assert job["status"] == "complete", job["error"]
+        assert job["results"]["coefficients"]["Cd"] == 0.52
+
+    def test_bad_results_rejected(self, client):
+        client, app_module = client
+        job_id = client.post("/api/simulate", data={
+            "file_id": "wheel01", "name": "bundle", "quality": "basic", "executor": "bundle"}).json()["job_id"]
+        response = client.post(f"/api/jobs/{job_id}/bundle/results",
+                               files={"file": ("results.tar.gz", b"not a tarball", "application/gzip")})
+        assert response.status_code == 400
+        assert app_module.jobs[job_id]["status"] == "awaiting_results"
@@ -0,0 +1,204 @@
+"""
+Tests for the incremental postProcessing .dat reader.
+"""
+
+import os
+import sys
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import dat_reader
+
+
+HEADER = "# Force coefficients\n# Time\tCm\tCd\tCl\tCl(f)\tCl(r)\n"
+
+
+def coeff_row(i: int) -> str:
+    return f"{i}\t0.01\t{0.5 + i / 1000}\t0.1\t0.05\t0.05\n"
+
+
+def append(path: Path, text: str):
+    with open(path, "a") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def coeffs(tmp_path):
+    path = tmp_path / "forceCoeffs.dat"
+    path.write_text(HEADER + "".join(coeff_row(i) for i in range(1, 4)))
+    yield path
+    dat_reader.forget(tmp_path)
+
+
+class TestParseRows:
+    """Tests for block parsing."""
+
+    def test_vectorized_block(self):
+        rows = dat_reader.parse_rows(b"# c\n1 2 3\n4 5 6\n")
+        assert rows.tolist() == [[1, 2, 3], [4, 5, 6]]
+
+    def test_vector_columns(self):
+        rows = dat_reader.parse_rows(b"500 ((0.5 0 0.1) (0.05 0 0) (0 0 0))\n")
+        assert rows.tolist() == [[500, 0.5, 0, 0.1, 0.05, 0, 0, 0, 0, 0]]
+
+    def test_bad_rows_skipped(self):
+        rows = dat_reader.parse_rows(b"1 2 3\n4 5\n6 nan? 7\n8 9 10\n")
+        assert rows.tolist() == [[1, 2, 3], [8, 9, 10]]
+
+    def test_empty(self):
+        assert dat_reader.parse_rows(b"# only a header\n", 6).shape == (0, 6)
+
+
+class TestIncrementalReads:
+    """Tests for the per-file cache."""
+
+    def test_reads_all_rows(self, coeffs):
+        rows = dat_reader.read_dat(coeffs)
+        assert rows.shape == (3, 6)
+        assert rows[:, 0].tolist() == [1, 2, 3]
+        assert dat_reader.last_row(coeffs)[2] == pytest.approx(0.503)
+
+    def test_only_appended_bytes_parsed(self, coeffs, monkeypatch):
+        dat_reader.read_dat(coeffs)
+        append(coeffs, coeff_row(4) + coeff_row(5))
+
+        parsed = []
+        original = dat_reader.parse_rows
+        monkeypatch.setattr(dat_reader, "parse_rows",
+                            lambda data, n_cols=0: parsed.append(data) or original(data, n_cols))
+        rows = dat_reader.read_dat(coeffs)
+        assert parsed == [(coeff_row(4) + coeff_row(5)).encode()]
+        assert rows[:, 0].tolist() == [1, 2, 3, 4, 5]
+
+        # Nothing new: no parsing at all
+        dat_reader.read_dat(coeffs)
+        assert len(parsed) == 1
+
+    def test_partial_line_waits(self, coeffs):
+        append(coeffs, "4\t0.01\t0.5")
+        assert len(dat_reader.read_dat(coeffs)) == 3
+        append(coeffs, "04\t0.1\t0.05\t0.05\n")
+        rows = dat_reader.read_dat(coeffs)
+        assert len(rows) == 4 and rows[-1, 2] == pytest.approx(0.504)
+
+    def test_growth_past_capacity(self, coeffs, monkeypatch):
+        monkeypatch.setattr(dat_reader, "INITIAL_CAPACITY", 4)
+        dat_reader.forget(coeffs.parent)
+        before = dat_reader.read_dat(coeffs)
+        for i in range(4, 40):
+            append(coeffs, coeff_row(i))
+            dat_reader.read_dat(coeffs)
+        rows = dat_reader.read_dat(coeffs)
+        assert rows[:, 0].tolist() == list(range(1, 40))
+        assert before[:, 0].tolist() == [1, 2, 3]
+
+    def test_rows_read_only(self, coeffs):
+        with pytest.raises(ValueError):
+            dat_reader.read_dat(coeffs)[0, 0] = 99
+
+    def test_truncated_file_reparsed(self, coeffs):
+        dat_reader.read_dat(coeffs)
+        coeffs.write_text(HEADER + coeff_row(7))
+        assert dat_reader.read_dat(coeffs)[:, 0].tolist() == [7]
+
+    def test_replaced_file_reparsed(self, coeffs, tmp_path):
+        dat_reader.read_dat(coeffs)
+        replacement = tmp_path / "new.dat"
+        replacement.write_text(HEADER + "".join(coeff_row(i) for i in range(10, 14)))
+        os.replace(replacement, coeffs)
+        assert dat_reader.read_dat(coeffs)[:, 0].tolist() == [10, 11, 12, 13]
+
+    def test_missing_file(self, tmp_path):
+        assert dat_reader.read_dat(tmp_path / "nope.dat").shape == (0, 0)
+        assert dat_reader.last_row(tmp_path / "nope.dat") is None
+
+    def test_cache_bounded(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(dat_reader, "MAX_FILES", 2)
+        for i in range(3):
+            (tmp_path / f"{i}.dat").write_text(coeff_row(i))
+            dat_reader.read_dat(tmp_path / f"{i}.dat")
+        cached = [key for key in dat_reader._tables if key.startswith(str(tmp_path.resolve()))]
+        assert [Path(key).name for key in cached] == ["1.dat", "2.dat"]
+        dat_reader.forget(tmp_path)
+        assert not any(key.startswith(str(tmp_path.resolve())) for key in dat_reader._tables)
+
+
+class TestSeries:
+    """Tables of a function object across restarts."""
+
+    @pytest.fixture
+    def function_dir(self, tmp_path):
+        # First run to step 6; resumed from the step 4 write
+        function_dir = tmp_path / "postProcessing" / "forceCoeffs"
+        for start, steps in (("0", range(1, 7)), ("4", range(5, 10))):
+            (function_dir / start).mkdir(parents=True)
+            (function_dir / start / "forceCoeffs.dat").write_text(HEADER + "".join(coeff_row(i) for i in steps))
+        yield function_dir
+        dat_reader.forget(tmp_path)
+
+    def test_later_run_replaces_overlap(self, function_dir):
+        rows = dat_reader.read_series(function_dir, "forceCoeffs.dat")
+        assert rows[:, 0].tolist() == list(range(1, 10))
+        assert dat_reader.last_series_row(function_dir, "forceCoeffs.dat")[0] == 9
+
+    def test_time_order_not_name_order(self, function_dir):
+        (function_dir / "10").mkdir()
+        (function_dir / "10" / "forceCoeffs.dat").write_text(HEADER + coeff_row(11))
+        assert dat_reader.read_series(function_dir, "forceCoeffs.dat")[-1, 0] == 11
+
+    def test_missing(self, tmp_path):
+        assert dat_reader.read_series(tmp_path / "none", "forceCoeffs.dat").shape == (0, 0)
+        assert dat_reader.last_series_row(tmp_path / "none", "forceCoeffs.dat") is None
+
+
+class TestConsumers:
+    """The endpoints and extractors read through the shared cache."""
+
+    def test_convergence_endpoint_sees_new_rows(self, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import app as app_module
+
+        monkeypatch.setattr(app_module, "CASES_DIR", tmp_path)
+        monkeypatch.setitem(app_module.jobs, "tail-job", {"status": "solving", "config": {}})
+        force_dir = tmp_path / "tail-job" / "postProcessing" / "forceCoeffs" / "0"
+        force_dir.mkdir(parents=True)
+        force_file = force_dir / "forceCoeffs.dat"
+        force_file.write_text(HEADER + coeff_row(1))
+
+        client = TestClient(app_module.app)
+        assert client.get("/api/jobs/tail-job/convergence").json()["time"] == [1]
+        append(force_file, coeff_row(2))
+        data = client.get("/api/jobs/tail-job/convergence").json()
+        assert data["time"] == [1, 2]
+        assert data["Cd"] == [0.501, 0.502]
+        dat_reader.forget(tmp_path)
+
+    def test_force_distribution(self, tmp_path):
+        from backend.visualization.force_distribution import extract_force_distribution
+
+        force_dir = tmp_path / "postProcessing" / "forceCoeffs" / "0"
+        force_dir.mkdir(parents=True)
+        (force_dir / "forceCoeffs.dat").write_text(HEADER + "".join(coeff_row(i) for i in range(1, 4)))
+        result = extract_force_distribution(tmp_path)
+        assert result["time"] == [1, 2, 3]
+        assert result["Cl_rear"] == [0.05] * 3
+        assert result["final_values"]["Cd"] == 0.503
+        dat_reader.forget(tmp_path)
+
+    def test_results_of_resumed_run(self, tmp_path):
+        import asyncio
+        from backend import app as app_module
+        from backend.visualization.force_distribution import extract_force_distribution
+
+        function_dir = tmp_path / "postProcessing" / "forceCoeffs"
+        for start, steps in (("0", range(1, 4)), ("2", range(3, 6))):
+            (function_dir / start).mkdir(parents=True)
+            (function_dir / start / "forceCoeffs.dat").write_text(HEADER + "".join(coeff_row(i) for i in steps))
+        config = {"air": {"rho": 1.225}, "speed": 10.0, "yaw_angle": 5}
+        results = asyncio.run(app_module.extract_results(tmp_path, config))
+        assert results["coefficients"]["Cd"] == 0.505
+        assert extract_force_distribution(tmp_path)["time"] == [1, 2, 3, 4, 5]
+        dat_reader.forget(tmp_path)
@@ -124,6 +124,17 @@ class TestDatabaseModule:
         assert updated["status"] == "failed"
         assert updated["error"] == "Mesh generation failed"
 
+    def test_mesh_statistics_stored(self, setup_test_db):
+        """Test storing a job's mesh statistics."""
+        db = setup_test_db
+        db.create_job("test-job-010", {})
+        assert db.get_job("test-job-010")["mesh"] is None
+
+        mesh = {"cells": 42928, "patches": {"wheel": 5000}, "refinement_levels": [10880, 3120]}
+        updated = db.update_job("test-job-010", mesh=mesh)
+
+        assert updated["mesh"] == mesh
+
     def test_delete_job(self, setup_test_db):
         """Test deleting a job."""
         db = setup_test_db
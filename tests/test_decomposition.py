@@ -0,0 +1,197 @@
+"""
+Tests for keeping cases decomposed between meshing and solving.
+"""
+
+import asyncio
+import sys
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import app as app_module
+
+
+class FakeProcess:
+    """Stands in for an asyncio subprocess that succeeds immediately."""
+
+    # Seconds a command takes, by name
+    DELAYS = {}
+
+    def __init__(self, cmd, case_dir):
+        self.cmd = list(cmd)
+        self.pid = 0
+        self.returncode = None
+        # decomposePar creates the processor directories
+        if self.cmd[0] == "decomposePar":
+            for i in range(self._target_procs(case_dir)):
+                (case_dir / f"processor{i}").mkdir()
+
+    @staticmethod
+    def _target_procs(case_dir):
+        content = (case_dir / "system" / "decomposeParDict").read_text()
+        for line in content.splitlines():
+            if line.startswith("numberOfSubdomains"):
+                return int(line.split()[1].rstrip(";"))
+        return 0
+
+    async def communicate(self):
+        await asyncio.sleep(self.DELAYS.get(self.cmd[0], 0))
+        self.returncode = 0
+        return b"", b""
+
+
+@pytest.fixture
+def case_dir(tmp_path):
+    (tmp_path / "system").mkdir()
+    (tmp_path / "0").mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def commands(case_dir):
+    """Record every command run_openfoam_command launches."""
+    launched = []
+
+    async def fake_exec(*cmd, cwd=None, **kwargs):
+        launched.append(list(cmd))
+        return FakeProcess(cmd, Path(cwd))
+
+    with patch.object(app_module, "get_openfoam_env_cached", return_value={}), \
+            patch.object(app_module.asyncio, "create_subprocess_exec", side_effect=fake_exec):
+        yield launched
+
+
+class TestDecomposeOnce:
+    """The case is decomposed once and reused by later parallel stages."""
+
+    def test_first_parallel_stage_decomposes(self, case_dir, commands):
+        asyncio.run(app_module.run_openfoam_command(
+            case_dir, "snappyHexMesh", ["-overwrite"], parallel=True, num_procs=4))
+
+        assert commands[0] == ["decomposePar"]
+        assert commands[1][:4] == ["mpirun", "-np", "4", "snappyHexMesh"]
+        assert app_module.count_processor_dirs(case_dir) == 4
+
+    def test_same_proc_count_reuses_decomposition(self, case_dir, commands):
+        for command in ["snappyHexMesh", "topoSet", "potentialFoam"]:
+            asyncio.run(app_module.run_openfoam_command(
+                case_dir, command, parallel=True, num_procs=4))
+
+        launched = [c[0] for c in commands]
+        assert launched.count("decomposePar") == 1
+        assert "reconstructPar" not in launched
+        assert "redistributePar" not in [c[3] for c in commands if c[0] == "mpirun"]
+
+    def test_different_proc_count_redistributes(self, case_dir, commands):
+        asyncio.run(app_module.run_openfoam_command(
+            case_dir, "snappyHexMesh", parallel=True, num_procs=4))
+        asyncio.run(app_module.run_openfoam_command(
+            case_dir, "foamRun", parallel=True, num_procs=8))
+
+        assert commands[2] == ["mpirun", "-np", "8", "redistributePar", "-parallel", "-overwrite"]
+        assert commands[3][:4] == ["mpirun", "-np", "8", "foamRun"]
+        content = (case_dir / "system" / "decomposeParDict").read_text()
+        assert "numberOfSubdomains 8;" in content
+
+    def test_solver_does_not_reconstruct(self, case_dir, commands):
+        asyncio.run(app_module.run_openfoam_command(
+            case_dir, "foamRun", ["-solver", "incompressibleFluid"], parallel=True, num_procs=4))
+
+        assert all(c[0] != "reconstructPar" for c in commands)
+
+
+class TestSolverSample:
+    """The solver's scaling sample covers the solver alone."""
+
+    def test_decomposition_not_timed(self, case_dir, commands, tmp_path, monkeypatch):
+        from backend import database as db
+
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "test_wheelflow.db")
+        db.init_db()
+        monkeypatch.setattr(FakeProcess, "DELAYS", {"decomposePar": 0.5})
+        config = {"rotation_method": "mrf"}
+        monkeypatch.setitem(app_module.jobs, "job-1", {"id": "job-1", "config": config})
+        samples = []
+        monkeypatch.setattr(app_module, "record_scaling_sample",
+                            lambda *args, **kwargs: samples.append(args))
+
+        asyncio.run(app_module.solve_case("job-1", case_dir, config, num_procs_solver=4,
+                                          use_parallel=True, gpu_enabled=False))
+
+        assert [c[0] for c in commands][:2] == ["decomposePar", "mpirun"]
+        _, _, stage, num_procs, wall_time = samples[0]
+        assert stage == "solver_mrf"
+        assert num_procs == 4
+        assert wall_time < 0.5
+
+
+class TestPostProcessing:
+    """On-demand slices run through the job's executor on the processor meshes."""
+
+    def test_slices_run_in_parallel(self, case_dir, commands, tmp_path, monkeypatch):
+        from backend import database as db
+
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "test_wheelflow.db")
+        db.init_db()
+        for i in range(2):
+            (case_dir / f"processor{i}" / "500").mkdir(parents=True)
+        monkeypatch.setattr(app_module, "CASES_DIR", case_dir.parent)
+        monkeypatch.setitem(app_module.jobs, case_dir.name, {"id": case_dir.name, "config": {}})
+
+        result = asyncio.run(app_module.run_postprocessing(case_dir.name))
+
+        assert result["success"] and result["time"] == 500
+        assert len(commands) == 4
+        for cmd in commands:
+            # Behind running jobs, at background priority
+            assert cmd[:3] == ["nice", "-n", str(app_module.affinity.BACKGROUND_NICE)]
+            launcher = cmd[cmd.index("mpirun"):]
+            assert launcher[:4] == ["mpirun", "-np", "2", "foamPostProcess"]
+            assert launcher[-1] == "-parallel"
+
+
+class TestReconstruct:
+    """Reconstruction is limited to the latest time and needed fields."""
+
+    def test_reconstruct_command_latest_fields(self):
+        cmd = app_module.reconstruct_command(mesh=False, fields=["p", "U"])
+        assert cmd == ["reconstructPar", "-latestTime", "-fields", "(p U)"]
+
+    def test_reconstruct_command_with_mesh(self):
+        cmd = app_module.reconstruct_command(mesh=True, fields=["p"])
+        assert "-constant" in cmd
+        assert "-latestTime" in cmd
+
+    def test_reconstruct_case_skips_undecomposed(self, case_dir, commands):
+        asyncio.run(app_module.reconstruct_case(case_dir, mesh=True))
+        assert commands == []
+
+    def test_reconstruct_case_runs_once(self, case_dir, commands):
+        (case_dir / "processor0").mkdir()
+        asyncio.run(app_module.reconstruct_case(case_dir, mesh=False))
+        assert commands == [["reconstructPar", "-latestTime", "-fields", "(p U)"]]
+        assert (case_dir / "log.reconstructPar").exists()
+
+
+class TestRefreshDecomposedFields:
+    """Initial fields are copied into processors after parallel meshing."""
+
+    def test_fields_copied_with_constraint_types(self, case_dir):
+        (case_dir / "0" / "p").write_text(
+            "internalField   uniform 0;\n\nboundaryField\n{\n    wheel\n    {\n"
+            "        type            zeroGradient;\n    }\n}\n")
+        for i in range(2):
+            (case_dir / f"processor{i}" / "0").mkdir(parents=True)
+            (case_dir / f"processor{i}" / "0" / "p").write_text("stale")
+
+        app_module.refresh_decomposed_fields(case_dir)
+
+        for i in range(2):
+            content = (case_dir / f"processor{i}" / "0" / "p").read_text()
+            assert '#includeEtc "caseDicts/setConstraintTypes"' in content
+            assert "wheel" in content
+        # The undecomposed field is left untouched
+        assert "setConstraintTypes" not in (case_dir / "0" / "p").read_text()
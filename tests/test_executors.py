@@ -0,0 +1,222 @@
+"""
+Tests for command executors, with local stand-ins for sbatch/squeue/scancel.
+"""
+
+import asyncio
+import sys
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import executors
+from backend import job_control
+
+
+# Runs the batch script in the background in its own session; the state
+# file exists while the job is "RUNNING"
+FAKE_SBATCH = """#!/bin/bash
+script="${@: -1}"
+id=$(( $(cat "$STATE_DIR/next" 2>/dev/null || echo 100) + 1 ))
+echo $id > "$STATE_DIR/next"
+out=$(sed -n 's/^#SBATCH --output=//p' "$script")
+dir=$(sed -n 's/^#SBATCH --chdir=//p' "$script")
+cd "$dir"
+touch "$STATE_DIR/$id"
+setsid bash -c "echo \\$\\$ > '$STATE_DIR/$id'; bash '$script' > '$out' 2>&1; rm -f '$STATE_DIR/$id'" \\
+    > /dev/null 2>&1 &
+echo "$id;testcluster"
+"""
+
+FAKE_SQUEUE = """#!/bin/bash
+# squeue -h -j <id> -o %T
+[ -f "$STATE_DIR/$3" ] && echo RUNNING
+exit 0
+"""
+
+FAKE_SCANCEL = """#!/bin/bash
+sig=TERM
+if [[ "$1" == --signal=* ]]; then sig="${1#--signal=}"; shift; fi
+[ -f "$STATE_DIR/$1" ] || exit 1
+while [ ! -s "$STATE_DIR/$1" ]; do sleep 0.05; done
+kill -s "$sig" -- -"$(cat "$STATE_DIR/$1")"
+# A cancelled job leaves the queue
+[[ "$sig" == TERM || "$sig" == KILL ]] && rm -f "$STATE_DIR/$1"
+exit 0
+"""
+
+# srun -n <ranks> <command...>
+FAKE_SRUN = """#!/bin/bash
+shift 2
+exec "$@"
+"""
+
+
+@pytest.fixture
+def slurm(tmp_path, monkeypatch):
+    """A SlurmExecutor driving the fake scheduler commands."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    state_dir = tmp_path / "state"
+    state_dir.mkdir()
+    for name, script in [("sbatch", FAKE_SBATCH), ("squeue", FAKE_SQUEUE),
+                         ("scancel", FAKE_SCANCEL), ("srun", FAKE_SRUN)]:
+        path = bin_dir / name
+        path.write_text(script)
+        path.chmod(0o755)
+
+    monkeypatch.setenv("STATE_DIR", str(state_dir))
+    monkeypatch.setenv("PATH", f"{bin_dir}:{__import__('os').environ['PATH']}")
+    monkeypatch.setenv("WHEELFLOW_SLURM_PARTITION", "cfd")
+    monkeypatch.setenv("WHEELFLOW_SLURM_BASHRC", "/dev/null")
+    monkeypatch.setenv("WHEELFLOW_SLURM_POLL", "0.1")
+    return executors.SlurmExecutor()
+
+
+@pytest.fixture
+def case_dir(tmp_path):
+    case = tmp_path / "case"
+    (case / "system").mkdir(parents=True)
+    return case
+
+
+class TestJobScript:
+    """Tests for generated batch scripts."""
+
+    def test_parallel_script(self, slurm, case_dir):
+        script = slurm.job_script(case_dir, ["foamRun", "-parallel"], "foamRun", 64, True, "abc123")
+        assert "#SBATCH --ntasks=64" in script
+        assert "#SBATCH --partition=cfd" in script
+        assert f"#SBATCH --chdir={case_dir}" in script
+        assert "srun -n 64 foamRun -parallel" in script
+        assert "slurm.foamRun.exit" in script
+
+    def test_serial_script_single_task(self, slurm, case_dir):
+        script = slurm.job_script(case_dir, ["blockMesh"], "blockMesh", 64, False)
+        assert "#SBATCH --ntasks=1" in script
+        assert "\nblockMesh\n" in script
+
+
+    def test_resumed_solve_appends_log(self, slurm, case_dir):
+        script = slurm.job_script(case_dir, ["foamRun"], "foamRun", 4, False, append_log=True)
+        assert "#SBATCH --open-mode=append" in script
+        assert "--open-mode" not in slurm.job_script(case_dir, ["foamRun"], "foamRun", 4, False)
+
+    def test_background_command_is_niced(self, slurm, case_dir):
+        script = slurm.job_script(case_dir, ["foamPostProcess"], "foamPostProcess", 4, True,
+                                  background=True)
+        assert "#SBATCH --nice" in script
+        assert "--nice" not in slurm.job_script(case_dir, ["foamRun"], "foamRun", 4, True)
+
+
+class TestLocalExecutor:
+    """Tests for commands run on this host."""
+
+    def test_append_log(self, case_dir):
+        local = executors.LocalExecutor()
+        asyncio.run(local.run(case_dir, ["echo", "first"], {}, "foamRun"))
+        asyncio.run(local.run(case_dir, ["echo", "second"], {}, "foamRun", append_log=True))
+        assert (case_dir / "log.foamRun").read_text() == "first\nsecond\n"
+        asyncio.run(local.run(case_dir, ["echo", "third"], {}, "foamRun"))
+        assert (case_dir / "log.foamRun").read_text() == "third\n"
+
+
+    def test_parallel_uses_configured_mpirun(self, case_dir, tmp_path, monkeypatch):
+        mpirun = tmp_path / "site-mpirun"
+        mpirun.write_text('#!/bin/bash\necho "site-mpirun $*"\n')
+        mpirun.chmod(0o755)
+        monkeypatch.setattr(executors.openfoam_env, "MPIRUN", str(mpirun))
+
+        asyncio.run(executors.LocalExecutor().run(case_dir, ["foamRun", "-parallel"], {}, "foamRun",
+                                                  num_procs=2, parallel=True))
+        assert (case_dir / "log.foamRun").read_text() == "site-mpirun -np 2 foamRun -parallel\n"
+
+
+class TestSlurmExecutor:
+    """Submitting, polling and collecting results through the fake scheduler."""
+
+    def test_serial_command(self, slurm, case_dir):
+        output = asyncio.run(slurm.run(case_dir, ["echo", "meshed"], {}, "blockMesh"))
+        assert "meshed" in output
+        assert "meshed" in (case_dir / "log.blockMesh").read_text()
+        assert (case_dir / "slurm.blockMesh.sh").exists()
+
+    def test_parallel_command(self, slurm, case_dir):
+        output = asyncio.run(slurm.run(case_dir, ["echo", "solved"], {}, "foamRun",
+                                       num_procs=4, parallel=True))
+        assert "solved" in output
+
+    def test_failure_raises(self, slurm, case_dir):
+        with pytest.raises(Exception, match="exit 3"):
+            asyncio.run(slurm.run(case_dir, ["bash", "-c", "exit 3"], {}, "snappyHexMesh"))
+
+    def test_cancel_scancels_job(self, slurm, case_dir):
+        async def scenario():
+            task = asyncio.create_task(slurm.run(case_dir, ["sleep", "30"], {}, "foamRun",
+                                                 job_id="slurm-cancel"))
+            while not job_control.is_running("slurm-cancel"):
+                await asyncio.sleep(0.05)
+            await job_control.cancel_job("slurm-cancel")
+            await task
+
+        start = time.monotonic()
+        with pytest.raises(job_control.JobCancelled):
+            asyncio.run(scenario())
+        job_control.clear_request("slurm-cancel")
+        assert time.monotonic() - start < 10
+
+    def test_signal_does_not_block_event_loop(self, slurm, tmp_path):
+        scancel = tmp_path / "bin" / "scancel"
+        scancel.write_text("#!/bin/bash\nsleep 0.5\nexit 0\n")
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.05)
+
+        async def scenario():
+            task = asyncio.create_task(ticker())
+            await asyncio.sleep(0)
+            signalled = await slurm.signal_job("42", job_control.STOP_AT_WRITE_NOW_SIGNAL)
+            task.cancel()
+            return signalled
+
+        assert asyncio.run(scenario())
+        assert len(ticks) >= 5
+
+
+class TestJobExecutor:
+    """run_openfoam_command hands commands to the job's executor."""
+
+    def test_slurm_job_submits(self, slurm, case_dir, monkeypatch):
+        from backend import app as app_module
+
+        monkeypatch.setitem(executors._executors, executors.SLURM, slurm)
+        monkeypatch.setitem(app_module.jobs, "slurm-job", {"config": {"executor": "slurm"}})
+        with patch.object(app_module, "get_openfoam_env_cached", return_value={}):
+            asyncio.run(app_module.run_openfoam_command(case_dir, "echo", ["ok"], job_id="slurm-job"))
+
+        assert (case_dir / "slurm.echo.sh").exists()
+        assert "ok" in (case_dir / "log.echo").read_text()
+
+    def test_remote_and_unknown_jobs_run_locally(self, monkeypatch):
+        from backend import app as app_module
+
+        monkeypatch.setitem(app_module.jobs, "remote-job", {"config": {"executor": "remote"}})
+        assert app_module.job_executor("remote-job").name == executors.LOCAL
+        assert app_module.job_executor(None).name == executors.LOCAL
+
+    def test_unknown_executor(self):
+        with pytest.raises(ValueError):
+            executors.get_executor("pbs")
+
+    def test_executor_requires_run(self):
+        class Incomplete(executors.Executor):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            Incomplete()
@@ -0,0 +1,222 @@
+"""
+Tests for the lazy OpenFOAM dictionary parser and writer.
+"""
+
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import foam_dict
+
+
+HEADER = b"""/*--------------------------------*- C++ -*----------------------------------*\\
+  =========                 |
+\\*---------------------------------------------------------------------------*/
+FoamFile
+{
+    version     2.0;
+    format      %s;
+    arch        "LSB;label=32;scalar=64";
+    class       %s;
+    object      %s;
+}
+// * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * //
+
+"""
+
+FV_SCHEMES = b"""
+ddtSchemes
+{
+    default         steadyState;
+}
+
+divSchemes
+{
+    default         none;
+    div(phi,U)      bounded Gauss linearUpwind grad(U);
+    div((nuEff*dev2(T(grad(U))))) Gauss linear;
+}
+
+fluxRequired { p; }
+wallDist { method meshWave; }
+"""
+
+
+def write(path: Path, body: bytes, cls: str = "dictionary", fmt: str = "ascii") -> Path:
+    path.write_bytes(HEADER % (fmt.encode(), cls.encode(), path.name.encode()) + body)
+    return path
+
+
+def pressure_file(path: Path, fmt: str, n_cells: int) -> Path:
+    def scalars(values):
+        values = np.asarray(values, dtype="<f8")
+        if fmt == "binary":
+            return b"nonuniform List<scalar> %d(" % len(values) + values.tobytes() + b")"
+        return b"nonuniform List<scalar> \n%d\n(\n" % len(values) + \
+            b"".join(b"%r\n" % v for v in values.tolist()) + b")\n"
+
+    body = (b"dimensions      [0 2 -2 0 0 0 0];\n\n"
+            b"internalField   " + scalars(np.arange(n_cells) * 0.5) + b";\n\n"
+            b"boundaryField\n{\n"
+            b"    #includeEtc \"caseDicts/setConstraintTypes\"\n\n"
+            b"    \"(inlet|outlet)\"\n    {\n        type            zeroGradient;\n    }\n"
+            b"    wheel\n    {\n        type            calculated;\n"
+            b"        value           " + scalars([-3.5, 1.25, 7.0]) + b";\n    }\n"
+            b"    road\n    {\n        type            fixedValue;\n        value           uniform 0;\n"
+            b"    }\n}\n")
+    return write(path, body, "volScalarField", fmt)
+
+
+class TestParsing:
+    """Tests for entries and values."""
+
+    def test_nested_entries(self, tmp_path):
+        schemes = foam_dict.read_dict(write(tmp_path / "fvSchemes", FV_SCHEMES))
+        assert schemes.header["class"] == "dictionary"
+        assert schemes.find("ddtSchemes", "default") == "steadyState"
+        assert schemes.find("divSchemes", "div(phi,U)") == ("bounded", "Gauss", "linearUpwind", "grad(U)")
+        assert schemes["fluxRequired"] == {"p": None}
+        assert schemes.find("wallDist", "method") == "meshWave"
+        assert schemes.find("divSchemes", "missing") is None
+
+    def test_values(self, tmp_path):
+        path = write(tmp_path / "controlDict", b"""
+application     foamRun;
+deltaT          1;
+writeInterval   0.5e-3;
+libs            ("libforces.so" "libfieldFunctionObjects.so");
+dims            [0 1 -1 0 0 0 0];
+locations       ((0 0 0) (1.5 -2 3e2));
+title           "a b; c";
+""")
+        control = foam_dict.read_dict(path)
+        assert control["deltaT"] == 1 and isinstance(control["deltaT"], int)
+        assert control["writeInterval"] == 0.0005
+        assert control["libs"] == ['"libforces.so"', '"libfieldFunctionObjects.so"']
+        assert isinstance(control["dims"], foam_dict.DimensionSet)
+        assert control["locations"] == [[0, 0, 0], [1.5, -2, 300.0]]
+        assert control["title"] == '"a b; c"'
+
+    def test_boundary_list(self, tmp_path):
+        path = write(tmp_path / "boundary", b"""2
+(
+    wheel
+    {
+        type            wall;
+        inGroups        List<word> 1(wall);
+        nFaces          120;
+        startFace       5000;
+    }
+    procBoundary0to1
+    {
+        type            processor;
+        nFaces          0;
+        startFace       5120;
+        matchTolerance  0.0001;
+        myProcNo        0;
+        neighbProcNo    1;
+    }
+)
+""", "polyBoundaryMesh")
+        boundary = foam_dict.read_dict(path)
+        assert list(boundary) == ["wheel", "procBoundary0to1"]
+        assert boundary["wheel"]["inGroups"] == ["wall"]
+        assert boundary["procBoundary0to1"]["neighbProcNo"] == 1
+
+    def test_pattern_keywords(self, tmp_path):
+        field = foam_dict.read_dict(pressure_file(tmp_path / "p", "ascii", 10))
+        assert field.find("boundaryField", "inlet", "type") == "zeroGradient"
+        assert field.find("boundaryField", "road", "value") == ("uniform", 0)
+        assert field["boundaryField"]["#includeEtc"] == '"caseDicts/setConstraintTypes"'
+
+    def test_malformed(self, tmp_path):
+        with pytest.raises(ValueError):
+            foam_dict.read_dict(write(tmp_path / "bad", b"a { b 1;\n"))
+
+
+class TestLazyLists:
+    """Large lists are located, not parsed."""
+
+    @pytest.mark.parametrize("fmt", ["ascii", "binary"])
+    def test_field_lists_lazy(self, tmp_path, fmt):
+        field = foam_dict.read_dict(pressure_file(tmp_path / "p", fmt, 5000))
+        internal = field["internalField"][1]
+        assert isinstance(internal, foam_dict.FoamList) and len(internal) == 5000
+        assert internal.read(4998).tolist() == [2499.0, 2499.5]
+
+        value = foam_dict.field_value(field.find("boundaryField", "wheel", "value"))
+        assert value.tolist() == [-3.5, 1.25, 7.0]
+        assert foam_dict.field_value(field.find("boundaryField", "road", "value")) == 0.0
+
+    def test_only_patch_values_read(self, tmp_path, monkeypatch):
+        path = pressure_file(tmp_path / "p", "ascii", 5000)
+        # Internal values the parser would choke on if it looked at them
+        path.write_bytes(path.read_bytes().replace(b"\n12.5\n", b"\n}{;\n"))
+        converted = []
+        original = foam_dict.FoamList.ascii_values_of
+        monkeypatch.setattr(foam_dict.FoamList, "ascii_values_of",
+                            lambda self, text: converted.append(len(text)) or original(self, text))
+
+        field = foam_dict.read_dict(path)
+        value = foam_dict.field_value(field.find("boundaryField", "wheel", "value"))
+        assert value.tolist() == [-3.5, 1.25, 7.0]
+        assert converted and max(converted) < 100
+
+    def test_short_lists_parsed(self, tmp_path):
+        path = write(tmp_path / "dict", b"short 3(1 2 3);\nlong 100(" + b" 1" * 100 + b");\n"
+                                         b"uniform 4{0.5};\n")
+        entries = foam_dict.read_dict(path)
+        assert entries["short"] == [1, 2, 3]
+        assert isinstance(entries["long"], foam_dict.FoamList)
+        assert entries["long"].read().sum() == 100
+        assert entries["uniform"] == [0.5] * 4
+
+
+class TestWriting:
+    """Tests for writing dictionaries."""
+
+    def test_round_trip(self, tmp_path):
+        entries = {
+            "numberOfSubdomains": 8,
+            "method": "scotch",
+            "simpleCoeffs": {"n": [2, 2, 2], "delta": 0.001},
+            "scotchCoeffs": {},
+            "writeCompression": False,
+            "dimensions": foam_dict.DimensionSet([0, 2, -2, 0, 0, 0, 0]),
+            "boundaryField": {"#includeEtc": '"caseDicts/setConstraintTypes"',
+                              "wheel": {"type": "fixedValue", "value": ("uniform", [0, 0, 1.5])}},
+        }
+        path = tmp_path / "decomposeParDict"
+        foam_dict.write_dict(path, entries, location="system")
+        text = path.read_text()
+        assert "numberOfSubdomains 8;\n" in text
+        assert "method          scotch;\n" in text
+        assert "    n               (2 2 2);\n" in text
+
+        parsed = foam_dict.read_dict(path)
+        assert parsed.header["object"] == "decomposeParDict"
+        assert parsed["simpleCoeffs"] == {"n": [2, 2, 2], "delta": 0.001}
+        assert parsed["writeCompression"] == "false"
+        assert parsed.find("boundaryField", "wheel", "value") == ("uniform", [0, 0, 1.5])
+        assert parsed["dimensions"] == [0, 2, -2, 0, 0, 0, 0]
+
+    def test_arrays_written_as_typed_lists(self, tmp_path):
+        path = tmp_path / "U"
+        values = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.5]])
+        foam_dict.write_dict(path, {"internalField": ("nonuniform", values)}, cls="volVectorField")
+        assert "List<vector>" in path.read_text()
+        parsed = foam_dict.read_dict(path)
+        assert np.array_equal(foam_dict.field_value(parsed["internalField"]), values)
+
+    def test_decompose_dict_generated(self, tmp_path):
+        from backend import app as app_module
+
+        (tmp_path / "system").mkdir()
+        app_module.generate_decompose_dict(tmp_path, 12)
+        parsed = foam_dict.read_dict(tmp_path / "system" / "decomposeParDict")
+        assert parsed["numberOfSubdomains"] == 12
+        assert sorted(parsed.find("simpleCoeffs", "n")) == [2, 2, 3]
@@ -0,0 +1,300 @@
+"""
+Tests for the memory-mapped polyMesh and field reader.
+"""
+
+import gzip
+import os
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import foam_mesh
+
+
+# 12 points; faces 0-1 on "ground", 2-4 on "wheel" (a triangle, a quad, a pentagon)
+POINTS = np.arange(36, dtype=np.float64).reshape(12, 3) / 4
+FACES = [[0, 1, 2, 3], [1, 2, 3], [4, 5, 6], [7, 8, 9, 10], [4, 6, 9, 11, 5]]
+PATCHES = [("ground", "wall", 2, 0), ("wheel", "wall", 3, 2)]
+WHEEL_P = np.array([-120.5, 3.25, 88.0])
+
+
+def header(cls: str, obj: str, fmt: str = "ascii") -> bytes:
+    return (f"/*--------------------------------*- C++ -*----------------------------------*\\\n"
+            f"FoamFile\n{{\n    version     2.0;\n    format      {fmt};\n"
+            f"    arch        \"LSB;label=32;scalar=64\";\n    class       {cls};\n"
+            f"    location    \"constant/polyMesh\";\n    object      {obj};\n}}\n"
+            f"// * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * //\n\n").encode()
+
+
+def binary_list(values: np.ndarray, dtype: str) -> bytes:
+    values = np.asarray(values, dtype=dtype)
+    count = len(values) if values.ndim == 1 else values.shape[0]
+    return f"{count}\n(".encode() + values.tobytes() + b")\n"
+
+
+def ascii_labels(values) -> bytes:
+    return (f"{len(values)}\n(\n" + "".join(f"{v}\n" for v in values) + ")\n").encode()
+
+
+def write_mesh(poly_mesh: Path, fmt: str = "ascii", compact: bool = False,
+               points=POINTS, faces=FACES, patches=PATCHES):
+    poly_mesh.mkdir(parents=True)
+    entries = "".join(f"    {name}\n    {{\n        type            {kind};\n        inGroups        "
+                      f"List<word> 1(wall);\n        nFaces          {n};\n        startFace       {start};\n"
+                      f"    }}\n" for name, kind, n, start in patches)
+    (poly_mesh / "boundary").write_bytes(header("polyBoundaryMesh", "boundary", fmt)
+                                         + f"{len(patches)}\n(\n{entries})\n".encode())
+
+    POINTS, FACES = points, faces
+    offsets = np.cumsum([0] + [len(face) for face in FACES])
+    labels = np.concatenate(FACES)
+    if fmt == "binary":
+        points = binary_list(POINTS, "<f8")
+        faces = binary_list(offsets, "<i4") + b"\n\n" + binary_list(labels, "<i4")
+    else:
+        points = f"{len(POINTS)}\n(\n".encode() + "".join(
+            f"({x:g} {y:g} {z:g})\n" for x, y, z in POINTS).encode() + b")\n"
+        if compact:
+            faces = ascii_labels(offsets) + b"\n\n" + ascii_labels(labels)
+        else:
+            faces = f"{len(FACES)}\n(\n".encode() + "".join(
+                f"{len(face)}({' '.join(map(str, face))})\n" for face in FACES).encode() + b")\n"
+
+    (poly_mesh / "points").write_bytes(header("vectorField", "points", fmt) + points)
+    face_class = "faceCompactList" if fmt == "binary" or compact else "faceList"
+    (poly_mesh / "faces").write_bytes(header(face_class, "faces", fmt) + faces)
+
+
+def write_pressure(path: Path, fmt: str = "ascii", internal: np.ndarray = None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    internal = np.linspace(-5, 5, 40) if internal is None else internal
+
+    def scalars(values):
+        if fmt == "binary":
+            return f"nonuniform List<scalar> {len(values)}(".encode() + \
+                np.asarray(values, "<f8").tobytes() + b")"
+        return f"nonuniform List<scalar> \n{len(values)}\n(\n".encode() + \
+            "".join(f"{float(v)!r}\n" for v in values).encode() + b")\n"
+
+    body = (b"dimensions      [0 2 -2 0 0 0 0];\n\n"
+            b"internalField   " + scalars(internal) + b";\n\n"
+            b"boundaryField\n{\n"
+            b"    #includeEtc \"caseDicts/setConstraintTypes\"\n"
+            b"    ground\n    {\n        type            calculated;\n"
+            b"        value           " + scalars([1.0, 2.0]) + b";\n    }\n"
+            b"    \"(inlet|outlet)\"\n    {\n        type            zeroGradient;\n    }\n"
+            b"    wheel\n    {\n        type            calculated;\n"
+            b"        value           " + scalars(WHEEL_P) + b";\n    }\n"
+            b"    top\n    {\n        type            fixedValue;\n        value           uniform 101325;\n"
+            b"    }\n}\n")
+    path.write_bytes(header("volScalarField", "p", fmt) + body)
+
+
+def local_faces(patch):
+    """Patch faces mapped back to mesh point ids."""
+    labels = patch["point_ids"][patch["labels"]]
+    return [labels[a:b].tolist() for a, b in zip(patch["offsets"][:-1], patch["offsets"][1:])]
+
+
+@pytest.fixture(params=["ascii", "compact", "binary"])
+def poly_mesh(request, tmp_path):
+    path = tmp_path / "constant" / "polyMesh"
+    write_mesh(path, "binary" if request.param == "binary" else "ascii", compact=request.param == "compact")
+    return path
+
+
+class TestPolyMesh:
+    """Tests for reading patches of ASCII and binary meshes."""
+
+    def test_boundary(self, poly_mesh):
+        patches = foam_mesh.read_boundary(poly_mesh)
+        assert list(patches) == ["ground", "wheel"]
+        assert patches["wheel"] == {"type": "wall", "n_faces": 3, "start_face": 2}
+
+    def test_patch_faces_and_points(self, poly_mesh):
+        patch = foam_mesh.read_patch(poly_mesh, "wheel")
+        assert local_faces(patch) == FACES[2:]
+        assert patch["point_ids"].tolist() == [4, 5, 6, 7, 8, 9, 10, 11]
+        assert np.array_equal(patch["points"], POINTS[patch["point_ids"]])
+        assert patch["points"].dtype == np.float64
+
+    def test_all_faces(self, poly_mesh):
+        offsets, labels = foam_mesh.read_faces(poly_mesh / "faces")
+        assert offsets.tolist() == np.cumsum([0] + [len(f) for f in FACES]).tolist()
+        assert labels.tolist() == np.concatenate(FACES).tolist()
+
+    def test_missing_patch(self, poly_mesh):
+        assert foam_mesh.read_patch(poly_mesh, "road") is None
+
+    def test_only_patch_lines_parsed(self, tmp_path):
+        poly_mesh = tmp_path / "polyMesh"
+        write_mesh(poly_mesh)
+        # A face and a point the patch does not use are unreadable
+        faces = poly_mesh / "faces"
+        faces.write_bytes(faces.read_bytes().replace(b"4(0 1 2 3)", b"4(0 1 x 3)"))
+        points = poly_mesh / "points"
+        points.write_bytes(points.read_bytes().replace(b"(0 0.25 0.5)", b"(0 bad 0.5)"))
+        patch = foam_mesh.read_patch(poly_mesh, "wheel")
+        assert local_faces(patch) == FACES[2:]
+
+    def test_gzipped_points(self, tmp_path):
+        poly_mesh = tmp_path / "polyMesh"
+        write_mesh(poly_mesh, "binary")
+        points = poly_mesh / "points"
+        (poly_mesh / "points.gz").write_bytes(gzip.compress(points.read_bytes()))
+        points.unlink()
+        assert np.array_equal(foam_mesh.read_points(points), POINTS)
+
+    def test_find_poly_mesh(self, tmp_path):
+        assert foam_mesh.find_poly_mesh(tmp_path) is None
+        write_mesh(tmp_path / "0.5" / "polyMesh")
+        assert foam_mesh.find_poly_mesh(tmp_path) == tmp_path / "0.5" / "polyMesh"
+
+
+class TestFields:
+    """Tests for reading a patch's field values."""
+
+    @pytest.mark.parametrize("fmt", ["ascii", "binary"])
+    def test_nonuniform_patch(self, tmp_path, fmt):
+        write_pressure(tmp_path / "p", fmt)
+        assert np.array_equal(foam_mesh.read_patch_field(tmp_path / "p", "wheel"), WHEEL_P)
+        assert foam_mesh.read_patch_field(tmp_path / "p", "top") == 101325.0
+        assert foam_mesh.read_patch_field(tmp_path / "p", "inlet") is None
+        assert foam_mesh.read_patch_field(tmp_path / "p", "road") is None
+
+    def test_binary_payload_skipped_by_size(self, tmp_path):
+        # Raw internal values whose bytes look like dictionary syntax
+        internal = np.frombuffer(b"wheel { value uniform 1; };)}(" + b"\x00" * 2, dtype="<f8")
+        write_pressure(tmp_path / "p", "binary", internal=internal)
+        assert np.array_equal(foam_mesh.read_patch_field(tmp_path / "p", "wheel"), WHEEL_P)
+
+    def test_uniform_list(self, tmp_path):
+        path = tmp_path / "U"
+        path.write_bytes(header("volVectorField", "U") + b"internalField uniform (0 0 0);\n"
+                         b"boundaryField\n{\n    wheel\n    {\n        type movingWallVelocity;\n"
+                         b"        value nonuniform List<vector> 3{(1 2 3)};\n    }\n}\n")
+        assert foam_mesh.read_patch_field(path, "wheel").tolist() == [[1, 2, 3]] * 3
+
+
+def write_labels(path: Path, labels, note: str = None):
+    text = header("labelList", path.name)
+    if note:
+        text = text.replace(b"    object", f"    note        \"{note}\";\n    object".encode())
+    path.write_bytes(text + ascii_labels(list(labels)))
+
+
+@pytest.fixture
+def decomposed_case(tmp_path):
+    """
+    The test mesh split over two processors: processor0 holds wheel faces
+    2-3 and processor1 face 4; points 4, 5, 6 and 9 are on both.
+    """
+    # The case's own mesh is the background mesh, without the wheel
+    write_mesh(tmp_path / "constant" / "polyMesh", points=POINTS[:4], faces=FACES[:2],
+               patches=[("ground", "wall", 2, 0)])
+    (tmp_path / "0").mkdir()
+
+    layout = [(FACES[2:4], [100.0, 200.0], 7), (FACES[4:], [300.0], 5)]
+    for rank, (faces, p_values, cells) in enumerate(layout):
+        processor = tmp_path / f"processor{rank}"
+        global_ids = sorted({label for face in faces for label in face})
+        local = {g: i for i, g in enumerate(global_ids)}
+        poly_mesh = processor / "constant" / "polyMesh"
+        write_mesh(poly_mesh, "binary" if rank else "ascii", points=POINTS[global_ids],
+                   faces=[[local[label] for label in face] for face in faces] + [[0, 1, 2]],
+                   patches=[("wheel", "wall", len(faces), 0),
+                            (f"procBoundary{rank}to{1 - rank}", "processor", 1, len(faces))])
+        write_labels(poly_mesh / "pointProcAddressing", global_ids)
+        write_labels(poly_mesh / "owner", [0] * (len(faces) + 1),
+                     note=f"nPoints:{len(global_ids)}  nCells:{cells}  nFaces:{len(faces) + 9}  "
+                          f"nInternalFaces:8")
+        (processor / "0").mkdir()
+        # The wheel's values on this processor
+        write_pressure(processor / "0.5" / "p", "ascii")
+        path = processor / "0.5" / "p"
+        path.write_bytes(path.read_bytes().replace(
+            b"List<scalar> \n3\n(\n-120.5\n3.25\n88.0\n)",
+            f"List<scalar> {len(p_values)}({' '.join(map(str, p_values))})".encode()))
+    return tmp_path
+
+
+class TestDecomposed:
+    """Tests for reading processor directories without reconstructPar."""
+
+    def test_detects_unreconstructed_results(self, decomposed_case):
+        assert foam_mesh.decomposed(decomposed_case)
+        assert not foam_mesh.decomposed(decomposed_case / "processor0")
+
+    def test_patch_assembled_and_points_merged(self, decomposed_case):
+        patch = foam_mesh.read_case_patch(decomposed_case, "wheel")
+        assert patch["processors"] == 2 and patch["n_faces"] == 3
+        assert local_faces(patch) == FACES[2:]
+        assert patch["point_ids"].tolist() == [4, 5, 6, 7, 8, 9, 10, 11]
+        assert np.array_equal(patch["points"], POINTS[4:])
+
+    def test_field_in_face_order(self, decomposed_case):
+        values = foam_mesh.read_case_patch_field(decomposed_case, "p", "wheel")
+        assert values.tolist() == [100.0, 200.0, 300.0]
+        assert foam_mesh.read_case_patch_field(decomposed_case, "U", "wheel") is None
+        assert foam_mesh.read_case_patch_field(decomposed_case, "p", "wheel", time="9") is None
+        (decomposed_case / "processor1" / "0.5" / "p").unlink()
+        assert foam_mesh.read_case_patch_field(decomposed_case, "p", "wheel") is None
+
+    def test_mesh_size(self, decomposed_case):
+        size = foam_mesh.mesh_size(decomposed_case)
+        # Points counted by global id, up to the last one addressed
+        assert size["cells"] == 12 and size["points"] == 12
+        # One face on the processor boundary, counted once
+        assert (size["faces"], size["internal_faces"]) == (11 + 10 - 1, 17)
+
+    def test_mesh_cells_ignores_stale_processors(self, decomposed_case):
+        assert foam_mesh.mesh_cells(decomposed_case) == 12
+        # Reconstructed since: the case has the latest time and a newer mesh
+        (decomposed_case / "0.5").mkdir()
+        case_mesh = decomposed_case / "constant" / "polyMesh"
+        write_labels(case_mesh / "owner", [0, 0], note="nPoints:4  nCells:30  nFaces:2  nInternalFaces:0")
+        later = (decomposed_case / "processor0" / "constant" / "polyMesh" / "boundary").stat().st_mtime + 10
+        os.utime(case_mesh / "boundary", (later, later))
+        assert foam_mesh.mesh_cells(decomposed_case) == 30
+
+    def test_mesh_cells_reads_compressed_owner(self, tmp_path):
+        poly_mesh = tmp_path / "constant" / "polyMesh"
+        write_mesh(poly_mesh)
+        write_labels(poly_mesh / "owner.tmp", [0], note="nPoints:8  nCells:5  nFaces:3  nInternalFaces:0")
+        (poly_mesh / "owner.gz").write_bytes(gzip.compress((poly_mesh / "owner.tmp").read_bytes()))
+        (poly_mesh / "owner.tmp").unlink()
+        assert foam_mesh.mesh_cells(tmp_path) == 5
+        assert foam_mesh.mesh_cells(tmp_path / "missing") is None
+
+    def test_pressure_surface_without_reconstruction(self, decomposed_case):
+        from backend.visualization.pressure_surface import (
+            parse_openfoam_boundary_mesh, read_pressure_field)
+
+        mesh = parse_openfoam_boundary_mesh(decomposed_case)
+        assert mesh["n_faces"] == 3 and len(mesh["points"]) == 8
+        assert read_pressure_field(decomposed_case)["values"] == [100.0, 200.0, 300.0]
+
+
+class TestPressureSurface:
+    """pressure_surface reads through foam_mesh."""
+
+    def test_binary_case_exported(self, tmp_path):
+        from backend.visualization.pressure_surface import (
+            export_pressure_surface_json, parse_openfoam_boundary_mesh, read_pressure_field)
+
+        write_mesh(tmp_path / "constant" / "polyMesh", "binary")
+        write_pressure(tmp_path / "500" / "p", "binary")
+        mesh = parse_openfoam_boundary_mesh(tmp_path)
+        assert mesh["n_faces"] == 3 and len(mesh["points"]) == 8
+        assert mesh["faces"][0] == [0, 1, 2]
+
+        pressure = read_pressure_field(tmp_path)
+        assert pressure == {"type": "nonuniform", "values": WHEEL_P.tolist(), "count": 3}
+
+        result = export_pressure_surface_json(tmp_path, tmp_path / "surface.json")
+        assert result["success"] and result["n_triangles"] == 1 + 2 + 3
+        assert result["pressure_range"] == [-120.5, 88.0]
@@ -0,0 +1,233 @@
+"""
+Tests for job cancellation and checkpoint-based suspension.
+"""
+
+import asyncio
+import os
+import sys
+import pytest
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import job_control
+
+
+async def _start(script: str, job_id: str, command: str):
+    """Start a python script in its own session and register it."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", script,
+        stdout=asyncio.subprocess.PIPE,
+        start_new_session=True
+    )
+    job_control.register_process(job_id, process, command)
+    return process
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A zombie still answers kill(0); check its state
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split()[2] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+class TestCancel:
+    """Cancelling kills the whole process group."""
+
+    def test_cancel_kills_process_group(self):
+        # Parent spawns a child (like mpirun spawning ranks) and reports its pid
+        script = (
+            "import subprocess, sys, time\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            "print(child.pid, flush=True)\n"
+            "time.sleep(60)\n"
+        )
+
+        async def scenario():
+            process = await _start(script, "cancel-001", "foamRun")
+            child_pid = int((await process.stdout.readline()).decode().strip())
+            assert job_control.is_running("cancel-001")
+
+            stopped = await job_control.cancel_job("cancel-001")
+            await asyncio.sleep(0.2)
+            job_control.unregister_process("cancel-001", process)
+            return stopped, child_pid
+
+        stopped, child_pid = asyncio.run(scenario())
+
+        assert stopped
+        assert not _pid_alive(child_pid)
+        assert job_control.get_request("cancel-001") == job_control.CANCEL
+        with pytest.raises(job_control.JobCancelled):
+            job_control.check_interrupted("cancel-001")
+        job_control.clear_request("cancel-001")
+
+    def test_cancel_without_process_only_records_request(self):
+        assert asyncio.run(job_control.cancel_job("cancel-002")) is False
+        assert job_control.get_request("cancel-002") == job_control.CANCEL
+        job_control.clear_request("cancel-002")
+
+
+class TestSuspend:
+    """Suspending asks the solver to write and stop."""
+
+    def test_solver_receives_write_now_signal(self, tmp_path):
+        marker = tmp_path / "written"
+        script = (
+            "import signal, sys, time\n"
+            "def handler(signum, frame):\n"
+            f"    open({str(marker)!r}, 'w').write('written')\n"
+            "    sys.exit(0)\n"
+            f"signal.signal({int(job_control.STOP_AT_WRITE_NOW_SIGNAL)}, handler)\n"
+            "print('ready', flush=True)\n"
+            "time.sleep(60)\n"
+        )
+
+        async def scenario():
+            process = await _start(script, "suspend-001", "foamRun")
+            await process.stdout.readline()
+            stopped = await job_control.suspend_job("suspend-001", timeout=10)
+            job_control.unregister_process("suspend-001", process)
+            return stopped, process.returncode
+
+        stopped, returncode = asyncio.run(scenario())
+
+        assert stopped
+        assert returncode == 0
+        assert marker.read_text() == "written"
+        with pytest.raises(job_control.JobSuspended):
+            job_control.check_interrupted("suspend-001")
+        job_control.clear_request("suspend-001")
+
+    def test_non_solver_stage_is_terminated(self):
+        script = "import time; print('ready', flush=True); time.sleep(60)"
+
+        async def scenario():
+            process = await _start(script, "suspend-002", "snappyHexMesh")
+            await process.stdout.readline()
+            stopped = await job_control.suspend_job("suspend-002", timeout=10)
+            job_control.unregister_process("suspend-002", process)
+            return stopped, process.returncode
+
+        stopped, returncode = asyncio.run(scenario())
+
+        assert stopped
+        assert returncode != 0
+        job_control.clear_request("suspend-002")
+
+
+class TestCheckpointHelpers:
+    """Tests for restart helpers."""
+
+    def test_latest_written_time_ignores_initial_time(self, tmp_path):
+        (tmp_path / "0").mkdir()
+        (tmp_path / "system").mkdir()
+        assert job_control.latest_written_time(tmp_path) is None
+
+        (tmp_path / "processor0" / "0").mkdir(parents=True)
+        (tmp_path / "processor0" / "300").mkdir()
+        assert job_control.latest_written_time(tmp_path) == 300
+
+    def test_set_start_from_latest(self, tmp_path):
+        (tmp_path / "system").mkdir()
+        control_dict = tmp_path / "system" / "controlDict"
+        control_dict.write_text("application     simpleFoam;\nstartFrom       startTime;\nstartTime       0;\n")
+
+        job_control.set_start_from_latest(tmp_path)
+
+        content = control_dict.read_text()
+        assert "startFrom       latestTime;" in content
+        assert "startTime       0;" in content
+
+    def test_signal_switches_use_configured_signal(self):
+        block = job_control.generate_signal_switches()
+        assert "OptimisationSwitches" in block
+        assert f"stopAtWriteNowSignal {int(job_control.STOP_AT_WRITE_NOW_SIGNAL)};" in block
+
+
+class TestJobControlEndpoints:
+    """Tests for the cancel/suspend/resume API."""
+
+    @pytest.fixture
+    def client(self):
+        from backend.app import app, jobs
+        yield TestClient(app), jobs
+
+    def test_cancel_pending_job(self, client):
+        test_client, jobs = client
+        jobs["ctl-001"] = {"id": "ctl-001", "status": "pending", "config": {}}
+        try:
+            response = test_client.post("/api/jobs/ctl-001/cancel")
+            assert response.status_code == 200
+            assert jobs["ctl-001"]["status"] == "cancelled"
+        finally:
+            jobs.pop("ctl-001", None)
+
+    def test_cancel_without_process_is_pending(self, client):
+        test_client, jobs = client
+        jobs["ctl-004"] = {"id": "ctl-004", "status": "post-processing", "config": {}}
+        try:
+            response = test_client.post("/api/jobs/ctl-004/cancel")
+            assert response.json()["status"] == "cancelling"
+            assert job_control.get_request("ctl-004") == job_control.CANCEL
+        finally:
+            jobs.pop("ctl-004", None)
+            job_control.clear_request("ctl-004")
+
+    def test_cancel_complete_job_rejected(self, client):
+        test_client, jobs = client
+        jobs["ctl-002"] = {"id": "ctl-002", "status": "complete", "config": {}}
+        try:
+            response = test_client.post("/api/jobs/ctl-002/cancel")
+            assert response.status_code == 400
+        finally:
+            jobs.pop("ctl-002", None)
+
+    def test_resume_requires_suspended_job(self, client):
+        test_client, jobs = client
+        jobs["ctl-003"] = {"id": "ctl-003", "status": "solving", "config": {}}
+        try:
+            response = test_client.post("/api/jobs/ctl-003/resume")
+            assert response.status_code == 400
+        finally:
+            jobs.pop("ctl-003", None)
+
+    def test_suspend_unknown_job(self, client):
+        test_client, _ = client
+        response = test_client.post("/api/jobs/does-not-exist/suspend")
+        assert response.status_code == 404
+
+
+class TestPipelineStops:
+    """Stages without an OpenFOAM process honour a pending cancel."""
+
+    def test_cancel_during_post_processing(self, tmp_path, monkeypatch):
+        from backend import app as app_module
+
+        async def solved(job_id, *args, **kwargs):
+            # Cancelled while the solver finishes, with no process left to kill
+            await job_control.cancel_job(job_id)
+
+        async def extract(case_dir, config):
+            raise AssertionError("results extracted for a cancelled job")
+
+        monkeypatch.setattr(app_module, "CASES_DIR", tmp_path)
+        monkeypatch.setattr(app_module, "solve_case", solved)
+        monkeypatch.setattr(app_module, "extract_results", extract)
+        monkeypatch.setattr(app_module, "sync_job_to_db", lambda job_id, job: None)
+        job = {"id": "ctl-005", "status": "suspended", "suspended_stage": "solving", "config": {}}
+        monkeypatch.setitem(app_module.jobs, "ctl-005", job)
+        (tmp_path / "ctl-005" / "system").mkdir(parents=True)
+        (tmp_path / "ctl-005" / "system" / "controlDict").write_text("startFrom startTime;\n")
+        (tmp_path / "ctl-005" / "100").mkdir()
+
+        asyncio.run(app_module.run_simulation("ctl-005", resume=True))
+        assert job["status"] == "cancelled"
@@ -0,0 +1,180 @@
+"""
+Tests for the single-pass solver log indexer.
+"""
+
+import asyncio
+import math
+import sys
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import log_index
+
+
+HEADER = "/*---------------------------------------------------------------------------*\\\n" \
+         "Build  : 13\nExec   : foamRun -solver incompressibleFluid\nPID    : 4242\n" + "// " * 200 + "\n\n"
+
+
+def steady_step(i: int, with_k: bool = True) -> str:
+    text = (f"Time = {i}s\n\n"
+            f"smoothSolver:  Solving for Ux, Initial residual = {1 / i}, Final residual = 0.01, No Iterations 2\n"
+            f"smoothSolver:  Solving for Uy, Initial residual = {0.9 / i}, Final residual = 0.01, No Iterations 3\n"
+            f"GAMG:  Solving for p, Initial residual = {2 / i}, Final residual = 0.02, No Iterations 7\n"
+            f"time step continuity errors : sum local = {1e-4 / i}, global = 1e-06, cumulative = {1e-6 * i}\n")
+    if with_k:
+        text += f"smoothSolver:  Solving for k, Initial residual = {0.5 / i}, Final residual = 0.005, No Iterations 1\n"
+    return text + f"ExecutionTime = {1.5 * i} s  ClockTime = {2 * i} s\n\n"
+
+
+def pimple_step(i: int) -> str:
+    return (f"Courant Number mean: 0.1 max: {0.5 + i / 10}\n"
+            f"deltaT = 0.001\n"
+            f"Time = {i / 1000}s\n\n"
+            f"PIMPLE: Iteration 1\n"
+            f"smoothSolver:  Solving for Ux, Initial residual = 0.3, Final residual = 0.001, No Iterations 2\n"
+            f"GAMG:  Solving for p, Initial residual = 0.4, Final residual = 0.01, No Iterations 6\n"
+            f"GAMG:  Solving for p, Initial residual = 0.05, Final residual = 0.001, No Iterations 4\n"
+            f"ExecutionTime = {i} s  ClockTime = {i} s\n\n")
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "log.foamRun"
+    path.write_text(HEADER + "".join(steady_step(i) for i in range(1, 6)))
+    return path
+
+
+def append(path: Path, text: str):
+    with open(path, "a") as f:
+        f.write(text)
+
+
+class TestParsing:
+    """Tests for the per-step records."""
+
+    def test_aligned_records(self, log):
+        records = log_index.records(log)
+        assert records["time"].tolist() == [1, 2, 3, 4, 5]
+        assert records["p_initial"][1] == pytest.approx(1.0)
+        assert records["Uy_iterations"].tolist() == [3] * 5
+        assert records["continuity_cumulative"][-1] == pytest.approx(5e-6)
+        assert records["execution_time"][-1] == 7.5
+        assert math.isnan(records["courant_max"][0])
+
+    def test_solvers_recorded(self, log):
+        meta = log_index.update(log)
+        assert meta["solvers"] == {"Ux": "smoothSolver", "Uy": "smoothSolver", "p": "GAMG", "k": "smoothSolver"}
+        assert log_index.solved_fields(meta) == ["Ux", "Uy", "p", "k"]
+
+    def test_pimple_correctors_aggregated(self, tmp_path):
+        path = tmp_path / "log.foamRun"
+        path.write_text(HEADER + "".join(pimple_step(i) for i in range(1, 4)) + "End\n")
+        records = log_index.records(path)
+        assert records["p_solves"].tolist() == [2, 2, 2]
+        assert records["p_iterations"].tolist() == [10, 10, 10]
+        assert records["p_initial"][0] == 0.4 and records["p_final"][0] == 0.001
+        # Courant number and deltaT printed before "Time =" belong to that step
+        assert records["courant_max"].tolist() == pytest.approx([0.6, 0.7, 0.8])
+        assert records["delta_t"].tolist() == [0.001] * 3
+
+
+class TestIncremental:
+    """Tests for appending to the index."""
+
+    def test_only_new_log_parsed(self, log, monkeypatch):
+        first = log_index.update(log)
+        append(log, steady_step(6) + "Time = 7s\n\nsmoothSolver:  Solving for Ux, Initial residual")
+
+        fed = []
+        original = log_index.LogParser.feed
+        monkeypatch.setattr(log_index.LogParser, "feed",
+                            lambda self, line: fed.append(line) or original(self, line))
+        meta = log_index.update(log)
+        assert meta["rows"] == 6
+        assert all(b"Time = 1s" not in line for line in fed)
+        # The unfinished step is parsed again next time, not recorded yet
+        assert meta["offset"] < log.stat().st_size
+        assert first["offset"] < meta["offset"]
+
+    def test_unfinished_step_completed_later(self, log):
+        append(log, "Time = 6s\n\nGAMG:  Solving for p, Initial residual = 0.3, ")
+        assert log_index.update(log)["rows"] == 5
+        append(log, "Final residual = 0.01, No Iterations 4\nExecutionTime = 9 s  ClockTime = 12 s\n")
+        records = log_index.records(log)
+        assert records["time"][-1] == 6
+        assert records["p_initial"][-1] == 0.3
+        assert math.isnan(records["Ux_initial"][-1])
+
+    def test_final_flushes_last_step(self, log):
+        append(log, "Time = 6s\n\nGAMG:  Solving for p, Initial residual = 0.3, Final residual = 0.01, "
+                    "No Iterations 4\n")
+        assert log_index.update(log)["rows"] == 5
+        assert log_index.update(log, final=True)["rows"] == 6
+
+    def test_new_field_widens_table(self, tmp_path):
+        path = tmp_path / "log.foamRun"
+        path.write_text(HEADER + steady_step(1, with_k=False))
+        log_index.update(path)
+        append(path, steady_step(2))
+        records = log_index.records(path)
+        assert math.isnan(records["k_initial"][0])
+        assert records["k_initial"][1] == 0.25
+        assert records["p_initial"].tolist() == [2, 1]
+
+    def test_rewritten_log_reindexed(self, log):
+        log_index.update(log)
+        log.write_text(HEADER.replace("4242", "4343") + "".join(steady_step(i) for i in range(1, 9)))
+        assert log_index.update(log)["rows"] == 8
+        log.write_text(HEADER + steady_step(1))
+        assert log_index.update(log)["rows"] == 1
+
+    def test_rerun_with_same_banner_reindexed(self, tmp_path):
+        # The banner before the PID line is over 512 bytes and identical in every run
+        banner = "/*" + "-" * 1100 + "*\\\n"
+        path = tmp_path / "log.foamRun"
+        path.write_text(banner + "PID    : 4242\n" + "".join(steady_step(i) for i in range(1, 6)))
+        log_index.update(path)
+        path.write_text(banner + "PID    : 4343\n" + "".join(steady_step(i, with_k=False)
+                                                        for i in range(1, 9)))
+        log_index.update(path)
+        assert "k_initial" not in log_index.records(path)
+
+    def test_replaced_log_reindexed(self, log, tmp_path):
+        log_index.update(log)
+        # Same header (e.g. a copied case), different file
+        replacement = tmp_path / "log.new"
+        replacement.write_text(HEADER + "".join(steady_step(i, with_k=False) for i in range(1, 9)))
+        replacement.replace(log)
+        assert log_index.update(log)["rows"] == 8
+        assert "k_initial" not in log_index.records(log)
+
+    def test_missing_log(self, tmp_path):
+        assert log_index.update(tmp_path / "log.foamRun")["rows"] == 0
+        assert log_index.find_solver_log(tmp_path) is None
+
+    def test_follow(self, log):
+        async def run():
+            task = asyncio.create_task(log_index.follow(log, interval=0.01))
+            append(log, steady_step(6))
+            await asyncio.sleep(0.2)
+            task.cancel()
+
+        asyncio.run(run())
+        assert log_index.read_meta(log)["rows"] == 6
+
+
+class TestConvergenceHistory:
+    """extract_convergence_history reads the index."""
+
+    def test_history_aligned(self, tmp_path):
+        from backend.visualization.force_distribution import extract_convergence_history
+
+        path = tmp_path / "log.foamRun"
+        path.write_text(HEADER + steady_step(1, with_k=False) + steady_step(2) + steady_step(3))
+        history = extract_convergence_history(tmp_path)
+        assert history["iterations"] == [1, 2, 3]
+        assert history["k"] == [None, 0.25, pytest.approx(0.5 / 3)]
+        assert history["Uz"] == [] and history["omega"] == []
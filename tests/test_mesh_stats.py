@@ -0,0 +1,155 @@
+"""
+Tests for the mesh statistics captured after meshing.
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import mesh_stats
+
+
+SNAPPY_LOG = """Refinement phase
+----------------
+
+Cells per refinement level:
+    0\t11520
+    1\t2304
+
+Surface refinement iteration 1
+Cells per refinement level:
+    0\t10880
+    1\t3120
+    2\t8448
+    3\t20480
+
+Snapped mesh : cells:42928  faces:137112  points:52341
+Checking final mesh ...
+Checking faces in error :
+    non-orthogonality > 65  degrees                        : 3
+    faces with face pyramid volume < 1e-13                 : 0
+    faces with skewness > 4   (internal) or 20  (boundary) : 1
+Finished meshing with 4 illegal faces (concave, zero area or negative cell pyramid volume)
+Finished meshing in = 85.27 s.
+End
+"""
+
+CHECK_MESH_LOG = """Checking geometry...
+    Max aspect ratio = 14.2 OK.
+    Minimum face area = 1.5e-08. Maximum face area = 0.0121.  Face area magnitudes OK.
+    Min volume = 2.1e-12. Max volume = 0.00133.  Total volume = 9.87.  Cell volumes OK.
+    Mesh non-orthogonality Max: 66.8 average: 7.93
+   *Number of severely non-orthogonal (> 65 degrees) faces: 3.
+    Non-orthogonality check OK.
+    Max skewness = 3.71 OK.
+
+Failed 1 mesh checks.
+
+End
+"""
+
+
+def foam_file(path: Path, cls: str, body: str, note: str = None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    note_line = f"    note        \"{note}\";\n" if note else ""
+    path.write_text("FoamFile\n{\n    version     2.0;\n    format      ascii;\n"
+                    f"    class       {cls};\n{note_line}    object      {path.name};\n}}\n\n{body}")
+
+
+def write_poly_mesh(poly_mesh: Path, patches, cells: int, faces: int, internal: int, points: int):
+    entries = "".join(f"    {name}\n    {{\n        type            {kind};\n        nFaces          {n};\n"
+                      f"        startFace       {internal};\n    }}\n" for name, kind, n in patches)
+    foam_file(poly_mesh / "boundary", "polyBoundaryMesh", f"{len(patches)}\n(\n{entries})\n")
+    foam_file(poly_mesh / "owner", "labelList", "0\n(\n)\n",
+              note=f"nPoints:{points}  nCells:{cells}  nFaces:{faces}  nInternalFaces:{internal}")
+
+
+@pytest.fixture
+def case(tmp_path):
+    write_poly_mesh(tmp_path / "constant" / "polyMesh",
+                    [("inlet", "patch", 64), ("wheel", "wall", 5000), ("ground", "wall", 900)],
+                    cells=42928, faces=137112, internal=131148, points=52341)
+    (tmp_path / "log.snappyHexMesh").write_text(SNAPPY_LOG)
+    return tmp_path
+
+
+class TestLogs:
+    """Tests for the meshing log parsers."""
+
+    def test_snappy_log(self, tmp_path):
+        path = tmp_path / "log.snappyHexMesh"
+        path.write_text(SNAPPY_LOG)
+        snappy = mesh_stats.parse_snappy_log(path)
+        # The last table describes the final mesh
+        assert snappy["refinement_levels"] == [10880, 3120, 8448, 20480]
+        assert snappy["error_faces"]["non-orthogonality > 65  degrees"] == 3
+        assert snappy["illegal_faces"] == 4
+        assert snappy["meshing_time"] == 85.27
+
+    def test_check_mesh_log(self, tmp_path):
+        path = tmp_path / "log.checkMesh"
+        path.write_text(CHECK_MESH_LOG)
+        quality = mesh_stats.parse_check_mesh_log(path)
+        assert quality["max_non_orthogonality"] == 66.8
+        assert quality["avg_non_orthogonality"] == 7.93
+        assert quality["max_skewness"] == 3.71
+        assert quality["min_volume"] == 2.1e-12
+        assert quality["severely_non_orthogonal_faces"] == 3
+        assert quality["failed_checks"] == 1 and quality["mesh_ok"] is False
+
+        path.write_text(CHECK_MESH_LOG.replace("Failed 1 mesh checks.", "Mesh OK."))
+        assert mesh_stats.parse_check_mesh_log(path)["mesh_ok"] is True
+
+    def test_missing_logs(self, tmp_path):
+        assert mesh_stats.parse_snappy_log(tmp_path / "log.snappyHexMesh") == {}
+        assert mesh_stats.parse_check_mesh_log(tmp_path / "log.checkMesh") == {}
+
+
+class TestCollect:
+    """Tests for the statistics of a case."""
+
+    def test_reconstructed_case(self, case):
+        stats = mesh_stats.collect(case)
+        assert (stats["cells"], stats["faces"], stats["points"]) == (42928, 137112, 52341)
+        assert stats["patches"] == {"inlet": 64, "wheel": 5000, "ground": 900}
+        assert sum(stats["refinement_levels"]) == stats["cells"]
+        assert stats["snappy"]["illegal_faces"] == 4
+        assert "quality" not in stats
+
+    def test_decomposed_case(self, case):
+        for rank, (wheel, cells) in enumerate([(3000, 25000), (2000, 17928)]):
+            poly_mesh = case / f"processor{rank}" / "constant" / "polyMesh"
+            write_poly_mesh(poly_mesh, [("wheel", "wall", wheel), ("ground", "wall", 450),
+                                        (f"procBoundary{rank}to{1 - rank}", "processor", 800)],
+                            cells=cells, faces=80000, internal=70000, points=30000)
+            foam_file(poly_mesh / "pointProcAddressing", "labelList", "2\n(\n0\n52340\n)\n")
+        (case / "processor0" / "0.5").mkdir()
+
+        stats = mesh_stats.collect(case)
+        assert stats["processors"] == 2 and stats["cells"] == 42928
+        assert stats["patches"] == {"wheel": 5000, "ground": 900}
+        assert stats["points"] == 52341
+
+    def test_no_mesh(self, tmp_path):
+        assert mesh_stats.collect(tmp_path) is None
+
+
+class TestSummary:
+    """Result summaries use the stored statistics."""
+
+    def test_stored_statistics_used(self, case, monkeypatch):
+        from backend.visualization.results_summary import get_mesh_info
+
+        stored = mesh_stats.collect(case)
+        monkeypatch.setattr(mesh_stats, "collect", lambda case_dir: pytest.fail("mesh re-read"))
+        info = get_mesh_info(case, stored)
+        assert info["cells"] == 42928 and info["patches"]["wheel"] == 5000
+        assert info["quality"] == {}
+
+    def test_collected_without_stored(self, case):
+        from backend.visualization.results_summary import get_mesh_info
+
+        assert get_mesh_info(case)["refinement_levels"][0] == 10880
@@ -0,0 +1,141 @@
+"""
+Tests for the Prometheus metrics registry and the /metrics endpoint.
+"""
+
+import re
+import sys
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import metrics
+
+
+def sample_value(text: str, sample: str) -> float:
+    """Value of one sample line (name plus labels exactly as rendered)."""
+    match = re.search(rf"^{re.escape(sample)} (\S+)$", text, re.MULTILINE)
+    assert match, f"{sample} not in output"
+    return float(match.group(1))
+
+
+class TestRegistry:
+    """Tests for metric types and the text format."""
+
+    def test_counter(self):
+        counter = metrics.Counter("test_total", "A counter.", labels=("kind",))
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        text = counter.render()
+        assert "# TYPE test_total counter" in text
+        assert sample_value(text, 'test_total{kind="a"}') == 3
+
+    def test_metric_requires_samples(self):
+        class Incomplete(metrics.Metric):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete("wheelflow_incomplete", "Missing samples")
+
+    def test_counter_rejects_wrong_labels(self):
+        counter = metrics.Counter("test_total", "A counter.", labels=("kind",))
+        with pytest.raises(ValueError):
+            counter.inc(other="a")
+
+    def test_histogram_buckets_cumulative(self):
+        histogram = metrics.Histogram("test_seconds", "A histogram.", labels=("stage",),
+                                      buckets=(1, 10))
+        for value in (0.5, 5, 50):
+            histogram.observe(value, stage="foamRun")
+        text = histogram.render()
+        assert sample_value(text, 'test_seconds_bucket{stage="foamRun",le="1"}') == 1
+        assert sample_value(text, 'test_seconds_bucket{stage="foamRun",le="10"}') == 2
+        assert sample_value(text, 'test_seconds_bucket{stage="foamRun",le="+Inf"}') == 3
+        assert sample_value(text, 'test_seconds_sum{stage="foamRun"}') == 55.5
+        assert sample_value(text, 'test_seconds_count{stage="foamRun"}') == 3
+
+    def test_gauge_collected_at_render(self):
+        state = {"depth": 1}
+        gauge = metrics.Gauge("test_depth", "A gauge.", collect=lambda: {(): state["depth"]})
+        state["depth"] = 4
+        assert sample_value(gauge.render(), "test_depth") == 4
+
+    def test_label_values_escaped(self):
+        counter = metrics.Counter("test_total", "A counter.", labels=("route",))
+        counter.inc(route='a"b')
+        assert 'route="a\\"b"' in counter.render()
+
+    def test_job_gauges(self):
+        registry = metrics.Registry()
+        jobs = {
+            "a": {"status": "pending"}, "b": {"status": "queued"},
+            "c": {"status": "solving"}, "d": {"status": "solving"},
+            "e": {"status": "meshing"}, "f": {"status": "complete"},
+        }
+        metrics.register_job_gauges(jobs, ("pending", "queued"), ("complete",),
+                                    worker_queue=lambda: 1, target=registry)
+        text = registry.render()
+        assert sample_value(text, "wheelflow_queue_depth") == 2
+        assert sample_value(text, 'wheelflow_jobs_running{stage="solving"}') == 2
+        assert sample_value(text, 'wheelflow_jobs_running{stage="meshing"}') == 1
+        assert 'stage="complete"' not in text
+        assert sample_value(text, "wheelflow_worker_queue_depth") == 1
+
+
+class TestMetricsEndpoint:
+    """Tests for /metrics on the application."""
+
+    @pytest.fixture
+    def client(self):
+        from fastapi.testclient import TestClient
+        from backend import app as app_module
+        return TestClient(app_module.app), app_module
+
+    def test_exposition(self, client):
+        client, _ = client
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        for name in ("wheelflow_queue_depth", "wheelflow_jobs_running",
+                     "wheelflow_stage_duration_seconds", "wheelflow_jobs_failed_total",
+                     "wheelflow_solver_iterations_per_second",
+                     "wheelflow_http_request_duration_seconds", "wheelflow_cache_requests_total"):
+            assert f"# TYPE {name} " in response.text
+
+    def test_request_latency_by_route_template(self, client):
+        client, _ = client
+        before = metrics.REQUEST_LATENCY.count(method="GET", route="/api/jobs/{job_id}",
+                                               status="404")
+        client.get("/api/jobs/does-not-exist")
+        client.get("/api/jobs/another-missing-job")
+        after = metrics.REQUEST_LATENCY.count(method="GET", route="/api/jobs/{job_id}",
+                                              status="404")
+        assert after - before == 2
+        assert "does-not-exist" not in client.get("/metrics").text
+
+    def test_artifact_cache_lookups(self, client, tmp_path, monkeypatch):
+        client, app_module = client
+        monkeypatch.setattr(app_module, "CASES_DIR", tmp_path)
+        monkeypatch.setitem(app_module.jobs, "cached-job", {"status": "complete", "config": {}})
+        viz_dir = tmp_path / "cached-job" / "visualizations"
+        viz_dir.mkdir(parents=True)
+        (viz_dir / "pressure_surface.json").write_text("{}")
+
+        before = metrics.CACHE_REQUESTS.value(cache="pressure_surface_json", result="hit")
+        assert client.get("/api/jobs/cached-job/viz/pressure_surface.json").status_code == 200
+        assert metrics.CACHE_REQUESTS.value(cache="pressure_surface_json", result="hit") == before + 1
+
+    def test_stage_durations_observed(self):
+        import asyncio
+        from backend import database as db
+        from backend import stage_metrics
+
+        async def stage():
+            async with stage_metrics.track_stage("metrics-job", "metricsTestStage"):
+                pass
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(db, "add_job_stage", lambda *args, **kwargs: None)
+            asyncio.run(stage())
+        assert metrics.STAGE_DURATION.count(stage="metricsTestStage", status="complete") == 1
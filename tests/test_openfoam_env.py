@@ -137,5 +137,99 @@ class TestParallelDecomposition:
         assert "scotch" in content.lower()
 
 
+class TestEnvironmentSnapshot:
+    """Tests for the persisted environment snapshot."""
+
+    @pytest.fixture
+    def fake_install(self, tmp_path, monkeypatch):
+        """A bashrc that sets up a minimal OpenFOAM-like environment."""
+        import openfoam_env
+
+        project_dir = tmp_path / "openfoam"
+        project_dir.mkdir()
+        bashrc = tmp_path / "bashrc"
+        bashrc.write_text(
+            f'export WM_PROJECT_DIR="{project_dir}"\n'
+            f'export FOAM_APPBIN="{project_dir}/bin"\n'
+            f'export FOAM_USER_LIBBIN="{tmp_path}/user/lib"\n'
+            f'export LD_LIBRARY_PATH="{project_dir}/lib:$LD_LIBRARY_PATH"\n'
+            'export MULTILINE="line1\nline2"\n'
+        )
+        monkeypatch.setattr(openfoam_env, "OPENFOAM_BASHRC", bashrc)
+        monkeypatch.setattr(openfoam_env, "SNAPSHOT_PATH", tmp_path / "env.json")
+        monkeypatch.setattr(openfoam_env, "_env_cache", None)
+        yield openfoam_env, bashrc
+        openfoam_env._env_cache = None
+
+    def test_snapshot_persisted(self, fake_install):
+        openfoam_env, bashrc = fake_install
+        env = openfoam_env.load_environment()
+
+        assert env["WM_PROJECT_DIR"].endswith("openfoam")
+        assert env["MULTILINE"] == "line1\nline2"
+        assert openfoam_env.SNAPSHOT_PATH.exists()
+
+    def test_snapshot_reused_without_bash(self, fake_install, monkeypatch):
+        openfoam_env, bashrc = fake_install
+        openfoam_env.load_environment()
+        openfoam_env._env_cache = None
+
+        def no_bash(*args, **kwargs):
+            raise AssertionError("bashrc sourced again")
+
+        monkeypatch.setattr(openfoam_env.subprocess, "run", no_bash)
+        env = openfoam_env.load_environment()
+        assert "WM_PROJECT_DIR" in env
+
+    def test_bashrc_change_invalidates_snapshot(self, fake_install):
+        import os
+        openfoam_env, bashrc = fake_install
+        openfoam_env.load_environment()
+
+        bashrc.write_text(bashrc.read_text() + 'export NEW_SETTING="1"\n')
+        stat = bashrc.stat()
+        os.utime(bashrc, (stat.st_atime, stat.st_mtime + 10))
+        openfoam_env._env_cache = None
+
+        assert openfoam_env.load_environment()["NEW_SETTING"] == "1"
+
+    def test_unusable_environment_not_persisted(self, fake_install):
+        openfoam_env, bashrc = fake_install
+        bashrc.write_text("export SOMETHING_ELSE=1\n")
+
+        env = openfoam_env.load_environment()
+
+        assert "WM_PROJECT_DIR" not in env
+        assert not openfoam_env.SNAPSHOT_PATH.exists()
+
+    def test_gpu_paths_from_configuration(self, fake_install, monkeypatch):
+        openfoam_env, _ = fake_install
+        monkeypatch.setattr(openfoam_env, "CUDA_HOME", Path("/opt/cuda-test"))
+        env = openfoam_env.get_environment(gpu_enabled=True)
+
+        paths = env["LD_LIBRARY_PATH"].split(":")
+        assert "/opt/cuda-test/lib64" in paths
+        assert paths[0].endswith("user/lib")
+        assert not any("/home/constantine" in p for p in paths)
+
+        monkeypatch.setenv("WHEELFLOW_GPU_LIB_PATHS", "/a:/b")
+        env = openfoam_env.get_environment(gpu_enabled=True)
+        assert env["LD_LIBRARY_PATH"].startswith("/a:/b:")
+
+    def test_environment_copy_is_independent(self, fake_install):
+        openfoam_env, _ = fake_install
+        env = openfoam_env.get_environment()
+        env["WM_PROJECT_DIR"] = "changed"
+        assert openfoam_env.get_environment()["WM_PROJECT_DIR"] != "changed"
+
+    def test_capabilities_probed_once(self, fake_install, monkeypatch):
+        openfoam_env, _ = fake_install
+        monkeypatch.setattr(openfoam_env, "_capabilities", None)
+
+        first = openfoam_env.get_capabilities()
+        assert first["openfoam"] is True
+        assert openfoam_env.get_capabilities() is first
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
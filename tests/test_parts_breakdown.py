@@ -128,6 +128,26 @@ class TestPartsDetection:
         # 'wheel' is not in KNOWN_WHEEL_PARTS (only specific parts like rim, tire, etc.)
         assert len(parts) == 0
 
+    def test_detect_parts_in_decomposed_mesh(self, tmp_path):
+        """A parallel-meshed case has only the background mesh at case level."""
+        import os
+
+        def boundary(*patches):
+            entries = "".join(f"    {name}\n    {{\n        type wall;\n        nFaces 10;\n"
+                              f"        startFace 0;\n    }}\n" for name in patches)
+            return f"{len(patches)}\n(\n{entries})\n"
+
+        case_dir = tmp_path / "test_case"
+        background = case_dir / "constant" / "polyMesh"
+        background.mkdir(parents=True)
+        (background / "boundary").write_text(boundary("inlet", "outlet"))
+        os.utime(background / "boundary", (1, 1))
+        processor_mesh = case_dir / "processor0" / "constant" / "polyMesh"
+        processor_mesh.mkdir(parents=True)
+        (processor_mesh / "boundary").write_text(boundary("inlet", "outlet", "rim", "tire"))
+
+        assert detect_wheel_parts(case_dir) == ["rim", "tire"]
+
     def test_detect_parts_missing_boundary_file(self, tmp_path):
         """Test detection returns empty list when boundary file doesn't exist."""
         case_dir = tmp_path / "test_case"
@@ -0,0 +1,308 @@
+"""
+Tests for reading VTK slice surfaces into arrays and rendering them.
+"""
+
+import base64
+import sys
+import zlib
+import numpy as np
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.visualization import pressure_slices, vtk_reader
+
+
+# A slice in the XZ plane (y = 0): two quads, a triangle and a pentagon
+POINTS = np.array([[0, 0, 0], [1, 0, 0], [2, 0, 0], [0, 0, 1], [1, 0, 1], [2, 0, 1],
+                   [3, 0, 0.5], [0.5, 0, 2], [1.5, 0, 2]], dtype=float)
+FACES = [[0, 1, 4, 3], [1, 2, 5, 4], [2, 6, 5], [3, 4, 5, 8, 7]]
+CELL_P = np.array([10.0, -20.0, 30.0, 5.0])
+POINT_T = np.arange(len(POINTS), dtype=float) * 0.5
+POINT_U = np.column_stack([POINT_T, -POINT_T, np.ones(len(POINTS))])
+
+
+def legacy_file(binary: bool = False, new_layout: bool = False) -> bytes:
+    """The slice as legacy VTK, with p as cell FIELD data and T, U as point data."""
+    chunks = [b"# vtk DataFile Version 2.0\nslice\n" + (b"BINARY" if binary else b"ASCII") +
+              b"\nDATASET POLYDATA\n"]
+
+    def block(header: str, values: np.ndarray, dtype: str):
+        chunks.append(header.encode() + b"\n")
+        if binary:
+            chunks.append(values.astype(">" + dtype).tobytes() + b"\n")
+        else:
+            chunks.append(" ".join(str(v) for v in values.ravel().tolist()).encode() + b"\n")
+
+    block(f"POINTS {len(POINTS)} float", POINTS, "f4")
+    labels = np.concatenate(FACES)
+    if new_layout:
+        offsets = np.cumsum([0] + [len(face) for face in FACES])
+        chunks.append(f"POLYGONS {len(offsets)} {len(labels)}\n".encode())
+        block("OFFSETS vtktypeint64", offsets, "i8")
+        block("CONNECTIVITY vtktypeint64", labels, "i8")
+    else:
+        cells = np.concatenate([[len(face)] + face for face in FACES])
+        block(f"POLYGONS {len(FACES)} {len(cells)}", cells, "i4")
+    chunks.append(f"CELL_DATA {len(FACES)}\nFIELD attributes 1\n".encode())
+    block(f"p 1 {len(FACES)} float", CELL_P, "f4")
+    chunks.append(f"POINT_DATA {len(POINTS)}\n".encode())
+    block("SCALARS T double\nLOOKUP_TABLE default", POINT_T, "f8")
+    block("VECTORS U float", POINT_U, "f4")
+    return b"".join(chunks)
+
+
+def xml_file(data_format: str, compressed: bool = False) -> bytes:
+    """The slice as XML PolyData, arrays written in data_format."""
+    offsets = np.cumsum([len(face) for face in FACES])
+    arrays = {
+        "Points": [("Points", POINTS.astype("<f4"), 3)],
+        "Polys": [("connectivity", np.concatenate(FACES).astype("<i8"), 1),
+                  ("offsets", offsets.astype("<i8"), 1)],
+        "CellData": [("p", CELL_P.astype("<f4"), 1)],
+        "PointData": [("T", POINT_T.astype("<f8"), 1), ("U", POINT_U.astype("<f4"), 3)],
+    }
+    types = {"f4": "Float32", "f8": "Float64", "i8": "Int64"}
+    appended = b""
+
+    def encoded(raw: bytes) -> bytes:
+        """Header and payload, each base64 encoded like VTK does."""
+        if compressed:
+            payload = zlib.compress(raw)
+            header = np.array([1, len(raw), len(raw), len(payload)], dtype="<u8").tobytes()
+        else:
+            payload, header = raw, np.array([len(raw)], dtype="<u8").tobytes()
+        return header, payload
+
+    sections = []
+    for section, entries in arrays.items():
+        elements = []
+        for name, values, components in entries:
+            header, payload = encoded(values.tobytes())
+            attributes = (f'type="{types[values.dtype.str[1:]]}" Name="{name}" '
+                          f'NumberOfComponents="{components}"')
+            if data_format == "ascii":
+                text = " ".join(str(v) for v in values.ravel().tolist())
+                elements.append(f'<DataArray {attributes} format="ascii">{text}</DataArray>')
+            elif data_format == "binary":
+                text = (base64.b64encode(header) + base64.b64encode(payload)).decode()
+                elements.append(f'<DataArray {attributes} format="binary">{text}</DataArray>')
+            else:
+                elements.append(f'<DataArray {attributes} format="appended" offset="{len(appended)}"/>')
+                if data_format == "base64":
+                    appended += base64.b64encode(header) + base64.b64encode(payload)
+                else:
+                    appended += header + payload
+        sections.append(f"<{section}>{''.join(elements)}</{section}>")
+
+    compressor = ' compressor="vtkZLibDataCompressor"' if compressed else ""
+    xml = (f'<?xml version="1.0"?>\n<VTKFile type="PolyData" version="1.0" byte_order="LittleEndian" '
+           f'header_type="UInt64"{compressor}>\n<PolyData>\n'
+           f'<Piece NumberOfPoints="{len(POINTS)}" NumberOfPolys="{len(FACES)}">'
+           f'{"".join(sections)}</Piece>\n</PolyData>\n').encode()
+    if data_format in ("raw", "base64"):
+        encoding = "base64" if data_format == "base64" else "raw"
+        xml += f'<AppendedData encoding="{encoding}">\n_'.encode() + appended + b"\n</AppendedData>\n"
+    return xml + b"</VTKFile>\n"
+
+
+def check_surface(surface: dict):
+    assert np.allclose(surface["points"], POINTS)
+    assert surface["offsets"].tolist() == [0, 4, 8, 11, 16]
+    assert surface["labels"].tolist() == np.concatenate(FACES).tolist()
+    assert np.allclose(surface["cell_data"]["p"], CELL_P)
+    assert np.allclose(surface["point_data"]["T"], POINT_T)
+    assert surface["point_data"]["U"].shape == (len(POINTS), 3)
+    assert np.allclose(surface["point_data"]["U"], POINT_U)
+
+
+class TestReader:
+    """Tests for reading VTK files into arrays."""
+
+    @pytest.mark.parametrize("binary", [False, True])
+    @pytest.mark.parametrize("new_layout", [False, True])
+    def test_legacy(self, tmp_path, binary, new_layout):
+        path = tmp_path / "slice.vtk"
+        path.write_bytes(legacy_file(binary, new_layout))
+        check_surface(vtk_reader.read_vtk(path))
+
+    @pytest.mark.parametrize("data_format", ["ascii", "binary", "raw", "base64"])
+    @pytest.mark.parametrize("compressed", [False, True])
+    def test_xml(self, tmp_path, data_format, compressed):
+        path = tmp_path / "slice.vtp"
+        path.write_bytes(xml_file(data_format, compressed))
+        check_surface(vtk_reader.read_vtk(path))
+
+    def test_all_triangles(self):
+        cells = np.array([3, 0, 1, 2, 3, 2, 1, 3])
+        offsets, labels = vtk_reader.legacy_polygons(cells, 2)
+        assert offsets.tolist() == [0, 3, 6] and labels.tolist() == [0, 1, 2, 2, 1, 3]
+
+    def test_not_polydata(self, tmp_path):
+        path = tmp_path / "grid.vtk"
+        path.write_text("# vtk DataFile Version 2.0\ngrid\nASCII\nDATASET STRUCTURED_POINTS\n")
+        assert vtk_reader.read_vtk(path) is None
+
+
+class TestSlice:
+    """Tests for slices read for rendering."""
+
+    @pytest.fixture
+    def vtk_file(self, tmp_path):
+        path = tmp_path / "ySlice_0.vtk"
+        path.write_bytes(legacy_file(binary=True))
+        return path
+
+    def test_pressure_per_triangle(self, vtk_file):
+        data = pressure_slices.read_slice(vtk_file)
+        assert data["field"] == "p" and data["location"] == "cell"
+        # Fan triangulation: 2 + 2 + 1 + 3 triangles
+        assert len(data["triangles"]) == len(data["values"]) == 8
+        assert data["values"].tolist() == [10, 10, -20, -20, 30, 5, 5, 5]
+        assert data["value_range"] == {"min": -20.0, "max": 30.0}
+        assert data["bounds"]["x_max"] == 3.0 and data["bounds"]["y_min"] == 0.0
+
+    def test_named_point_field(self, vtk_file):
+        data = pressure_slices.read_slice(vtk_file, field="T")
+        assert data["location"] == "point" and np.allclose(data["values"], POINT_T)
+        assert pressure_slices.read_slice(vtk_file, field="k") is None
+
+    def test_plane_axes(self, vtk_file):
+        data = pressure_slices.read_slice(vtk_file)
+        assert pressure_slices.plane_axes(data["points"]) == (0, 2)
+
+    def test_render_reuses_figure(self, vtk_file, tmp_path):
+        first = pressure_slices.render_vtk_slice_image(vtk_file, tmp_path / "a.png")
+        assert first["success"], first.get("error")
+        figure = pressure_slices.slice_figure(True)[0]
+
+        second = pressure_slices.render_vtk_slice_image(vtk_file, tmp_path / "b.png")
+        assert second["success"] and pressure_slices.slice_figure(True)[0] is figure
+        assert (tmp_path / "a.png").read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+        assert (tmp_path / "a.png").read_bytes() == (tmp_path / "b.png").read_bytes()
+        # Nothing is left on the reused axes
+        assert not figure.axes[0].collections
+
+    def test_points_without_polygons_triangulated_once(self, tmp_path):
+        rng = np.random.default_rng(3)
+        points = np.column_stack([rng.random(200), np.zeros(200), rng.random(200)])
+        values = points[:, 0] - points[:, 2]
+        text = (f"# vtk DataFile Version 2.0\ncloud\nASCII\nDATASET POLYDATA\nPOINTS 200 double\n"
+                f"{' '.join(map(str, points.ravel()))}\nPOINT_DATA 200\nSCALARS p double\n"
+                f"LOOKUP_TABLE default\n{' '.join(map(str, values))}\n")
+        path = tmp_path / "cloud.vtk"
+        path.write_text(text)
+
+        pressure_slices._triangulations.clear()
+        assert pressure_slices.render_vtk_slice_image(path, tmp_path / "a.png")["success"]
+        assert pressure_slices.render_vtk_slice_image(path, tmp_path / "b.png")["success"]
+        assert len(pressure_slices._triangulations) == 1
+
+    def test_unreadable_file(self, tmp_path):
+        path = tmp_path / "empty.vtk"
+        path.write_text("not vtk\n")
+        result = pressure_slices.render_vtk_slice_image(path, tmp_path / "a.png")
+        assert not result["success"]
+
+
+class TestGrid:
+    """Tests for slices resampled to a grid for the browser."""
+
+    @pytest.fixture
+    def vtk_file(self, tmp_path):
+        path = tmp_path / "ySlice_0.vtk"
+        path.write_bytes(legacy_file(binary=True))
+        return path
+
+    def test_derived_fields(self, vtk_file):
+        speed = 10.0
+        data = pressure_slices.read_slice(vtk_file, field="Cp", speed=speed)
+        assert data["location"] == "cell" and data["values"][0] == pytest.approx(10 / (0.5 * speed ** 2))
+        mag_u = pressure_slices.read_slice(vtk_file, field="magU")
+        assert np.allclose(mag_u["values"], np.linalg.norm(POINT_U, axis=1))
+        assert np.allclose(pressure_slices.read_slice(vtk_file, field="Ux")["values"], POINT_U[:, 0])
+        assert {"p", "Cp", "T", "magU", "Ux"} <= set(data["fields"])
+
+    def test_rasterize_linear_field_exact(self):
+        # One triangle with a linear point field: interpolation is exact inside
+        h, v = np.array([0.0, 1.0, 0.0]), np.array([0.0, 0.0, 1.0])
+        grid = pressure_slices.rasterize(h, v, np.array([[0, 1, 2]]), h + 2 * v, "point",
+                                         (0, 1, 0, 1), 10, 10)
+        centres = (np.arange(10) + 0.5) / 10
+        hh, vv = np.meshgrid(centres, centres)
+        inside = hh + vv < 1
+        assert np.allclose(grid[inside], (hh + 2 * vv)[inside], atol=1e-6)
+        assert np.isnan(grid[~inside & (hh + vv > 1.1)]).all()
+
+    def test_resample_cells_and_holes(self, vtk_file):
+        grid = pressure_slices.resample_slice(pressure_slices.read_slice(vtk_file), 30)
+        values = grid["values"]
+        # x spans 3, z spans 2: cells of 0.1, rows from z = 0
+        assert values.shape == (20, 30) and grid["axes"] == (0, 2)
+        assert values[5, 5] == 10 and values[5, 15] == -20 and values[5, 21] == 30
+        assert values[15, 10] == 5
+        # Corners outside every polygon
+        assert np.isnan(values[19, 29]) and np.isnan(values[19, 0])
+
+    @pytest.mark.parametrize("float16", [False, True])
+    def test_round_trip(self, vtk_file, float16):
+        grid = pressure_slices.resample_slice(pressure_slices.read_slice(vtk_file, field="T"), 40)
+        data = pressure_slices.encode_grid(grid, float16)
+        assert data[:4] == b"WFSG" and len(data) == 64 + grid["values"].size * (2 if float16 else 4)
+
+        decoded = pressure_slices.decode_grid(data)
+        assert decoded["field"] == "T" and decoded["axes"] == (0, 2)
+        assert decoded["extent"] == pytest.approx(grid["extent"])
+        assert np.array_equal(np.isnan(decoded["values"]), np.isnan(grid["values"]))
+        tolerance = 4e-3 if float16 else 1e-6
+        assert np.nanmax(np.abs(decoded["values"] - grid["values"])) < tolerance
+
+    def test_export_unknown_field(self, vtk_file, tmp_path):
+        result = pressure_slices.export_slice_grid(vtk_file, tmp_path / "s.grid", field="k")
+        assert not result["success"] and "magU" in result["fields"]
+
+
+class TestGridEndpoint:
+    """Tests for serving slice grids."""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import app as app_module
+
+        case = tmp_path / "job1"
+        slice_dir = case / "postProcessing" / "pressureSlices" / "100"
+        slice_dir.mkdir(parents=True)
+        (slice_dir / "ySlice_0.vtk").write_bytes(legacy_file(binary=True))
+        monkeypatch.setattr(app_module, "CASES_DIR", tmp_path)
+        monkeypatch.setitem(app_module.jobs, "job1", {"status": "complete", "config": {"speed": 10.0}})
+        return TestClient(app_module.app), "/api/jobs/job1/viz/slice/ySlice_0.grid"
+
+    def test_field_grid_cached(self, client):
+        client, url = client
+        response = client.get(url, params={"field": "Cp", "resolution": 30})
+        assert response.status_code == 200
+        grid = pressure_slices.decode_grid(response.content)
+        assert grid["field"] == "Cp" and grid["values"].shape == (20, 30)
+        assert grid["values"][5, 5] == pytest.approx(10 / 50)
+
+        etag = response.headers["etag"]
+        cached = client.get(url, params={"field": "Cp", "resolution": 30}, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        other = client.get(url, params={"field": "p", "resolution": 30})
+        assert other.headers["etag"] != etag
+
+    def test_float16(self, client):
+        client, url = client
+        full = client.get(url, params={"resolution": 30}, headers={"Accept-Encoding": "identity"})
+        half = client.get(url, params={"resolution": 30, "float16": True}, headers={"Accept-Encoding": "identity"})
+        assert len(half.content) - 64 == (len(full.content) - 64) // 2
+
+    def test_unknown_and_invalid_field(self, client):
+        client, url = client
+        missing = client.get(url, params={"field": "nut"})
+        assert missing.status_code == 404 and "Cp" in missing.json()["detail"]
+        assert client.get(url, params={"field": "../p"}).status_code == 400
+        assert client.get("/api/jobs/job1/viz/slice/zSlice.grid").status_code == 404
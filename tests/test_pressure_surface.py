@@ -0,0 +1,274 @@
+"""
+Tests for the vectorized pressure surface export.
+"""
+
+import json
+import os
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.visualization import pressure_surface
+
+
+# A unit square next to a 2 x 1 rectangle, with a pentagon (area 1.25) on
+# top: faces share points 1, 3 and 4
+POINTS = np.array([[0, 0, 0], [1, 0, 0], [3, 0, 0], [0, 1, 0], [1, 1, 0], [3, 1, 0],
+                   [1, 2, 0], [0.5, 2.5, 0], [0, 2, 0]], dtype=float)
+FACES = [[0, 1, 4, 3], [1, 2, 5, 4], [3, 4, 6, 7, 8]]
+P = np.array([10.0, 40.0, -20.0])
+SPEED = 10.0
+
+
+@pytest.fixture
+def fields():
+    """Patch values of the case's fields (tests may change them)."""
+    return {"p": P}
+
+
+@pytest.fixture
+def case(tmp_path, monkeypatch, fields):
+    offsets = np.cumsum([0] + [len(face) for face in FACES])
+    patch = {"points": POINTS, "offsets": offsets, "labels": np.concatenate(FACES),
+             "n_faces": len(FACES), "type": "wall"}
+    monkeypatch.setattr(pressure_surface.foam_mesh, "read_case_patch",
+                        lambda case_dir, name: patch if name == "wheel" else None)
+    monkeypatch.setattr(pressure_surface.foam_mesh, "read_case_patch_field",
+                        lambda case_dir, field, name, time=None: fields.get(field))
+    return tmp_path
+
+
+def read_ply(path: Path):
+    data = path.read_bytes()
+    header, body = data.split(b"end_header\n", 1)
+    n_vertices = int(header.split(b"element vertex ")[1].split()[0])
+    vertices = np.frombuffer(body, dtype=[("xyz", "<f4", 3), ("cp", "<f4"), ("rgb", "u1", 3)],
+                             count=n_vertices)
+    faces = np.frombuffer(body, dtype=[("n", "u1"), ("vertex_indices", "<i4", 3)],
+                          offset=vertices.nbytes)
+    return header.decode(), vertices, faces
+
+
+class TestArrays:
+    """Tests for the array helpers."""
+
+    def test_fan_triangulation(self):
+        offsets = np.cumsum([0] + [len(face) for face in FACES])
+        triangles, tri_face = pressure_surface.triangulate(offsets, np.concatenate(FACES))
+        assert triangles.tolist() == [[0, 1, 4], [0, 4, 3], [1, 2, 5], [1, 5, 4],
+                                      [3, 4, 6], [3, 6, 7], [3, 7, 8]]
+        assert tri_face.tolist() == [0, 0, 1, 1, 2, 2, 2]
+
+    def test_area_weighted_vertex_values(self):
+        offsets = np.array([0, 4, 8])
+        labels = np.array([0, 1, 4, 3, 1, 2, 5, 4])
+        values = pressure_surface.vertex_values(offsets, labels, np.array([10.0, 40.0]),
+                                                np.array([1.0, 2.0]), 7)
+        # Points 1 and 4 are shared: (1 * 10 + 2 * 40) / 3; point 6 has no face
+        assert values.tolist() == [10, 30, 40, 10, 30, 40, 0]
+
+    def test_triangle_areas(self):
+        triangles = np.array([[0, 1, 4], [1, 2, 5], [3, 4, 6]])
+        assert pressure_surface.triangle_areas(POINTS, triangles).tolist() == [0.5, 1.0, 0.5]
+
+    @pytest.mark.parametrize("decimals", [0, 2, 6])
+    def test_json_array(self, decimals):
+        values = np.random.default_rng(1).normal(0, 50, 5000)
+        text = pressure_surface.json_array(values, decimals)
+        assert np.allclose(json.loads(text), np.round(values, decimals), atol=1e-9)
+
+    def test_json_array_format(self):
+        assert pressure_surface.json_array(np.array([0.5, -0.0, -2.25, 100.0, 1e-9]), 4) == \
+            b"[0.5,0,-2.25,100,0]"
+        assert pressure_surface.json_array(np.array([7, -10, 0])) == b"[7,-10,0]"
+        assert pressure_surface.json_array(np.array([])) == b"[]"
+
+
+class TestSurface:
+    """Tests for the surface with vertex Cp."""
+
+    def test_vertex_cp(self, case):
+        surface = pressure_surface.read_surface(case, speed=SPEED)
+        cp = surface["vertex_cp"]
+        q = 0.5 * SPEED ** 2
+        # Face areas: 1, 2 and 1.25
+        assert cp[2] == pytest.approx(40 / q)
+        assert cp[1] == pytest.approx((1 * 10 + 2 * 40) / 3 / q)
+        assert cp[3] == pytest.approx((1 * 10 + 1.25 * -20) / 2.25 / q)
+        assert cp[4] == pytest.approx((1 * 10 + 2 * 40 + 1.25 * -20) / 4.25 / q)
+        assert cp[8] == pytest.approx(-20 / q)
+
+    def test_uniform_pressure(self, case, fields):
+        fields["p"] = 25.0
+        surface = pressure_surface.read_surface(case, speed=SPEED)
+        assert surface["vertex_cp"].tolist() == pytest.approx([0.5] * len(POINTS))
+
+    def test_no_pressure(self, case, fields):
+        del fields["p"]
+        surface = pressure_surface.read_surface(case)
+        assert surface["face_p"] is None and surface["vertex_cp"] is None
+        assert len(surface["triangles"]) == 7
+
+
+class TestExport:
+    """Tests for the PLY and JSON files."""
+
+    def test_ply(self, case):
+        result = pressure_surface.export_pressure_surface_ply(case, case / "s.ply", speed=SPEED)
+        assert result["success"]
+        assert (result["n_vertices"], result["n_faces"], result["n_triangles"]) == (9, 3, 7)
+        assert result["pressure_range"] == [-20.0, 40.0]
+
+        header, vertices, faces = read_ply(case / "s.ply")
+        assert "property float cp" in header
+        assert np.array_equal(vertices["xyz"], POINTS.astype(np.float32))
+        assert (faces["n"] == 3).all() and faces["vertex_indices"][1].tolist() == [0, 4, 3]
+        # Highest Cp red, lowest blue
+        assert vertices["rgb"][np.argmax(vertices["cp"])].tolist() == [255, 0, 0]
+        assert vertices["rgb"][np.argmin(vertices["cp"])].tolist() == [0, 0, 255]
+
+    def test_ply_without_pressure_grey(self, case, fields):
+        del fields["p"]
+        result = pressure_surface.export_pressure_surface_ply(case, case / "s.ply")
+        assert result["success"] and result["cp_range"] is None
+        _, vertices, _ = read_ply(case / "s.ply")
+        assert (vertices["rgb"] == 180).all()
+
+    def test_json(self, case):
+        result = pressure_surface.export_pressure_surface_json(case, case / "s.json", speed=SPEED)
+        assert result["success"] and result["n_triangles"] == 7
+
+        data = json.loads((case / "s.json").read_text())
+        assert data["vertices"] == POINTS.ravel().tolist()
+        assert data["indices"][:6] == [0, 1, 4, 0, 4, 3]
+        assert data["pressures"] == P.tolist()
+        assert len(data["vertex_cp"]) == data["n_vertices"] == 9
+        assert data["vertex_cp"][2] == 0.8
+        assert data["cp_range"] == result["cp_range"]
+
+    def test_missing_patch(self, case):
+        result = pressure_surface.export_pressure_surface_json(case, case / "s.json", patch_name="rim")
+        assert not result["success"]
+
+
+class TestBinary:
+    """Tests for the binary surface format."""
+
+    @pytest.mark.parametrize("quantized", [False, True])
+    def test_round_trip(self, case, quantized):
+        surface = pressure_surface.read_surface(case, speed=SPEED)
+        data = pressure_surface.encode_surface(surface, quantized)
+        decoded = pressure_surface.decode_surface(data)
+
+        assert decoded["triangles"].tolist() == surface["triangles"].tolist()
+        tolerance = 3 / 65535 if quantized else 1e-6
+        assert np.abs(decoded["points"] - POINTS).max() < tolerance
+        assert np.abs(decoded["vertex_cp"] - surface["vertex_cp"]).max() < tolerance
+        assert decoded["pressure_range"] == [-20.0, 40.0] and decoded["n_faces"] == 3
+
+    def test_layout(self, case):
+        surface = pressure_surface.read_surface(case, speed=SPEED)
+        data = pressure_surface.encode_surface(surface, quantized=True)
+        assert data[:4] == b"WFSF"
+        flags = int.from_bytes(data[6:8], "little")
+        assert flags == (pressure_surface.QUANTIZED_POSITIONS | pressure_surface.QUANTIZED_CP |
+                         pressure_surface.SHORT_INDICES | pressure_surface.HAS_CP)
+        # 27 uint16 positions padded to 56 bytes, 9 uint16 Cp to 20, 21 uint16 indices to 44
+        assert len(data) == 64 + 56 + 20 + 44
+
+    def test_long_indices_and_no_cp(self, case, fields):
+        del fields["p"]
+        surface = pressure_surface.read_surface(case)
+        surface["points"] = np.vstack([surface["points"], np.zeros((1 << 16, 3))])
+        data = pressure_surface.encode_surface(surface)
+        assert int.from_bytes(data[6:8], "little") == 0
+        decoded = pressure_surface.decode_surface(data)
+        assert decoded["vertex_cp"] is None and decoded["triangles"][-1].tolist() == [3, 7, 8]
+
+    def test_export_writes_compressed_copies(self, case):
+        import gzip
+
+        result = pressure_surface.export_pressure_surface_bin(case, case / "s.bin", speed=SPEED)
+        assert result["success"] and result["sizes"]["gzip"] < result["sizes"]["identity"]
+        data = (case / "s.bin").read_bytes()
+        assert gzip.decompress((case / "s.bin.gz").read_bytes()) == data
+        assert (case / "s.bin.etag").read_text() == result["etag"]
+
+    def test_rewrite_keeps_open_readers_whole(self, tmp_path):
+        # A response still streaming the previous export reads it to the end
+        path = tmp_path / "s.bin"
+        pressure_surface.write_encoded(b"old" * 1000, path)
+        with open(path, "rb") as reader, open(f"{path}.gz", "rb") as gz_reader:
+            etag, _ = pressure_surface.write_encoded(b"new", path)
+            assert reader.read() == b"old" * 1000
+            assert len(gz_reader.read()) > 0
+        assert path.read_bytes() == b"new"
+        assert (tmp_path / "s.bin.etag").read_text() == etag
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+class TestBinaryEndpoint:
+    """Tests for serving the binary surface."""
+
+    @pytest.fixture
+    def client(self, case, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import app as app_module
+
+        monkeypatch.setattr(app_module, "CASES_DIR", case.parent)
+        monkeypatch.setitem(app_module.jobs, case.name, {"status": "complete", "config": {"speed": SPEED}})
+        return TestClient(app_module.app), f"/api/jobs/{case.name}/viz/pressure_surface.bin"
+
+    def test_compressed_with_strong_etag(self, client):
+        client, url = client
+        response = client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        etag = response.headers["etag"]
+        assert etag.startswith('"') and etag.endswith('-gzip"')
+        assert pressure_surface.decode_surface(response.content)["n_faces"] == 3
+
+        cached = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert cached.status_code == 304
+
+    def test_newer_solution_exported_again(self, client, case, fields):
+        client, url = client
+        first = client.get(url, headers={"Accept-Encoding": "identity"})
+
+        # A resumed solve writes a later time with different pressures
+        index = case / "visualizations" / "pressure_surface.bin.lods.json"
+        (case / "600").mkdir()
+        (case / "600" / "p").write_text("")
+        later = index.stat().st_mtime + 10
+        os.utime(case / "600" / "p", (later, later))
+        fields["p"] = P * 2
+
+        second = client.get(url, headers={"Accept-Encoding": "identity",
+                                          "If-None-Match": first.headers["etag"]})
+        assert second.status_code == 200
+        assert second.headers["etag"] != first.headers["etag"]
+        # Unchanged since: served from the new export
+        third = client.get(url, headers={"Accept-Encoding": "identity",
+                                         "If-None-Match": second.headers["etag"]})
+        assert third.status_code == 304
+
+    def test_range_of_uncompressed_bytes(self, client):
+        client, url = client
+        full = client.get(url, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in full.headers
+
+        partial = client.get(url, headers={"Accept-Encoding": "gzip", "Range": "bytes=0-63"})
+        assert partial.status_code == 206
+        assert partial.content == full.content[:64]
+        assert partial.headers["etag"] == full.headers["etag"]
+
+    def test_quantized_variant(self, client):
+        client, url = client
+        full = client.get(url, headers={"Accept-Encoding": "identity"})
+        quantized = client.get(url + "?quantized=true", headers={"Accept-Encoding": "identity"})
+        assert len(quantized.content) < len(full.content)
+        assert quantized.headers["etag"] != full.headers["etag"]
@@ -0,0 +1,163 @@
+"""
+Tests for the stack sampler, allocation snapshots and admin endpoints.
+"""
+
+import sys
+import threading
+import time
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import profiler
+
+
+def busy_loop_for_profiler(stop: threading.Event):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_loop_for_profiler, args=(stop,), name="busy-worker")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+@pytest.fixture
+def idle_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait, name="idle-worker")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+class TestStackSampler:
+    """Tests for collect_stacks and its output formats."""
+
+    def test_busy_thread_sampled(self, busy_thread):
+        stacks = profiler.collect_stacks(0.3, interval=0.005)
+        busy = {stack: n for stack, n in stacks.items() if "busy_loop_for_profiler" in stack}
+        assert busy
+        assert all(stack.startswith("busy-worker;") for stack in busy)
+        assert sum(busy.values()) >= 10
+
+    def test_idle_threads_skipped(self, idle_thread):
+        stacks = profiler.collect_stacks(0.1, interval=0.005)
+        assert not any(stack.startswith("idle-worker;") for stack in stacks)
+        stacks = profiler.collect_stacks(0.1, interval=0.005, include_idle=True)
+        assert any(stack.startswith("idle-worker;") for stack in stacks)
+
+    def test_one_profile_at_a_time(self):
+        results = {}
+
+        def long_profile():
+            results["stacks"] = profiler.collect_stacks(0.5)
+
+        thread = threading.Thread(target=long_profile)
+        thread.start()
+        time.sleep(0.1)
+        with pytest.raises(profiler.ProfilerBusy):
+            profiler.collect_stacks(0.1)
+        thread.join()
+        assert "stacks" in results
+
+    def test_collapsed_text(self):
+        stacks = profiler.Counter({"main;a;b": 3, "main;a": 5})
+        assert profiler.collapsed_text(stacks) == "main;a 5\nmain;a;b 3\n"
+
+    def test_flame_graph(self):
+        stacks = profiler.Counter({"main;a;b": 3, "main;a": 5, "main;c": 2})
+        tree = profiler.flame_graph(stacks)
+        assert tree["value"] == 10
+        [main] = tree["children"]
+        assert [(child["name"], child["value"]) for child in main["children"]] == [("a", 8), ("c", 2)]
+        assert main["children"][0]["children"][0] == {"name": "b", "value": 3, "children": []}
+
+
+class TestAllocations:
+    """Tests for tracemalloc snapshots."""
+
+    @pytest.fixture(autouse=True)
+    def tracing(self):
+        profiler.start_tracemalloc(frames=5)
+        yield
+        profiler.stop_tracemalloc()
+
+    def test_snapshot_finds_allocation_site(self):
+        retained = [bytearray(1024) for _ in range(2000)]  # ~2 MB on this line
+        snapshot = profiler.allocation_snapshot(limit=5)
+        assert snapshot["tracing"]
+        assert any("test_profiler.py" in entry["traceback"][0] for entry in snapshot["top"])
+        assert len(retained) == 2000
+
+    def test_compare_reports_growth(self):
+        profiler.allocation_snapshot(limit=5)
+        retained = [bytearray(1024) for _ in range(2000)]
+        snapshot = profiler.allocation_snapshot(limit=5, compare=True)
+        assert snapshot["compared"]
+        assert snapshot["top"][0]["size_diff"] >= 2_000_000
+        assert len(retained) == 2000
+
+    def test_not_tracing(self):
+        profiler.stop_tracemalloc()
+        with pytest.raises(RuntimeError):
+            profiler.allocation_snapshot()
+
+
+class TestAdminEndpoints:
+    """Tests for /api/admin/* access control and responses."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import app as app_module
+
+        monkeypatch.setattr(app_module, "ADMIN_TOKEN", "s3cret")
+        return TestClient(app_module.app), app_module
+
+    def test_disabled_without_token(self, client, monkeypatch):
+        client, app_module = client
+        monkeypatch.setattr(app_module, "ADMIN_TOKEN", None)
+        response = client.get("/api/admin/profile?seconds=0", headers={"X-Admin-Token": ""})
+        assert response.status_code == 403
+
+    def test_wrong_token_rejected(self, client):
+        client, _ = client
+        assert client.get("/api/admin/profile?seconds=0").status_code == 401
+        assert client.get("/api/admin/profile?seconds=0",
+                          headers={"X-Admin-Token": "guess"}).status_code == 401
+
+    def test_profile_collapsed(self, client, busy_thread):
+        client, _ = client
+        response = client.get("/api/admin/profile?seconds=0.3&interval=0.005",
+                              headers={"X-Admin-Token": "s3cret"})
+        assert response.status_code == 200
+        assert "busy_loop_for_profiler" in response.text
+
+    def test_profile_json(self, client, busy_thread):
+        client, _ = client
+        response = client.get("/api/admin/profile?seconds=0.2&format=json",
+                              headers={"X-Admin-Token": "s3cret"})
+        body = response.json()
+        assert body["samples"] == body["flame_graph"]["value"] > 0
+
+    def test_tracemalloc_cycle(self, client):
+        client, _ = client
+        headers = {"X-Admin-Token": "s3cret"}
+        assert client.get("/api/admin/tracemalloc/snapshot", headers=headers).status_code == 400
+        try:
+            assert client.post("/api/admin/tracemalloc/start?frames=3", headers=headers).json()["tracing"]
+            response = client.get("/api/admin/tracemalloc/snapshot?limit=3&group_by=filename",
+                                  headers=headers)
+            assert response.status_code == 200
+            assert len(response.json()["top"]) <= 3
+        finally:
+            assert not client.post("/api/admin/tracemalloc/stop", headers=headers).json()["tracing"]
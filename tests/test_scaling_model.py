@@ -0,0 +1,177 @@
+"""
+Tests for the measured scaling model that picks process counts per stage.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import scaling_model
+
+
+@pytest.fixture
+def scaling_db(tmp_path):
+    """Use a temporary database for each test."""
+    from backend import database as db
+
+    original_path = db.DB_PATH
+    db.DB_PATH = tmp_path / "test_wheelflow.db"
+    db.init_db()
+
+    yield db
+
+    db.DB_PATH = original_path
+
+
+def amdahl_samples(stage, cells, serial, parallel, per_rank, procs, units=1):
+    """Synthetic measurements following the model exactly."""
+    return [
+        {
+            "stage": stage,
+            "num_procs": n,
+            "cells": cells,
+            "wall_time": (cells * (serial + parallel / n) + per_rank * n) * units,
+            "work_units": units,
+        }
+        for n in procs
+    ]
+
+
+class TestFit:
+    """Tests for fitting the strong-scaling model."""
+
+    def test_recovers_coefficients(self):
+        samples = amdahl_samples("solver", 2_000_000, 1e-7, 2e-6, 0.01, [1, 2, 4, 8, 16])
+        samples += amdahl_samples("solver", 500_000, 1e-7, 2e-6, 0.01, [1, 4])
+
+        fit = scaling_model.fit_stage(samples, "solver")
+
+        assert fit.serial_per_cell == pytest.approx(1e-7, rel=1e-3)
+        assert fit.parallel_per_cell == pytest.approx(2e-6, rel=1e-3)
+        assert fit.per_rank == pytest.approx(0.01, rel=1e-3)
+
+    def test_normalizes_by_work_units(self):
+        samples = amdahl_samples("solver", 1_000_000, 0, 1e-6, 0, [1, 2, 4], units=100)
+        fit = scaling_model.fit_stage(samples, "solver")
+        assert fit.predict(1, 1_000_000) == pytest.approx(1.0, rel=1e-3)
+
+    def test_needs_several_proc_counts(self):
+        samples = amdahl_samples("mesh", 1_000_000, 1e-7, 2e-6, 0.01, [8, 8, 8])
+        assert scaling_model.fit_stage(samples, "mesh") is None
+        assert scaling_model.fit_stage(samples[:2], "mesh") is None
+
+
+class TestChooseProcs:
+    """Tests for picking process counts from a fit."""
+
+    def test_defaults_without_measurements(self, scaling_db):
+        assert scaling_model.choose_procs("mesh", 15_000_000, max_procs=32) == 8
+
+    def test_default_procs_match_previous_limits(self):
+        assert scaling_model.default_procs("mesh", 32) == 8
+        assert scaling_model.default_procs("solver", 32) == 16
+        assert scaling_model.default_procs("solver", 6) == 6
+
+    def test_default_procs_never_exceed_available(self):
+        assert scaling_model.default_procs("solver", 2) == 2
+        assert scaling_model.default_procs("mesh", 1) == 1
+
+    def test_efficiency_knee(self):
+        # Per-rank overhead grows with n, so efficiency falls off eventually
+        fit = scaling_model.ScalingFit("solver", 0.0, 1e-6, 0.05, 5)
+        cells = 2_000_000
+        chosen = scaling_model.choose_procs("solver", cells, max_procs=64, fit=fit)
+
+        assert fit.efficiency(chosen, cells) >= scaling_model.MIN_EFFICIENCY
+        assert fit.efficiency(chosen + 1, cells) < scaling_model.MIN_EFFICIENCY
+        assert 1 < chosen < 64
+
+    def test_cells_per_core_limit(self):
+        # Perfect scaling, so only the cells-per-core rule limits the count
+        fit = scaling_model.ScalingFit("solver", 0.0, 1e-6, 0.0, 5)
+        cells = 200_000
+        chosen = scaling_model.choose_procs("solver", cells, max_procs=64, fit=fit)
+        assert chosen == cells // scaling_model.MIN_CELLS_PER_CORE["solver"]
+
+    def test_capped_by_available_cores(self):
+        fit = scaling_model.ScalingFit("solver", 0.0, 1e-6, 0.0, 5)
+        assert scaling_model.choose_procs("solver", 50_000_000, max_procs=12, fit=fit) == 12
+
+
+class TestPersistence:
+    """Samples are persisted and refit as jobs complete."""
+
+    def test_plan_uses_recorded_samples(self, scaling_db):
+        plan = scaling_model.plan_procs("pro", max_procs=32)
+        assert not plan["solver_fitted"]
+        assert plan["solver_procs"] == 16
+        assert plan["cells"] == scaling_model.DEFAULT_CELL_ESTIMATES["pro"]
+
+        # Scaling stops paying off quickly on this (synthetic) host
+        for sample in amdahl_samples("solver", 3_000_000, 1e-7, 1e-6, 0.5, [1, 2, 4, 8]):
+            scaling_model.record_sample("solver", sample["num_procs"], sample["cells"],
+                                        sample["wall_time"], quality="pro")
+        scaling_model.record_sample("mesh", 8, 3_000_000, 600.0, quality="pro")
+
+        plan = scaling_model.plan_procs("pro", max_procs=32)
+        assert plan["solver_fitted"]
+        assert plan["cells"] == 3_000_000
+        assert plan["solver_procs"] < 16
+
+    def test_solver_fits_per_rotation_method(self, scaling_db):
+        # Transient steps stop scaling early; steady iterations were never measured
+        for sample in amdahl_samples("solver_transient", 3_000_000, 1e-7, 1e-6, 0.5, [1, 2, 4, 8]):
+            scaling_model.record_sample(scaling_model.solver_stage("transient"), sample["num_procs"],
+                                        sample["cells"], sample["wall_time"])
+
+        transient = scaling_model.plan_procs("pro", max_procs=32, rotation_method="transient")
+        steady = scaling_model.plan_procs("pro", max_procs=32, rotation_method="none")
+        assert transient["solver_fitted"] and transient["solver_procs"] < 16
+        assert not steady["solver_fitted"] and steady["solver_procs"] == 16
+        assert scaling_model.solver_stage(None) == scaling_model.SOLVER
+
+    def test_invalid_samples_ignored(self, scaling_db):
+        scaling_model.record_sample("solver", 4, 0, 10.0)
+        scaling_model.record_sample("solver", 4, 1000, 0.0)
+        assert scaling_db.get_scaling_samples(scaling_model.get_host(), "solver") == []
+
+    def test_samples_are_per_host(self, scaling_db):
+        scaling_db.add_scaling_sample("other-host", "solver", 4, 1000, 1.0)
+        assert scaling_db.get_scaling_samples(scaling_model.get_host(), "solver") == []
+        assert len(scaling_db.get_scaling_samples("other-host", "solver")) == 1
+
+
+class TestMeasurements:
+    """Tests for reading iteration counts from a case."""
+
+    def test_count_time_steps(self, tmp_path):
+        log = tmp_path / "log.foamRun"
+        log.write_text("Time = 1s\n\nsmoothSolver: ...\nTime = 2s\n\nTime = 3s\nEnd\n")
+        assert scaling_model.count_time_steps(log) == 3
+
+
+class TestBenchmarkScript:
+    """scripts/benchmark_scaling.py benchmarks the case's real mesh."""
+
+    def test_parallel_meshed_case_copies_processor_meshes(self, tmp_path):
+        import os
+        from scripts.benchmark_scaling import copy_case
+
+        case = tmp_path / "case"
+        for mesh in [case / "constant" / "polyMesh", case / "processor0" / "constant" / "polyMesh"]:
+            mesh.mkdir(parents=True)
+            (mesh / "boundary").write_text("0()\n")
+        (case / "system").mkdir()
+        # snappyHexMesh ran in parallel after blockMesh
+        background = case / "constant" / "polyMesh" / "boundary"
+        os.utime(background, (background.stat().st_mtime - 10,) * 2)
+
+        assert copy_case(case, tmp_path / "solver", with_mesh=True)
+        assert not (tmp_path / "solver" / "constant" / "polyMesh").exists()
+        assert (tmp_path / "solver" / "processor0" / "constant" / "polyMesh" / "boundary").exists()
+
+        assert not copy_case(case, tmp_path / "mesh", with_mesh=False)
+        assert not (tmp_path / "mesh" / "processor0").exists()
@@ -0,0 +1,161 @@
+"""
+Tests for the solver profile: iterations per equation and the cost of write steps.
+"""
+
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import solver_profile
+
+
+SOLVER_LOG = """\
+Time = 1s
+
+smoothSolver:  Solving for Ux, Initial residual = 1, Final residual = 0.05, No Iterations 2
+smoothSolver:  Solving for Uy, Initial residual = 0.9, Final residual = 0.04, No Iterations 3
+smoothSolver:  Solving for Uz, Initial residual = 0.8, Final residual = 0.03, No Iterations 2
+GAMG:  Solving for p, Initial residual = 1, Final residual = 0.009, No Iterations 12
+time step continuity errors : sum local = 1e-05, global = 1e-07, cumulative = 1e-07
+smoothSolver:  Solving for omega, Initial residual = 0.2, Final residual = 0.01, No Iterations 1
+smoothSolver:  Solving for k, Initial residual = 1, Final residual = 0.04, No Iterations 2
+ExecutionTime = 2.5 s  ClockTime = 3 s
+
+Time = 2s
+
+smoothSolver:  Solving for Ux, Initial residual = 0.5, Final residual = 0.02, No Iterations 2
+smoothSolver:  Solving for Uy, Initial residual = 0.4, Final residual = 0.02, No Iterations 2
+smoothSolver:  Solving for Uz, Initial residual = 0.3, Final residual = 0.01, No Iterations 2
+GAMG:  Solving for p, Initial residual = 0.5, Final residual = 0.004, No Iterations 8
+smoothSolver:  Solving for omega, Initial residual = 0.1, Final residual = 0.005, No Iterations 1
+smoothSolver:  Solving for k, Initial residual = 0.6, Final residual = 0.03, No Iterations 2
+ExecutionTime = 4 s  ClockTime = 5 s
+
+End
+"""
+
+
+CONTROL_DICT = """\
+FoamFile
+{{
+    version     2.0;
+    format      ascii;
+    class       dictionary;
+    object      controlDict;
+}}
+
+startFrom       startTime;
+deltaT          {delta_t};
+writeControl    {control};
+writeInterval   {interval};
+"""
+
+
+def timed_log(times: list, step_seconds: list) -> str:
+    """A log whose steps end at the given times, each taking step_seconds."""
+    execution_time = 0.0
+    steps = []
+    for time, seconds in zip(times, step_seconds):
+        execution_time += seconds
+        steps.append(f"Time = {time}s\n\n"
+                     f"GAMG:  Solving for p, Initial residual = 0.1, Final residual = 0.001, No Iterations 5\n"
+                     f"ExecutionTime = {execution_time:g} s  ClockTime = {execution_time:g} s\n\n")
+    return "".join(steps) + "End\n"
+
+
+@pytest.fixture
+def case_dir(tmp_path):
+    (tmp_path / "log.foamRun").write_text(SOLVER_LOG)
+    (tmp_path / "0").mkdir()
+    return tmp_path
+
+
+def write_control_dict(case_dir: Path, control: str = "timeStep", interval: float = 5, delta_t: float = 1):
+    (case_dir / "system").mkdir(exist_ok=True)
+    (case_dir / "system" / "controlDict").write_text(
+        CONTROL_DICT.format(control=control, interval=interval, delta_t=delta_t))
+
+
+class TestParsers:
+    """Tests for the solver log parser."""
+
+    def test_log_iterations_per_equation(self, case_dir):
+        log = solver_profile.parse_solver_log(case_dir / "log.foamRun")
+        assert log["time_steps"] == 2
+        assert log["seconds_per_step"] == 2.0
+        assert set(log["equations"]) == {"U", "p", "k", "omega"}
+        p = log["equations"]["p"]
+        assert (p["solver"], p["solves"], p["iterations"], p["max_iterations"]) == ("GAMG", 2, 20, 12)
+        assert p["mean_iterations"] == 10
+        # Components fold into U; the residual is the worst component's
+        assert log["equations"]["U"]["solves"] == 6
+        assert log["equations"]["U"]["final_initial_residual"] == 0.5
+
+    def test_missing_log(self, tmp_path):
+        assert solver_profile.parse_solver_log(tmp_path / "log.foamRun")["equations"] == {}
+
+    def test_equation_name(self):
+        assert solver_profile.equation_name("Uz") == "U"
+        assert solver_profile.equation_name("k") == "k"
+        assert solver_profile.equation_name("nuTildax") == "nuTildax"
+
+
+class TestWriteCost:
+    """Tests for the time write steps take."""
+
+    def test_steady_write_steps(self, tmp_path):
+        # Start-up step, then 1 s per step; steps 5 and 10 write and take 4 s
+        seconds = [10] + [4 if step % 5 == 0 else 1 for step in range(2, 13)]
+        (tmp_path / "log.foamRun").write_text(timed_log(list(range(1, 13)), seconds))
+        write_control_dict(tmp_path)
+        writes = solver_profile.solver_profile(tmp_path)["write_steps"]
+        # Steps 5, 10 and the last one (12, an ordinary 1 s step)
+        assert writes["steps"] == 3
+        assert writes["seconds_per_step"] == 1.0
+        assert writes["time"] == 6.0 and writes["seconds_per_write"] == 2.0
+        assert writes["time_fraction"] == round(6 / sum(seconds), 4)
+
+    def test_run_time_write_steps(self):
+        times = np.round(np.arange(1, 21) * 0.003, 6)
+        schedule = {"write_control": "adjustableRunTime", "write_interval": 0.01, "delta_t": 0.003}
+        writes = solver_profile.write_steps(times, schedule)
+        # Passes 0.01 at 0.012, 0.02 at 0.021, ... plus the last step
+        assert times[writes].tolist() == [0.012, 0.021, 0.03, 0.042, 0.051, 0.06]
+
+    def test_unknown_schedule(self, case_dir):
+        assert solver_profile.solver_profile(case_dir)["write_steps"] is None
+        write_control_dict(case_dir, control="clockTime")
+        assert solver_profile.write_schedule(case_dir) is None
+
+
+class TestSolverProfile:
+    """Tests for the combined profile."""
+
+    def test_log_only(self, case_dir):
+        profile = solver_profile.solver_profile(case_dir)
+        assert profile["total_time"] == 4.0
+        assert profile["seconds_per_step"] == 2.0
+        assert profile["equations"]["p"]["iterations"] == 20
+        assert "time" not in profile["equations"]["p"]
+
+
+class TestSolverProfileEndpoint:
+    """Tests for /api/jobs/{job_id}/solver_profile."""
+
+    def test_endpoint(self, case_dir, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import app as app_module
+
+        monkeypatch.setattr(app_module, "CASES_DIR", case_dir.parent)
+        monkeypatch.setitem(app_module.jobs, case_dir.name, {"status": "complete", "config": {}})
+        write_control_dict(case_dir, interval=2)
+
+        client = TestClient(app_module.app)
+        body = client.get(f"/api/jobs/{case_dir.name}/solver_profile").json()
+        assert body["equations"]["U"]["solves"] == 6
+        assert body["time_steps"] == 2
+        assert client.get("/api/jobs/nope/solver_profile").status_code == 404
@@ -0,0 +1,191 @@
+"""
+Tests for per-stage timing and resource instrumentation.
+"""
+
+import asyncio
+import sys
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import database as db
+from backend import executors
+from backend import job_control
+from backend import stage_metrics
+
+
+# Burns ~1s of CPU while holding ~100 MB
+BUSY_COMMAND = [sys.executable, "-c",
+                "import time\n"
+                "block = bytearray(100 * 1024 * 1024)\n"
+                "end = time.process_time() + 1.0\n"
+                "while time.process_time() < end: pass\n"]
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "test_wheelflow.db")
+    monkeypatch.setattr(stage_metrics, "SAMPLE_INTERVAL", 0.05)
+    db.init_db()
+
+
+@pytest.fixture
+def case_dir(tmp_path):
+    case = tmp_path / "case"
+    (case / "constant" / "polyMesh").mkdir(parents=True)
+    return case
+
+
+def run_stage(job_id, stage, coro_factory, **kwargs):
+    async def scenario():
+        async with stage_metrics.track_stage(job_id, stage, **kwargs) as tracker:
+            return await coro_factory(tracker)
+    return asyncio.run(scenario())
+
+
+def local_command(case_dir, cmd, job_id):
+    return lambda tracker: executors.LocalExecutor().run(case_dir, cmd, {}, "foamRun", job_id=job_id)
+
+
+class TestTrackStage:
+    """Tests for stage measurement."""
+
+    def test_command_process_tree_measured(self, case_dir):
+        run_stage("job-a", "foamRun", local_command(case_dir, BUSY_COMMAND, "job-a"),
+                  num_procs=4, case_dir=case_dir, external=True)
+        [row] = db.get_job_stages("job-a")
+        assert row["stage"] == "foamRun"
+        assert row["status"] == "complete"
+        assert row["num_procs"] == 4
+        assert row["wall_time"] >= 1.0
+        assert row["cpu_time"] >= 0.5
+        assert row["peak_rss"] >= 100 * 1024 * 1024
+        assert row["cpu_scope"] == "tree"
+
+    def test_short_command_reports_reaped_cpu(self, case_dir):
+        run_stage("job-b", "blockMesh", local_command(case_dir, ["true"], "job-b"), external=True)
+        [row] = db.get_job_stages("job-b")
+        assert row["cpu_time"] is not None
+        assert row["cpu_time"] < 1.0
+
+    def test_failed_stage_recorded(self, case_dir):
+        with pytest.raises(Exception, match="foamRun failed"):
+            run_stage("job-c", "foamRun", local_command(case_dir, ["false"], "job-c"), external=True)
+        assert db.get_job_stages("job-c")[0]["status"] == "failed"
+
+    def test_cancelled_stage_recorded(self):
+        async def cancelled(tracker):
+            raise job_control.JobCancelled("job-d")
+
+        with pytest.raises(job_control.JobCancelled):
+            run_stage("job-d", "snappyHexMesh", cancelled, external=True)
+        assert db.get_job_stages("job-d")[0]["status"] == "cancelled"
+
+    def test_in_process_stage(self):
+        async def work(tracker):
+            sum(i * i for i in range(200_000))
+
+        run_stage("job-e", "extract_results", work)
+        [row] = db.get_job_stages("job-e")
+        assert row["cpu_time"] > 0
+        assert row["peak_rss"] > 0
+        assert row["cells"] is None
+        assert row["cpu_scope"] == "process"
+
+    def test_batch_scheduler_stage_wall_time_only(self):
+        class FakeBatchJob:
+            returncode = None
+
+        async def queued(tracker):
+            job_control.register_process("job-f", FakeBatchJob(), "foamRun")
+            await asyncio.sleep(0.2)
+            job_control.unregister_process("job-f", job_control.get_process("job-f"))
+
+        run_stage("job-f", "foamRun", queued, external=True)
+        [row] = db.get_job_stages("job-f")
+        assert row["wall_time"] >= 0.2
+        assert row["cpu_time"] is None
+        assert row["peak_rss"] is None
+        assert row["cpu_scope"] is None
+
+    def test_cells_from_mesh(self, case_dir):
+        (case_dir / "constant" / "polyMesh" / "owner").write_text(
+            'FoamFile\n{\n    note "nPoints:10 nCells:1234 nFaces:20 nInternalFaces:5";\n}\n')
+        (case_dir / "constant" / "polyMesh" / "boundary").write_text("FoamFile\n{\n}\n0\n(\n)\n")
+
+        async def mesh(tracker):
+            pass
+
+        run_stage("job-g", "snappyHexMesh", mesh, case_dir=case_dir, external=True)
+        assert db.get_job_stages("job-g")[0]["cells"] == 1234
+
+    def test_no_job_records_nothing(self):
+        async def work(tracker):
+            assert tracker is None
+
+        run_stage(None, "foamRun", work)
+
+
+class TestTimings:
+    """Tests for the per-job summary and the API."""
+
+    def test_summary_totals(self):
+        for stage, wall, cpu in [("blockMesh", 2.0, 1.5), ("foamRun", 100.0, 380.0), ("foamRun", 50.0, None)]:
+            stage_metrics.record_stage("job-h", stage, "complete", "2026-01-01T00:00:00", wall,
+                                       cpu_time=cpu, peak_rss=1000)
+        timings = stage_metrics.job_timings("job-h")
+        assert [row["stage"] for row in timings["stages"]] == ["blockMesh", "foamRun", "foamRun"]
+        assert timings["by_stage"]["foamRun"] == {"runs": 2, "wall_time": 150.0, "cpu_time": 380.0}
+        assert timings["total"]["wall_time"] == 152.0
+
+    def test_process_wide_cpu_left_out_of_total(self):
+        stage_metrics.record_stage("job-l", "foamRun", "complete", "2026-01-01T00:00:00", 10.0,
+                                   cpu_time=40.0, cpu_scope="tree")
+        stage_metrics.record_stage("job-l", "extract_results", "complete", "2026-01-01T00:00:10",
+                                   2.0, cpu_time=5.0, cpu_scope="process")
+        timings = stage_metrics.job_timings("job-l")
+        assert timings["total"]["cpu_time"] == 40.0
+        assert timings["by_stage"]["extract_results"]["cpu_time"] == 5.0
+
+    def test_scope_column_added_to_existing_database(self, tmp_path, monkeypatch):
+        import sqlite3
+
+        path = tmp_path / "old.db"
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE job_stages (id INTEGER PRIMARY KEY, job_id TEXT)")
+        monkeypatch.setattr(db, "DB_PATH", path)
+        db.init_db()
+        with sqlite3.connect(path) as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(job_stages)")}
+        assert "cpu_scope" in columns
+
+    def test_deleting_job_removes_stages(self):
+        stage_metrics.record_stage("job-i", "foamRun", "complete", "2026-01-01T00:00:00", 1.0)
+        db.delete_job("job-i")
+        assert db.get_job_stages("job-i") == []
+
+    def test_pipeline_commands_recorded(self, case_dir, monkeypatch):
+        """run_openfoam_command records each command as a stage."""
+        from backend import app as app_module
+
+        monkeypatch.setitem(app_module.jobs, "job-j", {"config": {}})
+        monkeypatch.setattr(app_module, "get_openfoam_env_cached", lambda gpu_enabled=False: {})
+        asyncio.run(app_module.run_openfoam_command(case_dir, "true", job_id="job-j"))
+        assert [row["stage"] for row in db.get_job_stages("job-j")] == ["true"]
+
+    def test_timings_endpoint(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import app as app_module
+
+        monkeypatch.setitem(app_module.jobs, "job-k", {"config": {}})
+        stage_metrics.record_stage("job-k", "foamRun", "complete", "2026-01-01T00:00:00", 3.0,
+                                   cpu_time=11.5, cells=500_000, num_procs=4)
+        client = TestClient(app_module.app)
+
+        response = client.get("/api/jobs/job-k/timings")
+        assert response.status_code == 200
+        [row] = response.json()["stages"]
+        assert row["cells"] == 500_000 and row["num_procs"] == 4
+        assert client.get("/api/jobs/nope/timings").status_code == 404
@@ -0,0 +1,165 @@
+"""
+Tests for the levels of detail of result surfaces.
+"""
+
+import json
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.visualization import pressure_surface, surface_lod
+
+
+# A torus like a tyre: tube radius R_TUBE around a circle of radius R_WHEEL
+R_WHEEL, R_TUBE = 0.3, 0.02
+
+
+def torus(nu: int = 200, nv: int = 100) -> dict:
+    """A closed torus of 2 nu nv triangles with Cp = cos(u) cos(v)."""
+    u, v = np.meshgrid(np.linspace(0, 2 * np.pi, nu, endpoint=False),
+                       np.linspace(0, 2 * np.pi, nv, endpoint=False), indexing="ij")
+    points = np.stack([(R_WHEEL + R_TUBE * np.cos(v)) * np.cos(u), R_TUBE * np.sin(v),
+                       (R_WHEEL + R_TUBE * np.cos(v)) * np.sin(u)], axis=-1).reshape(-1, 3)
+    i, j = np.meshgrid(np.arange(nu), np.arange(nv), indexing="ij")
+    a, b = i * nv + j, (i + 1) % nu * nv + j
+    c, d = (i + 1) % nu * nv + (j + 1) % nv, i * nv + (j + 1) % nv
+    triangles = np.concatenate([np.stack([a, b, c], -1).reshape(-1, 3),
+                                np.stack([a, c, d], -1).reshape(-1, 3)])
+    return {"points": points, "triangles": triangles, "vertex_cp": (np.cos(u) * np.cos(v)).ravel(),
+            "face_p": np.array([-50.0, 80.0]), "n_faces": nu * nv}
+
+
+def distance_to_torus(points: np.ndarray) -> np.ndarray:
+    return np.abs(np.hypot(np.hypot(points[:, 0], points[:, 2]) - R_WHEEL, points[:, 1]) - R_TUBE)
+
+
+@pytest.fixture(scope="module")
+def surface():
+    return torus()
+
+
+class TestDecimate:
+    """Tests for decimating a surface to a triangle budget."""
+
+    @pytest.mark.parametrize("budget", [10000, 2000])
+    def test_budget_respected(self, surface, budget):
+        lod = surface_lod.decimate(surface, budget)
+        assert 0.5 * budget < len(lod["triangles"]) <= budget
+        assert lod["triangles"].max() < len(lod["points"]) == len(lod["vertex_cp"])
+        # Every vertex is used
+        assert len(np.unique(lod["triangles"])) == len(lod["points"])
+
+    def test_geometry_close_to_surface(self, surface):
+        lod = surface_lod.decimate(surface, 10000)
+        assert distance_to_torus(lod["points"]).max() < 0.1 * R_TUBE
+
+    def test_scalar_field_preserved(self, surface):
+        lod = surface_lod.decimate(surface, 10000)
+        cp = lod["vertex_cp"]
+        assert cp.min() < -0.95 and cp.max() > 0.95
+        # Within about a Cp band of the nearest full-surface vertex
+        distances = ((lod["points"][:, None, :] - surface["points"][None, ::4, :]) ** 2).sum(axis=2)
+        nearest = surface["vertex_cp"][::4][distances.argmin(axis=1)]
+        assert np.abs(cp - nearest).max() < 0.15
+
+    def test_no_degenerate_or_duplicate_triangles(self, surface):
+        triangles = surface_lod.decimate(surface, 2000)["triangles"]
+        assert (triangles[:, 0] != triangles[:, 1]).all() and (triangles[:, 1] != triangles[:, 2]).all()
+        assert (triangles[:, 0] != triangles[:, 2]).all()
+        assert len(np.unique(np.sort(triangles, axis=1), axis=0)) == len(triangles)
+
+    def test_within_budget_unchanged(self, surface):
+        assert surface_lod.decimate(surface, 10 ** 6) is surface
+
+    def test_without_cp(self, surface):
+        lod = surface_lod.decimate(dict(surface, vertex_cp=None), 5000)
+        assert lod["vertex_cp"] is None and len(lod["triangles"]) <= 5000
+
+
+class TestLevels:
+    """Tests for the set of levels."""
+
+    def test_full_first_coarser_after(self, surface):
+        levels = surface_lod.levels(surface, [1000, 8000, 10 ** 6])
+        assert levels[0] is surface
+        counts = [len(level["triangles"]) for level in levels]
+        assert len(counts) == 3 and counts[1] <= 8000 and counts[2] <= 1000
+        assert counts == sorted(counts, reverse=True)
+
+
+class TestExport:
+    """Tests for the levels written with the binary surface."""
+
+    @pytest.fixture
+    def case(self, tmp_path, monkeypatch, surface):
+        monkeypatch.setattr(pressure_surface, "read_surface", lambda case_dir, patch_name, speed: surface)
+        monkeypatch.setattr(pressure_surface, "LOD_TRIANGLES", [8000, 1000])
+        return tmp_path
+
+    def test_level_files_and_index(self, case):
+        result = pressure_surface.export_pressure_surface_bin(case, case / "s.bin", quantized=True)
+        assert result["success"]
+        index = json.loads((case / "s.bin.lods.json").read_text())
+        assert [level["file"] for level in index["levels"]] == ["s.bin", "s.lod1.bin", "s.lod2.bin"]
+        assert index["levels"][0]["triangles"] == 40000
+
+        for level in index["levels"]:
+            decoded = pressure_surface.decode_surface((case / level["file"]).read_bytes())
+            assert len(decoded["triangles"]) == level["triangles"]
+            assert (case / f"{level['file']}.etag").read_text() == level["etag"]
+            assert (case / f"{level['file']}.gz").exists()
+            assert decoded["pressure_range"] == [-50.0, 80.0]
+
+    def test_select_level(self):
+        index = {"levels": [{"triangles": 40000}, {"triangles": 7900}, {"triangles": 980}]}
+        assert pressure_surface.select_level(index, None)["triangles"] == 40000
+        assert pressure_surface.select_level(index, 50000)["triangles"] == 40000
+        assert pressure_surface.select_level(index, 10000)["triangles"] == 7900
+        assert pressure_surface.select_level(index, 500)["triangles"] == 980
+
+    def test_endpoint_serves_budget(self, case, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import app as app_module
+
+        monkeypatch.setattr(app_module, "CASES_DIR", case.parent)
+        monkeypatch.setitem(app_module.jobs, case.name, {"status": "complete", "config": {}})
+        client = TestClient(app_module.app)
+        url = f"/api/jobs/{case.name}/viz/pressure_surface.bin"
+
+        full = client.get(url)
+        assert full.headers["x-surface-triangles"] == full.headers["x-surface-full-triangles"] == "40000"
+
+        coarse = client.get(url, params={"max_triangles": 10000})
+        triangles = int(coarse.headers["x-surface-triangles"])
+        assert triangles <= 8000 and coarse.headers["x-surface-full-triangles"] == "40000"
+        assert len(pressure_surface.decode_surface(coarse.content)["triangles"]) == triangles
+        assert coarse.headers["etag"] != full.headers["etag"]
+
+    def test_coarse_levels_follow_newer_solution(self, case, surface, monkeypatch):
+        import os
+        from fastapi.testclient import TestClient
+        from backend import app as app_module
+
+        monkeypatch.setattr(app_module, "CASES_DIR", case.parent)
+        monkeypatch.setitem(app_module.jobs, case.name, {"status": "complete", "config": {}})
+        client = TestClient(app_module.app)
+        url = f"/api/jobs/{case.name}/viz/pressure_surface.bin"
+        first = client.get(url, params={"max_triangles": 1000})
+
+        # Re-solved: a later time with different pressures
+        resolved = dict(surface, vertex_cp=surface["vertex_cp"] * 2, face_p=surface["face_p"] * 2)
+        monkeypatch.setattr(pressure_surface, "read_surface", lambda case_dir, patch_name, speed: resolved)
+        (case / "600").mkdir()
+        (case / "600" / "p").write_text("")
+        later = (case / "visualizations" / "pressure_surface.bin.lods.json").stat().st_mtime + 10
+        os.utime(case / "600" / "p", (later, later))
+
+        second = client.get(url, params={"max_triangles": 1000},
+                            headers={"If-None-Match": first.headers["etag"]})
+        assert second.status_code == 200
+        assert second.headers["etag"] != first.headers["etag"]
+        assert pressure_surface.decode_surface(second.content)["pressure_range"] == [-100.0, 160.0]
@@ -0,0 +1,197 @@
+"""
+Tests for the columnar time-series store and the chart query endpoints.
+"""
+
+import math
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import dat_reader
+from backend import timeseries
+
+
+HEADER = "# Time\tCm\tCd\tCl\tCl(f)\tCl(r)\n"
+
+
+def coeff_rows(start: int, stop: int) -> str:
+    return "".join(f"{i}\t0.01\t{0.5 + 0.1 * math.sin(i / 10)}\t0.1\t0.05\t0.05\n"
+                   for i in range(start, stop))
+
+
+def residual_log(iterations: int, partial: bool = False) -> str:
+    lines = []
+    for i in range(1, iterations + 1):
+        lines.append(f"Time = {i}\n")
+        lines.append(f"smoothSolver:  Solving for Ux, Initial residual = {1 / i}, "
+                     f"Final residual = 0.01, No Iterations 2\n")
+        lines.append(f"GAMG:  Solving for p, Initial residual = {2 / i}, "
+                     f"Final residual = 0.01, No Iterations 5\n")
+        if not (partial and i == iterations):
+            lines.append(f"smoothSolver:  Solving for k, Initial residual = {0.5 / i}, "
+                         f"Final residual = 0.01, No Iterations 1\n")
+            lines.append(f"ExecutionTime = {i} s  ClockTime = {i} s\n\n")
+    return "".join(lines)
+
+
+@pytest.fixture
+def case_dir(tmp_path):
+    case = tmp_path / "ts-job"
+    force_dir = case / "postProcessing" / "forceCoeffs" / "0"
+    force_dir.mkdir(parents=True)
+    (force_dir / "forceCoeffs.dat").write_text(HEADER + coeff_rows(1, 101))
+    yield case
+    dat_reader.forget(tmp_path)
+
+
+def append_rows(case: Path, text: str):
+    with open(case / "postProcessing" / "forceCoeffs" / "0" / "forceCoeffs.dat", "a") as f:
+        f.write(text)
+
+
+class TestLTTB:
+    """Tests for the downsampler."""
+
+    def test_keeps_endpoints_and_count(self):
+        x = np.arange(1000, dtype=float)
+        indices = timeseries.lttb(x, np.sin(x / 50), 100)
+        assert len(indices) == 100
+        assert indices[0] == 0 and indices[-1] == 999
+        assert np.all(np.diff(indices) > 0)
+
+    def test_keeps_spike(self):
+        x = np.arange(1000, dtype=float)
+        y = np.zeros(1000)
+        y[537] = 10.0
+        assert 537 in timeseries.lttb(x, y, 20)
+
+    def test_short_series_untouched(self):
+        assert timeseries.lttb(np.arange(5.0), np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+
+    def test_multiple_fields_within_budget(self):
+        x = np.arange(2000, dtype=float)
+        keep = timeseries.downsample(x, {"a": np.sin(x / 30), "b": np.cos(x / 7)}, 200)
+        assert len(keep) <= 200
+        assert keep[0] == 0 and keep[-1] == 1999
+
+
+class TestStore:
+    """Tests for syncing and querying the store."""
+
+    def test_sync_writes_columns(self, case_dir):
+        meta = timeseries.sync(case_dir, "coefficients")
+        assert meta["rows"] == 100
+        assert meta["columns"] == list(timeseries.COEFFICIENT_COLUMNS)
+        stored = np.fromfile(case_dir / "timeseries" / "coefficients" / "Cd.f8", dtype="<f8")
+        assert stored[0] == pytest.approx(0.5 + 0.1 * math.sin(0.1))
+
+    def test_sync_appends_only_new_rows(self, case_dir):
+        timeseries.sync(case_dir, "coefficients")
+        append_rows(case_dir, coeff_rows(101, 111))
+        meta = timeseries.sync(case_dir, "coefficients")
+        assert (meta["rows"], meta["generation"]) == (110, 1)
+        time = np.fromfile(case_dir / "timeseries" / "coefficients" / "time.f8", dtype="<f8")
+        assert time.tolist() == list(range(1, 111))
+
+    def test_rewritten_output_rebuilds(self, case_dir):
+        timeseries.sync(case_dir, "coefficients")
+        force_file = case_dir / "postProcessing" / "forceCoeffs" / "0" / "forceCoeffs.dat"
+        force_file.write_text(HEADER + coeff_rows(1, 11))
+        meta = timeseries.sync(case_dir, "coefficients")
+        assert (meta["rows"], meta["generation"]) == (10, 2)
+
+    def test_final_store_not_resynced(self, case_dir):
+        timeseries.compact(case_dir)
+        append_rows(case_dir, coeff_rows(101, 111))
+        assert timeseries.sync(case_dir, "coefficients")["rows"] == 100
+        timeseries.forget(case_dir)
+        assert timeseries.sync(case_dir, "coefficients")["rows"] == 110
+
+    def test_missing_output_creates_nothing(self, tmp_path):
+        meta = timeseries.sync(tmp_path / "not-started", "forces")
+        assert meta["rows"] == 0
+        assert not (tmp_path / "not-started").exists()
+
+    def test_query_window_and_downsample(self, case_dir):
+        result = timeseries.query(case_dir, "coefficients", ["Cd"], start=20, end=80, max_points=12)
+        assert result["rows"] == 100 and result["window_rows"] == 61
+        assert len(result["time"]) <= 12
+        assert result["time"][0] == 20 and result["time"][-1] == 80
+        assert set(result) >= {"time", "Cd"} and "Cl" not in result
+
+    def test_query_unknown_field(self, case_dir):
+        with pytest.raises(ValueError):
+            timeseries.query(case_dir, "coefficients", ["Cx"])
+
+    def test_etag_changes_with_rows_and_params(self, case_dir):
+        first = timeseries.query(case_dir, "coefficients", max_points=50)["etag"]
+        assert timeseries.query(case_dir, "coefficients", max_points=50)["etag"] == first
+        assert timeseries.query(case_dir, "coefficients", max_points=40)["etag"] != first
+        append_rows(case_dir, coeff_rows(101, 102))
+        assert timeseries.query(case_dir, "coefficients", max_points=50)["etag"] != first
+
+    def test_residuals_skip_unfinished_step(self, case_dir):
+        (case_dir / "log.foamRun").write_text(residual_log(10, partial=True))
+        meta = timeseries.sync(case_dir, "residuals")
+        assert meta["columns"] == ["time", "Ux", "p", "k"]
+        assert meta["rows"] == 9
+
+        timeseries.compact(case_dir)
+        result = timeseries.query(case_dir, "residuals")
+        assert result["rows"] == 10
+        assert result["k"][-1] is None
+        assert result["p"][-1] == pytest.approx(0.2)
+
+
+class TestChartEndpoints:
+    """Tests for the chart endpoints on the store."""
+
+    @pytest.fixture
+    def client(self, case_dir, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend import app as app_module
+
+        monkeypatch.setattr(app_module, "CASES_DIR", case_dir.parent)
+        monkeypatch.setitem(app_module.jobs, case_dir.name, {"status": "solving", "config": {}})
+        return TestClient(app_module.app)
+
+    def test_convergence_downsampled(self, client, case_dir):
+        response = client.get(f"/api/jobs/{case_dir.name}/convergence?max_points=30")
+        data = response.json()
+        assert len(data["time"]) <= 30 and data["rows"] == 100
+        assert data["time"][-1] == 100
+        assert len(response.content) < 4096
+
+    def test_not_modified(self, client, case_dir):
+        url = f"/api/jobs/{case_dir.name}/convergence?max_points=30"
+        etag = client.get(url).headers["etag"]
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        append_rows(case_dir, coeff_rows(101, 103))
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    def test_force_distribution_status_from_full_history(self, client, case_dir):
+        data = client.get(f"/api/jobs/{case_dir.name}/viz/force_distribution?max_points=10").json()
+        assert len(data["time"]) <= 10
+        assert data["final_values"]["time"] == 100
+        # sin-shaped Cd varies by more than 0.01 over the last 50 rows
+        assert data["converged"] is False
+        assert set(data) >= {"Cl_front", "Cl_rear"}
+
+    def test_residuals_endpoint(self, client, case_dir):
+        (case_dir / "log.foamRun").write_text(residual_log(20))
+        data = client.get(f"/api/jobs/{case_dir.name}/viz/residuals").json()
+        assert data["iterations"] == list(range(1, 21))
+        assert data["Uy"] == [] and data["omega"] == []
+
+    def test_generic_endpoint(self, client, case_dir):
+        base = f"/api/jobs/{case_dir.name}/timeseries"
+        data = client.get(f"{base}/coefficients?fields=Cd,Cl&start=50").json()
+        assert data["time"][0] == 50 and set(data) >= {"Cd", "Cl"}
+        assert client.get(f"{base}/coefficients?fields=Cx").status_code == 400
+        assert client.get(f"{base}/pressure").status_code == 404
+        assert client.get(f"{base}/coefficients?max_points=2").status_code == 400
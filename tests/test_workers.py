@@ -0,0 +1,417 @@
+"""
+Tests for the remote worker protocol: coordinator leases, the blob store
+and several workers running a yaw sweep against a local server.
+"""
+
+import asyncio
+import hashlib
+import json
+import socket
+import struct
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import pytest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import workers
+from backend.worker_client import WorkerClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def coordinator(clock):
+    coordinator = workers.Coordinator(lease_ttl=60, clock=clock)
+    coordinator.register("node-a", 64)
+    return coordinator
+
+
+def worker_id(coordinator, index=0):
+    return list(coordinator.workers)[index]
+
+
+class TestCoordinator:
+    """Tests for leasing, expiry and re-queueing."""
+
+    def test_jobs_leased_in_order(self, coordinator):
+        coordinator.enqueue("job-1")
+        coordinator.enqueue("job-2")
+        assert coordinator.lease(worker_id(coordinator))["job_id"] == "job-1"
+        assert coordinator.lease(worker_id(coordinator))["job_id"] == "job-2"
+        assert coordinator.lease(worker_id(coordinator)) is None
+
+    def test_unknown_worker_cannot_lease(self, coordinator):
+        coordinator.enqueue("job-1")
+        with pytest.raises(workers.LeaseError):
+            coordinator.lease("nobody")
+
+    def test_expired_lease_requeued_first(self, coordinator, clock):
+        coordinator.enqueue("job-1")
+        coordinator.enqueue("job-2")
+        coordinator.lease(worker_id(coordinator))
+        clock.now = 61
+        assert coordinator.expire() == [{"job_id": "job-1", "action": "requeued"}]
+        assert list(coordinator.queue) == ["job-1", "job-2"]
+
+    def test_renew_keeps_lease(self, coordinator, clock):
+        coordinator.enqueue("job-1")
+        lease = coordinator.lease(worker_id(coordinator))
+        clock.now = 50
+        coordinator.renew(lease["lease_id"])
+        clock.now = 100
+        assert coordinator.expire() == []
+
+    def test_fails_after_max_attempts(self, coordinator, clock):
+        coordinator.enqueue("job-1")
+        for attempt in range(workers.MAX_ATTEMPTS):
+            coordinator.touch(worker_id(coordinator))
+            assert coordinator.lease(worker_id(coordinator))["job_id"] == "job-1"
+            clock.now += 61
+            events = coordinator.expire()
+        assert events == [{"job_id": "job-1", "action": "failed"}]
+        assert not coordinator.is_managed("job-1")
+
+    def test_cancel_revokes_lease(self, coordinator):
+        coordinator.enqueue("job-1")
+        lease = coordinator.lease(worker_id(coordinator))
+        assert coordinator.cancel("job-1")
+        with pytest.raises(workers.LeaseError):
+            coordinator.renew(lease["lease_id"])
+
+    def test_cancel_queued(self, coordinator):
+        coordinator.enqueue("job-1")
+        assert coordinator.cancel("job-1")
+        assert not coordinator.queue
+        assert not coordinator.cancel("job-1")
+
+
+class TestBlobStore:
+    """Tests for content-addressed blobs and case archives."""
+
+    def test_store_and_verify(self, tmp_path):
+        digest = workers.store_blob_bytes(b"wheel", blobs_dir=tmp_path)
+        assert workers.blob_path(digest, tmp_path).read_bytes() == b"wheel"
+        with pytest.raises(ValueError):
+            workers.store_blob_bytes(b"other", expected_digest=digest, blobs_dir=tmp_path)
+
+    def test_store_stream(self, tmp_path):
+        async def chunks(*parts):
+            for part in parts:
+                yield part
+
+        digest = hashlib.sha256(b"wheel").hexdigest()
+        size = asyncio.run(workers.store_blob_stream(chunks(b"wh", b"eel"), digest, tmp_path))
+        assert size == 5
+        assert workers.blob_path(digest, tmp_path).read_bytes() == b"wheel"
+
+        other = hashlib.sha256(b"tyre").hexdigest()
+        with pytest.raises(ValueError):
+            asyncio.run(workers.store_blob_stream(chunks(b"rim"), other, tmp_path))
+        # Nothing is left behind for a rejected upload
+        assert not workers.blob_path(other, tmp_path).exists()
+        assert [p.name for p in (tmp_path / digest[:2]).iterdir()] == [digest]
+
+    def test_stream_size_limit(self, tmp_path):
+        async def chunks():
+            for _ in range(4):
+                yield b"x" * 10
+
+        digest = hashlib.sha256(b"x" * 40).hexdigest()
+        with pytest.raises(workers.BlobTooLarge):
+            asyncio.run(workers.store_blob_stream(chunks(), digest, tmp_path, max_size=25))
+        assert list((tmp_path / digest[:2]).iterdir()) == []
+
+    def test_rejects_bad_digest(self, tmp_path):
+        with pytest.raises(ValueError):
+            workers.blob_path("../../etc/passwd", tmp_path)
+
+    def test_archive_round_trip(self, tmp_path):
+        src = tmp_path / "case"
+        (src / "system").mkdir(parents=True)
+        (src / "system" / "controlDict").write_text("endTime 500;")
+        (src / "processor0").mkdir()
+        (src / "processor0" / "p").write_text("x")
+
+        archive = tmp_path / "case.tar.gz"
+        workers.archive_directory(src, archive, lambda rel: rel.parts[0] == "processor0")
+        workers.extract_archive(archive, tmp_path / "out")
+
+        assert (tmp_path / "out" / "system" / "controlDict").read_text() == "endTime 500;"
+        assert not (tmp_path / "out" / "processor0").exists()
+
+
+# =============================================================================
+# Several workers against a local server
+# =============================================================================
+
+def write_wheel_stl(path: Path):
+    """A small closed tetrahedron in millimetres (wheel-sized)."""
+    vertices = [(0, 0, 0), (600, 0, 0), (300, 600, 0), (300, 300, 30)]
+    faces = [(0, 2, 1), (0, 1, 3), (1, 2, 3), (2, 0, 3)]
+    with open(path, "wb") as f:
+        f.write(b"binary test wheel".ljust(80, b"\x00"))
+        f.write(struct.pack("<I", len(faces)))
+        for face in faces:
+            f.write(struct.pack("<3f", 0, 0, 0))
+            for i in face:
+                f.write(struct.pack("<3f", *vertices[i]))
+            f.write(struct.pack("<H", 0))
+
+
+def fake_runner(job, case_dir, proc_plan, stop):
+    """Stands in for OpenFOAM: checks the case and writes a result file."""
+    assert (case_dir / "system" / "controlDict").exists()
+    assert (case_dir / "constant" / "triSurface" / "wheel.stl").exists()
+    job["status"] = "solving"
+    job["progress"] = 50
+    time.sleep(0.3)
+    (case_dir / "postProcessing").mkdir()
+    (case_dir / "postProcessing" / "done").write_text(job["id"])
+    return {"coefficients": {"Cd": 0.5}, "forces": {"drag_N": 1.0}, "CdA": 0.01}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """The API on a free localhost port, with temporary storage."""
+    import uvicorn
+    from backend import app as app_module
+    from backend import database as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "test_wheelflow.db")
+    db.init_db()
+    for name in ("UPLOAD_DIR", "CASES_DIR"):
+        (tmp_path / name).mkdir()
+        monkeypatch.setattr(app_module, name, tmp_path / name)
+    monkeypatch.setattr(workers, "BLOBS_DIR", tmp_path / "blobs")
+    monkeypatch.setattr(workers, "EXPIRY_CHECK_INTERVAL", 0.2)
+    monkeypatch.setattr(workers, "WORKER_TOKEN", "s3cret")
+    monkeypatch.setattr(workers, "coordinator", workers.Coordinator(lease_ttl=2))
+
+    write_wheel_stl(tmp_path / "UPLOAD_DIR" / "wheel01.stl")
+
+    port = free_port()
+    uv = uvicorn.Server(uvicorn.Config(app_module.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=uv.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 30
+    while not uv.started:
+        assert time.time() < deadline, "server did not start"
+        time.sleep(0.05)
+
+    yield f"http://127.0.0.1:{port}", app_module, tmp_path
+
+    uv.should_exit = True
+    thread.join(timeout=10)
+
+
+def start_workers(url, tmp_path, count, stop):
+    clients = [WorkerClient(url, cores=4, memory_gb=16,
+                            work_dir=tmp_path / f"worker{i}" / "cases",
+                            cache_dir=tmp_path / f"worker{i}" / "cache",
+                            runner=fake_runner, poll_interval=0.1)
+               for i in range(count)]
+    threads = [threading.Thread(target=c.run_forever, args=(stop,), daemon=True) for c in clients]
+    for t in threads:
+        t.start()
+    return clients, threads
+
+
+def wait_for(condition, timeout=60):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.1)
+
+
+def post_form(url: str, path: str, fields: dict) -> dict:
+    data = urllib.parse.urlencode(fields).encode()
+    with urllib.request.urlopen(urllib.request.Request(url + path, data=data, method="POST")) as response:
+        return json.loads(response.read())
+
+
+def start_sweep(url: str, yaw_angles: str) -> dict:
+    return post_form(url, "/api/simulate/batch", {
+        "file_id": "wheel01", "name": "sweep", "yaw_angles": yaw_angles,
+        "quality": "basic", "executor": "remote",
+    })
+
+
+class TestLocalhostWorkers:
+    """End-to-end protocol tests over HTTP."""
+
+    def test_batch_runs_on_several_workers(self, server):
+        url, app_module, tmp_path = server
+        batch = start_sweep(url, "0,5,10,15")
+
+        stop = threading.Event()
+        clients, threads = start_workers(url, tmp_path, 3, stop)
+        try:
+            wait_for(lambda: app_module.batch_jobs[batch["batch_id"]]["status"] == "complete")
+        finally:
+            stop.set()
+            for t in threads:
+                t.join(timeout=10)
+
+        ran_on = set()
+        for job_id in batch["job_ids"]:
+            job = app_module.jobs[job_id]
+            assert job["status"] == "complete"
+            assert job["results"]["coefficients"]["Cd"] == 0.5
+            ran_on.add(job["worker_id"])
+            # The finished case came back to the coordinator
+            assert (app_module.CASES_DIR / job_id / "postProcessing" / "done").read_text() == job_id
+        assert len(ran_on) > 1
+        assert app_module.batch_jobs[batch["batch_id"]]["results"]["completed_jobs"] == 4
+
+    def test_dead_worker_lease_requeued(self, server):
+        url, app_module, tmp_path = server
+        batch = start_sweep(url, "0")
+        job_id = batch["job_ids"][0]
+
+        wait_for(lambda: workers.coordinator.is_managed(job_id))
+
+        # A worker leases the job and dies without reporting
+        dead = WorkerClient(url, cores=4, work_dir=tmp_path / "dead" / "cases",
+                            runner=fake_runner)
+        dead.register()
+        status, lease = dead.request("POST", f"/api/workers/{dead.worker_id}/lease")
+        assert status == 200 and lease["job_id"] == job_id
+        assert lease["proc_plan"]["solver_procs"] <= 4
+
+        wait_for(lambda: job_id in workers.coordinator.queue, timeout=30)
+
+        stop = threading.Event()
+        _, threads = start_workers(url, tmp_path, 1, stop)
+        try:
+            wait_for(lambda: app_module.jobs[job_id]["status"] == "complete")
+        finally:
+            stop.set()
+            for t in threads:
+                t.join(timeout=10)
+
+        # The dead worker's late report is refused
+        status, _ = dead.request("POST", f"/api/workers/leases/{lease['lease_id']}/progress",
+                                 {"status": "solving", "progress": 50})
+        assert status == 410
+
+    def test_cancel_queued_remote_job(self, server):
+        url, app_module, tmp_path = server
+        batch = start_sweep(url, "0")
+        job_id = batch["job_ids"][0]
+        wait_for(lambda: workers.coordinator.is_managed(job_id))
+        # The case was generated and published before the job was queued
+        assert (app_module.CASES_DIR / job_id / "system" / "controlDict").exists()
+        assert app_module.remote_inputs[job_id]
+
+        assert post_form(url, f"/api/jobs/{job_id}/cancel", {})["status"] == "cancelled"
+        assert not workers.coordinator.queue
+        wait_for(lambda: app_module.batch_jobs[batch["batch_id"]]["status"] == "complete")
+
+    def test_delete_queued_remote_job(self, server):
+        url, app_module, tmp_path = server
+        from backend import database as db
+
+        batch = start_sweep(url, "0")
+        job_id = batch["job_ids"][0]
+        wait_for(lambda: workers.coordinator.is_managed(job_id))
+
+        request = urllib.request.Request(f"{url}/api/jobs/{job_id}", method="DELETE")
+        with urllib.request.urlopen(request) as response:
+            assert response.status == 200
+        assert not workers.coordinator.is_managed(job_id)
+        # The waiting pipeline task does not write the deleted job back
+        wait_for(lambda: job_id not in app_module.remote_inputs)
+        assert db.get_job(job_id) is None
+
+    def test_lease_skips_missing_jobs(self, server):
+        url, app_module, tmp_path = server
+        workers.coordinator.enqueue("gone")
+        client = WorkerClient(url, cores=4, work_dir=tmp_path / "w")
+        client.register()
+        status, _ = client.request("POST", f"/api/workers/{client.worker_id}/lease")
+        assert status == 204
+        assert not workers.coordinator.is_managed("gone")
+        assert not workers.coordinator.leases
+
+    def test_worker_cannot_set_final_status(self, server):
+        url, app_module, tmp_path = server
+        batch = start_sweep(url, "0")
+        job_id = batch["job_ids"][0]
+        wait_for(lambda: workers.coordinator.is_managed(job_id))
+
+        client = WorkerClient(url, cores=4, work_dir=tmp_path / "w")
+        client.register()
+        _, lease = client.request("POST", f"/api/workers/{client.worker_id}/lease")
+        progress = f"/api/workers/leases/{lease['lease_id']}/progress"
+        status, _ = client.request("POST", progress, {"status": "complete", "progress": 100})
+        assert status == 400
+        assert app_module.jobs[job_id]["status"] == "leased"
+        status, _ = client.request("POST", progress, {"status": "solving", "progress": 60})
+        assert status == 200
+        assert app_module.jobs[job_id]["status"] == "solving"
+
+        # Cancelled while the worker was finishing: its result is refused
+        app_module.jobs[job_id]["status"] = "cancelled"
+        status, _ = client.request("POST", f"/api/workers/leases/{lease['lease_id']}/complete",
+                                   {"results": {"coefficients": {"Cd": 0.5}}})
+        assert status == 410
+        assert app_module.jobs[job_id]["status"] == "cancelled"
+        assert not workers.coordinator.is_managed(job_id)
+
+
+class TestWorkerAuth:
+    """Worker endpoints require the shared token."""
+
+    def test_requests_without_token_rejected(self, server):
+        url, app_module, tmp_path = server
+        intruder = WorkerClient(url, cores=4, work_dir=tmp_path / "intruder", token="wrong")
+        status, _ = intruder.request("POST", "/api/workers/register",
+                                     {"hostname": "x", "cores": 4})
+        assert status == 401
+        status, _ = intruder.request("PUT", f"/api/workers/blobs/{'0' * 64}", data=b"junk")
+        assert status == 401
+        status, _ = intruder.request("POST", "/api/workers/leases/any/complete", {})
+        assert status == 401
+
+    def test_disabled_without_token(self, server, monkeypatch):
+        url, app_module, tmp_path = server
+        monkeypatch.setattr(workers, "WORKER_TOKEN", None)
+        client = WorkerClient(url, cores=4, work_dir=tmp_path / "w", token="s3cret")
+        status, _ = client.request("POST", "/api/workers/register", {"hostname": "x", "cores": 4})
+        assert status == 403
+        with pytest.raises(urllib.error.HTTPError) as e:
+            start_sweep(url, "0")
+        assert e.value.code == 400
+
+    def test_oversized_blob_rejected(self, server, monkeypatch):
+        url, app_module, tmp_path = server
+        monkeypatch.setattr(workers, "MAX_BLOB_SIZE", 16)
+        client = WorkerClient(url, cores=4, work_dir=tmp_path / "w")
+        data = b"x" * 64
+        status, _ = client.request("PUT", f"/api/workers/blobs/{hashlib.sha256(data).hexdigest()}",
+                                   data=data)
+        assert status == 413